@@ -3,28 +3,2959 @@
 # 데이터 분석팀에서 제공 - 백엔드 담당자용
 
 # 필요한 라이브러리(기능 묶음)들을 불러옵니다.
-# pandas: 데이터를 표(DataFrame) 형태로 다루는 데 사용하는 라이브러리
-import pandas as pd
 # numpy: 숫자 계산을 효율적으로 처리하는 라이브러리
 import numpy as np
-# sklearn.metrics.pairwise: '코사인 유사도'를 계산하는 기능을 제공하는 라이브러리
 # 코사인 유사도(Cosine Similarity)란?
 # 벡터(데이터를 숫자로 표현한 것)들이 얼마나 비슷한 방향을 가리키는지 측정하여
 # 두 데이터가 얼마나 유사한지 판단하는 방법입니다. 값이 1에 가까울수록 매우 유사하다는 뜻입니다.
-from sklearn.metrics.pairwise import cosine_similarity
-# joblib: 파이썬 객체를 파일로 저장하고 불러오는 데 사용되는 라이브러리
-# 머신러닝 모델을 학습시킨 후, 다시 학습하지 않고 빠르게 불러와 사용하기 위해 주로 쓰입니다.
-import joblib
+# (아래 CosineSimilarityBackend에서 numpy 행렬 곱으로 직접 계산합니다.)
 # json: 데이터를 딕셔너리 형태로 저장하고 불러올 때 사용하는 라이브러리
 import json
 # os: 파일이나 폴더 경로를 다루는 데 사용되는 라이브러리
 import os
+# shutil, tempfile: 모델 번들을 임시 폴더에 다 만든 뒤 한 번에 바꿔 넣고, 지난 번들 폴더를 지울 때 사용하는 라이브러리
+import shutil
+import tempfile
 # datetime: 날짜와 시간을 다루는 라이브러리
 from datetime import datetime
 # collections: 자료구조를 더 효율적으로 다루기 위한 라이브러리
-# defaultdict, Counter: 딕셔너리와 비슷한 기능으로, 값이 없을 때 기본값을 설정하거나
+# Counter, OrderedDict: 딕셔너리와 비슷한 기능으로, 순서를 기억하거나
 # 항목의 개수를 쉽게 세는 기능을 제공합니다.
-from collections import defaultdict, Counter
+from collections import Counter, OrderedDict
+# time: 학습/일괄 추천 시간과 체크포인트 주기를 재는 데 사용하는 라이브러리
+import time
+# threading: 여러 요청(스레드)이 캐시를 동시에 사용할 때 잠금(Lock)을 거는 데 사용하는 라이브러리
+import threading
+# itertools: 모든 답 조합을 만들 때(itertools.product) 사용하는 라이브러리
+import itertools
+# copy: 모델을 업데이트할 때 읽는 스레드가 쓰고 있는 객체 대신 복사본을 고치는 데 사용하는 라이브러리
+import copy
+# contextlib, io: 대량으로 계산할 때 중간 출력 메시지를 숨기는 데 사용하는 라이브러리
+import contextlib
+import io
+# importlib: 무거운 라이브러리를 처음 사용할 때 불러오는(지연 import) 데 사용하는 라이브러리
+import importlib
+# asyncio, concurrent.futures: 비동기 서버에서 이벤트 루프를 막지 않고 추천을 계산할 때 사용하는 라이브러리
+import asyncio
+import concurrent.futures
+
+
+class _LazyModule:
+    """
+    처음 사용할 때 import되는 모듈 대리(proxy) 객체
+
+    pandas와 joblib은 불러오는 데 시간이 오래 걸리지만 학습(train_model)과 저장, 증분 학습에만 필요합니다.
+    저장된 모델 번들을 불러와 추천만 하는 워커는 numpy와 표준 라이브러리만으로 동작하므로,
+    모듈을 import할 때는 이름만 만들어 두고 실제 import는 `pd.read_csv`처럼 처음 사용할 때 합니다.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+# pandas: 데이터를 표(DataFrame) 형태로 다루는 데 사용하는 라이브러리
+pd = _LazyModule('pandas')
+# joblib: 파이썬 객체를 파일로 저장하고 불러오는 데 사용되는 라이브러리
+# 머신러닝 모델을 학습시킨 후, 다시 학습하지 않고 빠르게 불러와 사용하기 위해 주로 쓰입니다.
+joblib = _LazyModule('joblib')
+
+
+# 유사도 계산에 사용하는 6개 특징(Feature)입니다.
+# 기존 5개 + '다음_휴가_경험' 추가
+SELECTED_FEATURES = [
+    '연령대',
+    '성별',
+    '함께한_사람',
+    '휴가_장소_국내_해외',
+    '가장_최근_여름_휴가',
+    '다음_휴가_경험'  # 새로 추가된 특징
+]
+
+# 학습과 유사 사용자 선정에 사용하는 '만족도가 높은' 응답 값입니다.
+SATISFIED_LEVELS = ['만족', '매우 만족', '보통']
+
+# 만족도 응답 -> 점수 (사전에 없는 값은 '보통'과 같은 3점으로 계산합니다)
+SATISFACTION_SCORES = {'매우 불만족': 1, '불만족': 2, '보통': 3, '만족': 4, '매우 만족': 5}
+
+# 패턴 학습(점수표, 다음 휴가 전이 행렬, 비용 빈도표)에 사용하는 컬럼과
+# 응답에 그 컬럼이 없을 때 쓰는 기본값입니다. (row.get(컬럼, 기본값)과 같은 규칙)
+PATTERN_COLUMNS = {
+    '가장_최근_여름_휴가': '기타',
+    '휴가_장소_국내_해외': '기타',
+    '휴가_장소': '기타',
+    '만족도': '보통',
+    '다음_휴가_경험': '기타',
+    '연령대': '기타',
+    '성별': '기타',
+    '함께한_사람': '기타',
+    '총_비용': '기타',
+}
+
+# 유사 사용자 검색의 기본 후보 조건 {컬럼: 허용 값}입니다.
+# 검색 엔진이 이 조건에 맞는 응답자만 담은 색인(FilteredIndex)에서 찾으므로,
+# 상위 5명을 뽑은 뒤 걸러 내다 5명보다 적어지는 일이 없습니다.
+SATISFIED_FILTER = {'만족도': SATISFIED_LEVELS}
+
+
+class SurveyVocabulary:
+    """
+    🔠 설문 범주형 값 사전 (학습, 모델 번들, 추천이 함께 쓰는 값 번호표)
+
+    컬럼마다 응답 값(예: '해수욕, 물놀이')에 처음 등장한 순서대로 작은 정수 번호를 매겨 둡니다.
+    추천 점수표(ScoringTable), 다음 휴가 전이 행렬(CollaborativeFilter), 비용 빈도표(CostTable)와
+    모델 번들의 codes 배열이 모두 이 번호를 쓰므로, 학습과 집계는 긴 한국어 문자열 대신 정수 배열로 하고
+    문자열은 추천 결과와 cost_info를 만들 때만 번호로 찾아 붙입니다.
+
+    한 번 매긴 번호는 바뀌지 않고 새 값은 목록 끝에만 추가되므로,
+    이미 만든 집계 배열이나 모델 스냅샷은 사전이 늘어나도 그대로 쓸 수 있습니다.
+    """
+
+    def __init__(self, values=None):
+        # 컬럼별 '번호 -> 값' 목록과 '값 -> 번호' 사전
+        self.values = {}
+        self._codes = {}
+        for column, column_values in (values or {}).items():
+            self.values[column] = [self._key(value) for value in column_values]
+            self._codes[column] = {value: code for code, value in enumerate(self.values[column])}
+
+    @staticmethod
+    def _key(value):
+        """빈 값(NaN)은 객체마다 다르게 비교되므로 np.nan 하나로 모읍니다."""
+        if isinstance(value, float) and value != value:
+            return np.nan
+        return value
+
+    def code(self, column, value):
+        """값의 번호 (처음 보는 값이면 목록 끝에 추가)"""
+        codes = self._codes.setdefault(column, {})
+        value = self._key(value)
+        code = codes.get(value)
+        if code is None:
+            values = self.values.setdefault(column, [])
+            # 읽는 쪽이 번호를 보기 전에 값이 목록에 있도록 목록에 먼저 추가합니다.
+            values.append(value)
+            code = codes[value] = len(values) - 1
+        return code
+
+    def get(self, column, value, default=-1):
+        """값의 번호 (처음 보는 값이면 사전에 추가하지 않고 default)"""
+        return self._codes.get(column, {}).get(self._key(value), default)
+
+    def size(self, column):
+        """컬럼의 값 개수"""
+        return len(self.values.get(column, ()))
+
+    def encode(self, column, values):
+        """값 배열을 번호 배열로 바꿉니다 (처음 보는 값은 등장 순서대로 새 번호)."""
+        value_codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        unique_codes = np.array([self.code(column, value) for value in uniques.tolist()], dtype=np.intp)
+        return unique_codes[value_codes]
+
+    def pattern_codes(self, codes, n_rows):
+        """
+        패턴 학습용 컬럼(PATTERN_COLUMNS)의 번호 배열 사전을 완성합니다.
+
+        codes에 없는 컬럼은 `row.get(컬럼, 기본값)`처럼 모든 행을 기본값의 번호로 채웁니다.
+        """
+        return {
+            column: codes[column] if column in codes else np.full(n_rows, self.code(column, default), dtype=np.intp)
+            for column, default in PATTERN_COLUMNS.items()
+        }
+
+    def code_record(self, record):
+        """응답 한 개(dict 또는 Series)의 패턴 학습용 컬럼 번호 {컬럼: 번호}"""
+        return {column: self.code(column, record.get(column, default)) for column, default in PATTERN_COLUMNS.items()}
+
+    def satisfaction_scores(self):
+        """'만족도' 값 번호 -> 점수 배열"""
+        return np.array([SATISFACTION_SCORES.get(value, 3) for value in self.values.get('만족도', ())],
+                        dtype=np.int64)
+
+    def to_dict(self):
+        """JSON으로 저장할 수 있는 {컬럼: 값 목록} 딕셔너리"""
+        return {column: list(values) for column, values in self.values.items()}
+
+
+class FeatureEncoder:
+    """
+    🔤 고정(Frozen) 범주형 인코더
+
+    학습할 때 만들어진 원-핫 인코딩 열(Column) 목록을 한 번만 분석해서
+    '특징 -> 값 -> 열 번호' 사전을 만들어 둡니다.
+
+    추천 요청마다 `pd.DataFrame` + `pd.get_dummies` + `reindex`를 반복하는 대신
+    사전 조회 몇 번으로 사용자 벡터(NumPy 배열)를 바로 만들 수 있습니다.
+    학습 데이터에 없던 값은 `pd.get_dummies` + `reindex`와 마찬가지로 0으로 남습니다.
+    """
+
+    def __init__(self, columns, fields):
+        # columns: features_encoded의 열 이름 목록 (예: '연령대_20대')
+        # fields: 인코딩에 사용된 원래 특징 이름 목록 (예: '연령대')
+        self.columns = list(columns)
+        self.fields = list(fields)
+
+        # field_index: {'연령대': {'20대': 3, '30대': 4, ...}, ...}
+        self.field_index = {field: {} for field in self.fields}
+        for col_idx, col in enumerate(self.columns):
+            # '휴가_장소'와 '휴가_장소_국내_해외'처럼 앞부분이 겹치는 특징이 있으므로
+            # 가장 길게 일치하는 특징 이름을 찾습니다.
+            matches = [field for field in self.fields if col.startswith(field + '_')]
+            if not matches:
+                continue
+            field = max(matches, key=len)
+            self.field_index[field][col[len(field) + 1:]] = col_idx
+
+    @property
+    def width(self):
+        """인코딩된 벡터의 길이 (열 개수)"""
+        return len(self.columns)
+
+    @classmethod
+    def from_encoded_frame(cls, features_encoded, fields):
+        """`pd.get_dummies` 결과(features_encoded)로부터 인코더 생성"""
+        return cls(features_encoded.columns, fields)
+
+    def encode(self, user_data):
+        """
+        사용자 설문 응답(dict)을 (1, 열 개수) 크기의 float32 배열로 변환합니다.
+
+        DataFrame을 전혀 만들지 않고, 특징마다 사전 조회 한 번으로 1을 채웁니다.
+        """
+        vector = np.zeros((1, len(self.columns)), dtype=np.float32)
+        for field, value_index in self.field_index.items():
+            col_idx = value_index.get(user_data.get(field))
+            if col_idx is not None:
+                vector[0, col_idx] = 1.0
+        return vector
+
+    def encode_many(self, records):
+        """
+        여러 응답(dict 목록)을 한 번에 (응답 수, 열 개수) 크기의 float32 배열로 변환합니다.
+
+        행마다 `encode()`를 호출한 결과와 같습니다.
+        """
+        matrix = np.zeros((len(records), len(self.columns)), dtype=np.float32)
+        for field, value_index in self.field_index.items():
+            rows, cols = [], []
+            for row, user_data in enumerate(records):
+                col_idx = value_index.get(user_data.get(field))
+                if col_idx is not None:
+                    rows.append(row)
+                    cols.append(col_idx)
+            matrix[rows, cols] = 1.0
+        return matrix
+
+    def encode_frame(self, df):
+        """
+        여러 응답(DataFrame)을 한 번에 (행 수, 열 개수) 크기의 float32 배열로 변환합니다.
+
+        행마다 `encode()`를 호출한 결과와 같습니다 (학습 데이터에 없던 값과 빈 값은 0).
+        """
+        matrix = np.zeros((len(df), len(self.columns)), dtype=np.float32)
+        for field, value_index in self.field_index.items():
+            if field not in df.columns or not value_index:
+                continue
+            col_idx = df[field].map(value_index).to_numpy(dtype=np.float64, na_value=np.nan)
+            rows = np.flatnonzero(~np.isnan(col_idx))
+            matrix[rows, col_idx[rows].astype(np.intp)] = 1.0
+        return matrix
+
+    def to_dict(self):
+        """JSON으로 저장할 수 있는 딕셔너리 형태로 변환"""
+        return {'fields': self.fields, 'columns': self.columns}
+
+    @classmethod
+    def from_dict(cls, data):
+        """`to_dict()`로 저장한 딕셔너리로부터 인코더 복원"""
+        return cls(data['columns'], data['fields'])
+
+    def save(self, path):
+        """인코더를 JSON 파일로 저장"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        """JSON 파일에서 인코더 불러오기"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+def select_top_k(scores, top_k):
+    """
+    점수 배열에서 상위 top_k개의 위치(인덱스)를 골라 점수가 높은 순서로 반환합니다.
+
+    전체를 정렬(argsort)하지 않고 `np.argpartition`으로 상위 후보만 고른 뒤
+    후보 k개만 정렬합니다. 점수가 같으면 앞쪽(번호가 작은) 응답자가 먼저 옵니다.
+    """
+    n_rows = scores.shape[0]
+    k = min(top_k, n_rows)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n_rows:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        # argpartition은 경계 점수(k번째 점수)가 같은 응답자 중 아무나 고를 수 있으므로,
+        # 경계 점수보다 높은 응답자 + 경계 점수인 응답자 중 번호가 작은 순서로 다시 채웁니다.
+        kth_score = scores[candidates].min()
+        above = np.flatnonzero(scores > kth_score)
+        tied = np.flatnonzero(scores == kth_score)[:k - len(above)]
+        candidates = np.concatenate([above, tied])
+    else:
+        candidates = np.arange(n_rows)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order]
+
+
+class CosineSimilarityBackend:
+    """
+    🧮 코사인 유사도 검색 엔진 (기본 엔진)
+
+    학습 데이터(features_encoded)를 미리 L2 정규화한 float32 연속 행렬로 만들어 둡니다.
+    요청이 오면 행렬-벡터 곱 한 번으로 모든 응답자의 코사인 유사도를 구하고,
+    `select_top_k`로 상위 k명만 골라냅니다.
+
+    학습 데이터와 질의가 원-핫 벡터(고른 답만 1)이면 코사인 유사도는
+    '같은 답 개수 / (두 벡터 크기의 곱)'이므로, 행렬 곱으로 같은 답 개수(정수)를 구한 뒤
+    점수로 바꿉니다. 덧셈 순서와 상관없이 같은 답 개수면 항상 같은 점수가 나오므로
+    질의 하나(`search`)와 질의 블록(`score_many`)의 점수와 동점 순서가 정확히 같습니다.
+
+    다른 검색 엔진을 쓰고 싶다면 `fit(features)`와 `search(query_vector, top_k)`를
+    가진 객체를 만들어 `VacationRecommendationService(similarity_backend=...)`로 넘기면 됩니다.
+    """
+
+    name = 'cosine'
+
+    def __init__(self):
+        # (응답자 수, 열 개수) 크기의 L2 정규화된 float32 행렬
+        self.matrix = None
+        # 모든 행이 원-핫 벡터이면 행별 벡터 크기 sqrt(답 개수) (float64), 아니면 None
+        self.row_norms = None
+
+    @property
+    def n_rows(self):
+        """색인된 응답자 수"""
+        return 0 if self.matrix is None else self.matrix.shape[0]
+
+    @staticmethod
+    def _one_hot_row_norms(matrix):
+        """L2 정규화된 행렬의 모든 행이 원-핫 벡터(0이 아닌 값이 모두 같음)이면 행별 sqrt(답 개수)를, 아니면 None을 반환합니다."""
+        n_answers = np.count_nonzero(matrix, axis=1)
+        row_norms = np.sqrt(n_answers.astype(np.float64))
+        values = np.divide(1.0, row_norms, out=np.zeros_like(row_norms), where=n_answers > 0).astype(np.float32)
+        if not np.all((matrix == 0) | (np.abs(matrix - values[:, None]) <= 1e-6)):
+            return None
+        return row_norms
+
+    def fit(self, features):
+        """
+        인코딩된 학습 데이터로 검색용 행렬을 (다시) 만듭니다.
+
+        데이터가 바뀔 때만 호출하면 되고, 요청마다 호출할 필요는 없습니다.
+        """
+        matrix = np.array(features, dtype=np.float32, order='C')
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        # 모든 값이 0인 행은 나누지 않고 그대로 둡니다 (유사도 0).
+        norms[norms == 0] = 1.0
+        matrix /= norms
+        self.matrix = matrix
+        self.row_norms = self._one_hot_row_norms(matrix)
+        return self
+
+    def fit_normalized(self, matrix):
+        """
+        이미 L2 정규화된 검색용 행렬(모델 번들의 similarity_matrix)을 복사 없이 그대로 사용합니다.
+        """
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.row_norms = self._one_hot_row_norms(self.matrix)
+        return self
+
+    def _is_one_hot(self, queries):
+        """학습 행렬과 질의들(2차원)이 모두 원-핫 벡터라서 같은 답 개수로 정확히 계산할 수 있는지 확인합니다."""
+        if self.row_norms is None:
+            return False
+        return bool(np.all((queries == 0) | (queries == queries.max(axis=1, keepdims=True))))
+
+    def match_counts_many(self, query_matrix):
+        """
+        원-핫 질의 블록과 모든 응답자의 같은 답 개수를 행렬-행렬 곱 한 번으로 구합니다 (일괄 추천용).
+
+        응답자마다 답 개수가 같으면(보통은 모두 6개) 한 질의 안에서 같은 답 개수의 순서가 곧 유사도의 순서이므로,
+        `ProfileTable.top_respondents_many`가 부동소수 점수 대신 이 정수 행렬로 상위 응답자를 고를 수 있습니다.
+
+        Returns (반환 값):
+            (np.ndarray, np.ndarray) | None: ((질의 수, 응답자 수) uint8 같은 답 개수,
+            (질의 수, 최대 답 개수 + 1) float32 같은 답 개수별 코사인 유사도 - `search()`와 같은 값).
+            원-핫이 아니거나 응답자마다 답 개수가 다르면 None
+        """
+        queries = np.asarray(query_matrix, dtype=np.float32).reshape(-1, self.matrix.shape[1])
+        width = self.matrix.shape[1]
+        if not self._is_one_hot(queries) or len(np.unique(self.row_norms)) > 1 or width > 255:
+            return None
+        row_norm = self.row_norms[0] if len(self.row_norms) else 1.0
+        active = (queries != 0).astype(np.float32)
+        # 정규화된 행렬과 곱하면 '같은 답 개수 / 응답자 벡터 크기'가 나오므로 크기를 곱하고 반올림해 정수로 되돌립니다.
+        # (답이 많아야 수십 개라 float32 오차는 0.5보다 훨씬 작습니다.)
+        counts = active @ self.matrix.T
+        counts *= np.float32(row_norm)
+        np.rint(counts, out=counts)
+        count_scores = self._count_scores(np.arange(width + 1), np.full(width + 1, row_norm),
+                                          np.sqrt(active.sum(axis=1, dtype=np.float64)))
+        return counts.astype(np.uint8), count_scores
+
+    @staticmethod
+    def _count_scores(counts, row_norms, query_norms):
+        """
+        같은 답 개수를 코사인 유사도(같은 답 개수 / (질의 크기 x 응답자 크기))로 바꿉니다.
+
+        counts는 (질의 수, len(row_norms))로 늘려 쓸 수 있는 배열이고, float64로 나눈 뒤 소수점 6자리로 맞춘
+        float32를 돌려줍니다. 질의 크기가 0이면 유사도는 0입니다.
+        """
+        denominators = np.multiply.outer(query_norms, row_norms)
+        scores = np.divide(counts, denominators, out=np.zeros(denominators.shape), where=denominators > 0)
+        return np.round(scores, 6).astype(np.float32)
+
+    def _exact_scores(self, queries):
+        """원-핫 질의들(2차원)과 모든 응답자의 코사인 유사도를 같은 답 개수로 정확히 계산합니다."""
+        active = (queries != 0).astype(np.float32)
+        counts = active @ self.matrix.T
+        counts *= self.row_norms.astype(np.float32)
+        np.rint(counts, out=counts)
+        return self._count_scores(counts, self.row_norms, np.sqrt(active.sum(axis=1, dtype=np.float64)))
+
+    def search(self, query_vector, top_k=5):
+        """
+        질의 벡터와 가장 유사한 응답자 top_k명을 찾습니다.
+
+        Returns (반환 값):
+            (np.ndarray, np.ndarray): (응답자 위치, 코사인 유사도) - 유사도 높은 순
+        """
+        query = np.asarray(query_vector, dtype=np.float32).reshape(1, -1)
+        if self._is_one_hot(query):
+            scores = self._exact_scores(query)[0]
+        else:
+            scores = self._float_scores(query[0])
+        top_indices = select_top_k(scores, top_k)
+        return top_indices, scores[top_indices]
+
+    def _float_scores(self, query):
+        """원-핫이 아닌 질의 벡터 하나의 코사인 유사도 (정규화한 float32 행렬-벡터 곱)"""
+        query_norm = np.linalg.norm(query)
+        if query_norm > 0:
+            query = query / query_norm
+        scores = self.matrix @ query
+        # float32 계산 오차 때문에 같은 점수가 미세하게 달라지지 않도록 소수점 6자리로 맞춥니다.
+        # (순위가 같은 응답자는 항상 번호가 작은 쪽이 먼저 오도록 하기 위함)
+        np.round(scores, 6, out=scores)
+        return scores
+
+    def score_many(self, query_matrix):
+        """
+        여러 질의 벡터의 유사도를 (질의 수, 응답자 수) 행렬 하나에 채웁니다 (일괄 추천용).
+
+        원-핫 질의 블록은 행렬-행렬 곱 한 번으로 같은 답 개수를 구해 점수로 바꾸므로
+        `search()`와 점수가 정확히 같습니다. 원-핫이 아닌 질의는 `search()`와 똑같은 행렬-벡터 곱을
+        질의마다 계산합니다 (float32 덧셈 순서가 달라지면 동점 순서가 달라질 수 있으므로).
+
+        Returns (반환 값):
+            np.ndarray: 코사인 유사도 - `search()`와 같이 소수점 6자리로 맞춘 값
+        """
+        queries = np.asarray(query_matrix, dtype=np.float32).reshape(-1, self.matrix.shape[1])
+        if self._is_one_hot(queries):
+            return self._exact_scores(queries)
+        scores = np.empty((queries.shape[0], self.matrix.shape[0]), dtype=np.float32)
+        for row, query in enumerate(queries):
+            scores[row] = self._float_scores(query)
+        return scores
+
+
+class InvertedIndexBackend:
+    """
+    📇 역색인(Inverted Index) 유사도 검색 엔진
+
+    features_encoded의 모든 열은 6개 설문 응답의 원-핫 인코딩이고,
+    설문의 모든 문항은 하나만 고르는 `<select>`이므로 응답자 벡터의 크기(norm)는 sqrt(답 개수)입니다.
+    따라서 두 응답자의 코사인 유사도는 '같은 답을 고른 문항 수'만 세면 바로 구할 수 있습니다.
+
+    이 엔진은 (문항, 답) 열마다 그 답을 고른 응답자 번호 배열(역색인)을 만들어 두고,
+    요청이 오면 사용자가 고른 답의 역색인만 모아 응답자별 일치 개수를 셉니다.
+    (응답자 수 x 열 개수) 밀집 행렬을 쓰지 않으므로 계산량과 메모리는
+    '일치하는 응답자 수'에 비례하며, 결과(상위 k명과 순서)는 CosineSimilarityBackend와 정확히 같습니다.
+    """
+
+    name = 'inverted_index'
+
+    def __init__(self):
+        # postings[열 번호] = 그 답을 고른 응답자 번호 배열 (오름차순, int32)
+        self.postings = []
+        self._n_rows = 0
+        # 응답자별 벡터 크기 sqrt(답 개수) - 보통은 모두 같은 값입니다.
+        self.row_norms = np.empty(0)
+
+    @property
+    def n_rows(self):
+        """색인된 응답자 수"""
+        return self._n_rows
+
+    def fit(self, features):
+        """
+        원-핫 인코딩된 학습 데이터로 열별 역색인을 만듭니다.
+
+        0이 아닌 칸의 (행, 열) 위치만 뽑아 열 번호 순으로 묶으므로, 밀집 행렬 사본을 만들거나
+        열마다 전체 행을 훑지 않습니다 (추가 메모리는 0이 아닌 칸 수에 비례).
+        `tocoo()`가 있는 희소 행렬(scipy.sparse)도 그대로 받을 수 있습니다.
+        """
+        if hasattr(features, 'tocoo'):
+            coo = features.tocoo()
+            n_rows, width = coo.shape
+            rows, cols = np.asarray(coo.row), np.asarray(coo.col)
+            # COO 행렬은 칸 순서가 정해져 있지 않으므로 (행, 열) 순으로 맞춥니다.
+            order = np.lexsort((cols, rows))
+            rows, cols = rows[order], cols[order]
+        else:
+            features = np.asarray(features)
+            n_rows, width = features.shape
+            # np.nonzero는 행 우선 순서로 위치를 돌려주므로 rows가 이미 오름차순입니다.
+            rows, cols = np.nonzero(features)
+        self._n_rows = n_rows
+        # 응답자별 벡터 크기 = sqrt(고른 답 개수)
+        row_norms = np.sqrt(np.bincount(rows, minlength=n_rows).astype(np.float64))
+        # 답이 하나도 없는 행은 나누지 않습니다 (일치 개수가 0이므로 유사도도 0).
+        row_norms[row_norms == 0] = 1.0
+        self.row_norms = row_norms
+        # 열 번호로 안정 정렬하면 같은 열 안에서는 응답자 번호가 오름차순으로 남습니다.
+        by_column = np.argsort(cols, kind='stable')
+        column_counts = np.bincount(cols, minlength=width)
+        self.postings = np.split(rows[by_column].astype(np.int32), np.cumsum(column_counts)[:-1])
+        return self
+
+    def search(self, query_vector, top_k=5):
+        """
+        질의 벡터와 가장 유사한 응답자 top_k명을 찾습니다.
+
+        Returns (반환 값):
+            (np.ndarray, np.ndarray): (응답자 위치, 코사인 유사도) - 유사도 높은 순
+        """
+        k = min(top_k, self._n_rows)
+        active_columns = np.flatnonzero(np.asarray(query_vector).ravel())
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+
+        # 사용자가 고른 답의 역색인만 모아서 응답자별 일치 개수를 셉니다.
+        if len(active_columns):
+            matched = np.concatenate([self.postings[col] for col in active_columns])
+        else:
+            matched = np.empty(0, dtype=np.int32)
+        if len(matched) * 4 >= self._n_rows:
+            # 일치 항목이 많으면 정렬(np.unique)보다 응답자 수 크기의 카운터(bincount)가 더 빠릅니다.
+            counts = np.bincount(matched, minlength=self._n_rows)
+            candidate_ids = np.arange(self._n_rows)
+            match_counts = counts
+        else:
+            candidate_ids, match_counts = np.unique(matched, return_counts=True)
+
+        # 일치 개수를 코사인 유사도로 바꿉니다 (CosineSimilarityBackend와 같이 소수점 6자리).
+        query_norm = np.sqrt(len(active_columns))
+        if query_norm > 0:
+            candidate_scores = np.round(match_counts / (self.row_norms[candidate_ids] * query_norm), 6)
+        else:
+            candidate_scores = np.zeros(len(candidate_ids))
+
+        # candidate_ids가 오름차순이므로 select_top_k의 동점 처리(번호가 작은 쪽 우선)가
+        # 그대로 응답자 번호 기준 동점 처리가 됩니다.
+        top = select_top_k(candidate_scores, k)
+        top_indices = candidate_ids[top].astype(np.intp)
+        scores = candidate_scores[top]
+
+        # 일치하는 답이 하나도 없는 응답자는 유사도 0점이며, 번호가 작은 순서로 채웁니다.
+        if len(top_indices) < k:
+            needed = k - len(top_indices)
+            fillers = np.setdiff1d(np.arange(needed + len(candidate_ids)), candidate_ids)[:needed]
+            top_indices = np.concatenate([top_indices, fillers])
+            scores = np.concatenate([scores, np.zeros(needed)])
+        return top_indices, scores
+
+
+def spherical_kmeans(matrix, n_clusters, n_iter=10, rng=None, weights=None):
+    """
+    L2 정규화된 행들을 구형 k-평균(코사인 유사도 기준)으로 n_clusters개 군집으로 나눕니다.
+
+    Args (매개변수):
+        matrix: (행 수, 열 개수) 크기의 L2 정규화된 float32 행렬
+        rng: np.random.Generator (없으면 시드 42)
+        weights: 행별 가중치 (예: 프로필별 응답자 수 - 없으면 모두 1)
+
+    Returns (반환 값):
+        np.ndarray: (군집 수, 열 개수) 크기의 L2 정규화된 군집 중심 (float32)
+    """
+    rng = rng if rng is not None else np.random.default_rng(42)
+    n_clusters = max(1, min(n_clusters, len(matrix)))
+    if weights is None:
+        centroids = matrix[rng.choice(len(matrix), n_clusters, replace=False)]
+    else:
+        # 가중치(응답자 수)에 비례해 처음 중심을 골라 응답자가 많은 프로필 근처에서 시작합니다.
+        weights = np.asarray(weights, dtype=np.float32)
+        start = rng.choice(len(matrix), n_clusters, replace=False, p=weights / weights.sum())
+        centroids = matrix[np.sort(start)]
+        matrix = matrix * weights[:, None]
+    for _ in range(n_iter):
+        labels = np.argmax(matrix @ centroids.T, axis=1)
+        counts = np.bincount(labels, minlength=n_clusters)
+        filled = np.flatnonzero(counts)
+        sums = np.empty_like(centroids)
+        sums[filled] = np.add.reduceat(matrix[np.argsort(labels, kind='stable')],
+                                       (np.cumsum(counts) - counts)[filled], axis=0)
+        # 비어 버린 군집은 다른 행으로 다시 시작합니다.
+        empty = np.flatnonzero(counts == 0)
+        sums[empty] = matrix[rng.choice(len(matrix), len(empty))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+
+class IVFSimilarityBackend:
+    """
+    🧭 근사 최근접 이웃(ANN) 검색 엔진 - IVF(역파일, 군집 가지치기) 방식
+
+    검색용 행렬(CosineSimilarityBackend와 같이 L2 정규화)의 행들을 구형 k-평균으로 n_lists개 군집으로 나누고,
+    군집 순서로 다시 모아 둡니다. 요청이 오면 질의와 가장 가까운 군집 n_probe개(와 top_k명을 채울 만큼의 군집)에
+    속한 행만 유사도를 계산하므로, 요청 1건의 계산량이 전체 행 수의 약 n_probe / n_lists로 줄어듭니다.
+
+    n_probe가 정확도(recall)와 속도를 맞바꾸는 손잡이입니다. 크게 할수록 정확한 코사인 검색 결과에 가까워지고
+    (n_probe >= 군집 수면 정확한 결과와 같음), 작게 할수록 빠릅니다. `bench_recommendations.evaluate_recall()`로 정확한 검색 대비
+    recall@k를 확인해서 고르세요. 동점 처리(유사도가 같으면 번호가 작은 순)와 점수 반올림은 코사인 엔진과 같습니다.
+
+    군집 중심은 처음 fit할 때 한 번만 학습하고, 이후의 fit(증분 학습으로 프로필이 늘어난 행렬, 조건부 색인의 부분 행렬 등)은
+    같은 중심에 행을 다시 배정만 합니다. 행 수가 학습할 때의 2배를 넘으면 중심을 다시 학습합니다.
+    학습한 중심과 배정 결과는 모델 번들에 함께 저장되므로 불러올 때 다시 학습하지 않습니다.
+    """
+
+    name = 'ivf'
+
+    def __init__(self, n_lists=None, n_probe=8, n_iter=10, seed=42):
+        # 군집 수 (None이면 처음 fit할 때 행 수의 제곱근)
+        self.n_lists = n_lists
+        # 요청마다 유사도를 계산할 최소 군집 수
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.seed = seed
+        # (행 수, 열 개수) 크기의 L2 정규화된 float32 행렬
+        self.matrix = None
+        # (군집 수, 열 개수) 크기의 L2 정규화된 군집 중심과, 중심을 학습할 때의 행 수
+        self.centroids = None
+        self._trained_rows = 0
+        # 행별 군집 번호, 군집 순서로 모은 행 번호/행렬, 군집별 구간 시작 위치
+        self.labels = None
+        self._list_rows = None
+        self._list_matrix = None
+        self._list_offsets = None
+
+    @property
+    def n_rows(self):
+        """색인된 행 수"""
+        return 0 if self.matrix is None else self.matrix.shape[0]
+
+    def fit(self, features):
+        """인코딩된 데이터로 색인을 만듭니다 (정규화는 CosineSimilarityBackend.fit과 같음)."""
+        return self.fit_normalized(CosineSimilarityBackend().fit(features).matrix)
+
+    def fit_normalized(self, matrix, index_arrays=None):
+        """
+        L2 정규화된 검색용 행렬로 색인을 만듭니다.
+
+        Args (매개변수):
+            index_arrays (dict): 모델 번들에 저장한 {'centroids', 'labels'} (있으면 학습/배정 없이 그대로 사용)
+        """
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        if index_arrays is not None:
+            self.centroids = np.asarray(index_arrays['centroids'], dtype=np.float32)
+            self._trained_rows = self.n_rows
+            labels = np.asarray(index_arrays['labels'], dtype=np.intp)
+        else:
+            if (self.centroids is None or self.centroids.shape[1] != self.matrix.shape[1]
+                    or self.n_rows > 2 * self._trained_rows):
+                self._train_centroids()
+            labels = self._assign(self.matrix)
+        self.labels = labels
+        self._list_rows = np.argsort(labels, kind='stable')
+        self._list_matrix = self.matrix[self._list_rows]
+        self._list_offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=len(self.centroids)))])
+        return self
+
+    def index_arrays(self):
+        """모델 번들에 저장할 색인 배열 {'centroids', 'labels'}"""
+        return {'centroids': self.centroids, 'labels': self.labels.astype(np.int32)}
+
+    def _train_centroids(self):
+        """검색용 행렬에서 뽑은 표본으로 구형 k-평균을 돌려 군집 중심을 학습합니다."""
+        n_rows, width = self.matrix.shape
+        if n_rows == 0:
+            self.centroids = np.zeros((1, width), dtype=np.float32)
+            self._trained_rows = 0
+            return
+        n_lists = max(1, min(self.n_lists or int(np.sqrt(n_rows)), n_rows))
+        rng = np.random.default_rng(self.seed)
+        # 군집마다 64행 정도의 표본이면 중심이 충분히 안정되므로 전체 행 대신 표본으로 학습합니다.
+        sample = self.matrix[np.sort(rng.choice(n_rows, min(n_rows, 64 * n_lists), replace=False))]
+        self.centroids = spherical_kmeans(sample, n_lists, self.n_iter, rng)
+        self._trained_rows = n_rows
+
+    def _assign(self, matrix, block_size=65536):
+        """행마다 가장 가까운(코사인 유사도가 가장 큰) 군집 번호를 구합니다 (블록 단위로 메모리 제한)."""
+        labels = np.empty(len(matrix), dtype=np.intp)
+        for start in range(0, len(matrix), block_size):
+            labels[start:start + block_size] = np.argmax(matrix[start:start + block_size] @ self.centroids.T, axis=1)
+        return labels
+
+    def search(self, query_vector, top_k=5):
+        """
+        질의 벡터와 가까운 군집들 안에서 가장 유사한 행 top_k개를 찾습니다.
+
+        Returns (반환 값):
+            (np.ndarray, np.ndarray): (행 위치, 코사인 유사도) - 유사도 높은 순, 같으면 번호가 작은 순
+        """
+        k = min(top_k, self.n_rows)
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+        query = np.asarray(query_vector, dtype=np.float32).ravel()
+        query_norm = np.linalg.norm(query)
+        if query_norm > 0:
+            query = query / query_norm
+
+        # 질의와 가까운 군집부터 n_probe개 이상, 행이 top_k개 이상 모일 때까지 고릅니다.
+        list_order = np.argsort(-(self.centroids @ query), kind='stable')
+        covered = np.cumsum(np.diff(self._list_offsets)[list_order])
+        n_probe = max(min(self.n_probe, len(list_order)), int(np.searchsorted(covered, k)) + 1)
+        starts = self._list_offsets[list_order[:n_probe]]
+        ends = self._list_offsets[list_order[:n_probe] + 1]
+        candidates = np.concatenate([self._list_rows[start:end] for start, end in zip(starts, ends)])
+        scores = np.concatenate([self._list_matrix[start:end] @ query for start, end in zip(starts, ends)])
+        np.round(scores, 6, out=scores)
+
+        # select_top_k는 동점이면 앞쪽 위치를 고르므로, 후보를 행 번호 순으로 정렬해 코사인 엔진과 같은 동점 순서를 만듭니다.
+        order = np.argsort(candidates, kind='stable')
+        candidates, scores = candidates[order], scores[order]
+        top = select_top_k(scores, k)
+        return candidates[top], scores[top]
+
+
+# 이름(문자열)으로 고를 수 있는 유사도 검색 엔진 목록입니다.
+SIMILARITY_BACKENDS = {
+    CosineSimilarityBackend.name: CosineSimilarityBackend,
+    InvertedIndexBackend.name: InvertedIndexBackend,
+    IVFSimilarityBackend.name: IVFSimilarityBackend,
+}
+
+
+def make_similarity_backend(backend):
+    """
+    유사도 검색 엔진 객체를 만듭니다.
+
+    Args (매개변수):
+        backend (str | object): SIMILARITY_BACKENDS의 이름(예: 'cosine') 또는
+            `fit()`/`search()`를 가진 엔진 객체
+    """
+    if isinstance(backend, str):
+        if backend not in SIMILARITY_BACKENDS:
+            raise ValueError(f"알 수 없는 유사도 엔진: {backend} (사용 가능: {', '.join(SIMILARITY_BACKENDS)})")
+        return SIMILARITY_BACKENDS[backend]()
+    return backend
+
+
+def _fitted_copy(backend, matrix, normalized=False):
+    """
+    검색 엔진의 복사본을 matrix로 fit해서 반환합니다.
+    (원래 엔진 객체는 그대로 두므로 이전 스냅샷이 쓰고 있는 검색 엔진에 영향이 없습니다.)
+    """
+    backend = copy.copy(backend)
+    if normalized:
+        backend.fit_normalized(matrix)
+    else:
+        backend.fit(matrix)
+    return backend
+
+
+class ProfileTable:
+    """
+    👥 응답 프로필 테이블 (같은 답을 한 응답자들을 하나로 묶은 표)
+
+    6개 특징이 모두 범주형이라, 수천 명의 응답자가 똑같은 인코딩 벡터를 갖는 경우가 많습니다.
+    이 테이블은 서로 다른 벡터(프로필)마다 한 줄씩만 저장하고,
+    각 프로필의 응답자 수, 만족도 분포, 소속 응답자 번호를 함께 기록합니다.
+
+    유사도 검색 엔진은 응답자 전체 대신 프로필에 대해서만 점수를 계산하고,
+    `top_respondents()`가 결과를 다시 응답자 단위로 펼쳐 줍니다.
+    (순서 규칙은 그대로: 유사도 높은 순, 같으면 응답자 번호가 작은 순)
+    """
+
+    def __init__(self, width):
+        self.width = width
+        # 프로필 벡터를 담는 버퍼 (새 프로필이 늘어날 때 2배씩 키워 복사 횟수를 줄입니다)
+        self._matrix = np.zeros((0, width), dtype=np.float32)
+        self.counts = []             # 프로필별 응답자 수
+        self.satisfaction_hist = []  # 프로필별 만족도 분포 (Counter)
+        self.members = []            # 프로필별 소속 응답자 번호 (오름차순 리스트)
+        self._profile_of_key = {}    # 벡터 바이트 -> 프로필 번호
+        self.n_rows = 0              # 전체 응답자 수
+        # 읽기 전용 사본(frozen)이 읽을 수 있는 응답자 번호 상한 (None이면 제한 없음)
+        self.row_limit = None
+
+    @property
+    def n_profiles(self):
+        """서로 다른 프로필 개수"""
+        return len(self.counts)
+
+    @property
+    def matrix(self):
+        """(프로필 수, 열 개수) 크기의 프로필 벡터 행렬"""
+        return self._matrix[:self.n_profiles]
+
+    @staticmethod
+    def _row_keys(matrix):
+        """각 행을 비트로 압축해 사전 키로 쓸 수 있는 바이트 배열로 만듭니다."""
+        packed = np.ascontiguousarray(np.packbits(np.asarray(matrix) != 0, axis=1))
+        return packed.view(np.dtype((np.void, packed.shape[1]))).ravel()
+
+    @classmethod
+    def from_features(cls, features, satisfactions):
+        """
+        인코딩된 학습 데이터로 프로필 테이블을 한 번에 만듭니다.
+
+        Args (매개변수):
+            features: features_encoded (응답자 수 x 열 개수)
+            satisfactions: 응답자별 만족도 값 목록 (features와 같은 순서)
+        """
+        matrix = np.asarray(features, dtype=np.float32)
+        table = cls(matrix.shape[1])
+        n_rows = matrix.shape[0]
+        if n_rows == 0:
+            return table
+
+        keys = cls._row_keys(matrix)
+        _, first_rows, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        # 프로필 번호는 처음 등장한 순서대로 매깁니다.
+        order = np.argsort(first_rows, kind='stable')
+        remap = np.empty_like(order)
+        remap[order] = np.arange(len(order))
+        profile_of_row = remap[inverse.ravel()]
+        first_rows = first_rows[order]
+
+        counts = np.bincount(profile_of_row, minlength=len(first_rows))
+        rows_by_profile = np.argsort(profile_of_row, kind='stable')
+        members = np.split(rows_by_profile, np.cumsum(counts)[:-1])
+        satisfactions = list(satisfactions)
+
+        table._matrix = matrix[first_rows].copy()
+        table.counts = counts.tolist()
+        table.members = [rows.tolist() for rows in members]
+        table.satisfaction_hist = [Counter(satisfactions[row] for row in rows) for rows in table.members]
+        table._profile_of_key = {key.tobytes(): profile for profile, key in enumerate(keys[first_rows])}
+        table.n_rows = n_rows
+        return table
+
+    @classmethod
+    def from_arrays(cls, profile_matrix, row_profile, satisfaction_codes, satisfaction_values,
+                    rows_by_profile=None, shared=False):
+        """
+        모델 번들에 저장된 배열로 프로필 테이블을 복원합니다.
+
+        Args (매개변수):
+            profile_matrix: (프로필 수, 열 개수) 크기의 0/1 프로필 벡터
+            row_profile: 응답자별 프로필 번호
+            satisfaction_codes: 응답자별 만족도 값 번호 (satisfaction_values의 위치)
+            satisfaction_values: 만족도 값 목록
+            rows_by_profile: 프로필 번호 순으로 정렬한 응답자 번호 (없으면 row_profile로 계산)
+            shared (bool): True면 프로필별 응답자 목록을 파이썬 리스트로 만들지 않고
+                rows_by_profile 배열(메모리 맵)의 구간으로 그대로 사용합니다.
+        """
+        matrix = np.asarray(profile_matrix, dtype=np.float32)
+        table = cls(matrix.shape[1])
+        n_profiles = matrix.shape[0]
+        row_profile = np.asarray(row_profile, dtype=np.intp)
+        counts = np.bincount(row_profile, minlength=n_profiles)
+        if rows_by_profile is None:
+            rows_by_profile = np.argsort(row_profile, kind='stable')
+        if shared:
+            members = SharedProfileMembers(rows_by_profile, np.concatenate([[0], np.cumsum(counts)]))
+        else:
+            # 프로필 번호 순으로 정렬한 응답자 목록을 한 번에 파이썬 리스트로 바꾼 뒤 구간별로 잘라 씁니다.
+            rows_list = np.asarray(rows_by_profile).tolist()
+            ends = np.cumsum(counts).tolist()
+            members = [rows_list[start:end] for start, end in zip([0] + ends[:-1], ends)]
+
+        # 프로필별 만족도 분포는 (프로필, 만족도) 쌍의 개수를 한 번에 세어 만듭니다.
+        n_values = len(satisfaction_values)
+        pair_counts = np.bincount(row_profile * n_values + np.asarray(satisfaction_codes, dtype=np.intp),
+                                  minlength=n_profiles * n_values).reshape(n_profiles, n_values)
+
+        table._matrix = matrix.copy()
+        table.counts = counts.tolist()
+        table.members = members
+        table.satisfaction_hist = [
+            Counter({satisfaction_values[code]: count for code, count in enumerate(row) if count})
+            for row in pair_counts.tolist()
+        ]
+        table._profile_of_key = {key.tobytes(): profile for profile, key in enumerate(cls._row_keys(matrix))}
+        table.n_rows = len(row_profile)
+        return table
+
+    def row_profiles(self):
+        """응답자별 프로필 번호 배열 (모델 번들 저장용)"""
+        row_profile = np.empty(self.n_rows, dtype=np.int32)
+        for profile in range(self.n_profiles):
+            rows = self.members[profile]
+            if self.row_limit is not None:
+                # 읽기 전용 사본은 공유하는 목록의 앞쪽(만들 때의 응답자 수)까지만 읽습니다.
+                rows = rows[:self.counts[profile]]
+            row_profile[rows] = profile
+        return row_profile
+
+    def frozen(self, row_limit=None):
+        """
+        지금 상태의 읽기 전용 사본을 만듭니다 (모델 스냅샷용).
+
+        프로필 벡터 버퍼와 프로필별 응답자 목록은 복사하지 않고 공유합니다.
+        `add_row`는 새 프로필을 버퍼의 뒤쪽에만 쓰고 응답자 번호를 목록 끝에만 붙이므로,
+        사본은 만들 때의 프로필 수와 응답자 수(row_limit)까지만 읽어서 이후의 추가를 보지 않습니다.
+
+        Args (매개변수):
+            row_limit (int): 사본이 읽을 응답자 번호 상한 (없으면 n_rows)
+                일부 응답자만 담은 테이블(`subset`)은 번호가 n_rows보다 클 수 있으므로 전체 응답자 수를 넘깁니다.
+        """
+        view = ProfileTable(self.width)
+        view._matrix = self.matrix
+        view.counts = list(self.counts)
+        view.members = self.members
+        view.satisfaction_hist = self.satisfaction_hist
+        view._profile_of_key = self._profile_of_key
+        view.n_rows = self.n_rows
+        view.row_limit = self.n_rows if row_limit is None else row_limit
+        return view
+
+    def subset(self, row_mask):
+        """
+        row_mask[응답자 번호]가 True인 응답자만 남긴 프로필 테이블을 만듭니다 (조건부 검색 색인용).
+
+        응답자 번호는 그대로 두고, 남은 응답자가 없는 프로필은 뺍니다 (프로필 순서는 유지).
+        응답자 목록은 파이썬 리스트 대신 배열 하나의 구간(SharedProfileMembers)으로 만들고,
+        만족도 분포(satisfaction_hist)는 검색에 쓰지 않으므로 세지 않습니다.
+        """
+        rows = np.flatnonzero(np.asarray(row_mask, dtype=bool))
+        kept, profile_of_row = np.unique(self.row_profiles()[rows], return_inverse=True)
+        counts = np.bincount(profile_of_row, minlength=len(kept))
+
+        table = ProfileTable(self.width)
+        table._matrix = self.matrix[kept]
+        table.counts = counts.tolist()
+        table.members = SharedProfileMembers(rows[np.argsort(profile_of_row, kind='stable')],
+                                             np.concatenate([[0], np.cumsum(counts)]))
+        table.satisfaction_hist = [Counter() for _ in range(len(kept))]
+        table._profile_of_key = {key.tobytes(): profile for profile, key in enumerate(self._row_keys(table._matrix))}
+        table.n_rows = len(rows)
+        return table
+
+    def add_row(self, vector, satisfaction, row_id):
+        """
+        새 응답자 한 명을 테이블에 추가합니다.
+
+        Returns (반환 값):
+            bool: 새로운 프로필이 생겼으면 True (검색 엔진을 다시 만들어야 함)
+        """
+        if not isinstance(self.members, list):
+            # 공유 배열의 구간은 수정할 수 없으므로 처음 추가할 때 이 프로세스 전용 리스트로 바꿉니다.
+            self.members = self.members.to_lists()
+        vector = np.asarray(vector, dtype=np.float32).reshape(1, -1)
+        key = self._row_keys(vector)[0].tobytes()
+        profile = self._profile_of_key.get(key)
+        is_new = profile is None
+        if is_new:
+            profile = self.n_profiles
+            if profile == len(self._matrix):
+                grown = np.zeros((max(1, 2 * len(self._matrix)), self.width), dtype=np.float32)
+                grown[:profile] = self._matrix
+                self._matrix = grown
+            self._matrix[profile] = vector[0]
+            self._profile_of_key[key] = profile
+            self.counts.append(0)
+            self.satisfaction_hist.append(Counter())
+            self.members.append([])
+        self.counts[profile] += 1
+        self.satisfaction_hist[profile][satisfaction] += 1
+        self.members[profile].append(row_id)
+        self.n_rows += 1
+        return is_new
+
+    def top_respondents(self, backend, query_vector, top_k=5):
+        """
+        프로필 단위로 검색한 뒤 상위 top_k명의 응답자로 펼칩니다.
+
+        Args (매개변수):
+            backend: 이 테이블의 matrix로 fit()된 유사도 검색 엔진
+
+        Returns (반환 값):
+            (list, list): (응답자 번호, 유사도) - 유사도 높은 순, 같으면 번호가 작은 순
+        """
+        k = min(top_k, self.n_rows)
+        if k <= 0:
+            return [], []
+        return self._expand_top_profiles(lambda n_fetch: backend.search(query_vector, n_fetch), k)
+
+    def top_respondents_from_scores(self, profile_scores, top_k=5):
+        """
+        프로필별 유사도 배열(검색 엔진의 `score_many` 결과 한 줄)로 상위 top_k명의 응답자를 찾습니다.
+
+        Returns (반환 값):
+            (list, list): `top_respondents()`와 같은 (응답자 번호, 유사도)
+        """
+        k = min(top_k, self.n_rows)
+        if k <= 0:
+            return [], []
+        # 응답자가 한 명 이상인 프로필 k개면 k명을 채우므로, k번째 프로필 점수 이상(동점 포함)만 정렬합니다.
+        n_fetch = min(k, self.n_profiles)
+        kth_score = np.partition(profile_scores, self.n_profiles - n_fetch)[self.n_profiles - n_fetch]
+        profiles = np.flatnonzero(profile_scores >= kth_score)
+        scores = profile_scores[profiles]
+        order = np.lexsort((profiles, -scores))
+        profiles, scores = profiles[order], scores[order]
+        covered = np.cumsum([self.counts[profile] for profile in profiles])
+        boundary = scores[int(np.searchsorted(covered, k))]
+        return self._respondents_down_to(profiles, scores, boundary, k)
+
+    def _expand_top_profiles(self, search, k):
+        """search(n)으로 상위 프로필을 가져와 응답자 k명으로 펼칩니다."""
+        # 상위 프로필들의 응답자 수 합이 k명을 넘을 때까지 검색 범위를 넓힙니다.
+        # 경계 점수와 같은 프로필이 잘리지 않도록 경계 점수보다 낮은 프로필이 보일 때까지 확인합니다.
+        # 범주형 특징이라 답 하나만 다른 프로필들이 같은 점수로 수십 개씩 묶이므로,
+        # k개가 아니라 넉넉히 8k개부터 가져와 다시 검색하는 횟수를 줄입니다 (조건부 색인처럼 프로필당 응답자가 적을 때).
+        n_fetch = min(8 * k, self.n_profiles)
+        while True:
+            profiles, scores = search(n_fetch)
+            covered = np.cumsum([self.counts[profile] for profile in profiles])
+            boundary = scores[int(np.searchsorted(covered, k))]
+            if n_fetch < self.n_profiles and scores[-1] == boundary:
+                n_fetch = min(n_fetch * 2, self.n_profiles)
+                continue
+            break
+        return self._respondents_down_to(profiles, scores, boundary, k)
+
+    def top_respondents_many(self, match_counts, count_scores, top_k=5):
+        """
+        질의 블록 전체의 상위 top_k명 응답자를 한 번에 찾습니다 (검색 엔진의 `match_counts_many` 결과 사용).
+
+        질의마다 점수 배열을 partition/정렬하지 않고, 블록 전체에서 같은 답 개수가 가장 많은 단계부터
+        (행별 최댓값 -> 그 값과 같은 칸) 한꺼번에 골라 응답자 k명이 찰 때까지 한 단계씩 내려갑니다.
+        같은 답 개수가 곧 같은 점수이므로 결과는 행마다 `top_respondents_from_scores()`와 같습니다.
+
+        Args (매개변수):
+            match_counts: (질의 수, 프로필 수) 크기의 같은 답 개수 (uint8)
+            count_scores: (질의 수, 최대 답 개수 + 1) 크기의 같은 답 개수별 유사도
+
+        Returns (반환 값):
+            list: 질의마다 `top_respondents()`와 같은 (응답자 번호, 유사도)
+        """
+        n_queries = match_counts.shape[0]
+        k = min(top_k, self.n_rows)
+        if k <= 0 or self.n_profiles == 0:
+            return [([], []) for _ in range(n_queries)]
+        sizes = np.asarray(self.counts, dtype=np.int64)
+        covered = np.zeros(n_queries, dtype=np.int64)
+        ceiling = np.full(n_queries, 256, dtype=np.int64)
+        active = np.arange(n_queries)
+        picked_queries, picked_profiles, picked_levels = [], [], []
+        while len(active):
+            block = match_counts[active]
+            if len(picked_levels):
+                # 이미 고른 단계(ceiling 이상)는 빼고 다음으로 많은 같은 답 개수를 찾습니다.
+                block = np.where(block < ceiling[active, None], block, 0).astype(np.uint8)
+            levels = block.max(axis=1)
+            # 2차원 np.nonzero보다 평평하게 편 배열의 np.flatnonzero가 훨씬 빠르므로 위치를 (행, 열)로 되돌려 씁니다.
+            hit_rows, hit_profiles = np.divmod(np.flatnonzero(block == levels[:, None]), block.shape[1])
+            if len(picked_levels):
+                # 같은 답 개수가 0인 단계에서는 위에서 0으로 지운 칸(이미 고른 프로필)을 다시 고르지 않습니다.
+                keep = match_counts[active[hit_rows], hit_profiles] == levels[hit_rows]
+                hit_rows, hit_profiles = hit_rows[keep], hit_profiles[keep]
+            picked_queries.append(active[hit_rows])
+            picked_profiles.append(hit_profiles)
+            picked_levels.append(levels[hit_rows])
+            level_sizes = np.bincount(hit_rows, weights=sizes[hit_profiles], minlength=len(active))
+            covered[active] += level_sizes.astype(np.int64)
+            ceiling[active] = levels
+            # k명을 채웠거나 더 내려갈 단계가 없는(같은 답 0개까지 고른) 질의는 끝냅니다.
+            active = active[(covered[active] < k) & (levels > 0)]
+
+        queries = np.concatenate(picked_queries)
+        profiles = np.concatenate(picked_profiles)
+        levels = np.concatenate(picked_levels).astype(np.int64)
+        # 프로필별 가장 작은 응답자 번호 (소속 응답자 목록은 오름차순이므로 첫 번째 번호)
+        if isinstance(self.members, SharedProfileMembers):
+            first_members = np.asarray(self.members.rows_by_profile)[self.members.offsets[:-1]]
+        else:
+            first_members = np.fromiter((rows[0] for rows in self.members), dtype=np.int64, count=self.n_profiles)
+        # 질의 순 -> 같은 답 개수가 많은 순 -> 가장 작은 응답자 번호 순으로 정렬합니다.
+        order = np.lexsort((first_members[profiles], -levels, queries))
+        queries, profiles, levels = queries[order], profiles[order], levels[order]
+        # 같은 (질의, 같은 답 개수) 묶음에서는 응답자를 번호 순으로 k명까지만 꺼내므로, 가장 작은 응답자 번호가
+        # 묶음 안에서 k번째 안에 드는 프로필만 남깁니다 (나머지 프로필의 응답자는 모두 그보다 번호가 큼).
+        new_group = np.ones(len(queries), dtype=bool)
+        new_group[1:] = (queries[1:] != queries[:-1]) | (levels[1:] != levels[:-1])
+        group_starts = np.flatnonzero(new_group)
+        positions = np.arange(len(queries)) - np.repeat(group_starts, np.diff(np.append(group_starts, len(queries))))
+        keep = positions < k
+        queries, profiles, levels = queries[keep], profiles[keep].tolist(), levels[keep].tolist()
+        starts = np.searchsorted(queries, np.arange(n_queries + 1)).tolist()
+        results = []
+        for query in range(n_queries):
+            query_profiles = profiles[starts[query]:starts[query + 1]]
+            query_levels = levels[starts[query]:starts[query + 1]]
+            level_scores = count_scores[query].tolist()
+            groups = []
+            for profile, level in zip(query_profiles, query_levels):
+                if groups and groups[-1][0] == level_scores[level]:
+                    groups[-1][1].append(profile)
+                else:
+                    groups.append((level_scores[level], [profile]))
+            results.append(self._merge_members(groups, k))
+        return results
+
+    def _respondents_down_to(self, profiles, scores, boundary, k):
+        """점수순 프로필 중 boundary 점수까지, 같은 점수의 프로필끼리 소속 응답자를 합쳐 번호 순으로 k명을 꺼냅니다."""
+        groups = [(score, [profile for profile, profile_score in zip(profiles, scores) if profile_score == score])
+                  for score in sorted(set(scores[scores >= boundary].tolist()), reverse=True)]
+        return self._merge_members(groups, k)
+
+    def _merge_members(self, groups, k):
+        """(점수, 프로필 목록) 묶음을 점수가 높은 순서로 받아, 묶음마다 소속 응답자를 번호 순으로 합쳐 k명을 꺼냅니다."""
+        row_ids, row_scores = [], []
+        for score, level_profiles in groups:
+            if len(row_ids) == k:
+                break
+            if len(level_profiles) == 1:
+                level_rows = self.members[level_profiles[0]]
+            else:
+                # 남은 자리(need)만큼만 필요하므로 프로필마다 앞쪽 need명만 모아 번호 순으로 정렬합니다.
+                need = k - len(row_ids)
+                level_rows = sorted(itertools.chain.from_iterable(
+                    self.members[profile][:need] for profile in level_profiles))
+            for row_id in level_rows:
+                # 사본을 만든 뒤에 추가된 응답자(번호가 row_limit 이상)는 읽지 않습니다.
+                if len(row_ids) == k or (self.row_limit is not None and row_id >= self.row_limit):
+                    break
+                row_ids.append(int(row_id))
+                row_scores.append(score)
+        return row_ids, row_scores
+
+
+class SharedProfileMembers:
+    """
+    프로필별 응답자 번호 목록을 하나의 공유 배열(rows_by_profile)의 구간으로 보여주는 읽기 전용 목록
+
+    `members[profile]`은 복사 없이 배열 조각(view)을 돌려주므로, 메모리 맵으로 연 배열을
+    여러 워커 프로세스가 그대로 공유할 수 있습니다.
+    """
+
+    def __init__(self, rows_by_profile, offsets):
+        self.rows_by_profile = rows_by_profile
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, profile):
+        return self.rows_by_profile[self.offsets[profile]:self.offsets[profile + 1]]
+
+    def __iter__(self):
+        for profile in range(len(self)):
+            yield self[profile]
+
+    def to_lists(self):
+        """수정 가능한 파이썬 리스트 목록으로 바꿉니다."""
+        rows = np.asarray(self.rows_by_profile).tolist()
+        offsets = self.offsets.tolist()
+        return [rows[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+class ScoringTable:
+    """
+    📋 추천 점수 사전 집계표
+
+    만족도 높은 응답을 (휴가 유형, 국내/해외) 묶음별로 미리 집계한 정수 배열입니다.
+    묶음마다 응답자 수, 만족도 점수 합계, 장소별 빈도, 다음 휴가 경험별 빈도를 두고
+    값은 모두 SurveyVocabulary의 번호로 셉니다 (장소별 빈도는 칸이 처음 0보다 커진 순서도 함께 기록).
+    요청마다 달라지는 값은 사용자의 '다음_휴가_경험' 하나뿐이므로,
+    추천 생성은 집계표 조회 + 간단한 가중합 계산만 하면 됩니다.
+    (묶음 안의 응답자 수가 늘어나도 요청 처리 시간은 변하지 않습니다.)
+    """
+
+    VACATION_COLUMN = '가장_최근_여름_휴가'
+    LOCATION_TYPE_COLUMN = '휴가_장소_국내_해외'
+    LOCATION_COLUMN = '휴가_장소'
+    NEXT_COLUMN = '다음_휴가_경험'
+
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+        # 묶음 번호 -> (휴가 유형 번호, 국내/해외 번호) - 묶음이 처음 등장한 순서
+        self.bucket_keys = []
+        self._bucket_of_key = {}
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.score_sums = np.zeros(0, dtype=np.int64)
+        # (묶음 수, 장소 수) 빈도와 칸이 처음 0보다 커진 순서 (최빈 장소가 동점이면 먼저 나온 장소)
+        self.location_counts = np.zeros((0, 0), dtype=np.int64)
+        self.location_first_seen = np.zeros((0, 0), dtype=np.int64)
+        # (묶음 수, 다음 휴가 경험 수) 빈도
+        self.next_counts = np.zeros((0, 0), dtype=np.int64)
+        # 묶음별 최빈 장소 번호 (아직 없으면 -1)
+        self.top_locations = np.zeros(0, dtype=np.int64)
+        self._n_seen = 0
+        # 추천에 쓰는 묶음의 고정 값 (rank()가 처음 호출될 때 만들고 집계가 바뀌면 버립니다)
+        self._ranked_buckets = None
+
+    @property
+    def n_buckets(self):
+        """(휴가 유형, 국내/해외) 묶음 수"""
+        return len(self.bucket_keys)
+
+    def _bucket(self, vacation_code, location_type_code):
+        """묶음 번호 (처음 보는 묶음이면 새 번호)"""
+        key = (vacation_code, location_type_code)
+        bucket = self._bucket_of_key.get(key)
+        if bucket is None:
+            bucket = self._bucket_of_key[key] = len(self.bucket_keys)
+            self.bucket_keys.append(key)
+        return bucket
+
+    def _grow(self):
+        """새 묶음이나 새 장소/다음 휴가 경험 값이 생겼으면 배열을 그 크기로 늘립니다."""
+        n_buckets = self.n_buckets
+        n_locations = max(self.vocabulary.size(self.LOCATION_COLUMN), self.location_counts.shape[1])
+        n_next = max(self.vocabulary.size(self.NEXT_COLUMN), self.next_counts.shape[1])
+        if self.counts.shape[0] != n_buckets:
+            extra = n_buckets - self.counts.shape[0]
+            self.counts = np.pad(self.counts, (0, extra))
+            self.score_sums = np.pad(self.score_sums, (0, extra))
+            self.top_locations = np.pad(self.top_locations, (0, extra), constant_values=-1)
+        if self.location_counts.shape != (n_buckets, n_locations):
+            padding = [(0, n_buckets - self.location_counts.shape[0]), (0, n_locations - self.location_counts.shape[1])]
+            self.location_counts = np.pad(self.location_counts, padding)
+            self.location_first_seen = np.pad(self.location_first_seen, padding)
+        if self.next_counts.shape != (n_buckets, n_next):
+            padding = [(0, n_buckets - self.next_counts.shape[0]), (0, n_next - self.next_counts.shape[1])]
+            self.next_counts = np.pad(self.next_counts, padding)
+
+    def _refresh_top_locations(self):
+        """묶음별 최빈 장소를 다시 찾습니다 (빈도가 같으면 먼저 나온 장소)."""
+        counts = self.location_counts
+        if counts.size == 0:
+            return
+        sort_keys = np.where(counts > 0, self.location_first_seen - counts * (self._n_seen + 1), 0)
+        self.top_locations = np.where(counts.any(axis=1), np.argmin(sort_keys, axis=1), -1)
+
+    def add(self, codes):
+        """새 응답 한 개(패턴 학습용 컬럼 번호 {컬럼: 번호})를 해당 묶음에 더합니다 (O(1))."""
+        bucket = self._bucket(codes[self.VACATION_COLUMN], codes[self.LOCATION_TYPE_COLUMN])
+        location, next_value = codes[self.LOCATION_COLUMN], codes[self.NEXT_COLUMN]
+        self._grow()
+        self.counts[bucket] += 1
+        self.score_sums[bucket] += SATISFACTION_SCORES.get(self.vocabulary.values['만족도'][codes['만족도']], 3)
+        self.next_counts[bucket, next_value] += 1
+
+        counts, first_seen = self.location_counts[bucket], self.location_first_seen[bucket]
+        if counts[location] == 0:
+            first_seen[location] = self._n_seen
+        counts[location] += 1
+        top = self.top_locations[bucket]
+        if top < 0 or counts[location] > counts[top] or (
+                counts[location] == counts[top] and first_seen[location] < first_seen[top]):
+            self.top_locations[bucket] = location
+        self._n_seen += 1
+        self._ranked_buckets = None
+
+    def add_many(self, codes):
+        """응답 여러 개(컬럼별 같은 길이의 번호 배열)를 한 번에 더합니다 - `add`를 차례로 호출한 것과 같은 결과"""
+        vacation, location_type = codes[self.VACATION_COLUMN], codes[self.LOCATION_TYPE_COLUMN]
+        n_rows = len(vacation)
+        if n_rows == 0:
+            return
+        # (휴가 유형, 국내/해외) 번호 쌍을 정수 하나로 합쳐 묶음을 처음 등장한 순서대로 만듭니다.
+        pair_keys = vacation * max(self.vocabulary.size(self.LOCATION_TYPE_COLUMN), 1) + location_type
+        unique_keys, first_positions, inverse = np.unique(pair_keys, return_index=True, return_inverse=True)
+        bucket_of_key = np.empty(len(unique_keys), dtype=np.intp)
+        for index in np.argsort(first_positions, kind='stable').tolist():
+            position = first_positions[index]
+            bucket_of_key[index] = self._bucket(int(vacation[position]), int(location_type[position]))
+        buckets = bucket_of_key[inverse.reshape(-1)]
+        self._grow()
+
+        n_buckets = self.n_buckets
+        scores = self.vocabulary.satisfaction_scores()[codes['만족도']]
+        self.counts += np.bincount(buckets, minlength=n_buckets)
+        self.score_sums += np.bincount(buckets, weights=scores, minlength=n_buckets).astype(np.int64)
+
+        n_next = self.next_counts.shape[1]
+        self.next_counts += np.bincount(buckets * n_next + codes[self.NEXT_COLUMN],
+                                        minlength=n_buckets * n_next).reshape(n_buckets, n_next)
+
+        cells = buckets * self.location_counts.shape[1] + codes[self.LOCATION_COLUMN]
+        counts = self.location_counts.reshape(-1)
+        # 이번에 처음 0보다 커지는 칸은 그 칸이 처음 나온 위치를 순서로 기록합니다.
+        touched, first_positions = np.unique(cells, return_index=True)
+        unseen = counts[touched] == 0
+        self.location_first_seen.reshape(-1)[touched[unseen]] = self._n_seen + first_positions[unseen]
+        counts += np.bincount(cells, minlength=counts.size)
+        self._n_seen += n_rows
+        self._refresh_top_locations()
+        self._ranked_buckets = None
+
+    def bucket_stats(self):
+        """
+        묶음별 집계 값을 값(문자열)으로 풀어 돌려줍니다 (검증/비교용).
+
+        Returns (반환 값):
+            list: [(휴가 유형, 국내/해외, 응답자 수, 점수 합계, 최빈 장소, [(장소, 빈도) - 처음 나온 순서],
+            {다음 휴가 경험: 빈도}), ...] - rank()가 묶음을 읽는 순서
+        """
+        values = self.vocabulary.values
+        locations, next_values = values.get(self.LOCATION_COLUMN, []), values.get(self.NEXT_COLUMN, [])
+        stats = []
+        for bucket in self._bucket_order():
+            vacation_code, location_type_code = self.bucket_keys[bucket]
+            location_codes = np.flatnonzero(self.location_counts[bucket])
+            location_codes = location_codes[np.argsort(self.location_first_seen[bucket, location_codes], kind='stable')]
+            top = int(self.top_locations[bucket])
+            stats.append((
+                values[self.VACATION_COLUMN][vacation_code], values[self.LOCATION_TYPE_COLUMN][location_type_code],
+                int(self.counts[bucket]), int(self.score_sums[bucket]), None if top < 0 else locations[top],
+                [(locations[code], int(self.location_counts[bucket, code])) for code in location_codes.tolist()],
+                {next_values[code]: int(self.next_counts[bucket, code])
+                 for code in np.flatnonzero(self.next_counts[bucket]).tolist()},
+            ))
+        return stats
+
+    def _bucket_order(self):
+        """예전 {휴가 유형: {국내/해외: ...}} 중첩 딕셔너리와 같은 묶음 순서 (휴가 유형이 처음 나온 순서로 모음)"""
+        vacation_rank = {}
+        for vacation_code, _ in self.bucket_keys:
+            vacation_rank.setdefault(vacation_code, len(vacation_rank))
+        return sorted(range(self.n_buckets), key=lambda bucket: (vacation_rank[self.bucket_keys[bucket][0]], bucket))
+
+    def _ranking_buckets(self):
+        """추천 대상 묶음(2명 이상, 평균 만족도 3.0 이상)의 (묶음 번호, 문자열 값, 응답자 수, 평균 만족도) 목록"""
+        ranked = self._ranked_buckets
+        if ranked is None:
+            values = self.vocabulary.values
+            counts, score_sums, top_locations = (self.counts.tolist(), self.score_sums.tolist(),
+                                                 self.top_locations.tolist())
+            ranked = []
+            for bucket in self._bucket_order():
+                count = counts[bucket]
+                if count < 2:  # 최소 2명 이상 경험한 데이터만 사용합니다.
+                    continue
+                # 예전 코드의 np.mean(...)과 같은 np.float64로 계산합니다.
+                # (np.float64의 round()는 파이썬 float의 round()와 .xx5 경계에서 다르게 반올림하므로
+                #  평균과 총점을 파이썬 float로 계산하면 total_score와 추천 순서가 예전 결과와 달라질 수 있습니다.)
+                avg_satisfaction = np.float64(score_sums[bucket]) / count
+                if avg_satisfaction < 3.0:  # 만족도 평균이 '보통' 이상인 경우만 추천합니다.
+                    continue
+                vacation_code, location_type_code = self.bucket_keys[bucket]
+                top = top_locations[bucket]
+                ranked.append((bucket, values[self.VACATION_COLUMN][vacation_code],
+                               values[self.LOCATION_TYPE_COLUMN][location_type_code],
+                               None if top < 0 else values[self.LOCATION_COLUMN][top], count, avg_satisfaction))
+            self._ranked_buckets = ranked
+        return ranked
+
+    def copy(self):
+        """
+        집계표의 복사본 (모델 업데이트용 copy-on-write)
+
+        묶음 수는 (휴가 유형 x 국내/해외) 정도로 작으므로 응답자 수와 상관없이 빠르게 복사됩니다.
+        """
+        table = ScoringTable(self.vocabulary)
+        table.bucket_keys = list(self.bucket_keys)
+        table._bucket_of_key = dict(self._bucket_of_key)
+        for name in ('counts', 'score_sums', 'location_counts', 'location_first_seen', 'next_counts',
+                     'top_locations'):
+            setattr(table, name, getattr(self, name).copy())
+        table._n_seen = self._n_seen
+        table._ranked_buckets = self._ranked_buckets
+        return table
+
+    def rank(self, user_next_pref):
+        """
+        사용자의 다음 휴가 경험을 반영해 추천 목록을 만듭니다.
+
+        예전 `_generate_recommendations`와 같은 점수 공식, 같은 정렬 순서를 사용합니다.
+        """
+        next_code = self.vocabulary.get(self.NEXT_COLUMN, user_next_pref)
+        if 0 <= next_code < self.next_counts.shape[1]:
+            next_counts = self.next_counts[:, next_code].tolist()
+        else:
+            next_counts = [0] * self.n_buckets
+
+        recommendations = []
+        for bucket, vacation_type, location_type, top_location, count, avg_satisfaction in self._ranking_buckets():
+            # 다음 휴가 경험 일치도 = 같은 다음 휴가 경험을 고른 응답자 비율
+            next_experience_score = next_counts[bucket] / count
+            # 전체 점수는 만족도 + 다음 휴가 경험 일치도의 가중평균입니다.
+            total_score = (avg_satisfaction * 0.7) + (next_experience_score * 5 * 0.3)
+
+            recommendations.append({
+                'vacation_type': vacation_type,
+                'location_type': location_type,
+                'recommended_location': top_location,
+                'avg_satisfaction': round(avg_satisfaction, 2),
+                'next_experience_match': round(next_experience_score, 2),
+                'total_score': round(total_score, 2),
+                'experience_count': count,
+                'confidence': min(count / 10 * total_score / 5, 1.0)
+            })
+
+        # 총점과 경험 수 기준으로 정렬하여 가장 좋은 추천을 상위에 놓습니다.
+        recommendations.sort(key=lambda x: (x['total_score'], x['experience_count']), reverse=True)
+        return recommendations
+
+    @classmethod
+    def from_patterns(cls, vacation_patterns, vocabulary):
+        """예전 learned_vacation_patterns.json(휴가 유형 -> 국내/해외 -> 경험 목록)으로 집계표를 만듭니다."""
+        columns = (cls.VACATION_COLUMN, cls.LOCATION_TYPE_COLUMN, cls.LOCATION_COLUMN, '만족도', cls.NEXT_COLUMN)
+        rows = {column: [] for column in columns}
+        for vacation_type, location_data in vacation_patterns.items():
+            for location_type, experiences in location_data.items():
+                for experience in experiences:
+                    for column, value in zip(columns, (vacation_type, location_type, experience['location'],
+                                                       experience['satisfaction'], experience.get('next_experience'))):
+                        rows[column].append(vocabulary.code(column, value))
+        table = cls(vocabulary)
+        table.add_many({column: np.array(codes, dtype=np.intp) for column, codes in rows.items()})
+        return table
+
+    def to_arrays(self):
+        """집계표를 정수 배열 사전으로 변환합니다 (모델 번들 저장용, 값은 SurveyVocabulary 번호)."""
+        return {
+            'scoring_bucket_keys': np.array(self.bucket_keys, dtype=np.int64).reshape(-1, 2),
+            'scoring_counts': self.counts,
+            'scoring_score_sums': self.score_sums,
+            'scoring_location_counts': self.location_counts,
+            'scoring_location_first_seen': self.location_first_seen,
+            'scoring_next_counts': self.next_counts,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, vocabulary):
+        """`to_arrays()`로 저장한 배열로 집계표를 복원합니다."""
+        table = cls(vocabulary)
+        for vacation_code, location_type_code in arrays['scoring_bucket_keys'].tolist():
+            table._bucket(vacation_code, location_type_code)
+        table.counts = np.array(arrays['scoring_counts'], dtype=np.int64)
+        table.score_sums = np.array(arrays['scoring_score_sums'], dtype=np.int64)
+        table.location_counts = np.array(arrays['scoring_location_counts'], dtype=np.int64)
+        table.location_first_seen = np.array(arrays['scoring_location_first_seen'], dtype=np.int64)
+        table.next_counts = np.array(arrays['scoring_next_counts'], dtype=np.int64)
+        table.top_locations = np.full(table.n_buckets, -1, dtype=np.int64)
+        if table.location_first_seen.size:
+            table._n_seen = int(table.location_first_seen.max()) + 1
+        table._grow()
+        table._refresh_top_locations()
+        return table
+
+    @classmethod
+    def from_legacy_arrays(cls, values, arrays, vocabulary):
+        """
+        형식 버전 1 모델 번들의 집계표(점수표 전용 값 목록 + (묶음, 값 번호, 개수) 행)를 변환합니다.
+
+        장소별 빈도 행은 묶음 안에서 장소가 처음 나온 순서대로 저장되어 있으므로 그 순서를 처음 센 순서로 씁니다.
+        """
+        table = cls(vocabulary)
+        for vacation_code, location_type_code in arrays['bucket_keys'].tolist():
+            table._bucket(vocabulary.code(cls.VACATION_COLUMN, values[vacation_code]),
+                          vocabulary.code(cls.LOCATION_TYPE_COLUMN, values[location_type_code]))
+        location_rows = [(bucket, vocabulary.code(cls.LOCATION_COLUMN, values[value_code]), count)
+                         for bucket, value_code, count in arrays['location_counts'].tolist()]
+        next_rows = [(bucket, vocabulary.code(cls.NEXT_COLUMN, values[value_code]), count)
+                     for bucket, value_code, count in arrays['next_counts'].tolist()]
+        table._grow()
+        table.counts = np.array(arrays['bucket_count'], dtype=np.int64)
+        table.score_sums = np.array(arrays['bucket_score_sum'], dtype=np.int64)
+        for seen, (bucket, location, count) in enumerate(location_rows):
+            table.location_counts[bucket, location] = count
+            table.location_first_seen[bucket, location] = seen
+        for bucket, next_value, count in next_rows:
+            table.next_counts[bucket, next_value] = count
+        table._n_seen = len(location_rows)
+        table._refresh_top_locations()
+        return table
+
+
+class CollaborativeFilter:
+    """
+    🔁 다음 휴가 경험 동시 출현(전이) 행렬 (collaborative_filter)
+
+    만족도가 높은 응답들로 정수 행렬 두 개를 셉니다.
+    - 'next_preferences': 연령대 x 다음 휴가 경험
+    - 'next_from_current': 현재(가장 최근) 휴가 유형 x 다음 휴가 경험
+    행/열 번호는 SurveyVocabulary의 값 번호이고, 칸마다 응답 수(counts)와 처음 센 순서(first_seen)를 둡니다.
+
+    예전 preference_patterns(키 -> 패턴 이름 -> Counter 중첩 딕셔너리)와 같은 정보이며,
+    `top()`은 Counter.most_common과 같은 순서(응답 수가 많은 순, 같으면 먼저 센 값 순)로 돌려줍니다.
+    다음 휴가 제안을 만들 때 딕셔너리를 훑지 않고 행 하나만 읽고, 모델 번들에는 정수 배열로 저장합니다.
+    """
+
+    KINDS = ('next_preferences', 'next_from_current')
+    # 행렬별 행 컬럼 (열은 두 행렬 모두 '다음_휴가_경험')
+    ROW_COLUMNS = {'next_preferences': '연령대', 'next_from_current': '가장_최근_여름_휴가'}
+    NEXT_COLUMN = '다음_휴가_경험'
+
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+        # 행렬별 (행 값 수, 열 값 수) 크기의 응답 수와, 칸이 처음 0보다 커진 순서
+        self.counts = {kind: np.zeros((0, 0), dtype=np.int64) for kind in self.KINDS}
+        self.first_seen = {kind: np.zeros((0, 0), dtype=np.int64) for kind in self.KINDS}
+        self._n_seen = 0
+
+    def _grow(self):
+        """사전에 새 행/열 값이 생겼으면 두 행렬을 그 크기로 늘립니다."""
+        n_columns = self.vocabulary.size(self.NEXT_COLUMN)
+        for kind in self.KINDS:
+            counts = self.counts[kind]
+            shape = (max(self.vocabulary.size(self.ROW_COLUMNS[kind]), counts.shape[0]),
+                     max(n_columns, counts.shape[1]))
+            if counts.shape != shape:
+                padding = [(0, shape[0] - counts.shape[0]), (0, shape[1] - counts.shape[1])]
+                self.counts[kind] = np.pad(counts, padding)
+                self.first_seen[kind] = np.pad(self.first_seen[kind], padding)
+
+    def _add_count(self, kind, row, column, count, seen):
+        counts = self.counts[kind]
+        if row >= counts.shape[0] or column >= counts.shape[1]:
+            # 처음 보는 값이면 행렬을 늘린 뒤 더합니다.
+            self._grow()
+            counts = self.counts[kind]
+        if counts[row, column] == 0:
+            self.first_seen[kind][row, column] = seen
+        counts[row, column] += count
+
+    def add(self, codes):
+        """만족도 높은 응답 한 개(패턴 학습용 컬럼 번호 {컬럼: 번호})를 두 행렬에 더합니다 (증분 학습용)."""
+        column = codes[self.NEXT_COLUMN]
+        for kind in self.KINDS:
+            self._add_count(kind, codes[self.ROW_COLUMNS[kind]], column, 1, self._n_seen)
+        self._n_seen += 1
+
+    def add_many(self, codes):
+        """응답 여러 개(컬럼별 같은 길이의 번호 배열)를 한 번에 더합니다 - `add`를 차례로 호출한 것과 같은 결과"""
+        columns = codes[self.NEXT_COLUMN]
+        n_rows = len(columns)
+        if n_rows == 0:
+            return
+        self._grow()
+        for kind in self.KINDS:
+            n_columns = self.counts[kind].shape[1]
+            cells = codes[self.ROW_COLUMNS[kind]] * n_columns + columns
+            counts = self.counts[kind].reshape(-1)
+            # 이번에 처음 0보다 커지는 칸은 그 칸이 처음 나온 위치를 순서로 기록합니다.
+            touched, first_positions = np.unique(cells, return_index=True)
+            unseen = counts[touched] == 0
+            self.first_seen[kind].reshape(-1)[touched[unseen]] = self._n_seen + first_positions[unseen]
+            counts += np.bincount(cells, minlength=counts.size)
+        self._n_seen += n_rows
+
+    def _rows(self, kind):
+        """응답이 있는 행 번호 - 행 값이 처음 나온 순서 (예전 딕셔너리의 키 순서)"""
+        counts = self.counts[kind]
+        rows = np.flatnonzero(counts.any(axis=1))
+        first_seen = np.where(counts[rows] > 0, self.first_seen[kind][rows], self._n_seen)
+        first_seen = first_seen.min(axis=1, initial=self._n_seen)
+        return rows[np.argsort(first_seen, kind='stable')]
+
+    def _sort_keys(self, kind):
+        """(응답 수 내림차순, 처음 센 순서 오름차순)을 정수 하나로 합친 정렬 키 (작을수록 앞)"""
+        return self.first_seen[kind] - self.counts[kind] * (self._n_seen + 1)
+
+    def top(self, kind, key, n):
+        """
+        key 행에서 응답 수가 많은 다음 휴가 경험 n개를 찾습니다.
+
+        Returns (반환 값):
+            list: [(다음 휴가 경험, 응답 수), ...] - Counter.most_common(n)과 같은 순서 (없는 key면 빈 목록)
+        """
+        row = self.vocabulary.get(self.ROW_COLUMNS[kind], key)
+        if not 0 <= row < self.counts[kind].shape[0]:
+            return []
+        counts = self.counts[kind][row]
+        n = min(n, int(np.count_nonzero(counts)))
+        if n <= 0:
+            return []
+        sort_keys = self._sort_keys(kind)[row]
+        columns = np.argpartition(sort_keys, n - 1)[:n]
+        columns = columns[np.argsort(sort_keys[columns])]
+        next_values = self.vocabulary.values[self.NEXT_COLUMN]
+        return [(next_values[column], int(counts[column])) for column in columns.tolist()]
+
+    def top_all(self, kind, n):
+        """
+        모든 행의 `top(kind, key, n)`을 행렬 연산 한 번으로 구합니다.
+
+        Returns (반환 값):
+            list: [(행 값, [(다음 휴가 경험, 응답 수), ...]), ...] - 행 값이 처음 나온 순서
+        """
+        rows = self._rows(kind)
+        row_values = self.vocabulary.values.get(self.ROW_COLUMNS[kind], [])
+        counts = self.counts[kind][rows]
+        n = min(n, counts.shape[1])
+        if n <= 0:
+            return [(row_values[row], []) for row in rows.tolist()]
+        sort_keys = self._sort_keys(kind)[rows]
+        columns = np.argpartition(sort_keys, n - 1, axis=1)[:, :n]
+        columns = np.take_along_axis(columns, np.argsort(np.take_along_axis(sort_keys, columns, axis=1), axis=1),
+                                     axis=1)
+        top_counts = np.take_along_axis(counts, columns, axis=1)
+        next_values = self.vocabulary.values[self.NEXT_COLUMN]
+        return [
+            (row_values[row], [(next_values[column], count) for column, count in zip(row_columns, row_counts)
+                               if count > 0])
+            for row, row_columns, row_counts in zip(rows.tolist(), columns.tolist(), top_counts.tolist())
+        ]
+
+    def score(self, kind, keys):
+        """
+        행 값 목록의 다음 휴가 경험 확률 분포를 한 번에 계산합니다.
+
+        Returns (반환 값):
+            np.ndarray: (len(keys), 다음 휴가 경험 수) 크기 - 행마다 응답 수 / 행 합계 (처음 보는 값의 행은 0)
+        """
+        counts = self.counts[kind]
+        rows = np.array([self.vocabulary.get(self.ROW_COLUMNS[kind], key) for key in keys], dtype=np.intp)
+        scores = np.zeros((len(rows), counts.shape[1]), dtype=np.float64)
+        known = (rows >= 0) & (rows < counts.shape[0])
+        totals = counts.sum(axis=1, keepdims=True)
+        scores[known] = (counts / np.maximum(totals, 1))[rows[known]]
+        return scores
+
+    @classmethod
+    def from_preference_patterns(cls, preference_patterns, vocabulary):
+        """예전 preference_patterns(키 -> 패턴 이름 -> {다음 휴가 경험: 응답 수})로 행렬을 만듭니다."""
+        matrix = cls(vocabulary)
+        for key, patterns in preference_patterns.items():
+            for kind, counts in patterns.items():
+                if kind not in matrix.counts:
+                    continue
+                row = vocabulary.code(cls.ROW_COLUMNS[kind], key)
+                for next_value, count in counts.items():
+                    matrix._add_count(kind, row, vocabulary.code(cls.NEXT_COLUMN, next_value), int(count),
+                                      matrix._n_seen)
+                    matrix._n_seen += 1
+        return matrix
+
+    def to_preference_patterns(self):
+        """예전 preference_patterns 형태의 딕셔너리 (행 값, 처음 센 순서대로)"""
+        patterns = {}
+        next_values = self.vocabulary.values.get(self.NEXT_COLUMN, [])
+        for kind in self.KINDS:
+            row_values = self.vocabulary.values.get(self.ROW_COLUMNS[kind], [])
+            for row in self._rows(kind).tolist():
+                counts = self.counts[kind][row]
+                columns = np.flatnonzero(counts)
+                columns = columns[np.argsort(self.first_seen[kind][row, columns], kind='stable')]
+                patterns.setdefault(row_values[row], {})[kind] = {next_values[column]: int(counts[column])
+                                                                  for column in columns.tolist()}
+        return patterns
+
+    def to_arrays(self):
+        """정수 배열 사전으로 변환합니다 (모델 번들 저장용, 행/열은 SurveyVocabulary 번호)."""
+        arrays = {}
+        for kind in self.KINDS:
+            arrays[f'cf_{kind}_counts'] = self.counts[kind]
+            arrays[f'cf_{kind}_first_seen'] = self.first_seen[kind]
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, vocabulary):
+        """`to_arrays()`로 저장한 배열로 행렬을 복원합니다."""
+        matrix = cls(vocabulary)
+        for kind in cls.KINDS:
+            matrix.counts[kind] = np.array(arrays[f'cf_{kind}_counts'], dtype=np.int64)
+            matrix.first_seen[kind] = np.array(arrays[f'cf_{kind}_first_seen'], dtype=np.int64)
+            if matrix.first_seen[kind].size:
+                matrix._n_seen = max(matrix._n_seen, int(matrix.first_seen[kind].max()) + 1)
+        matrix._grow()
+        return matrix
+
+    @classmethod
+    def from_legacy_arrays(cls, values, arrays, vocabulary):
+        """형식 버전 1 모델 번들의 행렬(행렬 전용 행/열 값 목록)을 사전 번호로 옮깁니다."""
+        matrix = cls(vocabulary)
+        next_codes = np.array([vocabulary.code(cls.NEXT_COLUMN, value) for value in values['next_values']],
+                              dtype=np.intp)
+        row_codes = {kind: np.array([vocabulary.code(cls.ROW_COLUMNS[kind], value)
+                                     for value in values['row_values'][kind]], dtype=np.intp)
+                     for kind in cls.KINDS}
+        matrix._grow()
+        for kind in cls.KINDS:
+            counts = np.array(arrays[f'cf_{kind}_counts'], dtype=np.int64)
+            first_seen = np.array(arrays[f'cf_{kind}_first_seen'], dtype=np.int64)
+            rows, columns = np.nonzero(counts)
+            matrix.counts[kind][row_codes[kind][rows], next_codes[columns]] = counts[rows, columns]
+            matrix.first_seen[kind][row_codes[kind][rows], next_codes[columns]] = first_seen[rows, columns]
+            if first_seen.size:
+                matrix._n_seen = max(matrix._n_seen, int(first_seen.max()) + 1)
+        return matrix
+
+
+class CostTable:
+    """
+    💰 비용 빈도표 (cost_info의 원본 집계)
+
+    만족도 높은 응답 하나마다 다섯 가지 (키, 세부 키) 조합에 비용을 하나씩 셉니다.
+    - (휴가 유형, 국내/해외), (연령대, 휴가 유형), (성별, 휴가 유형), (함께한 사람, 국내/해외), (다음 휴가 경험, 국내/해외)
+    조합마다 (키 값 수, 세부 키 값 수, 비용 값 수) 크기의 응답 수와 처음 센 순서를 SurveyVocabulary 번호로 두고,
+    'age_20대' 같은 접두어 키와 최빈 비용 문자열은 `cost_info()`를 만들 때만 붙입니다.
+
+    예전 cost_patterns(키 -> 세부 키 -> 비용 목록)를 Counter로 센 것과 같은 키 순서와
+    같은 최빈 비용(동점이면 먼저 나온 비용)을 돌려줍니다.
+    """
+
+    # (cost_info 키 접두어, 키 컬럼, 세부 키 컬럼) - 응답 한 개를 이 순서대로 셉니다.
+    GROUPS = (
+        (None, '가장_최근_여름_휴가', '휴가_장소_국내_해외'),
+        ('age', '연령대', '가장_최근_여름_휴가'),
+        ('gender', '성별', '가장_최근_여름_휴가'),
+        ('companion', '함께한_사람', '휴가_장소_국내_해외'),
+        ('next', '다음_휴가_경험', '휴가_장소_국내_해외'),
+    )
+    COST_COLUMN = '총_비용'
+
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+        # 조합별 (키 값 수, 세부 키 값 수, 비용 값 수) 크기의 응답 수와 칸이 처음 0보다 커진 순서
+        # 처음 센 순서는 (응답 순서 x 조합 수 + 조합 번호)로 매겨 예전 목록에 비용을 넣던 순서와 같게 합니다.
+        self.counts = [np.zeros((0, 0, 0), dtype=np.int64) for _ in self.GROUPS]
+        self.first_seen = [np.zeros((0, 0, 0), dtype=np.int64) for _ in self.GROUPS]
+        self._n_seen = 0
+
+    def _grow(self):
+        """사전에 새 값이 생겼으면 배열을 그 크기로 늘립니다."""
+        n_costs = self.vocabulary.size(self.COST_COLUMN)
+        for group, (_, key_column, inner_column) in enumerate(self.GROUPS):
+            counts = self.counts[group]
+            shape = (max(self.vocabulary.size(key_column), counts.shape[0]),
+                     max(self.vocabulary.size(inner_column), counts.shape[1]), max(n_costs, counts.shape[2]))
+            if counts.shape != shape:
+                padding = [(0, size - current) for size, current in zip(shape, counts.shape)]
+                self.counts[group] = np.pad(counts, padding)
+                self.first_seen[group] = np.pad(self.first_seen[group], padding)
+
+    def add(self, codes):
+        """만족도 높은 응답 한 개(패턴 학습용 컬럼 번호 {컬럼: 번호})의 비용을 다섯 조합에 더합니다 (O(1))."""
+        self._grow()
+        cost = codes[self.COST_COLUMN]
+        for group, (_, key_column, inner_column) in enumerate(self.GROUPS):
+            cell = (codes[key_column], codes[inner_column], cost)
+            if self.counts[group][cell] == 0:
+                self.first_seen[group][cell] = self._n_seen * len(self.GROUPS) + group
+            self.counts[group][cell] += 1
+        self._n_seen += 1
+
+    def add_many(self, codes):
+        """응답 여러 개(컬럼별 같은 길이의 번호 배열)를 한 번에 더합니다 - `add`를 차례로 호출한 것과 같은 결과"""
+        costs = codes[self.COST_COLUMN]
+        n_rows = len(costs)
+        if n_rows == 0:
+            return
+        self._grow()
+        for group, (_, key_column, inner_column) in enumerate(self.GROUPS):
+            _, n_inner, n_costs = self.counts[group].shape
+            cells = (codes[key_column] * n_inner + codes[inner_column]) * n_costs + costs
+            counts = self.counts[group].reshape(-1)
+            touched, first_positions = np.unique(cells, return_index=True)
+            unseen = counts[touched] == 0
+            self.first_seen[group].reshape(-1)[touched[unseen]] = (
+                (self._n_seen + first_positions[unseen]) * len(self.GROUPS) + group)
+            counts += np.bincount(cells, minlength=counts.size)
+        self._n_seen += n_rows
+
+    def _cells(self):
+        """
+        응답이 있는 (키, 세부 키) 칸을 예전 cost_patterns의 키 순서대로 돌려줍니다.
+
+        Returns (반환 값):
+            list: [(키 문자열, 세부 키 값, 비용 번호 배열, 처음 센 순서 배열, 응답 수 배열), ...]
+        """
+        values = self.vocabulary.values
+        cells = []
+        key_first_seen = {}
+        for group, (prefix, key_column, inner_column) in enumerate(self.GROUPS):
+            counts = self.counts[group]
+            if counts.size == 0:
+                continue
+            first_seen = np.where(counts > 0, self.first_seen[group], np.iinfo(np.int64).max)
+            cell_first_seen = first_seen.min(axis=2)
+            for key_code, inner_code in zip(*np.nonzero(counts.any(axis=2))):
+                key = values[key_column][key_code]
+                if prefix is not None:
+                    key = f"{prefix}_{key}"
+                seen = int(cell_first_seen[key_code, inner_code])
+                key_first_seen[key] = min(key_first_seen.get(key, seen), seen)
+                cells.append((seen, key, values[inner_column][inner_code],
+                              counts[key_code, inner_code], first_seen[key_code, inner_code]))
+        # 키는 처음 나온 순서대로, 같은 키 안에서는 세부 키가 처음 나온 순서대로 놓습니다.
+        cells.sort(key=lambda cell: (key_first_seen[cell[1]], cell[0]))
+        return [(key, inner, cost_counts, first_seen) for _, key, inner, cost_counts, first_seen in cells]
+
+    def cost_info(self):
+        """{키: {세부 키: 최빈 비용}} - 예전 cost_patterns의 비용 목록마다 Counter.most_common(1)을 구한 것과 같음"""
+        cost_values = self.vocabulary.values.get(self.COST_COLUMN, [])
+        cost_info = {}
+        for key, inner, cost_counts, first_seen in self._cells():
+            # 응답 수가 가장 많은 비용, 같으면 먼저 센 비용
+            best = int(np.argmin(first_seen - cost_counts * (self._n_seen + 1) * len(self.GROUPS)))
+            cost_info.setdefault(key, {})[inner] = cost_values[best]
+        return cost_info
+
+    def cost_counts(self):
+        """{키: {세부 키: {비용: 응답 수}}} - 비용은 처음 센 순서 (검증/비교용)"""
+        cost_values = self.vocabulary.values.get(self.COST_COLUMN, [])
+        cost_counts = {}
+        for key, inner, counts, first_seen in self._cells():
+            codes = np.flatnonzero(counts)
+            codes = codes[np.argsort(first_seen[codes], kind='stable')]
+            cost_counts.setdefault(key, {})[inner] = {cost_values[code]: int(counts[code]) for code in codes.tolist()}
+        return cost_counts
+
+    @classmethod
+    def from_cost_patterns(cls, cost_patterns, vocabulary):
+        """예전 cost_patterns.json(키 -> 세부 키 -> 비용 목록)으로 빈도표를 만듭니다 (키 접두어로 조합을 찾음)."""
+        table = cls(vocabulary)
+        prefixes = {prefix: group for group, (prefix, _, _) in enumerate(cls.GROUPS) if prefix is not None}
+        cells = []
+        for key, location_data in cost_patterns.items():
+            prefix, _, value = str(key).partition('_')
+            group = prefixes.get(prefix, 0) if value else 0
+            if group == 0:
+                value = key
+            _, key_column, inner_column = cls.GROUPS[group]
+            key_code = vocabulary.code(key_column, value)
+            for inner, costs in location_data.items():
+                inner_code = vocabulary.code(inner_column, inner)
+                for cost, count in Counter(costs).items():
+                    cells.append((group, key_code, inner_code, vocabulary.code(cls.COST_COLUMN, cost), count))
+        table._grow()
+        # 파일에 저장된 순서(키, 세부 키, 비용이 처음 나온 순서)를 처음 센 순서로 씁니다.
+        for seen, (group, key_code, inner_code, cost_code, count) in enumerate(cells):
+            table.counts[group][key_code, inner_code, cost_code] = count
+            table.first_seen[group][key_code, inner_code, cost_code] = seen
+        table._n_seen = len(cells)
+        return table
+
+    def to_arrays(self):
+        """정수 배열 사전으로 변환합니다 (모델 번들 저장용, 값은 SurveyVocabulary 번호)."""
+        arrays = {}
+        for group in range(len(self.GROUPS)):
+            arrays[f'cost_{group}_counts'] = self.counts[group]
+            arrays[f'cost_{group}_first_seen'] = self.first_seen[group]
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, vocabulary):
+        """`to_arrays()`로 저장한 배열로 빈도표를 복원합니다."""
+        table = cls(vocabulary)
+        for group in range(len(cls.GROUPS)):
+            table.counts[group] = np.array(arrays[f'cost_{group}_counts'], dtype=np.int64)
+            table.first_seen[group] = np.array(arrays[f'cost_{group}_first_seen'], dtype=np.int64)
+            if table.first_seen[group].size:
+                table._n_seen = max(table._n_seen, int(table.first_seen[group].max()) // len(cls.GROUPS) + 1)
+        table._grow()
+        return table
+
+
+class RecommendationCache:
+    """
+    🗃️ 추천 결과 캐시 (LRU + 선택적 TTL)
+
+    같은 답 조합의 추천 요청이 반복될 때 계산 결과를 재사용합니다.
+    - 크기 제한: 가장 오래 사용하지 않은 항목부터 지웁니다 (LRU, Least Recently Used).
+    - TTL(Time To Live): 지정하면 저장 후 ttl초가 지난 항목은 사용하지 않습니다.
+    - 적중(hit)/실패(miss)/축출(eviction)/만료(expiration) 횟수를 세어 `stats()`로 보여줍니다.
+
+    여러 스레드에서 동시에 사용해도 안전하도록 잠금(Lock)을 사용합니다.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        # key -> (만료 시각, 값), 최근에 사용한 항목일수록 뒤쪽에 있습니다.
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        """캐시에서 값을 찾습니다. 없거나 만료되었으면 default를 반환합니다."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or self._clock() < expires_at:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """값을 저장합니다. 크기 제한을 넘으면 가장 오래 사용하지 않은 항목을 지웁니다."""
+        expires_at = None if self.ttl is None else self._clock() + self.ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """모든 항목을 지웁니다 (통계 값은 유지)."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """모니터링(대시보드)용 통계 값을 반환합니다."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# 캐시 키에서 '응답에 그 문항이 아예 없음'을 None 값과 구분하기 위한 표시입니다.
+_MISSING = ('<없음>',)
+
+
+def canonical_feature_key(user_data):
+    """
+    추천 결과를 결정하는 6개 특징 응답만 정해진 순서의 튜플로 만듭니다.
+
+    추천 결과는 SELECTED_FEATURES 6개 응답에만 의존하므로, 나머지 항목(총_비용, 만족도 등)이나
+    딕셔너리의 키 순서가 달라도 같은 키가 됩니다.
+    """
+    return tuple(user_data.get(field, _MISSING) for field in SELECTED_FEATURES)
+
+
+class MaterializedRecommendations:
+    """
+    🗂️ 모든 답 조합의 추천 결과를 미리 계산해 둔 조회표
+
+    6개 특징의 선택지는 정해져 있으므로, 학습 데이터에 나온 값들의 모든 조합에 대해
+    get_recommendations()의 결과를 미리 계산해 JSON 파일 하나에 저장합니다.
+    요청이 오면 답 조합의 번호를 계산해 바로 꺼내므로 pandas나 유사도 계산이 필요 없습니다.
+
+    파일 크기를 줄이기 위해 같은 내용은 한 번만 저장합니다.
+    - 추천 목록: '다음_휴가_경험' 값에만 의존하므로 값마다 한 번
+    - 유사 사용자 카드: 서로 다른 카드 목록(user_cards)과, 조합별 카드 번호 목록(similar_user_ids)
+    - cost_info, next_vacation_suggestions: 모델 전체에서 한 번
+    """
+
+    FILE_NAME = 'materialized_recommendations.json'
+    FORMAT_VERSION = 1
+
+    def __init__(self, fields, choices, static_payload, recommendations, user_cards, similar_user_ids,
+                 n_respondents=None):
+        self.fields = list(fields)
+        self.choices = [list(values) for values in choices]
+        self.static_payload = static_payload
+        # '다음_휴가_경험' 값 번호 -> 상위 5개 추천 목록
+        self.recommendations = recommendations
+        self.user_cards = user_cards
+        # 답 조합 번호 -> 유사 사용자 카드 번호 목록
+        self.similar_user_ids = similar_user_ids
+        # 이 조회표를 만든 학습 데이터의 응답자 수 (불러올 때 모델 파일과 맞는지 확인하는 용도)
+        self.n_respondents = n_respondents
+        self._value_index = [{value: code for code, value in enumerate(values)} for values in self.choices]
+        # 답 조합 번호 = 각 특징의 값 번호를 자릿수처럼 이어 붙인 수 (마지막 특징이 가장 낮은 자리)
+        self._strides = []
+        stride = 1
+        for values in reversed(self.choices):
+            self._strides.append(stride)
+            stride *= len(values)
+        self._strides.reverse()
+        self._next_position = self.fields.index('다음_휴가_경험')
+
+    @property
+    def n_combinations(self):
+        return len(self.similar_user_ids)
+
+    @classmethod
+    def build(cls, service, max_combinations=200000):
+        """학습된 서비스 객체로 모든 답 조합의 추천 결과를 계산합니다."""
+        encoder = service.feature_encoder
+        missing = [field for field in SELECTED_FEATURES if field not in encoder.field_index]
+        if missing:
+            raise ValueError(f'학습 데이터에 없는 특징이 있어 미리 계산할 수 없습니다: {missing}')
+        choices = [list(encoder.field_index[field]) for field in SELECTED_FEATURES]
+        n_combinations = int(np.prod([len(values) for values in choices]))
+        if n_combinations > max_combinations:
+            raise ValueError(f'답 조합이 너무 많습니다: {n_combinations:,}개 (최대 {max_combinations:,}개)')
+
+        next_position = SELECTED_FEATURES.index('다음_휴가_경험')
+        user_cards = []
+        card_ids = {}
+        similar_user_ids = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            recommendations = [
+                service._generate_recommendations({'다음_휴가_경험': value}, [])[:5]
+                for value in choices[next_position]
+            ]
+            # itertools.product는 마지막 특징이 가장 빠르게 바뀌는 순서로 조합을 만들므로
+            # 만들어진 순서가 곧 답 조합 번호입니다.
+            for combination in itertools.product(*choices):
+                user_data = dict(zip(SELECTED_FEATURES, combination))
+                similar_users = service._format_for_django([], service._find_similar_users(user_data))['similar_users']
+                ids = []
+                for card in similar_users:
+                    card_key = tuple(card.items())
+                    if card_key not in card_ids:
+                        card_ids[card_key] = len(user_cards)
+                        user_cards.append(card)
+                    ids.append(card_ids[card_key])
+                similar_user_ids.append(ids)
+
+        return cls(SELECTED_FEATURES, choices, dict(service._get_static_payload()), recommendations,
+                   user_cards, similar_user_ids, n_respondents=service._n_respondents())
+
+    def lookup(self, user_data):
+        """
+        미리 계산된 추천 결과를 반환합니다.
+        조회표에 없는 값(학습 데이터에 없던 값, 직접 입력한 값, 빠진 문항)이 있으면 None을 반환합니다.
+        """
+        index = 0
+        for field, value_index, stride in zip(self.fields, self._value_index, self._strides):
+            try:
+                code = value_index.get(user_data.get(field))
+            except TypeError:
+                return None
+            if code is None:
+                return None
+            index += code * stride
+        next_code = (index // self._strides[self._next_position]) % len(self.choices[self._next_position])
+        return {
+            'success': True,
+            'recommendations': self.recommendations[next_code],
+            'similar_users': [self.user_cards[card_id] for card_id in self.similar_user_ids[index]],
+            **self.static_payload
+        }
+
+    def to_dict(self):
+        # 유사 사용자 카드는 키 이름을 한 번만 적고 값 목록만 저장합니다.
+        card_keys = list(self.user_cards[0]) if self.user_cards else []
+        return {
+            'format_version': self.FORMAT_VERSION,
+            'fields': self.fields,
+            'choices': self.choices,
+            'n_respondents': self.n_respondents,
+            'static_payload': self.static_payload,
+            'recommendations': self.recommendations,
+            'user_card_keys': card_keys,
+            'user_cards': [[card[key] for key in card_keys] for card in self.user_cards],
+            'similar_user_ids': self.similar_user_ids,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('format_version') != cls.FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 조회표 형식입니다: {data.get('format_version')}")
+        card_keys = data['user_card_keys']
+        user_cards = [dict(zip(card_keys, values)) for values in data['user_cards']]
+        return cls(data['fields'], data['choices'], data['static_payload'], data['recommendations'],
+                   user_cards, data['similar_user_ids'], n_respondents=data.get('n_respondents'))
+
+    def save(self, path):
+        """조회표를 공백 없는 JSON 파일로 저장하고 파일 크기(바이트)를 반환합니다."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(',', ':'))
+        return os.path.getsize(path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+class UserSegmentModel:
+    """
+    🧩 사용자 세그먼트 라우터 (user_clustering_model)
+
+    학습할 때 만족도가 높은 응답자들을 6개 특징 인코딩 벡터의 구형 k-평균으로 n_segments개 세그먼트로 나누고,
+    세그먼트마다 소속 응답자만으로 추천 목록('다음_휴가_경험' 값별), cost_info, 대표 유사 사용자 카드를 미리 계산합니다.
+    요청이 오면 사용자 벡터와 세그먼트 중심의 내적만 계산해 가장 가까운 세그먼트의 결과를 꺼내므로
+    요청 1건의 계산량이 응답자(프로필) 수와 상관없이 세그먼트 수에 비례합니다.
+
+    결과는 정확한 유사도 경로(get_recommendations)의 근사이며, `bench_recommendations.evaluate_segments()`로 차이를 확인할 수 있습니다.
+    - 추천 목록: 세그먼트 응답자의 점수표로 순위를 매기고, 5개가 안 되면 전체 모델의 순위로 채움
+    - cost_info: 세그먼트에 있는 (키, 세부 키)는 세그먼트의 최빈 비용, 나머지는 전체 모델의 값
+    - 유사 사용자: 세그먼트 중심에 가장 가까운 응답자 카드 (유사도는 요청한 사용자 기준으로 다시 계산)
+    세그먼트는 만든 시점의 모델 기준이므로, 증분 학습으로 들어온 응답은 다시 만들 때(`build_user_segments`) 반영됩니다.
+    """
+
+    FILE_NAME = 'user_segments.json'
+    FORMAT_VERSION = 1
+
+    def __init__(self, centroids, segments, n_respondents=None):
+        # (세그먼트 수, 열 개수) 크기의 L2 정규화된 세그먼트 중심
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        # 세그먼트별 {'size', 'recommendations', 'fallback', 'cost_info', 'user_cards', 'card_columns'}
+        self.segments = segments
+        # 세그먼트를 만든 학습 데이터의 응답자 수
+        self.n_respondents = n_respondents
+
+    @property
+    def n_segments(self):
+        return len(self.segments)
+
+    @classmethod
+    def build(cls, service, n_segments=64, n_iter=20, seed=42):
+        """학습된 서비스 객체의 현재 스냅샷으로 세그먼트를 나누고 세그먼트별 결과를 미리 계산합니다."""
+        snapshot = service._current_snapshot()
+        table = snapshot.search_index(service._resolve_filters()).profile_table
+        if table.n_profiles == 0:
+            raise ValueError('만족도가 높은 응답자가 없어 세그먼트를 만들 수 없습니다.')
+        # 프로필을 응답자 수만큼의 가중치로 군집화하므로 응답자 단위로 군집화한 것과 같습니다.
+        matrix = CosineSimilarityBackend().fit(table.matrix).matrix
+        counts = np.asarray(table.counts[:table.n_profiles], dtype=np.intp)
+        centroids = spherical_kmeans(matrix, n_segments, n_iter, np.random.default_rng(seed), weights=counts)
+        profile_scores = matrix @ centroids.T
+        profile_segment = np.argmax(profile_scores, axis=1)
+
+        # 응답자 번호 순으로 모아야 세그먼트별 집계의 값 순서(동점 처리)가 전체 학습과 같아집니다.
+        rows = np.concatenate([np.asarray(table.members[profile][:count], dtype=np.intp)
+                               for profile, count in enumerate(counts.tolist())])
+        row_segment = np.repeat(profile_segment, counts)
+        order = np.argsort(rows, kind='stable')
+        rows, row_segment = rows[order], row_segment[order]
+        frame = snapshot.respondent_frame(rows)
+        positions_by_segment = np.argsort(row_segment, kind='stable')
+        segment_sizes = np.bincount(row_segment, minlength=len(centroids))
+        segment_starts = np.concatenate([[0], np.cumsum(segment_sizes)[:-1]])
+
+        # 세그먼트 응답자들의 값을 한 번만 값 번호로 바꾸고, 세그먼트마다 번호 배열을 잘라서 셉니다.
+        vocabulary = snapshot.scoring_table.vocabulary
+        columns = [column for column in PATTERN_COLUMNS if column in frame.columns]
+        codes = vocabulary.pattern_codes({column: vocabulary.encode(column, frame[column]) for column in columns},
+                                         len(frame))
+
+        next_values = list(snapshot.feature_encoder.field_index.get('다음_휴가_경험', {}))
+        overall_cost_info = snapshot.static_payload['cost_info']
+        overall = {value: snapshot.scoring_table.rank(value) for value in next_values}
+        overall_fallback = snapshot.scoring_table.rank(None)
+
+        segments = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for segment_id in range(len(centroids)):
+                start = segment_starts[segment_id]
+                positions = positions_by_segment[start:start + segment_sizes[segment_id]]
+                segment_codes = {column: column_codes[positions] for column, column_codes in codes.items()}
+                scoring_table = ScoringTable(vocabulary)
+                scoring_table.add_many(segment_codes)
+                cost_table = CostTable(vocabulary)
+                cost_table.add_many(segment_codes)
+
+                cost_info = {key: dict(location_data) for key, location_data in overall_cost_info.items()}
+                for key, location_data in cost_table.cost_info().items():
+                    cost_info.setdefault(key, {}).update(location_data)
+
+                card_rows, card_scores, card_profiles = cls._closest_respondents(
+                    table, profile_scores[:, segment_id], np.flatnonzero(profile_segment == segment_id))
+                similar_users = service._similar_users_from_top(card_rows, card_scores,
+                                                                snapshot.respondent_records(card_rows))
+                cards = service._format_for_django([], similar_users, snapshot)['similar_users']
+
+                segments.append({
+                    'size': int(segment_sizes[segment_id]),
+                    'recommendations': {
+                        value: cls._top_recommendations(scoring_table.rank(value), overall[value])
+                        for value in next_values
+                    },
+                    'fallback': cls._top_recommendations(scoring_table.rank(None), overall_fallback),
+                    'cost_info': cost_info,
+                    'user_cards': [{key: value for key, value in card.items() if key not in ('rank', 'similarity')}
+                                   for card in cards],
+                    'card_columns': [np.flatnonzero(table.matrix[profile]).tolist() for profile in card_profiles],
+                })
+        return cls(centroids, segments, n_respondents=snapshot.n_respondents)
+
+    @staticmethod
+    def _closest_respondents(table, profile_scores, profiles, top_k=3):
+        """
+        세그먼트 프로필 중 중심과 가까운 순(같으면 프로필 번호 순)으로 응답자 top_k명을 고릅니다.
+
+        Returns (반환 값):
+            (list, list, list): (응답자 번호, 중심과의 유사도, 프로필 번호)
+        """
+        order = np.lexsort((profiles, -profile_scores[profiles]))
+        row_ids, scores, row_profiles = [], [], []
+        for profile in profiles[order].tolist():
+            for row_id in table.members[profile][:table.counts[profile]][:top_k - len(row_ids)]:
+                row_ids.append(int(row_id))
+                scores.append(float(profile_scores[profile]))
+                row_profiles.append(profile)
+            if len(row_ids) == top_k:
+                break
+        return row_ids, scores, row_profiles
+
+    @staticmethod
+    def _top_recommendations(ranked, overall, top_k=5):
+        """세그먼트 추천 상위 top_k개 (모자라면 전체 모델 순위에서 겹치지 않는 추천으로 채움)"""
+        top = ranked[:top_k]
+        seen = {(item['vacation_type'], item['location_type']) for item in top}
+        for item in overall:
+            if len(top) == top_k:
+                break
+            if (item['vacation_type'], item['location_type']) not in seen:
+                top.append(item)
+        return top
+
+    def route(self, user_vector):
+        """인코딩된 사용자 벡터와 코사인 유사도가 가장 큰 세그먼트 번호 (세그먼트 수만큼의 내적 한 번)"""
+        return int(np.argmax(self.centroids @ np.asarray(user_vector, dtype=np.float32).ravel()))
+
+    def lookup(self, user_vector, user_data, static_payload):
+        """
+        사용자가 속한 세그먼트의 미리 계산된 결과를 get_recommendations()와 같은 형식으로 반환합니다.
+
+        Args (매개변수):
+            user_vector: 고정 인코더로 인코딩한 사용자 벡터
+            static_payload: 모델의 cost_info/next_vacation_suggestions (cost_info는 세그먼트 값으로 바꿈)
+        """
+        segment_id = self.route(user_vector)
+        segment = self.segments[segment_id]
+        vector = np.asarray(user_vector, dtype=np.float32).ravel()
+        user_norm = float(np.linalg.norm(vector))
+        # 카드의 프로필 벡터는 0/1이므로 코사인 유사도 = 켜진 열의 사용자 값 합 / (|사용자| * sqrt(켜진 열 수))
+        similarities = [
+            float(vector[columns].sum()) / (user_norm * np.sqrt(len(columns))) if user_norm and columns else 0.0
+            for columns in segment['card_columns']
+        ]
+        order = sorted(range(len(similarities)), key=lambda position: -similarities[position])
+        try:
+            recommendations = segment['recommendations'].get(user_data.get('다음_휴가_경험', '기타'))
+        except TypeError:
+            recommendations = None
+        return {
+            'success': True,
+            'recommendations': recommendations if recommendations is not None else segment['fallback'],
+            'similar_users': [
+                {'rank': rank, 'similarity': f"{round(similarities[position], 2)*100:.0f}%",
+                 **segment['user_cards'][position]}
+                for rank, position in enumerate(order, start=1)
+            ],
+            **static_payload,
+            'cost_info': segment['cost_info'],
+            'segment': segment_id,
+        }
+
+    def to_dict(self):
+        # 추천 항목은 키 이름을 한 번만 적고 값 목록만 저장합니다.
+        item_keys = next((list(segment['fallback'][0]) for segment in self.segments if segment['fallback']), [])
+
+        def compact(items):
+            return [[item[key] for key in item_keys] for item in items]
+
+        return {
+            'format_version': self.FORMAT_VERSION,
+            'n_respondents': self.n_respondents,
+            'centroids': self.centroids.tolist(),
+            'recommendation_keys': item_keys,
+            'segments': [
+                {**segment,
+                 'recommendations': {value: compact(items) for value, items in segment['recommendations'].items()},
+                 'fallback': compact(segment['fallback'])}
+                for segment in self.segments
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('format_version') != cls.FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 세그먼트 형식입니다: {data.get('format_version')}")
+        item_keys = data['recommendation_keys']
+
+        def expand(rows):
+            return [dict(zip(item_keys, values)) for values in rows]
+
+        segments = [
+            {**segment,
+             'recommendations': {value: expand(rows) for value, rows in segment['recommendations'].items()},
+             'fallback': expand(segment['fallback'])}
+            for segment in data['segments']
+        ]
+        return cls(data['centroids'], segments, n_respondents=data.get('n_respondents'))
+
+    def save(self, path):
+        """세그먼트를 공백 없는 JSON 파일로 저장하고 파일 크기(바이트)를 반환합니다."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(',', ':'))
+        return os.path.getsize(path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+def _records_from(original_df, pending_rows, coded_respondents, row_ids):
+    """응답자 번호들의 원본 응답(dict) 목록 (original_df + 대기 중인 새 응답, 또는 값 번호 응답자 목록에서)"""
+    if original_df is None:
+        return [coded_respondents.record(row_id) for row_id in row_ids]
+    n_stored = len(original_df)
+    columns = original_df.columns.tolist()
+    rows = original_df.iloc[[row_id for row_id in row_ids if row_id < n_stored]].to_numpy(dtype=object)
+    stored = (dict(zip(columns, values)) for values in rows.tolist())
+    return [next(stored) if row_id < n_stored else dict(pending_rows[row_id - n_stored])
+            for row_id in row_ids]
+
+
+def _frame_from(original_df, pending_rows, coded_respondents, row_ids):
+    """응답자 번호들(오름차순)의 원본 응답 DataFrame (_records_from과 같은 출처, 응답마다 dict를 만들지 않음)"""
+    row_ids = np.asarray(row_ids, dtype=np.intp)
+    if original_df is None:
+        return CodedRespondents(coded_respondents.codes[row_ids], coded_respondents.column_info).to_frame()
+    n_stored = len(original_df)
+    stored = original_df.iloc[row_ids[row_ids < n_stored]].reset_index(drop=True)
+    pending = [pending_rows[row_id - n_stored] for row_id in row_ids[row_ids >= n_stored].tolist()]
+    if not pending:
+        return stored
+    return pd.concat([stored, pd.DataFrame(pending)], ignore_index=True)
+
+
+def normalize_filters(filters):
+    """
+    검색 조건을 {컬럼: frozenset(허용 값)} 형태로 맞춥니다.
+    허용 값이 하나면 목록 대신 값만 써도 됩니다 (예: {'휴가_장소_국내_해외': '해외'}).
+    """
+    return {column: frozenset([values] if isinstance(values, str) else values)
+            for column, values in filters.items()}
+
+
+def filter_key(filters):
+    """정규화된 검색 조건을 사전 키로 쓸 수 있는 튜플로 바꿉니다 (컬럼과 값의 순서는 무시)."""
+    return tuple(sorted(filters.items()))
+
+
+def _filter_mask(original_df, pending_rows, coded_respondents, n_rows, filters):
+    """응답자 번호 0..n_rows-1 중 검색 조건(정규화된 filters)을 모두 만족하는 응답자를 True로 표시한 배열"""
+    mask = np.ones(n_rows, dtype=bool)
+    for column, values in filters.items():
+        if original_df is None:
+            # 값 번호 응답자 목록은 허용 값의 번호만 골라 codes 열과 비교합니다.
+            if column not in coded_respondents.columns:
+                mask[:] = False
+                continue
+            position = coded_respondents.columns.index(column)
+            allowed = [code for code, value in enumerate(coded_respondents.column_info[position]['values'])
+                       if value in values]
+            mask &= np.isin(coded_respondents.codes[:n_rows, position], allowed)
+            continue
+        n_stored = min(len(original_df), n_rows)
+        if column in original_df.columns:
+            mask[:n_stored] &= original_df[column].iloc[:n_stored].isin(values).to_numpy(dtype=bool)
+        else:
+            mask[:n_stored] = False
+        mask[n_stored:] &= np.array([row.get(column) in values for row in pending_rows[:n_rows - n_stored]],
+                                    dtype=bool)
+    return mask
+
+
+class FilteredIndex:
+    """
+    🔎 조건부 유사 사용자 검색 색인
+
+    검색 조건(예: 만족도가 높은 응답자, 해외 휴가 응답자)을 만족하는 응답자만 담은 프로필 테이블과,
+    그 테이블의 프로필로 fit한 검색 엔진입니다. 조건에 맞지 않는 응답자는 유사도를 계산하지 않으며,
+    상위 k명을 뽑은 뒤 걸러 내는 방식과 달리 조건에 맞는 응답자가 k명 이상이면 항상 k명을 채웁니다.
+    (순서 규칙과 응답자 번호는 전체 프로필 테이블과 같습니다.)
+    """
+
+    def __init__(self, filters, profile_table, similarity_backend):
+        # 정규화된 검색 조건 {컬럼: frozenset(허용 값)}
+        self.filters = filters
+        self.profile_table = profile_table
+        self.similarity_backend = similarity_backend
+
+    @classmethod
+    def build(cls, filters, profile_table, similarity_backend, row_mask):
+        """전체 프로필 테이블에서 row_mask가 True인 응답자만 골라 색인을 만듭니다 (검색 엔진은 복사본을 fit)."""
+        table = profile_table.subset(row_mask)
+        return cls(filters, table, _fitted_copy(similarity_backend, table.matrix))
+
+    def matches(self, record):
+        """응답(dict)이 이 색인의 조건을 모두 만족하는지 확인합니다."""
+        return all(record.get(column) in values for column, values in self.filters.items())
+
+    def add_row(self, vector, satisfaction, row_id):
+        """조건에 맞는 새 응답자를 추가합니다 (새 프로필이 생기면 검색 엔진의 복사본을 다시 fit)."""
+        if self.profile_table.add_row(vector, satisfaction, row_id):
+            self.similarity_backend = _fitted_copy(self.similarity_backend, self.profile_table.matrix)
+
+    def frozen(self, row_limit):
+        """지금 상태의 읽기 전용 사본 (모델 스냅샷용, row_limit: 전체 응답자 수)"""
+        return FilteredIndex(self.filters, self.profile_table.frozen(row_limit), self.similarity_backend)
+
+
+class ModelSnapshot:
+    """
+    📸 읽기 전용 모델 스냅샷
+
+    추천을 계산할 때 읽는 모델 상태(인코더, 프로필 테이블, 검색 엔진, 점수표, cost_info 등)를
+    한 객체에 묶어 둔 것으로, 만든 뒤에는 바꾸지 않습니다.
+    요청을 처리하는 스레드는 시작할 때 `service._current_snapshot()`으로 스냅샷 하나를 잡고 끝까지 그것만 읽고,
+    모델을 바꾸는 쪽(학습/로드/업데이트)은 다음 스냅샷을 모두 만든 뒤 참조 하나만 바꿔 끼웁니다.
+    그래서 멀티스레드 WSGI 서버에서도 잠금 없이 읽을 수 있고, 업데이트 중에도 읽는 스레드가 기다리지 않습니다.
+
+    업데이트 쪽은 스냅샷이 가진 객체를 직접 고치지 않습니다.
+    - 점수표: 복사본(`ScoringTable.copy`)에 새 경험을 더함
+    - 검색 엔진: 새 프로필이 생기면 새 엔진 객체를 만들어 fit
+    - 프로필 테이블/응답자 목록: 뒤에만 추가되므로 스냅샷은 만들 때의 개수까지만 읽음
+    - 조건부 검색 색인(FilteredIndex): 프로필 테이블, 검색 엔진과 같은 방식
+    """
+
+    def __init__(self, model_version, feature_encoder, profile_table, similarity_backend, scoring_table,
+                 static_payload, respondents, materialized=None, filtered_indexes=None, segments=None):
+        self.model_version = model_version
+        self.feature_encoder = feature_encoder
+        self.profile_table = profile_table
+        self.similarity_backend = similarity_backend
+        self.scoring_table = scoring_table
+        self.static_payload = static_payload
+        # (original_df, 대기 중인 새 응답 목록, 값 번호 응답자 목록, 응답자 수)
+        self._respondents = respondents
+        self.materialized = materialized
+        # filter_key(검색 조건) -> 조건부 검색 색인
+        # 미리 만들어 두지 않은 조건은 처음 요청될 때 이 스냅샷의 데이터로 만들어 여기에 보관합니다.
+        self.filtered_indexes = dict(filtered_indexes or {})
+        # 사용자 세그먼트 라우터 (UserSegmentModel, 없으면 None)
+        self.segments = segments
+        self._static_payload_json = None
+
+    @property
+    def n_respondents(self):
+        """이 스냅샷의 응답자 수"""
+        return self._respondents[3]
+
+    def respondent_records(self, row_ids):
+        """응답자 번호들의 원본 응답(dict) 목록"""
+        original_df, pending_rows, coded_respondents, _ = self._respondents
+        return _records_from(original_df, pending_rows, coded_respondents, row_ids)
+
+    def respondent_frame(self, row_ids):
+        """응답자 번호들(오름차순)의 원본 응답 DataFrame"""
+        original_df, pending_rows, coded_respondents, _ = self._respondents
+        return _frame_from(original_df, pending_rows, coded_respondents, row_ids)
+
+    def search_index(self, filters):
+        """검색 조건(정규화된 filters)에 맞는 응답자만 담은 조건부 검색 색인"""
+        key = filter_key(filters)
+        index = self.filtered_indexes.get(key)
+        if index is None:
+            original_df, pending_rows, coded_respondents, n_respondents = self._respondents
+            row_mask = _filter_mask(original_df, pending_rows, coded_respondents, n_respondents, filters)
+            index = FilteredIndex.build(filters, self.profile_table, self.similarity_backend, row_mask)
+            self.filtered_indexes[key] = index
+        return index
+
+    def static_payload_json(self):
+        """cost_info와 next_vacation_suggestions의 JSON 바이트 (스냅샷마다 한 번만 직렬화)"""
+        if self._static_payload_json is None:
+            self._static_payload_json = json.dumps(
+                self.static_payload, ensure_ascii=False, separators=(',', ':')
+            ).encode('utf-8')
+        return self._static_payload_json
+
+
+class CodedRespondents:
+    """
+    🗜️ 값 번호(codes)로 저장된 응답자 목록
+
+    모델 번들의 codes 배열(메모리 맵 가능)과 컬럼별 값 사전만 가지고 있다가,
+    응답자 한 명의 원본 응답이 필요할 때만 딕셔너리로 풀어 줍니다.
+    워커마다 original_df(DataFrame) 전체를 메모리에 만들지 않아도 됩니다.
+    """
+
+    def __init__(self, codes, columns):
+        self.codes = codes
+        # 모델 번들 매니페스트의 컬럼 정보 [{name, dtype, values}, ...]
+        self.column_info = columns
+        self.columns = [column['name'] for column in columns]
+        self._dtypes = [column['dtype'] for column in columns]
+        # 컬럼마다 '값 번호 -> 값' 배열 (마지막 번호는 빈 값 NaN)
+        self._lookups = []
+        for column in columns:
+            lookup = np.empty(len(column['values']) + 1, dtype=object)
+            # 값 사전에 들어 있는 빈 값(NaN)도 np.nan 하나로 모읍니다 (JSON에서 읽으면 객체가 달라짐).
+            lookup[:-1] = [SurveyVocabulary._key(value) for value in column['values']]
+            lookup[-1] = np.nan
+            self._lookups.append(lookup)
+
+    def __len__(self):
+        return self.codes.shape[0]
+
+    def record(self, row_id):
+        """응답자 한 명의 원본 응답(dict)"""
+        return {name: lookup[code]
+                for name, lookup, code in zip(self.columns, self._lookups, self.codes[row_id].tolist())}
+
+    def to_frame(self):
+        """전체 응답을 원래 dtype의 DataFrame으로 복원합니다."""
+        data = {}
+        for position, (name, dtype, lookup) in enumerate(zip(self.columns, self._dtypes, self._lookups)):
+            series = pd.Series(lookup[self.codes[:, position]], dtype=object)
+            if dtype != 'object':
+                series = series.astype(dtype)
+            data[name] = series
+        return pd.DataFrame(data, columns=self.columns)
+
+
+class ModelBundle:
+    """
+    📦 버전이 있는 이진(binary) 모델 번들
+
+    pickle 없이 JSON 매니페스트와 numpy 배열(.npy/.npz)만으로 학습된 모델을 저장합니다.
+    - manifest.json: 형식 버전, 컬럼별 값 사전(SurveyVocabulary), 고정 인코더, cost_info/다음 휴가 제안
+    - codes.npy: 원본 응답(original_df)의 컬럼별 값 번호 (응답자 수 x 컬럼 수, uint8)
+    - profile_matrix.npy / row_profile.npy: 서로 다른 프로필 벡터(0/1)와 응답자별 프로필 번호
+    - rows_by_profile.npy: 프로필 번호 순으로 정렬한 응답자 번호 (프로필별 응답자 목록)
+    - similarity_matrix.npy: 프로필 벡터를 L2 정규화한 검색용 float32 행렬
+    - ann_centroids.npy / ann_labels.npy: 근사 검색 엔진(IVFSimilarityBackend)의 군집 중심과 프로필별 군집 번호
+      (그 엔진으로 학습했을 때만 저장)
+    - patterns.npz: 추천 점수표(ScoringTable)의 묶음별 사전 집계 값, 다음 휴가 전이 행렬(CollaborativeFilter)과
+      비용 빈도표(CostTable)의 응답 수 (모두 codes.npy와 같은 값 번호)
+    - materialized_recommendations.json / user_segments.json: 미리 계산된 추천 조회표와 사용자 세그먼트
+      (있을 때만, 같은 버전 폴더에 함께 저장하므로 번들과 항상 짝이 맞습니다)
+
+    불러올 때 임의의 파이썬 객체를 복원(unpickle)하지 않고,
+    원본 경험 목록 대신 사전 집계 값만 읽으므로 서버(워커) 시작이 빠르고 메모리도 적게 씁니다.
+    `load(bundle_dir, mmap=True)`로 열면 큰 배열들을 메모리 맵(읽기 전용)으로 열어서
+    같은 서버의 여러 워커 프로세스가 운영체제의 페이지 캐시 한 벌을 함께 사용합니다.
+
+    번들 폴더(model_bundle/) 안에서 저장할 때마다 새 버전 폴더를 통째로 만들고,
+    CURRENT 파일(지금 쓰는 버전 폴더 이름)을 os.replace로 바꿔서 한 번에 새 번들로 넘어갑니다.
+    이미 저장된 파일은 다시 쓰지 않으므로 저장 중에 실패해도 이전 번들이 그대로 남습니다.
+    다른 워커가 메모리 맵으로 열어 둔 이전 버전 파일도 덮어쓰거나 줄이지(truncate) 않으므로,
+    그 워커는 모델을 다시 불러올 때까지 이전 번들로 계속 응답합니다 (SIGBUS 없음).
+    """
+
+    DIR_NAME = 'model_bundle'
+    MANIFEST = 'manifest.json'
+    FORMAT_VERSION = 2
+    # 1: 점수표와 전이 행렬이 각자 따로 값 목록을 갖던 형식 (불러올 때 값 사전 번호로 옮깁니다)
+    SUPPORTED_VERSIONS = (1, 2)
+    ARRAY_FILES = ('codes', 'profile_matrix', 'row_profile', 'rows_by_profile', 'similarity_matrix',
+                   'ann_centroids', 'ann_labels')
+    # 이 형식의 초기 번들에는 없던 배열 (없으면 불러올 때 계산합니다)
+    OPTIONAL_ARRAY_FILES = ('rows_by_profile', 'ann_centroids', 'ann_labels')
+    # 번들 폴더 안에서 지금 쓰는 버전 폴더 이름을 적어 두는 파일
+    CURRENT = 'CURRENT'
+    # 만드는 중인 버전 폴더 이름의 접두사 (다 만들어진 뒤 버전 이름으로 바꿉니다)
+    TMP_PREFIX = '.tmp-'
+    # 저장 후 남겨 둘 버전 폴더 수 (지금 버전 포함). 방금 CURRENT를 읽은 워커가 이전 버전을 여는 중일 수 있습니다.
+    KEEP_VERSIONS = 3
+
+    def __init__(self, manifest, arrays, pattern_arrays, path=None):
+        self.manifest = manifest
+        # codes, profile_matrix, row_profile, rows_by_profile, similarity_matrix (+ ann_centroids, ann_labels)
+        self.arrays = arrays
+        self.pattern_arrays = pattern_arrays
+        # 불러온 버전 폴더 경로 (새로 만든 번들은 None)
+        self.path = path
+
+    @classmethod
+    def current_dir(cls, bundle_dir):
+        """
+        bundle_dir에서 지금 쓰는 버전 폴더의 경로를 찾습니다 (저장된 번들이 없으면 None).
+
+        버전 폴더를 쓰기 전에 저장한 번들(bundle_dir에 매니페스트가 바로 있는 형식)은 bundle_dir 자체를 돌려줍니다.
+        """
+        try:
+            with open(os.path.join(bundle_dir, cls.CURRENT), 'r', encoding='utf-8') as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            version = None
+        if version:
+            return os.path.join(bundle_dir, version)
+        if os.path.exists(os.path.join(bundle_dir, cls.MANIFEST)):
+            return bundle_dir
+        return None
+
+    @classmethod
+    def exists(cls, bundle_dir):
+        """매니페스트까지 모두 저장된 번들이 있는지 확인합니다."""
+        version_dir = cls.current_dir(bundle_dir)
+        return version_dir is not None and os.path.exists(os.path.join(version_dir, cls.MANIFEST))
+
+    @classmethod
+    def from_service(cls, service):
+        """학습된 서비스 객체의 현재 상태로 번들을 만듭니다 (대기 중인 새 응답은 먼저 합쳐 둘 것)."""
+        vocabulary = service.vocabulary
+        df = service.original_df
+        if df is None:
+            # 나누어 읽기 학습(chunksize) 등으로 원본 응답이 이미 값 번호로만 있으면 그대로 저장합니다.
+            respondents = service._coded_respondents
+            columns, codes = respondents.column_info, respondents.codes
+        else:
+            # 원본 응답도 점수표/비용 빈도표와 같은 값 사전(SurveyVocabulary)의 번호로 저장합니다.
+            code_columns = [vocabulary.encode(column, df[column]) for column in df.columns]
+            columns = [{'name': column, 'dtype': str(df[column].dtype), 'values': list(vocabulary.values[column])}
+                       for column in df.columns]
+            max_code = max((len(column['values']) for column in columns), default=0)
+            codes_dtype = np.min_scalar_type(max_code)
+            if code_columns:
+                codes = np.column_stack(code_columns).astype(codes_dtype)
+            else:
+                codes = np.zeros((len(df), 0), dtype=codes_dtype)
+
+        profile_table = service.profile_table
+        row_profile = profile_table.row_profiles()
+        static_payload = service._get_static_payload()
+        # 점수표, 다음 휴가 전이 행렬, 비용 빈도표는 값 번호로 센 정수 배열 그대로 patterns.npz에 저장합니다.
+        pattern_arrays = {}
+        for table in (service.scoring_table, service.collaborative_filter, service.cost_table):
+            pattern_arrays.update(table.to_arrays())
+        column_names = {column['name'] for column in columns}
+
+        manifest = {
+            'format_version': cls.FORMAT_VERSION,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'n_rows': len(codes),
+            'n_profiles': profile_table.n_profiles,
+            'columns': columns,
+            # columns에 없는 컬럼의 값 사전 (CSV에 없던 패턴 컬럼을 기본값 '기타'로 학습한 경우 등)
+            'vocabulary': {column: values for column, values in vocabulary.to_dict().items()
+                           if column not in column_names},
+            'feature_encoder': service.feature_encoder.to_dict(),
+            'static_payload': static_payload,
+            'applied_submission_seq': service.applied_submission_seq,
+            'similarity_index': None,
+        }
+        arrays = {
+            'codes': codes,
+            'profile_matrix': (profile_table.matrix != 0).astype(np.uint8),
+            'row_profile': row_profile,
+            'rows_by_profile': np.argsort(row_profile, kind='stable').astype(np.int32),
+            # CosineSimilarityBackend.fit()과 똑같이 계산한 행렬이므로 불러온 뒤 다시 정규화할 필요가 없습니다.
+            'similarity_matrix': CosineSimilarityBackend().fit(profile_table.matrix).matrix,
+        }
+        # 근사 검색 엔진은 학습한 군집 중심과 배정 결과를 함께 저장해 불러올 때 다시 학습하지 않도록 합니다.
+        backend = service.similarity_backend
+        if hasattr(backend, 'index_arrays') and backend.n_rows == profile_table.n_profiles:
+            index_arrays = backend.index_arrays()
+            manifest['similarity_index'] = backend.name
+            arrays['ann_centroids'] = index_arrays['centroids']
+            arrays['ann_labels'] = index_arrays['labels']
+        return cls(manifest, arrays, pattern_arrays)
+
+    def save(self, bundle_dir, extra_files=None):
+        """
+        번들을 bundle_dir 안의 새 버전 폴더에 저장하고 CURRENT를 그 폴더로 바꿉니다.
+
+        모든 파일을 임시 폴더에 다 쓴 뒤 폴더 이름을 바꾸고(os.rename), CURRENT 파일을 os.replace로 바꿉니다.
+        중간에 실패하면 임시 폴더만 지우므로 CURRENT는 계속 이전 번들을 가리킵니다.
+
+        Args (매개변수):
+            bundle_dir (str): 번들 폴더 (model_dir/model_bundle)
+            extra_files (dict): 같은 버전 폴더에 함께 저장할 파일 {파일 이름: 경로를 받아 그 파일을 쓰는 함수}
+
+        Returns (반환 값):
+            str: 새 버전 폴더 경로
+        """
+        os.makedirs(bundle_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=self.TMP_PREFIX, dir=bundle_dir)
+        try:
+            for name in self.ARRAY_FILES:
+                if name in self.arrays:
+                    np.save(os.path.join(tmp_dir, f'{name}.npy'), self.arrays[name])
+            np.savez(os.path.join(tmp_dir, 'patterns.npz'), **self.pattern_arrays)
+            for name, write in (extra_files or {}).items():
+                write(os.path.join(tmp_dir, name))
+            with open(os.path.join(tmp_dir, self.MANIFEST), 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f, ensure_ascii=False, separators=(',', ':'), default=str)
+            # 폴더를 바꿔 넣기 전에 파일 내용을 디스크에 기록해 둡니다 (전원이 꺼져도 반쯤 쓴 번들을 가리키지 않도록).
+            for name in os.listdir(tmp_dir):
+                self._fsync(os.path.join(tmp_dir, name))
+            version = self._new_version_name(bundle_dir)
+            os.rename(tmp_dir, os.path.join(bundle_dir, version))
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        self._switch_current(bundle_dir, version)
+        self._remove_old_versions(bundle_dir, version)
+        self.path = os.path.join(bundle_dir, version)
+        return self.path
+
+    @staticmethod
+    def _fsync(path):
+        """파일 내용을 디스크에 기록합니다."""
+        with open(path, 'rb') as f:
+            os.fsync(f.fileno())
+
+    @classmethod
+    def _new_version_name(cls, bundle_dir):
+        """저장 시각 순으로 정렬되는, 아직 쓰이지 않은 버전 폴더 이름을 만듭니다."""
+        base = datetime.now().strftime('%Y%m%d-%H%M%S-%f') + f'-{os.getpid()}'
+        version, counter = base, 0
+        while os.path.exists(os.path.join(bundle_dir, version)):
+            counter += 1
+            version = f'{base}-{counter}'
+        return version
+
+    @classmethod
+    def _remove_old_versions(cls, bundle_dir, current):
+        """
+        KEEP_VERSIONS개보다 오래된 버전 폴더와 예전 형식(버전 폴더 없이 바로 저장한) 파일을 지웁니다.
+
+        파일은 덮어쓰지 않고 지우기만(unlink) 하므로, 그 파일을 메모리 맵으로 열어 둔 프로세스는
+        닫을 때까지 원래 내용을 그대로 읽습니다. (파일을 지울 수 없는 운영체제에서는 다음 저장 때 다시 지웁니다.)
+        """
+        versions = sorted(name for name in os.listdir(bundle_dir)
+                          if name not in (current, cls.CURRENT) and not name.startswith('.')
+                          and os.path.isdir(os.path.join(bundle_dir, name)))
+        for name in versions[:max(0, len(versions) - (cls.KEEP_VERSIONS - 1))]:
+            shutil.rmtree(os.path.join(bundle_dir, name), ignore_errors=True)
+        for name in (cls.MANIFEST, 'patterns.npz') + tuple(f'{array}.npy' for array in cls.ARRAY_FILES):
+            path = os.path.join(bundle_dir, name)
+            if os.path.isfile(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    @classmethod
+    def _switch_current(cls, bundle_dir, version):
+        """CURRENT 파일을 새 버전 이름으로 한 번에 바꿉니다 (os.replace)."""
+        current_path = os.path.join(bundle_dir, cls.CURRENT)
+        tmp_path = f'{current_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, current_path)
+
+    @classmethod
+    def load(cls, bundle_dir, mmap=False):
+        """
+        폴더에 저장된 번들을 불러옵니다 (pickle 사용 안 함).
+
+        bundle_dir의 CURRENT가 가리키는 버전 폴더 하나에서만 파일을 읽습니다.
+        mmap=True면 .npy 배열을 복사하지 않고 읽기 전용 메모리 맵으로 엽니다.
+        """
+        version_dir = cls.current_dir(bundle_dir)
+        if version_dir is None:
+            raise FileNotFoundError(f"저장된 모델 번들이 없습니다: {bundle_dir}")
+        bundle_dir = version_dir
+        with open(os.path.join(bundle_dir, cls.MANIFEST), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format_version') not in cls.SUPPORTED_VERSIONS:
+            raise ValueError(f"지원하지 않는 모델 번들 형식입니다: {manifest.get('format_version')}")
+        arrays = {}
+        for name in cls.ARRAY_FILES:
+            path = os.path.join(bundle_dir, f'{name}.npy')
+            if name in cls.OPTIONAL_ARRAY_FILES and not os.path.exists(path):
+                continue
+            arrays[name] = np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False)
+        with np.load(os.path.join(bundle_dir, 'patterns.npz'), allow_pickle=False) as data:
+            pattern_arrays = {name: data[name] for name in data.files}
+        return cls(manifest, arrays, pattern_arrays, path=bundle_dir)
+
+    @property
+    def static_payload(self):
+        """저장할 때 계산해 둔 cost_info와 next_vacation_suggestions"""
+        return self.manifest['static_payload']
+
+    @property
+    def similarity_matrix(self):
+        return self.arrays['similarity_matrix']
+
+    def similarity_index(self, backend_name):
+        """backend_name 엔진으로 저장한 근사 검색 색인 배열 {'centroids', 'labels'} (없으면 None)"""
+        if self.manifest.get('similarity_index') != backend_name or 'ann_centroids' not in self.arrays:
+            return None
+        return {'centroids': self.arrays['ann_centroids'], 'labels': self.arrays['ann_labels']}
+
+    def respondents(self):
+        """값 번호 그대로의 응답자 목록 (DataFrame을 만들지 않음)"""
+        return CodedRespondents(self.arrays['codes'], self.manifest['columns'])
+
+    def original_df(self):
+        """값 번호(codes)와 컬럼별 값 사전으로 원본 응답 DataFrame을 복원합니다."""
+        return self.respondents().to_frame()
+
+    def feature_encoder(self):
+        return FeatureEncoder.from_dict(self.manifest['feature_encoder'])
+
+    def profile_table(self, shared=False):
+        """저장된 프로필 배열로 ProfileTable을 복원합니다 (shared=True면 응답자 목록을 배열 그대로 공유)."""
+        names = [column['name'] for column in self.manifest['columns']]
+        if '만족도' in names:
+            position = names.index('만족도')
+            satisfaction_values = self.manifest['columns'][position]['values'] + [np.nan]
+            satisfaction_codes = self.arrays['codes'][:, position]
+        else:
+            satisfaction_values = [None]
+            satisfaction_codes = np.zeros(self.manifest['n_rows'], dtype=np.intp)
+        return ProfileTable.from_arrays(self.arrays['profile_matrix'], self.arrays['row_profile'],
+                                        satisfaction_codes, satisfaction_values,
+                                        rows_by_profile=self.arrays.get('rows_by_profile'), shared=shared)
+
+    def vocabulary(self):
+        """codes 배열과 집계 배열이 쓰는 값 사전"""
+        values = {column['name']: column['values'] for column in self.manifest['columns']}
+        values.update(self.manifest.get('vocabulary', {}))
+        return SurveyVocabulary(values)
+
+    def scoring_table(self, vocabulary):
+        if self.manifest['format_version'] == 1:
+            return ScoringTable.from_legacy_arrays(self.manifest['scoring_values'], self.pattern_arrays, vocabulary)
+        return ScoringTable.from_arrays(self.pattern_arrays, vocabulary)
+
+    def collaborative_filter(self, vocabulary):
+        """저장된 다음 휴가 전이 행렬 (이 정보가 없는 예전 번들이면 None)"""
+        if self.manifest['format_version'] == 1:
+            values = self.manifest.get('collaborative_filter')
+            if values is None:
+                return None
+            return CollaborativeFilter.from_legacy_arrays(values, self.pattern_arrays, vocabulary)
+        return CollaborativeFilter.from_arrays(self.pattern_arrays, vocabulary)
+
+    def cost_table(self, vocabulary):
+        """저장된 비용 빈도표 (형식 버전 1 번들에는 없으므로 None)"""
+        if self.manifest['format_version'] == 1:
+            return None
+        return CostTable.from_arrays(self.pattern_arrays, vocabulary)
+
+
+class ChunkedSurveyAggregator:
+    """
+    🌊 나누어 읽은 CSV 조각(chunk)들을 차례로 받아 학습 결과를 쌓아 가는 집계기
+
+    `pd.read_csv(chunksize=...)`로 읽은 조각마다
+    - 모든 컬럼을 SurveyVocabulary의 값 번호(codes)로 바꾸고 (ModelBundle의 codes와 같은 번호)
+    - 6개 특징 값 번호 조합으로 프로필 번호를 매기고 (ProfileTable.from_features와 같은 번호)
+    - 만족도 높은 응답의 값 번호를 추천 점수표, 다음 휴가 전이 행렬, 비용 빈도표에 더해 갑니다.
+    조각을 다 읽고 나면 DataFrame 전체나 원-핫 인코딩 표 없이
+    한 번에 읽어 학습한 것과 같은 인코더/프로필 테이블/점수표/cost_info를 만들 수 있습니다.
+    응답자 수에 비례해 남는 메모리는 값 번호와 프로필 번호 배열(응답자당 수십 바이트)뿐입니다.
+    """
+
+    def __init__(self, columns, vocabulary=None):
+        self.columns = list(columns)
+        self.features = [feat for feat in SELECTED_FEATURES if feat in self.columns]
+        self._feature_positions = [self.columns.index(feat) for feat in self.features]
+        # 컬럼별 값 번호 사전 (처음 등장한 순서)
+        self.vocabulary = vocabulary if vocabulary is not None else SurveyVocabulary()
+        self._dtypes = {}
+        self._code_chunks = []
+        self._profile_chunks = []
+        # 6개 특징 값 번호 조합 -> 프로필 번호 (처음 등장한 순서)
+        self._profile_of_key = {}
+        self.n_rows = 0
+        self.n_satisfied = 0
+
+        self.scoring_table = ScoringTable(self.vocabulary)
+        self.collaborative_filter = CollaborativeFilter(self.vocabulary)
+        self.cost_table = CostTable(self.vocabulary)
+
+    def add_chunk(self, chunk):
+        """CSV 조각 하나를 값 번호로 바꾸고 프로필/패턴 집계에 더합니다."""
+        chunk = chunk.fillna('기타')
+        codes = np.empty((len(chunk), len(self.columns)), dtype=np.uint32)
+        for position, column in enumerate(self.columns):
+            values = chunk[column]
+            self._dtypes.setdefault(column, str(values.dtype))
+            codes[:, position] = self.vocabulary.encode(column, values)
+        self._code_chunks.append(codes)
+        self._profile_chunks.append(self._assign_profiles(codes[:, self._feature_positions]))
+        self.n_rows += len(chunk)
+
+        # 만족도가 높은 응답만 패턴 학습에 사용합니다 (_learn_patterns와 같은 규칙).
+        satisfied = chunk['만족도'].isin(SATISFIED_LEVELS).to_numpy()
+        n_satisfied = int(satisfied.sum())
+        self.n_satisfied += n_satisfied
+        self._add_patterns(self.vocabulary.pattern_codes(
+            {column: codes[satisfied, position].astype(np.intp)
+             for position, column in enumerate(self.columns) if column in PATTERN_COLUMNS},
+            n_satisfied,
+        ))
+
+    def _assign_profiles(self, feature_codes):
+        """조각의 각 행에 프로필 번호를 매깁니다 (처음 보는 조합은 등장 순서대로 새 번호)."""
+        n_rows = len(feature_codes)
+        if n_rows == 0:
+            return np.zeros(0, dtype=np.int32)
+        keys, first_rows, inverse = np.unique(feature_codes, axis=0, return_index=True, return_inverse=True)
+        key_profiles = np.empty(len(keys), dtype=np.int32)
+        for index in np.argsort(first_rows, kind='stable').tolist():
+            key = tuple(keys[index].tolist())
+            profile = self._profile_of_key.get(key)
+            if profile is None:
+                profile = self._profile_of_key[key] = len(self._profile_of_key)
+            key_profiles[index] = profile
+        return key_profiles[inverse.reshape(-1)]
+
+    def _add_patterns(self, pattern_codes):
+        """만족도 높은 응답들의 값 번호(컬럼별 번호 배열)를 점수표/전이 행렬/비용 빈도표에 더합니다."""
+        for table in (self.scoring_table, self.collaborative_filter, self.cost_table):
+            table.add_many(pattern_codes)
+
+    def respondents(self):
+        """모은 값 번호로 응답자 목록(CodedRespondents)을 만듭니다."""
+        columns = [{'name': column, 'dtype': self._dtypes.get(column, 'object'),
+                    'values': list(self.vocabulary.values.get(column, []))}
+                   for column in self.columns]
+        max_code = max((len(column['values']) for column in columns), default=0)
+        codes_dtype = np.min_scalar_type(max_code)
+        if self._code_chunks:
+            codes = np.concatenate([chunk.astype(codes_dtype) for chunk in self._code_chunks])
+        else:
+            codes = np.zeros((0, len(columns)), dtype=codes_dtype)
+        self._code_chunks = []
+        return CodedRespondents(codes, columns)
+
+    def feature_encoder(self):
+        """`pd.get_dummies`와 같은 열 순서(특징 순서, 특징 안에서는 값 정렬 순서)의 고정 인코더"""
+        columns = [f"{feature}_{value}" for feature in self.features
+                   for value in sorted(self.vocabulary.values.get(feature, []))]
+        return FeatureEncoder(columns, self.features)
+
+    def profile_table(self, encoder, satisfaction_codes, satisfaction_values):
+        """프로필 번호 배열과 값 번호 조합으로 ProfileTable을 만듭니다 (응답자 목록은 배열로 공유)."""
+        profile_keys = np.array(list(self._profile_of_key), dtype=np.int64).reshape(-1, len(self.features))
+        profile_matrix = np.zeros((len(profile_keys), encoder.width), dtype=np.float32)
+        rows = np.arange(len(profile_keys))
+        for position, feature in enumerate(self.features):
+            field_index = encoder.field_index[feature]
+            column_of_code = np.array([field_index[value] for value in self.vocabulary.values.get(feature, [])],
+                                      dtype=np.intp)
+            profile_matrix[rows, column_of_code[profile_keys[:, position]]] = 1.0
+        row_profile = (np.concatenate(self._profile_chunks) if self._profile_chunks
+                       else np.zeros(0, dtype=np.int32))
+        self._profile_chunks = []
+        return ProfileTable.from_arrays(profile_matrix, row_profile, satisfaction_codes, satisfaction_values,
+                                        shared=True)
 
 
 class VacationRecommendationService:
@@ -41,7 +2972,7 @@ class VacationRecommendationService:
     2. 실시간 추천: `get_recommendations(user_survey_data)` 함수를 호출하여 사용자에게 추천을 제공합니다.
     """
     
-    def __init__(self, model_dir='./ml_models/'):
+    def __init__(self, model_dir='./ml_models/', similarity_backend='cosine', cache_size=1024, cache_ttl=None):
         # 클래스가 생성될 때 가장 먼저 실행되는 함수입니다.
         # 앞으로 모델 파일들을 저장하고 불러올 기본 폴더 경로를 지정합니다.
         self.model_dir = model_dir
@@ -51,18 +2982,73 @@ class VacationRecommendationService:
         # 머신러닝 모델이 사용하는 데이터와 패턴을 저장할 변수들입니다.
         # 이 변수들은 모델을 불러오거나 학습할 때 채워집니다.
         self.features_encoded = None
-        self.full_encoded_df = None
         self.original_df = None
-        # vacation_patterns, preference_patterns, cost_patterns는
-        # 이전에 학습된 패턴들을 딕셔너리 형태로 저장하는 변수들입니다.
-        self.vacation_patterns = None
-        self.preference_patterns = None
-        self.cost_patterns = None
+        # 사용자 응답을 유사도 계산용 벡터로 바꿔주는 고정 인코더입니다.
+        # `_load_training_data`에서 한 번만 만들고 모델 폴더에 함께 저장합니다.
+        self.feature_encoder = None
+        # 유사 사용자를 찾는 검색 엔진입니다. (기본값: 'cosine')
+        # 학습 데이터가 바뀔 때만 검색용 행렬을 다시 만들고, 요청마다 재사용합니다.
+        # 프로필 수가 아주 많다면 근사 검색 엔진 'ivf'(또는 IVFSimilarityBackend(n_probe=...))를 쓸 수 있습니다.
+        self.similarity_backend = make_similarity_backend(similarity_backend)
+        self._similarity_source = None
+        # 같은 답을 한 응답자들을 하나로 묶은 프로필 테이블입니다.
+        # 검색 엔진은 응답자 전체가 아니라 이 테이블의 프로필에 대해서만 점수를 계산합니다.
+        self.profile_table = None
+        # 검색 조건별로 조건에 맞는 응답자만 담은 조건부 검색 색인입니다 (filter_key -> FilteredIndex).
+        # 기본 조건(SATISFIED_FILTER)과 add_search_filter로 등록한 조건의 색인은
+        # 프로필 테이블과 함께 새 응답을 증분 반영합니다.
+        self._search_filters = [normalize_filters(SATISFIED_FILTER)]
+        self._filtered_indexes = {}
+        self._filtered_source = None
+        # 설문 응답 값(문자열)마다 정수 번호를 매긴 값 사전입니다.
+        # 점수표, 다음 휴가 전이 행렬, 비용 빈도표와 모델 번들의 codes 배열이 모두 이 번호를 씁니다.
+        self.vocabulary = SurveyVocabulary()
+        # 만족도 높은 응답을 (휴가 유형, 국내/해외) 묶음별로 미리 집계한 추천 점수표와
+        # 키/세부 키 조합별 비용 빈도표입니다.
+        self.scoring_table = None
+        self.cost_table = None
+        # update_model_with_new_data로 들어온 뒤 아직 original_df에 합쳐지지 않은 새 응답들입니다.
+        self._pending_rows = []
+        # 모델 번들에서 불러왔을 때 original_df 대신 사용하는 값 번호 응답자 목록입니다.
+        self._coded_respondents = None
+        # SurveySubmissionQueue로 접수한 설문 중 모델에 반영된 마지막 접수 번호입니다.
+        # 모델 번들 매니페스트에 함께 저장되어, 재시작 후 아직 반영되지 않은 접수분만 다시 반영합니다.
+        self.applied_submission_seq = 0
+        
+        # 모델 버전: 학습/로드/업데이트할 때마다 1씩 올라갑니다.
+        # 모델 버전이 바뀌면 버전별로 저장해 둔 캐시(비용 정보, 다음 휴가 제안 등)가 자동으로 무효화됩니다.
+        self.model_version = 0
+        self._static_payload = None
+        
+        # 모델을 바꾸는 공개 메서드(학습, 로드, 증분 학습, 검색 조건 등록, 세그먼트 생성)와
+        # SurveySubmissionQueue의 반영/체크포인트가 한 번에 하나씩만 실행되도록 하는 쓰기 잠금입니다.
+        # 추천 요청(읽기)은 스냅샷만 읽으므로 이 잠금을 기다리지 않습니다.
+        # train_model이 build_user_segments를 부르는 것처럼 잠금을 쥔 채 다른 쓰기 메서드를 부를 수 있도록
+        # 같은 스레드가 다시 잡을 수 있는 잠금(RLock)을 씁니다.
+        self._write_lock = threading.RLock()
+        
+        # 추천 요청(읽기)이 사용하는 읽기 전용 모델 스냅샷입니다.
+        # 학습/로드/업데이트가 끝날 때 `_publish_snapshot`으로 새 스냅샷을 만들어 바꿔 끼웁니다.
+        self._snapshot = None
+        
+        # 같은 6개 특징 응답 조합의 추천 결과를 재사용하는 캐시입니다.
+        # 키: (모델 버전, 6개 특징 응답) / cache_size=0이면 캐시를 사용하지 않습니다.
+        # cache_ttl(초)을 지정하면 그 시간이 지난 결과는 다시 계산합니다.
+        self.result_cache = RecommendationCache(cache_size, cache_ttl) if cache_size else None
+        
+        # train_model(materialize=True)로 만든 '모든 답 조합' 추천 결과 조회표입니다.
+        # 모델이 바뀌면(증분 학습 등) 더 이상 맞지 않으므로 버리고 실시간 계산으로 돌아갑니다.
+        self.materialized = None
+        self.materialize_report = None
         
         # 새로 추가된 머신러닝 모델 변수들을 초기화합니다.
         self.satisfaction_predictor = None
+        # 사용자 세그먼트 라우터(UserSegmentModel)입니다.
+        # train_model(segments=True) 또는 build_user_segments()로 만들고, get_segment_recommendations()가 사용합니다.
         self.user_clustering_model = None
         self.vacation_classifier = None
+        # 연령대/현재 휴가 유형 x 다음 휴가 경험 응답 수 행렬(CollaborativeFilter)입니다.
+        # 패턴 학습 때 만들고 증분 학습 때 칸 하나씩 더하며, 다음 휴가 제안은 이 행렬의 행을 읽어 만듭니다.
         self.collaborative_filter = None
         self.label_encoders = None
         
@@ -71,7 +3057,7 @@ class VacationRecommendationService:
         # SurveyResponse와 같은 Django 모델 객체를 연결하여 사용하면 편리합니다.
         # 예: self.survey_model = SurveyResponse.objects.all()
         
-    def train_model(self, csv_path):
+    def train_model(self, csv_path, vectorized=True, materialize=False, chunksize=None, segments=False):
         """
         🎓 초기 학습 함수 (서버 시작 시 한 번만 실행)
         
@@ -80,97 +3066,156 @@ class VacationRecommendationService:
         
         Args (매개변수):
             csv_path (str): 기존 설문조사 데이터가 담긴 CSV 파일의 경로
+            vectorized (bool): True면 행(Row)을 하나씩 읽지 않고 그룹 단위로 한 번에
+                패턴을 학습합니다 (결과는 같고 훨씬 빠릅니다).
+            materialize (bool): True면 6개 특징의 모든 답 조합에 대한 추천 결과를 미리 계산해
+                조회표 파일(materialized_recommendations.json)로 저장합니다.
+                이후 요청은 계산 없이 조회표에서 바로 꺼내고, 조회표에 없는 값만 실시간으로 계산합니다.
+                만드는 데 걸린 시간과 파일 크기는 `materialize_report`에 기록됩니다.
+            chunksize (int): 지정하면 CSV를 이 행 수만큼씩 나누어 읽으면서 학습합니다.
+                CSV 전체를 DataFrame으로 올리지 않고 조각마다 값 번호(codes)와 집계 값만 남기므로
+                메모리에 다 올라가지 않는 큰 CSV도 학습할 수 있습니다 (추천 결과는 한 번에 읽은 것과 같습니다).
+                조각마다 타입 추론이 달라지지 않도록 모든 컬럼을 문자열(dtype=str)로 읽습니다.
+            segments (bool): True면 응답자들을 세그먼트로 나누고 세그먼트별 추천 결과를 미리 계산해
+                user_segments.json으로 저장합니다 (`build_user_segments`, `get_segment_recommendations` 참고).
             
         Returns (반환 값):
             bool: 학습이 성공했으면 True, 실패했으면 False를 반환합니다.
         """
-        print(f"🤖 머신러닝 모델 학습 시작... (6개 특징 사용)")
-        
-        try:
-            # 1. 데이터를 불러와서 머신러닝이 이해할 수 있는 형태로 전처리합니다.
-            self._load_training_data(csv_path)
-            
-            # 2. 전처리된 데이터를 바탕으로 다양한 패턴(규칙)을 학습합니다.
-            # 어떤 연령대가 어떤 휴가를 선호하는지, 만족도가 높은 휴가는 어떤 특징이 있는지 등을 분석합니다.
-            self._learn_patterns()
+        with self._write_lock:
+            print(f"🤖 머신러닝 모델 학습 시작... (6개 특징 사용)")
             
-            # 3. 학습이 완료된 모델과 패턴들을 파일로 저장합니다.
-            # 다음에 서버를 재시작할 때 이 파일들을 불러와서 바로 사용할 수 있습니다.
-            self._save_trained_model()
-            
-            # 학습 성공 플래그를 True로 변경합니다.
-            self.is_trained = True
-            print("✅ 머신러닝 모델 학습 완료! (6개 특징 적용)")
-            return True
-            
-        except Exception as e:
-            # 학습 과정에서 오류가 발생하면, 오류 메시지를 출력하고 False를 반환합니다.
-            print(f"❌ 모델 학습 실패: {e}")
-            return False
+            try:
+                if chunksize:
+                    # 1~2. CSV를 나누어 읽으면서 전처리와 패턴 학습을 함께 합니다.
+                    self._learn_from_csv_chunks(csv_path, chunksize)
+                else:
+                    # 1. 데이터를 불러와서 머신러닝이 이해할 수 있는 형태로 전처리합니다.
+                    self._load_training_data(csv_path)
+                    
+                    # 2. 전처리된 데이터를 바탕으로 다양한 패턴(규칙)을 학습합니다.
+                    # 어떤 연령대가 어떤 휴가를 선호하는지, 만족도가 높은 휴가는 어떤 특징이 있는지 등을 분석합니다.
+                    self._learn_patterns(vectorized=vectorized)
+                # 모델이 바뀌었으므로 모델 버전을 올리고 이전 버전의 캐시를 비웁니다.
+                self._bump_model_version()
+                
+                # (선택) 모든 답 조합의 추천 결과를 미리 계산합니다.
+                if materialize:
+                    self._materialize_recommendations()
+                
+                # (선택) 사용자 세그먼트를 나누고 세그먼트별 추천 결과를 미리 계산합니다.
+                # 이전 학습 데이터로 만든 세그먼트는 새 모델과 맞지 않으므로 버립니다.
+                self.user_clustering_model = None
+                if segments:
+                    self.build_user_segments()
+                
+                # 3. 학습이 완료된 모델과 패턴들을 파일로 저장합니다.
+                # 다음에 서버를 재시작할 때 이 파일들을 불러와서 바로 사용할 수 있습니다.
+                self._save_trained_model()
+                
+                if self.materialize_report is not None:
+                    report = self.materialize_report
+                    print(f"🗂️ 추천 조회표: {report['n_combinations']:,}개 조합, "
+                          f"{report['build_seconds']:.1f}초, {report['file_bytes'] / 1024:.1f} KB")
+                
+                # 새 모델의 읽기 전용 스냅샷을 바꿔 끼웁니다. (그전까지 요청은 이전 모델로 계속 처리됩니다.)
+                self._publish_snapshot()
+                # 학습 성공 플래그를 True로 변경합니다.
+                self.is_trained = True
+                print("✅ 머신러닝 모델 학습 완료! (6개 특징 적용)")
+                return True
+                
+            except Exception as e:
+                # 학습 과정에서 오류가 발생하면, 오류 메시지를 출력하고 False를 반환합니다.
+                print(f"❌ 모델 학습 실패: {e}")
+                return False
     
-    def load_pretrained_model(self):
+    def load_pretrained_model(self, mmap=False):
         """
         📂 기존에 학습된 모델 로드 (서버 재시작 시 사용)
         
         이 함수는 `train_model`로 이미 학습되어 저장된 모델 파일을
         다시 불러와서 바로 사용할 수 있도록 준비하는 역할을 합니다.
         
+        Args (매개변수):
+            mmap (bool): True면 모델 번들의 배열들을 읽기 전용 메모리 맵으로 엽니다.
+                Gunicorn 워커 여러 개가 같은 모델 폴더를 열면 운영체제의 페이지 캐시 한 벌을
+                함께 쓰므로 워커마다 데이터를 복사하지 않고 바로 요청을 처리할 수 있습니다.
+                다른 프로세스가 같은 모델 폴더에 다시 저장해도 새 버전 폴더에 쓰므로 이미 연 배열은 바뀌지 않고,
+                새 모델은 이 함수를 다시 호출할 때 불러옵니다.
+        
+        모델 번들을 불러올 때는 original_df(DataFrame)를 만들지 않으므로
+        추천만 하는 워커는 pandas/joblib 없이 numpy와 표준 라이브러리만 사용합니다.
+        (증분 학습/저장이 필요해지면 그때 DataFrame을 만듭니다.)
+        
         Returns (반환 값):
             bool: 로드가 성공했으면 True, 실패했으면 False를 반환합니다.
         """
-        try:
-            # 모델 폴더가 존재하는지 먼저 확인합니다. 없으면 학습되지 않았다는 뜻입니다.
-            if not os.path.exists(self.model_dir):
-                print("⚠️ 학습된 모델이 없습니다. 먼저 train_model()을 실행하세요.")
-                return False
-            
-            # joblib.load()와 json.load()를 사용하여 저장된 파일들을 불러옵니다.
-            # joblib.load: features_encoded.pkl, original_data.pkl 파일을 불러옵니다.
-            self.features_encoded = joblib.load(os.path.join(self.model_dir, 'features_encoded.pkl'))
-            self.original_df = joblib.load(os.path.join(self.model_dir, 'original_data.pkl'))
-            
-            # json.load: 학습된 패턴들을 담고 있는 JSON 파일들을 불러옵니다.
-            with open(os.path.join(self.model_dir, 'learned_vacation_patterns.json'), 'r', encoding='utf-8') as f:
-                self.vacation_patterns = json.load(f)
-            
-            with open(os.path.join(self.model_dir, 'preference_patterns.json'), 'r', encoding='utf-8') as f:
-                self.preference_patterns = json.load(f)
+        with self._write_lock:
+            try:
+                # 모델 폴더가 존재하는지 먼저 확인합니다. 없으면 학습되지 않았다는 뜻입니다.
+                if not os.path.exists(self.model_dir):
+                    print("⚠️ 학습된 모델이 없습니다. 먼저 train_model()을 실행하세요.")
+                    return False
                 
-            with open(os.path.join(self.model_dir, 'cost_patterns.json'), 'r', encoding='utf-8') as f:
-                self.cost_patterns = json.load(f)
-            
-            # 추가 모델 파일들이 있으면 로드합니다.
-            satisfaction_model_path = os.path.join(self.model_dir, 'satisfaction_model.pkl')
-            if os.path.exists(satisfaction_model_path):
-                self.satisfaction_predictor = joblib.load(satisfaction_model_path)
-            
-            clustering_model_path = os.path.join(self.model_dir, 'clustering_model.pkl')
-            if os.path.exists(clustering_model_path):
-                self.user_clustering_model = joblib.load(clustering_model_path)
-            
-            vacation_classifier_path = os.path.join(self.model_dir, 'vacation_classifier.pkl')
-            if os.path.exists(vacation_classifier_path):
-                self.vacation_classifier = joblib.load(vacation_classifier_path)
-            
-            collaborative_filter_path = os.path.join(self.model_dir, 'collaborative_filter.pkl')
-            if os.path.exists(collaborative_filter_path):
-                self.collaborative_filter = joblib.load(collaborative_filter_path)
-            
-            label_encoders_path = os.path.join(self.model_dir, 'label_encoders.pkl')
-            if os.path.exists(label_encoders_path):
-                self.label_encoders = joblib.load(label_encoders_path)
-            
-            # 로드 성공 플래그를 True로 변경합니다.
-            self.is_trained = True
-            print("✅ 기존 학습된 모델 로드 완료! (6개 특징 버전)")
-            return True
-            
-        except Exception as e:
-            # 파일이 없거나 손상되었을 경우 오류 메시지를 출력합니다.
-            print(f"❌ 모델 로드 실패: {e}")
-            return False
+                # pickle 없는 모델 번들이 있으면 번들을, 없으면 예전 형식(pkl + JSON) 파일을 불러옵니다.
+                bundle_dir = os.path.join(self.model_dir, ModelBundle.DIR_NAME)
+                if ModelBundle.exists(bundle_dir):
+                    bundle = self._load_model_bundle(bundle_dir, mmap=mmap)
+                    static_payload = bundle.static_payload
+                    # 추천 조회표와 세그먼트는 번들과 같은 버전 폴더에서 읽습니다 (버전 폴더가 없던 번들은 모델 폴더에서).
+                    extras_dir = self.model_dir if bundle.path == bundle_dir else bundle.path
+                else:
+                    static_payload = None
+                    extras_dir = self.model_dir
+                    self._load_legacy_model_files()
+                
+                # 추가 모델 파일들이 있으면 로드합니다.
+                satisfaction_model_path = os.path.join(self.model_dir, 'satisfaction_model.pkl')
+                if os.path.exists(satisfaction_model_path):
+                    self.satisfaction_predictor = joblib.load(satisfaction_model_path)
+                
+                # 사용자 세그먼트는 pickle 대신 JSON 파일로 저장합니다 (같은 인코더 열 개수로 만든 것만 사용).
+                self.user_clustering_model = None
+                segments_path = os.path.join(extras_dir, UserSegmentModel.FILE_NAME)
+                if os.path.exists(segments_path):
+                    segments = UserSegmentModel.load(segments_path)
+                    if segments.centroids.shape[1] == self.feature_encoder.width:
+                        self.user_clustering_model = segments
+                
+                vacation_classifier_path = os.path.join(self.model_dir, 'vacation_classifier.pkl')
+                if os.path.exists(vacation_classifier_path):
+                    self.vacation_classifier = joblib.load(vacation_classifier_path)
+                
+                label_encoders_path = os.path.join(self.model_dir, 'label_encoders.pkl')
+                if os.path.exists(label_encoders_path):
+                    self.label_encoders = joblib.load(label_encoders_path)
+                
+                # 모델이 바뀌었으므로 모델 버전을 올리고 이전 버전의 캐시를 비웁니다.
+                self._bump_model_version()
+                # 번들에 저장된 cost_info/다음 휴가 제안을 그대로 사용합니다.
+                if static_payload is not None:
+                    self._static_payload = static_payload
+                
+                # 미리 계산된 추천 조회표가 있고 같은 학습 데이터로 만든 것이면 불러옵니다.
+                materialized_path = os.path.join(extras_dir, MaterializedRecommendations.FILE_NAME)
+                if os.path.exists(materialized_path):
+                    materialized = MaterializedRecommendations.load(materialized_path)
+                    if materialized.n_respondents == self._n_respondents():
+                        self.materialized = materialized
+                
+                self._publish_snapshot()
+                # 로드 성공 플래그를 True로 변경합니다.
+                self.is_trained = True
+                print("✅ 기존 학습된 모델 로드 완료! (6개 특징 버전)")
+                return True
+                
+            except Exception as e:
+                # 파일이 없거나 손상되었을 경우 오류 메시지를 출력합니다.
+                print(f"❌ 모델 로드 실패: {e}")
+                return False
     
-    def get_recommendations(self, user_survey_data):
+    def get_recommendations(self, user_survey_data, filters=None):
         """
         🎯 실시간 추천 생성 함수 (Django View에서 호출)
         
@@ -188,17 +3233,342 @@ class VacationRecommendationService:
                 '함께한_사람': '친구',
                 '다음_휴가_경험': '바다/섬에서 물놀이'  # 새로 추가된 특징
             }
+            filters (dict): 유사 사용자 후보 조건 {컬럼: 허용 값 목록} (선택사항)
+            예시: {'휴가_장소_국내_해외': '해외'} - 해외 휴가를 다녀온 응답자 중에서만 찾습니다.
+            만족도 조건(SATISFIED_LEVELS)은 '만족도'를 직접 지정하지 않는 한 항상 함께 적용됩니다.
+            자주 쓰는 조건은 `add_search_filter`로 미리 색인해 두면 더 빠릅니다.
             
         Returns (반환 값):
             dict: 추천 결과가 담긴 딕셔너리를 반환합니다.
             성공 여부, 추천 목록, 유사 사용자 정보, 비용 정보 등이 포함됩니다.
         """
         
-        # 🔧 백엔드 담당자 TODO: Django에서 받은 데이터를 딕셔너리 형태로 변환하는 부분입니다.
-        # 사용자가 폼에 입력한 데이터를 `request.POST.get()`으로 가져와서
-        # 위의 예시처럼 딕셔너리 형태로 만들어주면 됩니다.
+        # 🔧 백엔드 담당자 TODO: Django에서 받은 데이터를 딕셔너리 형태로 변환하는 부분입니다.
+        # 사용자가 폼에 입력한 데이터를 `request.POST.get()`으로 가져와서
+        # 위의 예시처럼 딕셔너리 형태로 만들어주면 됩니다.
+        
+        # 모델이 학습되지 않았다면 오류 메시지를 반환합니다.
+        if not self.is_trained:
+            return {
+                'success': False,
+                'error': '모델이 학습되지 않았습니다. 관리자에게 문의하세요.',
+                'recommendations': [],
+                'similar_users': [],
+                'cost_info': {}
+            }
+        
+        # 이 요청은 처음에 잡은 모델 스냅샷 하나만 읽습니다.
+        # (다른 스레드가 모델을 업데이트해도 계산 도중에 모델이 바뀌지 않습니다.)
+        snapshot = self._current_snapshot()
+        
+        # 응답 값으로 조회표/캐시 키를 만드는 것도 try 안에서 합니다.
+        # (여러 개를 고르는 폼 항목처럼 키로 쓸 수 없는 값(목록 등)이 오면 예외 대신 실패 결과를 반환합니다.)
+        try:
+            # 미리 계산된 조회표가 있으면 답 조합 번호로 바로 꺼냅니다.
+            # 조회표에 없는 값이 섞여 있으면 아래의 실시간 계산으로 넘어갑니다.
+            # (조회표는 기본 검색 조건으로 만들었으므로 filters를 지정한 요청에는 쓰지 않습니다.)
+            if snapshot.materialized is not None and not filters:
+                materialized_result = snapshot.materialized.lookup(user_survey_data)
+                if materialized_result is not None:
+                    print(f"⚡ 미리 계산된 추천 결과 반환 (6개 특징 기반)")
+                    return materialized_result
+            
+            # 같은 6개 특징 응답 조합을 같은 모델 버전에서 이미 계산했다면 그 결과를 그대로 반환합니다.
+            # (반환된 결과는 다른 요청과 공유되므로 수정하지 말고 읽기 전용으로 사용하세요.)
+            cache_key = None
+            if self.result_cache is not None:
+                cache_key = (snapshot.model_version, canonical_feature_key(user_survey_data))
+                if filters:
+                    cache_key += (filter_key(self._resolve_filters(filters)),)
+                cached_result = self.result_cache.get(cache_key)
+                if cached_result is not None:
+                    print(f"⚡ 캐시된 추천 결과 반환 (6개 특징 기반)")
+                    return cached_result
+            
+            print(f"🔍 사용자 추천 생성 중... (6개 특징 사용)")
+            
+            # 1. _find_similar_users() 함수를 호출하여 현재 사용자와 가장 비슷한
+            # 성향을 가진 기존 사용자들을 찾습니다.
+            similar_users = self._find_similar_users(user_survey_data, snapshot=snapshot, filters=filters)
+            
+            # 2. _generate_recommendations() 함수를 호출하여 유사 사용자들의
+            # 데이터를 기반으로 추천 목록을 생성합니다.
+            recommendations = self._generate_recommendations(user_survey_data, similar_users, snapshot)
+            
+            # 3. _format_for_django() 함수를 호출하여 추천 결과를
+            # Django의 템플릿(HTML)에서 쉽게 사용할 수 있도록 구조를 정리합니다.
+            formatted_result = self._format_for_django(recommendations, similar_users, snapshot)
+            
+            if cache_key is not None:
+                self.result_cache.put(cache_key, formatted_result)
+            
+            print(f"✅ 추천 생성 완료! (6개 특징 기반)")
+            return formatted_result
+            
+        except Exception as e:
+            # 추천 생성 과정에서 오류가 발생하면 오류 정보를 반환합니다.
+            print(f"❌ 추천 생성 실패: {e}")
+            return {
+                'success': False,
+                'error': str(e),
+                'recommendations': [],
+                'similar_users': [],
+                'cost_info': {}
+            }
+    
+    def get_recommendations_batch(self, user_survey_data_list, block_size=1024):
+        """
+        📦 여러 사용자의 추천을 한 번에 생성 (이메일 캠페인 등 일괄 처리용)
+        
+        `get_recommendations`를 사용자마다 호출하는 것과 같은 결과를 훨씬 빠르게 만듭니다.
+        - 6개 특징 응답이 같은 사용자는 한 번만 계산합니다.
+        - 서로 다른 응답 조합을 한 행렬로 인코딩하고, block_size개씩 나눈 블록마다
+          모든 프로필과의 유사도 행렬을 한 번에 채웁니다 (블록 크기로 메모리 사용량을 제한).
+        - 추천 점수표 순위는 '다음_휴가_경험' 값마다 한 번만 계산합니다.
+        
+        Args (매개변수):
+            user_survey_data_list (list): `get_recommendations`에 넘기는 설문 응답(dict)들의 목록
+            block_size (int): 한 번의 행렬 곱으로 계산할 최대 응답 조합 수
+            
+        Returns (반환 값):
+            list: 입력과 같은 순서의 추천 결과(dict) 목록
+            (같은 응답 조합의 사용자들은 같은 결과 객체를 공유하므로 읽기 전용으로 사용하세요.)
+        """
+        user_survey_data_list = list(user_survey_data_list)
+        if not self.is_trained:
+            return [self.get_recommendations(user_data) for user_data in user_survey_data_list]
+        
+        start = time.perf_counter()
+        snapshot = self._current_snapshot()
+        results = [None] * len(user_survey_data_list)
+        # 6개 특징 응답 조합 -> 그 조합을 보낸 사용자 위치 목록
+        positions_by_key = {}
+        for position, user_data in enumerate(user_survey_data_list):
+            try:
+                if snapshot.materialized is not None:
+                    results[position] = snapshot.materialized.lookup(user_data)
+                    if results[position] is not None:
+                        continue
+                positions_by_key.setdefault(canonical_feature_key(user_data), []).append(position)
+            except Exception:
+                # 키로 쓸 수 없는 값(목록 등)이 있는 응답은 `get_recommendations`처럼 실패 결과를 넣고
+                # 나머지 사용자는 그대로 한 번에 계산합니다.
+                results[position] = self.get_recommendations(user_data)
+        
+        # 같은 모델 버전의 캐시에 이미 있는 조합은 다시 계산하지 않습니다.
+        pending = []
+        for key, positions in positions_by_key.items():
+            cached_result = None
+            if self.result_cache is not None:
+                cached_result = self.result_cache.get((snapshot.model_version, key))
+            if cached_result is not None:
+                for position in positions:
+                    results[position] = cached_result
+            else:
+                pending.append((key, positions))
+        
+        try:
+            ranked_by_next_pref = {}
+            representatives = [user_survey_data_list[positions[0]] for _, positions in pending]
+            # 유사 사용자는 기본 조건(만족도)의 조건부 색인에서 찾습니다 (`_find_similar_users`와 같음).
+            index = snapshot.search_index(self._resolve_filters())
+            profile_table = index.profile_table
+            match_counts_many = getattr(index.similarity_backend, 'match_counts_many', None)
+            score_many = getattr(index.similarity_backend, 'score_many', None)
+            # 블록 하나의 (응답 조합 수 x 프로필 수) 유사도 행렬이 너무 커지지 않도록 블록 크기를 줄입니다.
+            rows_per_block = max(1, min(block_size, 16_000_000 // max(1, profile_table.n_profiles)))
+            for block_start in range(0, len(pending), rows_per_block):
+                block = representatives[block_start:block_start + rows_per_block]
+                query_matrix = snapshot.feature_encoder.encode_many(block)
+                # 원-핫 질의는 블록 전체의 같은 답 개수를 행렬-행렬 곱 한 번으로 구하고 상위 응답자도 한 번에 고릅니다.
+                block_counts = match_counts_many(query_matrix) if match_counts_many is not None else None
+                if block_counts is not None:
+                    tops = profile_table.top_respondents_many(*block_counts)
+                elif score_many is not None:
+                    block_scores = score_many(query_matrix)
+                    tops = [profile_table.top_respondents_from_scores(scores) for scores in block_scores]
+                else:
+                    tops = [profile_table.top_respondents(index.similarity_backend, query_matrix[offset:offset + 1])
+                            for offset in range(len(block))]
+                # 블록 전체의 유사 사용자 원본 응답을 한 번에 가져옵니다.
+                records = iter(snapshot.respondent_records([idx for top_indices, _ in tops for idx in top_indices]))
+                
+                for offset, (user_data, (top_indices, top_scores)) in enumerate(zip(block, tops)):
+                    similar_users = self._similar_users_from_top(
+                        top_indices, top_scores, [next(records) for _ in top_indices]
+                    )
+                    
+                    user_next_pref = user_data.get('다음_휴가_경험', '기타')
+                    if user_next_pref not in ranked_by_next_pref:
+                        ranked_by_next_pref[user_next_pref] = self._generate_recommendations(
+                            user_data, similar_users, snapshot
+                        )
+                    formatted_result = self._format_for_django(ranked_by_next_pref[user_next_pref], similar_users,
+                                                               snapshot)
+                    
+                    key, positions = pending[block_start + offset]
+                    if self.result_cache is not None:
+                        self.result_cache.put((snapshot.model_version, key), formatted_result)
+                    for position in positions:
+                        results[position] = formatted_result
+        except Exception as e:
+            # 묶음 계산이 실패하면 아직 결과가 없는 응답 조합만 `get_recommendations`로 하나씩 다시 계산합니다.
+            # (문제가 있는 응답만 실패 결과를 받고, 같은 묶음의 다른 사용자는 정상 결과를 받습니다.)
+            print(f"❌ 일괄 추천 생성 실패, 하나씩 다시 계산합니다: {e}")
+            for _, positions in pending:
+                if results[positions[0]] is None:
+                    result = self.get_recommendations(user_survey_data_list[positions[0]])
+                    for position in positions:
+                        results[position] = result
+        
+        elapsed = time.perf_counter() - start
+        print(f"✅ 일괄 추천 생성 완료: {len(results)}명 (서로 다른 응답 조합 {len(pending)}개 계산, "
+              f"{elapsed:.2f}초)")
+        return results
+    
+    def update_model_with_new_data(self, new_survey_data, save=True, verify=False):
+        """
+        🔄 새로운 설문 데이터로 모델 업데이트 (선택사항)
+        
+        새로운 사용자가 설문조사를 완료할 때마다
+        모델에 최신 데이터를 반영하여 추천 정확도를 높이는 함수입니다.
+        
+        전체 데이터를 다시 학습하지 않고, 새 응답 한 개만 패턴과 프로필 테이블에
+        더하는 증분 학습(Incremental Learning) 방식으로 동작합니다.
+        
+        Args (매개변수):
+            new_survey_data (dict): 새로 제출된 설문조사 응답 데이터
+            save (bool): True면 업데이트 후 모델 파일을 바로 저장합니다.
+                False면 메모리에만 반영하므로 데이터 크기와 상관없이 빠르게 끝납니다.
+            verify (bool): True면 증분 학습 결과가 전체 재학습 결과와 같은지 검증합니다.
+                (검증은 전체 재학습을 하므로 느립니다. 테스트/점검용으로만 사용하세요.)
+                검증 결과가 달라도 새 응답은 전체 재학습한 모델로 반영(발행)되고, False를 반환합니다.
+        
+        Returns (반환 값):
+            bool: 반영(과 검증)에 성공했으면 True, 실패했으면 False
+        """
+        
+        # 🔧 백엔드 담당자 TODO: Django의 모델과 연동하여 새로운 데이터를 가져오는 부분입니다.
+        # Django의 모델을 사용하여 새로 추가된 설문 응답들을 가져와서
+        # 이 함수를 호출하여 최신 데이터를 학습 데이터에 추가할 수 있습니다.
+        
+        with self._write_lock:
+            try:
+                # 모델 번들에서 불러온 서비스라면 이때 처음으로 original_df를 만듭니다.
+                self._ensure_original_df()
+                # 새로운 데이터를 Pandas의 데이터프레임으로 변환합니다.
+                if self.original_df is not None:
+                    # 기존 학습 데이터(original_df)에 새로운 데이터를 추가합니다.
+                    # (대기 목록에 넣어 두었다가 전체 데이터가 필요할 때 한 번에 합칩니다.)
+                    # 모델 번들에서 불러와 집계표가 없다면(예전 형식 번들) 증분 학습 전에 먼저 만들어 둡니다.
+                    self._ensure_patterns()
+                    # 응답 값은 값 사전과 프로필 색인의 키로 쓰이므로, 키로 쓸 수 없는 값(목록 등)이 있으면
+                    # 모델을 조금이라도 바꾸기 전에 실패로 처리합니다 (반쯤 추가된 응답이 저장을 막지 않도록).
+                    for value in new_survey_data.values():
+                        hash(value)
+                    row_id = self._append_respondent(new_survey_data)
+                    record = self._respondent_record(row_id)
+                    
+                    # 새 응답자를 프로필 테이블에도 바로 반영합니다.
+                    self._index_new_respondent(record, row_id)
+                    
+                    # 만족도가 높은 응답이면 학습된 패턴에 이 응답 하나만 더합니다.
+                    # (전체 데이터를 다시 학습하지 않습니다.)
+                    # 지금 스냅샷이 읽고 있는 점수표는 그대로 두고 복사본에 더합니다 (copy-on-write).
+                    if record.get('만족도') in SATISFIED_LEVELS:
+                        if self.scoring_table is not None:
+                            self.scoring_table = self.scoring_table.copy()
+                        self._learn_from_row(record)
+                    
+                    # 모델이 바뀌었으므로 모델 버전을 올리고 이전 버전의 캐시를 비웁니다.
+                    self._bump_model_version()
+                    
+                    verified = True
+                    if verify:
+                        mismatches = self._verify_incremental_update()
+                        if mismatches:
+                            print(f"❌ 증분 학습 결과가 전체 재학습과 다릅니다: {mismatches}")
+                            verified = False
+                        else:
+                            print("🔍 증분 학습 검증 완료: 전체 재학습 결과와 동일")
+                    
+                    # 다 바뀐 모델로 새 스냅샷을 만들어 바꿔 끼웁니다.
+                    # 그 전까지 들어온 요청은 이전 스냅샷으로 끝까지 계산됩니다.
+                    # (검증은 전체 재학습한 표로 바꿔 두므로, 결과가 달라도 그 모델을 발행해 서비스 상태와 스냅샷을 맞춥니다.)
+                    self._publish_snapshot()
+                    
+                    if save:
+                        self._save_trained_model()
+                    
+                    if not verified:
+                        return False
+                    print("✅ 모델 업데이트 완료! (6개 특징 반영)")
+                    return True
+            except Exception as e:
+                print(f"❌ 모델 업데이트 실패: {e}")
+                return False
+    
+    def add_search_filter(self, filters):
+        """
+        🔎 자주 쓰는 유사 사용자 검색 조건을 미리 색인해 둡니다 (선택사항)
+        
+        등록한 조건의 색인은 기본 조건(만족도)의 색인처럼 모델 스냅샷에 함께 담기고
+        새 응답이 들어올 때 증분 갱신되므로, `get_recommendations(..., filters=...)`가 빠르게 처리됩니다.
+        등록하지 않은 조건도 사용할 수 있지만, 그 색인은 모델이 바뀔 때마다 첫 요청에서 다시 만듭니다.
+        
+        Args (매개변수):
+            filters (dict): {컬럼: 허용 값 목록} 예: {'휴가_장소_국내_해외': '해외'}
+                만족도 조건은 '만족도'를 직접 지정하지 않는 한 기본 조건(SATISFIED_LEVELS)이 함께 적용됩니다.
+        """
+        with self._write_lock:
+            filters = self._resolve_filters(filters)
+            if filter_key(filters) not in [filter_key(known) for known in self._search_filters]:
+                self._search_filters.append(filters)
+            if self.is_trained:
+                self._publish_snapshot()
+    
+    # ================================
+    # 내부 머신러닝 함수들 (백엔드 담당자는 수정하지 마세요)
+    # ================================
+    
+    def build_user_segments(self, n_segments=64):
+        """
+        🧩 사용자 세그먼트를 나누고 세그먼트별 추천 결과를 미리 계산합니다 (user_clustering_model)
+        
+        만족도가 높은 응답자들을 6개 특징 벡터로 n_segments개 세그먼트로 군집화하고,
+        세그먼트마다 추천 목록, cost_info, 대표 유사 사용자를 계산해 둡니다.
+        모델 파일은 다음 저장(`_save_trained_model`) 때 함께 저장됩니다.
+        
+        Args (매개변수):
+            n_segments (int): 세그먼트 수 (많을수록 정확한 경로에 가깝고, 요청 1건의 계산량은 세그먼트 수에 비례)
+            
+        Returns (반환 값):
+            UserSegmentModel: 만든 세그먼트 라우터
+        """
+        with self._write_lock:
+            print(f"🧩 사용자 세그먼트 {n_segments}개를 만드는 중...")
+            start = time.perf_counter()
+            # 세그먼트는 지금 모델 상태의 스냅샷으로 계산합니다.
+            self._publish_snapshot()
+            self.user_clustering_model = UserSegmentModel.build(self, n_segments=n_segments)
+            self._publish_snapshot()
+            print(f"🧩 사용자 세그먼트 {self.user_clustering_model.n_segments}개, {time.perf_counter() - start:.1f}초")
+            return self.user_clustering_model
+    
+    def get_segment_recommendations(self, user_survey_data):
+        """
+        🧩 세그먼트 기반 빠른 추천 (get_recommendations의 근사)
+        
+        사용자를 가장 가까운 세그먼트로 보내고(세그먼트 중심과의 내적만 계산),
+        그 세그먼트에 미리 계산해 둔 추천 목록, cost_info, 유사 사용자를 반환합니다.
+        응답자와의 유사도 계산을 하지 않으므로 응답자 수가 아주 많아도 요청 1건의 비용이 일정합니다.
         
-        # 모델이 학습되지 않았다면 오류 메시지를 반환합니다.
+        Args (매개변수):
+            user_survey_data (dict): get_recommendations()와 같은 설문 응답 데이터
+            
+        Returns (반환 값):
+            dict: get_recommendations()와 같은 형식의 결과 (+ 'segment': 세그먼트 번호)
+        """
         if not self.is_trained:
             return {
                 'success': False,
@@ -207,271 +3577,451 @@ class VacationRecommendationService:
                 'similar_users': [],
                 'cost_info': {}
             }
-        
-        try:
-            print(f"🔍 사용자 추천 생성 중... (6개 특징 사용)")
-            
-            # 1. _find_similar_users() 함수를 호출하여 현재 사용자와 가장 비슷한
-            # 성향을 가진 기존 사용자들을 찾습니다.
-            similar_users = self._find_similar_users(user_survey_data)
-            
-            # 2. _generate_recommendations() 함수를 호출하여 유사 사용자들의
-            # 데이터를 기반으로 추천 목록을 생성합니다.
-            recommendations = self._generate_recommendations(user_survey_data, similar_users)
-            
-            # 3. _format_for_django() 함수를 호출하여 추천 결과를
-            # Django의 템플릿(HTML)에서 쉽게 사용할 수 있도록 구조를 정리합니다.
-            formatted_result = self._format_for_django(recommendations, similar_users)
-            
-            print(f"✅ 추천 생성 완료! (6개 특징 기반)")
-            return formatted_result
-            
-        except Exception as e:
-            # 추천 생성 과정에서 오류가 발생하면 오류 정보를 반환합니다.
-            print(f"❌ 추천 생성 실패: {e}")
+        snapshot = self._current_snapshot()
+        if snapshot.segments is None:
             return {
                 'success': False,
-                'error': str(e),
+                'error': '사용자 세그먼트가 없습니다. train_model(..., segments=True) 또는 build_user_segments()를 먼저 실행하세요.',
                 'recommendations': [],
                 'similar_users': [],
                 'cost_info': {}
             }
+        user_vector = snapshot.feature_encoder.encode(user_survey_data)
+        return snapshot.segments.lookup(user_vector, user_survey_data, snapshot.static_payload)
     
-    def update_model_with_new_data(self, new_survey_data):
+    def _load_model_bundle(self, bundle_dir, mmap=False):
         """
-        🔄 새로운 설문 데이터로 모델 업데이트 (선택사항)
-        
-        새로운 사용자가 설문조사를 완료할 때마다
-        모델에 최신 데이터를 반영하여 추천 정확도를 높이는 함수입니다.
+        모델 번들(pickle 없는 이진 형식)을 불러옵니다.
         
-        Args (매개변수):
-            new_survey_data (dict): 새로 제출된 설문조사 응답 데이터
+        Returns (반환 값):
+            ModelBundle: 불러온 번들 (static_payload에 저장된 cost_info와 next_vacation_suggestions, path에 버전 폴더)
         """
+        bundle = ModelBundle.load(bundle_dir, mmap=mmap)
+        # 원본 응답은 값 번호 그대로 두고, 유사 사용자 정보가 필요할 때 한 명씩 풀어 씁니다.
+        # (original_df(DataFrame)는 증분 학습/저장이 필요할 때 만들므로, 추천만 할 때는 pandas가 필요 없습니다.)
+        self.original_df = None
+        self._coded_respondents = bundle.respondents()
+        self._pending_rows = []
+        self.feature_encoder = bundle.feature_encoder()
         
-        # 🔧 백엔드 담당자 TODO: Django의 모델과 연동하여 새로운 데이터를 가져오는 부분입니다.
-        # Django의 모델을 사용하여 새로 추가된 설문 응답들을 가져와서
-        # 이 함수를 호출하여 최신 데이터를 학습 데이터에 추가할 수 있습니다.
+        # 원-핫 인코딩 표(features_encoded)는 만들지 않고 저장된 프로필 테이블과 검색용 행렬을 바로 사용합니다.
+        self.features_encoded = None
+        self.profile_table = bundle.profile_table(shared=mmap)
+        index_arrays = bundle.similarity_index(getattr(self.similarity_backend, 'name', None))
+        if index_arrays is not None:
+            # 근사 검색 엔진은 저장된 군집 중심과 배정 결과를 그대로 사용합니다 (다시 학습하지 않음).
+            backend = copy.copy(self.similarity_backend)
+            backend.fit_normalized(bundle.similarity_matrix, index_arrays=index_arrays)
+            self.similarity_backend = backend
+        elif isinstance(self.similarity_backend, (CosineSimilarityBackend, IVFSimilarityBackend)):
+            self._replace_similarity_backend(bundle.similarity_matrix, normalized=True)
+        else:
+            self._replace_similarity_backend(self.profile_table.matrix)
+        self._similarity_source = self.features_encoded
         
-        try:
-            # 새로운 데이터를 Pandas의 데이터프레임으로 변환합니다.
-            if self.original_df is not None:
-                new_df = pd.DataFrame([new_survey_data])
-                # 기존 학습 데이터(original_df)에 새로운 데이터를 추가합니다.
-                self.original_df = pd.concat([self.original_df, new_df], ignore_index=True)
-                
-                # 새로운 데이터가 추가되었으므로 패턴을 다시 학습하고 모델을 저장합니다.
-                self._learn_patterns()
-                self._save_trained_model()
-                
-                print("✅ 모델 업데이트 완료! (6개 특징 반영)")
-                return True
-        except Exception as e:
-            print(f"❌ 모델 업데이트 실패: {e}")
-            return False
+        # 원본 경험 목록 대신 값 번호로 사전 집계된 점수표, 전이 행렬, 비용 빈도표를 정수 배열 그대로 불러옵니다.
+        # (예전 번들에 없는 표는 증분 학습 등에서 필요할 때 original_df로 다시 만듭니다.)
+        self.vocabulary = bundle.vocabulary()
+        self.scoring_table = bundle.scoring_table(self.vocabulary)
+        self.collaborative_filter = bundle.collaborative_filter(self.vocabulary)
+        self.cost_table = bundle.cost_table(self.vocabulary)
+        self.applied_submission_seq = bundle.manifest.get('applied_submission_seq', 0)
+        return bundle
     
-    # ================================
-    # 내부 머신러닝 함수들 (백엔드 담당자는 수정하지 마세요)
-    # ================================
+    def _load_legacy_model_files(self):
+        """예전 형식(features_encoded.pkl, original_data.pkl, 패턴 JSON 파일)으로 저장된 모델을 불러옵니다."""
+        # joblib.load()와 json.load()를 사용하여 저장된 파일들을 불러옵니다.
+        # joblib.load: features_encoded.pkl, original_data.pkl 파일을 불러옵니다.
+        self.features_encoded = joblib.load(os.path.join(self.model_dir, 'features_encoded.pkl'))
+        self.original_df = joblib.load(os.path.join(self.model_dir, 'original_data.pkl'))
+        self._coded_respondents = None
+        
+        # 고정 인코더를 불러옵니다.
+        # 인코더 파일이 없는 예전 모델 폴더라면 features_encoded의 열 목록으로 다시 만듭니다.
+        encoder_path = os.path.join(self.model_dir, 'feature_encoder.json')
+        if os.path.exists(encoder_path):
+            self.feature_encoder = FeatureEncoder.load(encoder_path)
+        else:
+            self.feature_encoder = FeatureEncoder.from_encoded_frame(self.features_encoded, SELECTED_FEATURES)
+        self._refresh_similarity_backend()
+        
+        # json.load: 학습된 패턴들을 담고 있는 JSON 파일들을 불러와 값 번호 집계표로 옮깁니다.
+        self.vocabulary = SurveyVocabulary()
+        with open(os.path.join(self.model_dir, 'learned_vacation_patterns.json'), 'r', encoding='utf-8') as f:
+            self.scoring_table = ScoringTable.from_patterns(json.load(f), self.vocabulary)
+        
+        with open(os.path.join(self.model_dir, 'preference_patterns.json'), 'r', encoding='utf-8') as f:
+            self.collaborative_filter = CollaborativeFilter.from_preference_patterns(json.load(f), self.vocabulary)
+        
+        with open(os.path.join(self.model_dir, 'cost_patterns.json'), 'r', encoding='utf-8') as f:
+            self.cost_table = CostTable.from_cost_patterns(json.load(f), self.vocabulary)
+        self._pending_rows = []
     
     def _load_training_data(self, csv_path):
         """기존 설문조사 데이터 로드 및 전처리"""
         self.original_df = pd.read_csv(csv_path)
+        self._coded_respondents = None
+        self._pending_rows = []
+        # 새 학습 데이터의 값 번호는 처음부터 다시 매깁니다.
+        self.vocabulary = SurveyVocabulary()
         
         # 결측값(비어있는 값)을 '기타'로 채워 넣어 오류를 방지합니다.
         self.original_df = self.original_df.fillna('기타')
         
-        # 원-핫 인코딩(One-Hot Encoding)
-        # 문자열(예: '20대', '여성')을 머신러닝 모델이 이해할 수 있는
-        # 숫자(0 또는 1)로 변환하는 작업입니다.
-        # '연령대_20대'와 같은 새로운 열을 만들어 20대면 1, 아니면 0을 넣습니다.
-        self.full_encoded_df = pd.get_dummies(self.original_df)
-        
         # ✨ 업데이트: 유사도 계산에 사용할 특정 특징(Feature)들을 6개로 확장했습니다.
-        # 기존 5개 + '다음_휴가_경험' 추가
-        selected_features = [
-            '연령대', 
-            '성별', 
-            '함께한_사람', 
-            '휴가_장소_국내_해외', 
-            '가장_최근_여름_휴가',
-            '다음_휴가_경험'  # 새로 추가된 특징
-        ]
-        
+        # (SELECTED_FEATURES: 기존 5개 + '다음_휴가_경험' 추가)
         # CSV 파일에 실제로 존재하는 특징들만 선택합니다.
-        available_features = [feat for feat in selected_features if feat in self.original_df.columns]
+        available_features = [feat for feat in SELECTED_FEATURES if feat in self.original_df.columns]
         
         print(f"📊 사용 가능한 특징들: {available_features}")
         
         features_df = self.original_df[available_features]
-        # 선택된 특징들만 원-핫 인코딩하여 저장합니다.
+        # 원-핫 인코딩(One-Hot Encoding)
+        # 문자열(예: '20대', '여성')을 머신러닝 모델이 이해할 수 있는
+        # 숫자(0 또는 1)로 변환하는 작업입니다.
+        # '연령대_20대'와 같은 새로운 열을 만들어 20대면 1, 아니면 0을 넣습니다.
+        # 휴가_장소, 총_비용처럼 값 종류가 많은 컬럼까지 펼치지 않도록 선택된 특징들만 인코딩합니다.
         self.features_encoded = pd.get_dummies(features_df)
         
+        # 추천 요청 때마다 pandas 인코딩을 반복하지 않도록
+        # '특징 -> 값 -> 열 번호' 사전을 가진 고정 인코더를 미리 만들어 둡니다.
+        self.feature_encoder = FeatureEncoder.from_encoded_frame(self.features_encoded, available_features)
+        # 유사도 검색용 행렬도 데이터가 바뀐 이 시점에 한 번만 다시 만듭니다.
+        self._refresh_similarity_backend()
+        
         print(f"🔢 인코딩된 특징 개수: {self.features_encoded.shape[1]}개")
     
-    def _learn_patterns(self):
+    def _learn_from_csv_chunks(self, csv_path, chunksize):
+        """
+        CSV를 chunksize행씩 나누어 읽으며 학습합니다 (ChunkedSurveyAggregator 사용).
+        
+        원본 응답은 값 번호(CodedRespondents)로만 남기고, 조각마다 같은 값 사전의 번호로
+        추천 점수표, 다음 휴가 전이 행렬, 비용 빈도표에 바로 더합니다.
+        """
+        aggregator = None
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize, dtype=str):
+            if aggregator is None:
+                aggregator = ChunkedSurveyAggregator(chunk.columns)
+            aggregator.add_chunk(chunk)
+        if aggregator is None:
+            raise ValueError(f"CSV 파일에 데이터가 없습니다: {csv_path}")
+        
+        print(f"📊 사용 가능한 특징들: {aggregator.features}")
+        self.original_df = None
+        self._coded_respondents = aggregator.respondents()
+        self._pending_rows = []
+        self.features_encoded = None
+        self.feature_encoder = aggregator.feature_encoder()
+        
+        columns = self._coded_respondents.columns
+        if '만족도' in columns:
+            position = columns.index('만족도')
+            satisfaction_values = self._coded_respondents.column_info[position]['values'] + [np.nan]
+            satisfaction_codes = self._coded_respondents.codes[:, position]
+        else:
+            satisfaction_values = [None]
+            satisfaction_codes = np.zeros(aggregator.n_rows, dtype=np.intp)
+        self.profile_table = aggregator.profile_table(self.feature_encoder, satisfaction_codes, satisfaction_values)
+        self._replace_similarity_backend(self.profile_table.matrix)
+        self._similarity_source = self.features_encoded
+        print(f"🔢 인코딩된 특징 개수: {self.feature_encoder.width}개")
+        print(f"📈 학습용 데이터: 전체 {aggregator.n_rows}개 중 만족도 높은 {aggregator.n_satisfied}개 사용")
+        
+        self.vocabulary = aggregator.vocabulary
+        self.scoring_table = aggregator.scoring_table
+        self.collaborative_filter = aggregator.collaborative_filter
+        self.cost_table = aggregator.cost_table
+        print("✅ 패턴 학습 완료 (CSV 나누어 읽기)")
+    
+    def _learn_patterns(self, vectorized=True):
         """머신러닝 패턴 학습 (6개 특징 반영)"""
-        # defaultdict: 딕셔너리의 키가 없을 때 오류 대신 기본값을 반환하는 유용한 기능입니다.
-        # 여기서는 중첩된 딕셔너리를 쉽게 만들기 위해 사용됩니다.
-        self.vacation_patterns = defaultdict(lambda: defaultdict(list))
+        # 아직 original_df에 합쳐지지 않은 새 응답이 있으면 먼저 합칩니다.
+        self._flush_pending_rows()
+        
+        # 추천 점수표, 다음 휴가 전이 행렬, 비용 빈도표는 모두 값 사전의 번호로 셉니다.
+        self.scoring_table = ScoringTable(self.vocabulary)
+        self.collaborative_filter = CollaborativeFilter(self.vocabulary)
+        self.cost_table = CostTable(self.vocabulary)
+        # 값 번호는 전체 응답에서 처음 등장한 순서대로 매깁니다 (나누어 읽기 학습과 같은 번호).
+        columns = [column for column in PATTERN_COLUMNS if column in self.original_df.columns]
+        codes = {column: self.vocabulary.encode(column, self.original_df[column]) for column in columns}
         
         # 만족도(만족, 매우 만족, 보통)가 높은 데이터만 골라내서 학습에 사용합니다.
         # 불만족스러운 데이터는 추천에 방해가 될 수 있기 때문입니다.
-        satisfied_data = self.original_df[
-            self.original_df['만족도'].isin(['만족', '매우 만족', '보통'])
-        ]
+        satisfied = self.original_df['만족도'].isin(SATISFIED_LEVELS).to_numpy()
+        n_satisfied = int(satisfied.sum())
         
-        print(f"📈 학습용 데이터: 전체 {len(self.original_df)}개 중 만족도 높은 {len(satisfied_data)}개 사용")
+        print(f"📈 학습용 데이터: 전체 {len(self.original_df)}개 중 만족도 높은 {n_satisfied}개 사용")
         
-        for _, row in satisfied_data.iterrows():
-            # 각 행(Row)의 데이터를 읽어와서 패턴을 분석합니다.
-            vacation_type = row.get('가장_최근_여름_휴가', '기타')
-            location_type = row.get('휴가_장소_국내_해외', '기타')
-            location = row.get('휴가_장소', '기타')
-            satisfaction = row.get('만족도', '보통')
-            next_experience = row.get('다음_휴가_경험', '기타')  # 새로 추가된 특징
-            
-            # vacation_patterns 딕셔너리에 데이터를 쌓습니다.
-            # '해수욕' -> '해외' -> [{location: '하와이', satisfaction: '만족', next_experience: '바다/섬에서 물놀이'}, ...]
-            self.vacation_patterns[vacation_type][location_type].append({
-                'location': location,
-                'satisfaction': satisfaction,
-                'cost': row.get('총_비용', '기타'),
-                'duration': row.get('휴가_기간', '기타'),
-                'next_experience': next_experience  # 새로운 정보 추가
-            })
-        
-        # 선호도 패턴 학습 (다음 휴가 경험 패턴 포함)
-        self.preference_patterns = defaultdict(lambda: defaultdict(Counter))
-        # Counter: 리스트나 문자열 등에서 각 항목의 개수를 세어주는 클래스입니다.
-        for _, row in satisfied_data.iterrows():
-            age = row.get('연령대', '기타')
-            vacation_type = row.get('가장_최근_여름_휴가', '기타')
-            next_pref = row.get('다음_휴가_경험', '기타')
-            
-            # 연령대별 다음 휴가 선호도를 학습합니다.
-            self.preference_patterns[age]['next_preferences'][next_pref] += 1
-            
-            # 현재 휴가 유형과 다음 휴가 경험의 연관성을 학습합니다.
-            self.preference_patterns[vacation_type]['next_from_current'][next_pref] += 1
-        
-        # 비용 패턴 학습 (6개 특징별로 세밀한 분석)
-        self.cost_patterns = defaultdict(lambda: defaultdict(list))
-        for _, row in satisfied_data.iterrows():
-            # 6개 특징 모두 추출
-            age_group = row.get('연령대', '기타')
-            gender = row.get('성별', '기타')
-            companion = row.get('함께한_사람', '기타')
-            location_type = row.get('휴가_장소_국내_해외', '기타')
-            vacation_type = row.get('가장_최근_여름_휴가', '기타')
-            next_experience = row.get('다음_휴가_경험', '기타')
-            cost = row.get('총_비용', '기타')
-            
-            # 다양한 조합별 비용 패턴 분석
-            # 기본 패턴
-            self.cost_patterns[vacation_type][location_type].append(cost)
-            
-            # 6개 특징 기반 세밀한 패턴
-            self.cost_patterns[f"age_{age_group}"][vacation_type].append(cost)
-            self.cost_patterns[f"gender_{gender}"][vacation_type].append(cost)  
-            self.cost_patterns[f"companion_{companion}"][location_type].append(cost)
-            self.cost_patterns[f"next_{next_experience}"][location_type].append(cost)
+        if vectorized:
+            # 컬럼 단위 번호 배열로 세 가지 표를 한 번에 셉니다.
+            self._learn_patterns_vectorized(
+                self.vocabulary.pattern_codes({column: codes[column][satisfied] for column in columns}, n_satisfied)
+            )
+        else:
+            # 각 행(Row)의 데이터를 한 번씩만 읽어서 세 가지 표에 함께 더합니다.
+            for _, row in self.original_df[satisfied].iterrows():
+                self._learn_from_row(row)
         
         print("✅ 패턴 학습 완료 (다음 휴가 경험 특징 포함)")
     
-    def _find_similar_users(self, user_data, top_k=5):
-        """코사인 유사도로 유사한 사용자 찾기 (6개 특징 사용)"""
-        user_df = pd.DataFrame([user_data])
+    def _learn_from_row(self, row):
+        """
+        만족도 높은 응답 한 개를 추천 점수표, 다음 휴가 전이 행렬, 비용 빈도표에 반영합니다.
         
-        # 사용자의 데이터를 기존 학습 데이터와 같은 형태로 맞춥니다.
-        # .reindex() 함수를 사용하여 없는 열은 0으로 채웁니다.
-        user_encoded = pd.get_dummies(user_df).reindex(
-            columns=self.full_encoded_df.columns, fill_value=0
-        )
+        전체 학습(`_learn_patterns`)과 증분 학습(`update_model_with_new_data`)이
+        같은 함수를 쓰기 때문에 두 방식의 결과가 항상 같습니다.
+        """
+        # 응답 값을 값 사전의 번호로 바꾼 뒤 (처음 보는 값은 새 번호) 세 표의 칸 하나씩에 더합니다.
+        # 추천 점수표: (휴가 유형, 국내/해외) 묶음의 응답 수, 만족도 점수 합, 장소/다음 휴가 경험 빈도
+        # 다음 휴가 전이 행렬: 연령대별, 현재 휴가 유형별 다음 휴가 경험 응답 수
+        # 비용 빈도표: 기본 조합 + 연령대/성별/동반자/다음 휴가 경험 조합별 비용 빈도
+        codes = self.vocabulary.code_record(row)
+        self.scoring_table.add(codes)
+        self.collaborative_filter.add(codes)
+        self.cost_table.add(codes)
+    
+    def _learn_patterns_vectorized(self, codes):
+        """
+        `_learn_from_row`를 모든 행에 차례로 적용한 것과 똑같은 표를 컬럼 단위로 만듭니다.
         
-        # 특징 추출
-        cols_to_keep = [col for col in self.full_encoded_df.columns 
-                         if col in self.features_encoded.columns]
-        user_features = user_encoded[cols_to_keep].reindex(
-            columns=self.features_encoded.columns, fill_value=0
-        )
+        `iterrows()`는 행마다 Series 객체를 만들기 때문에 느립니다.
+        여기서는 만족도 높은 응답들의 값 번호 배열(codes: {컬럼: 번호 배열})을
+        `np.bincount`로 한 번에 세고, 처음 센 순서도 함께 기록해 키 순서까지 똑같이 맞춥니다.
+        """
+        self.scoring_table.add_many(codes)
+        self.collaborative_filter.add_many(codes)
+        self.cost_table.add_many(codes)
+    
+    def _ensure_patterns(self):
+        """모델 번들에서 불러와 집계표가 없으면(예전 형식 번들) original_df로 다시 학습합니다."""
+        if self.scoring_table is None or self.collaborative_filter is None or self.cost_table is None:
+            self._ensure_original_df()
+            if self.original_df is not None:
+                self._learn_patterns()
+    
+    def _ensure_original_df(self):
+        """모델 번들에서 불러와 original_df가 없으면 값 번호로부터 DataFrame을 만듭니다 (학습/업데이트/저장 때만)."""
+        if self.original_df is None and self._coded_respondents is not None:
+            self.original_df = self._coded_respondents.to_frame()
+            self._coded_respondents = None
+    
+    def _n_respondents(self):
+        """전체 응답자 수 (대기 중인 새 응답 포함)"""
+        if self.original_df is None:
+            return len(self._coded_respondents) if self._coded_respondents is not None else 0
+        return len(self.original_df) + len(self._pending_rows)
+    
+    def _append_respondent(self, survey_data):
+        """
+        새 응답을 대기 목록에 추가하고 응답자 번호를 반환합니다.
+        
+        매번 `pd.concat`으로 original_df 전체를 복사하지 않고,
+        전체 데이터가 필요할 때(`_flush_pending_rows`) 한 번에 합칩니다.
+        original_df에 있는 컬럼 중 응답에 없는 값은 `pd.concat`과 같이 NaN으로 채웁니다.
+        """
+        record = {column: np.nan for column in self.original_df.columns}
+        record.update(survey_data)
+        self._pending_rows.append(record)
+        return len(self.original_df) + len(self._pending_rows) - 1
+    
+    def _flush_pending_rows(self):
+        """대기 중인 새 응답들을 original_df에 한 번에 합칩니다."""
+        if self._pending_rows:
+            new_df = pd.DataFrame(self._pending_rows)
+            self.original_df = pd.concat([self.original_df, new_df], ignore_index=True)
+            self._pending_rows = []
+    
+    def _respondent_record(self, row_id):
+        """응답자 번호로 원본 응답(dict)을 가져옵니다 (대기 중인 새 응답 포함)."""
+        return _records_from(self.original_df, self._pending_rows, self._coded_respondents, [row_id])[0]
+    
+    def _respondent_records(self, row_ids):
+        """여러 응답자의 원본 응답(dict)을 한 번에 가져옵니다 (일괄 추천용, DataFrame 조회 한 번)."""
+        return _records_from(self.original_df, self._pending_rows, self._coded_respondents, row_ids)
+    
+    def _verify_incremental_update(self):
+        """
+        증분 학습 결과가 전체 재학습 결과와 같은지 확인합니다.
+        
+        Returns (반환 값):
+            list: 서로 다른 항목 이름 목록 (모두 같으면 빈 리스트)
+        """
+        def snapshot():
+            return json.dumps([self.collaborative_filter.to_preference_patterns(), self.cost_table.cost_counts()],
+                              ensure_ascii=False, default=str)
+        
+        def profile_state(table, satisfaction=True):
+            # 프로필 번호(순서)는 응답이 들어온 순서에 따라 전체 재학습과 달라도 되므로
+            # 프로필 벡터를 키로 응답자 수, 소속 응답자, 만족도 분포를 비교합니다.
+            keys = ProfileTable._row_keys(table.matrix)
+            hists = table.satisfaction_hist if satisfaction else [{}] * table.n_profiles
+            return {key.tobytes(): (table.counts[profile], [int(row) for row in table.members[profile]],
+                                    sorted((str(value), count) for value, count in hists[profile].items()))
+                    for profile, key in enumerate(keys)}
+        
+        def filtered_state(table):
+            return profile_state(table, satisfaction=False)
+        
+        def scoring_state(table):
+            return table.bucket_stats()
+        
+        incremental_patterns = snapshot()
+        incremental_scoring = scoring_state(self.scoring_table)
+        incremental_profiles = profile_state(self.profile_table) if self.profile_table is not None else None
+        incremental_filtered = None
+        if self.profile_table is not None and self._filtered_source is self.profile_table:
+            incremental_filtered = {key: filtered_state(index.profile_table)
+                                    for key, index in self._filtered_indexes.items()}
+        
+        # 전체 재학습: 패턴을 처음부터 다시 만들고 프로필 테이블과 조건부 검색 색인도 새로 만듭니다.
+        self._learn_patterns()
+        self.profile_table = None
+        self._refresh_similarity_backend()
+        self._refresh_filtered_indexes()
+        
+        mismatches = []
+        if snapshot() != incremental_patterns:
+            mismatches.append('patterns')
+        if scoring_state(self.scoring_table) != incremental_scoring:
+            mismatches.append('scoring_table')
+        if incremental_profiles is not None and profile_state(self.profile_table) != incremental_profiles:
+            mismatches.append('profile_table')
+        if incremental_filtered is not None and incremental_filtered != {
+            key: filtered_state(index.profile_table) for key, index in self._filtered_indexes.items()
+        }:
+            mismatches.append('filtered_indexes')
+        return mismatches
+    
+    def _find_similar_users(self, user_data, top_k=5, snapshot=None, filters=None):
+        """
+        코사인 유사도로 유사한 사용자 찾기 (6개 특징 사용, snapshot: 읽을 모델 스냅샷 - 없으면 현재 스냅샷)
+        filters: 기본 조건(만족도)에 더할 검색 조건 - 조건에 맞는 응답자 중에서 top_k명을 찾습니다.
+        """
+        snapshot = snapshot or self._current_snapshot()
+        index = snapshot.search_index(self._resolve_filters(filters))
+        # 사용자의 데이터를 기존 학습 데이터와 같은 형태(열 순서)의 벡터로 맞춥니다.
+        # 고정 인코더가 '특징 -> 값 -> 열 번호' 사전만 조회하므로
+        # DataFrame 생성, get_dummies, reindex 없이 바로 NumPy 배열이 만들어집니다.
+        # 학습 데이터에 없던 값은 예전과 마찬가지로 0으로 남습니다.
+        user_features = snapshot.feature_encoder.encode(user_data)
         
         # 유사도 계산
-        # scikit-learn의 `cosine_similarity` 함수를 사용하여
-        # 현재 사용자와 기존 사용자들 간의 유사도 점수를 계산합니다.
-        similarity_scores = cosine_similarity(user_features, self.features_encoded)
-        # 유사도 점수가 높은 순서대로 상위 5개의 인덱스(위치)를 가져옵니다.
-        top_indices = similarity_scores[0].argsort()[::-1][:top_k]
-        
-        similar_users = []
-        for i, idx in enumerate(top_indices):
-            similarity_score = similarity_scores[0][idx]
-            user_info = self.original_df.iloc[idx].to_dict()
-            
-            # 만족도(만족, 매우 만족, 보통)가 높은 사용자들만 유사 사용자로 포함합니다.
-            if user_info.get('만족도') in ['만족', '매우 만족', '보통']:
-                similar_users.append({
-                    'rank': i + 1,
-                    'similarity_score': round(similarity_score, 2),
-                    'user_data': user_info
-                })
+        # 미리 정규화해 둔 검색용 행렬과 행렬-벡터 곱 한 번으로
+        # 현재 사용자와 기존 사용자들 간의 유사도 점수를 계산하고,
+        # 점수가 높은 순서대로 상위 5개의 인덱스(위치)를 가져옵니다.
+        # (같은 답을 한 응답자들은 프로필 하나로 묶어 한 번만 계산합니다.)
+        # 만족도(만족, 매우 만족, 보통)가 높은 사용자들만 담은 조건부 색인에서 찾으므로
+        # 만족도가 낮은 응답자는 점수를 계산하지 않고, 항상 top_k명을 채웁니다.
+        top_indices, top_scores = index.profile_table.top_respondents(
+            index.similarity_backend, user_features, top_k
+        )
+        similar_users = self._similar_users_from_top(top_indices, top_scores,
+                                                     snapshot.respondent_records(top_indices))
         
         print(f"👥 유사 사용자 {len(similar_users)}명 발견 (6개 특징 기준)")
         return similar_users
     
-    def _generate_recommendations(self, user_data, similar_users):
+    def _similar_users_from_top(self, top_indices, top_scores, records=None):
+        """상위 응답자 번호와 유사도로 유사 사용자 목록을 만듭니다 (records: 미리 가져온 원본 응답)."""
+        if records is None:
+            records = [self._respondent_record(idx) for idx in top_indices]
+        return [
+            {
+                'rank': i + 1,
+                'similarity_score': round(float(similarity_score), 2),
+                'user_data': user_info
+            }
+            for i, (user_info, similarity_score) in enumerate(zip(records, top_scores))
+        ]
+    
+    def _refresh_similarity_backend(self):
+        """학습 데이터(features_encoded)가 바뀌었을 때만 프로필 테이블과 유사도 검색 엔진을 다시 만듭니다."""
+        if self.profile_table is not None and self._similarity_source is self.features_encoded:
+            return
+        self._ensure_original_df()
+        self._flush_pending_rows()
+        if '만족도' in self.original_df.columns:
+            satisfactions = self.original_df['만족도'].tolist()
+        else:
+            satisfactions = [None] * len(self.original_df)
+        if self.features_encoded is not None:
+            n_encoded = len(self.features_encoded)
+            features = self.features_encoded
+        else:
+            # 모델 번들에서 불러와 features_encoded가 없으면 고정 인코더로 전체 응답을 한 번에 인코딩합니다.
+            n_encoded = len(self.original_df)
+            features = self.feature_encoder.encode_frame(self.original_df)
+        self.profile_table = ProfileTable.from_features(features, satisfactions[:n_encoded])
+        
+        # update_model_with_new_data로 추가된 뒤 features_encoded에는 아직 없는 응답자들도
+        # 고정 인코더로 인코딩해서 프로필 테이블에 이어 붙입니다.
+        for row_id in range(n_encoded, len(self.original_df)):
+            row = self.original_df.iloc[row_id].to_dict()
+            self.profile_table.add_row(self.feature_encoder.encode(row)[0], satisfactions[row_id], row_id)
+        
+        self._replace_similarity_backend(self.profile_table.matrix)
+        self._similarity_source = self.features_encoded
+    
+    def _replace_similarity_backend(self, matrix, normalized=False):
+        """
+        검색 엔진의 복사본을 새 행렬로 fit해서 바꿔 끼웁니다.
+        (이전 스냅샷이 쓰고 있는 검색 엔진 객체는 그대로 두므로 읽는 중인 요청에 영향이 없습니다.)
+        """
+        self.similarity_backend = _fitted_copy(self.similarity_backend, matrix, normalized)
+    
+    def _refresh_filtered_indexes(self):
+        """프로필 테이블이 새로 만들어졌으면 조건부 검색 색인을 다시 만들고, 아직 없는 조건의 색인을 채웁니다."""
+        if self._filtered_source is not self.profile_table:
+            self._filtered_indexes = {}
+            self._filtered_source = self.profile_table
+        for filters in self._search_filters:
+            key = filter_key(filters)
+            if key not in self._filtered_indexes:
+                row_mask = _filter_mask(self.original_df, self._pending_rows, self._coded_respondents,
+                                        self.profile_table.n_rows, filters)
+                self._filtered_indexes[key] = FilteredIndex.build(filters, self.profile_table,
+                                                                  self.similarity_backend, row_mask)
+    
+    def _resolve_filters(self, filters=None):
+        """요청의 검색 조건에 기본 조건(SATISFIED_FILTER)을 더해 정규화합니다 (같은 컬럼은 요청 쪽 조건을 사용)."""
+        return normalize_filters({**SATISFIED_FILTER, **(filters or {})})
+    
+    def _index_new_respondent(self, survey_data, row_id):
+        """새 응답자 한 명을 프로필 테이블에 추가합니다 (새 프로필이 생길 때만 검색 엔진을 다시 만듦)."""
+        if self.profile_table is None or self._similarity_source is not self.features_encoded:
+            # 아직 프로필 테이블이 없으면 다음 검색 때 전체를 한 번에 만듭니다.
+            return
+        vector = self.feature_encoder.encode(survey_data)[0]
+        satisfaction = survey_data.get('만족도')
+        is_new_profile = self.profile_table.add_row(vector, satisfaction, row_id)
+        if is_new_profile:
+            self._replace_similarity_backend(self.profile_table.matrix)
+        # 조건부 검색 색인에도 조건에 맞는 응답자만 추가합니다.
+        if self._filtered_source is self.profile_table:
+            for index in self._filtered_indexes.values():
+                if index.matches(survey_data):
+                    index.add_row(vector, satisfaction, row_id)
+    
+    def _generate_recommendations(self, user_data, similar_users, snapshot=None):
         """AI 추천 생성 (다음 휴가 경험 고려)"""
-        recommendations = []
         user_next_pref = user_data.get('다음_휴가_경험', '기타')
         
-        # 학습된 'vacation_patterns'을 기반으로 추천을 생성합니다.
-        for vacation_type, location_data in self.vacation_patterns.items():
-            for location_type, experiences in location_data.items():
-                if len(experiences) >= 2:  # 최소 2명 이상 경험한 데이터만 사용합니다.
-                    # 각 만족도 항목을 숫자로 변환하여 평균을 계산합니다.
-                    satisfaction_scores = [self._satisfaction_to_score(exp['satisfaction']) 
-                                           for exp in experiences]
-                    avg_satisfaction = np.mean(satisfaction_scores)
-                    
-                    # 다음 휴가 경험 일치도를 계산합니다.
-                    next_experience_match = sum(1 for exp in experiences 
-                                               if exp.get('next_experience') == user_next_pref)
-                    next_experience_score = next_experience_match / len(experiences)
-                    
-                    # 전체 점수는 만족도 + 다음 휴가 경험 일치도의 가중평균입니다.
-                    total_score = (avg_satisfaction * 0.7) + (next_experience_score * 5 * 0.3)
-                    
-                    if avg_satisfaction >= 3.0:  # 만족도 평균이 '보통' 이상인 경우만 추천합니다.
-                        # Counter().most_common(1): 가장 자주 등장한 항목을 찾습니다.
-                        location_counts = Counter(exp['location'] for exp in experiences)
-                        top_location = location_counts.most_common(1)[0]
-                        
-                        recommendations.append({
-                            'vacation_type': vacation_type,
-                            'location_type': location_type,
-                            'recommended_location': top_location[0],
-                            'avg_satisfaction': round(avg_satisfaction, 2),
-                            'next_experience_match': round(next_experience_score, 2),
-                            'total_score': round(total_score, 2),
-                            'experience_count': len(experiences),
-                            'confidence': min(len(experiences) / 10 * total_score / 5, 1.0)
-                        })
-        
-        # 총점과 경험 수 기준으로 정렬하여 가장 좋은 추천을 상위에 놓습니다.
-        recommendations.sort(key=lambda x: (x['total_score'], x['experience_count']), reverse=True)
+        # 학습할 때 미리 집계해 둔 점수표(scoring_table)를 기반으로 추천을 생성합니다.
+        # 묶음별 평균 만족도, 응답자 수, 최빈 장소, 다음 휴가 경험 분포가 이미 계산되어 있으므로
+        # 사용자의 '다음_휴가_경험'에 맞춘 가중합만 계산합니다.
+        recommendations = (snapshot or self._current_snapshot()).scoring_table.rank(user_next_pref)
         
         print(f"🎯 {len(recommendations)}개 추천 생성 (다음 휴가 경험 '{user_next_pref}' 고려)")
         return recommendations
     
     def _satisfaction_to_score(self, satisfaction):
         """만족도를 점수로 변환"""
-        # '매우 만족'과 같은 문자열을 숫자로 바꿔주는 딕셔너리입니다.
-        satisfaction_map = {
-            '매우 불만족': 1, '불만족': 2, '보통': 3, '만족': 4, '매우 만족': 5
-        }
-        # 딕셔너리에 없는 값일 경우 기본값으로 3('보통')을 반환합니다.
-        return satisfaction_map.get(satisfaction, 3)
+        # '매우 만족'과 같은 문자열을 숫자로 바꿔주는 모듈 상수 사전(SATISFACTION_SCORES)을 씁니다.
+        # 사전에 없는 값일 경우 기본값으로 3('보통')을 반환합니다.
+        return SATISFACTION_SCORES.get(satisfaction, 3)
     
-    def _format_for_django(self, recommendations, similar_users):
+    def _format_for_django(self, recommendations, similar_users, snapshot=None):
         """Django 템플릿에서 사용하기 쉽도록 결과 포맷팅 (6개 특징 정보 포함)"""
         
         # 🔧 백엔드 담당자: 여기는 Django 템플릿에 데이터를 전달하기 전에
@@ -495,50 +4045,138 @@ class VacationRecommendationService:
                 }
                 for user in similar_users[:3]  # 유사 사용자 중 상위 3명만 보여줍니다.
             ],
-            'cost_info': self._get_cost_recommendations(),
-            'next_vacation_suggestions': self._get_next_vacation_suggestions()
+            # 비용 정보와 다음 휴가 제안은 사용자와 상관없이 모델에 따라서만 달라지므로
+            # 스냅샷을 만들 때 한 번만 계산한 값을 재사용합니다.
+            **(snapshot or self._current_snapshot()).static_payload
+        }
+    
+    def _current_snapshot(self):
+        """추천 요청이 읽을 현재 모델 스냅샷 (아직 없으면 지금 모델 상태로 만듦)"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self._publish_snapshot()
+        return snapshot
+    
+    def _publish_snapshot(self):
+        """
+        지금 모델 상태로 읽기 전용 스냅샷을 만들어 바꿔 끼웁니다 (학습/로드/업데이트가 끝날 때 호출).
+        
+        스냅샷에 필요한 값(검색 엔진, 점수표, cost_info 등)을 모두 여기서 미리 계산하므로
+        읽는 쪽은 아무것도 만들거나 고치지 않습니다. 참조 하나를 바꾸는 것은 원자적이어서
+        읽는 스레드는 이전 스냅샷이나 새 스냅샷 중 하나만 보게 됩니다.
+        """
+        self._refresh_similarity_backend()
+        self._refresh_filtered_indexes()
+        n_respondents = self._n_respondents()
+        snapshot = ModelSnapshot(
+            model_version=self.model_version,
+            feature_encoder=self.feature_encoder,
+            profile_table=self.profile_table.frozen(),
+            similarity_backend=self.similarity_backend,
+            scoring_table=self.scoring_table,
+            static_payload=self._get_static_payload(),
+            respondents=(self.original_df, self._pending_rows, self._coded_respondents, n_respondents),
+            materialized=self.materialized,
+            filtered_indexes={key: index.frozen(n_respondents) for key, index in self._filtered_indexes.items()},
+            segments=self.user_clustering_model,
+        )
+        self._snapshot = snapshot
+        return snapshot
+    
+    def _bump_model_version(self):
+        """모델 버전을 올리고 버전별 캐시를 비웁니다 (train/load/update 후 호출)."""
+        self.model_version += 1
+        self._static_payload = None
+        # 이전 버전의 추천 결과는 더 이상 사용할 수 없으므로 캐시를 비웁니다.
+        if self.result_cache is not None:
+            self.result_cache.clear()
+        # 미리 계산된 조회표도 이전 모델 기준이므로 더 이상 사용하지 않습니다.
+        self.materialized = None
+        self.materialize_report = None
+    
+    def _materialize_recommendations(self):
+        """모든 답 조합의 추천 결과를 미리 계산해 self.materialized에 저장합니다 (파일 저장은 _save_trained_model)."""
+        print("🗂️ 모든 답 조합의 추천 결과를 미리 계산하는 중...")
+        start = time.perf_counter()
+        # 조회표는 학습이 끝난 새 모델의 스냅샷으로 계산합니다.
+        self._publish_snapshot()
+        self.materialized = MaterializedRecommendations.build(self)
+        self.materialize_report = {
+            'n_combinations': self.materialized.n_combinations,
+            'n_user_cards': len(self.materialized.user_cards),
+            'build_seconds': time.perf_counter() - start,
+            'file_bytes': None,
         }
     
+    def get_cache_stats(self):
+        """
+        📊 추천 결과 캐시 통계 (모니터링 대시보드용)
+        
+        Returns (반환 값):
+            dict: 캐시 크기, 적중(hits)/실패(misses)/축출(evictions)/만료(expirations) 횟수,
+            적중률(hit_rate), 현재 모델 버전. 캐시를 사용하지 않으면 {'enabled': False}
+        """
+        if self.result_cache is None:
+            return {'enabled': False, 'model_version': self.model_version}
+        return {'enabled': True, 'model_version': self.model_version, **self.result_cache.stats()}
+    
+    def _get_static_payload(self):
+        """
+        현재 모델 버전의 cost_info와 next_vacation_suggestions를 반환합니다.
+        
+        처음 호출할 때만 계산하고 이후에는 같은 객체를 돌려주므로,
+        반환된 딕셔너리와 리스트는 읽기 전용으로 사용해야 합니다.
+        """
+        if self._static_payload is None:
+            self._ensure_patterns()
+            self._static_payload = {
+                'cost_info': self._get_cost_recommendations(),
+                'next_vacation_suggestions': self._get_next_vacation_suggestions()
+            }
+        return self._static_payload
+    
+    def get_static_payload_json(self):
+        """
+        📦 현재 모델 버전의 cost_info와 next_vacation_suggestions를 JSON 바이트로 반환합니다.
+        
+        모델 버전마다 한 번만 직렬화하므로, Django에서 응답 본문에 그대로 붙여 쓰거나
+        캐시 서버에 저장할 때 매번 json.dumps를 하지 않아도 됩니다.
+        
+        Returns (반환 값):
+            bytes: UTF-8로 인코딩된 JSON ({"cost_info": ..., "next_vacation_suggestions": ...})
+        """
+        return self._current_snapshot().static_payload_json()
+    
     def _get_cost_recommendations(self):
         """비용 추천 정보 (다음 휴가 경험 패턴 포함)"""
-        cost_info = {}
-        for vacation_type, location_data in self.cost_patterns.items():
-            cost_info[vacation_type] = {}
-            for location_type, costs in location_data.items():
-                if costs:
-                    # Counter를 사용하여 가장 많이 등장한 비용을 찾습니다.
-                    most_common_cost = Counter(costs).most_common(1)[0]
-                    cost_info[vacation_type][location_type] = most_common_cost[0]
-        return cost_info
+        # 비용 빈도표에서 조합별로 가장 많이 등장한 비용을 찾고, 값 이름(문자열)은 이때만 붙입니다.
+        return self.cost_table.cost_info()
     
     def _get_next_vacation_suggestions(self):
         """다음 휴가 제안 (연령대 및 현재 휴가 유형별)"""
         suggestions = []
+        collaborative_filter = self.collaborative_filter
         
         # 연령대별 선호도
-        for age_group, patterns in self.preference_patterns.items():
-            if isinstance(patterns, dict) and 'next_preferences' in patterns:
-                next_prefs = patterns.get('next_preferences', {})
-                # 각 연령대에서 가장 인기있는 다음 휴가 경험 3개를 찾습니다.
-                for vacation_type, count in Counter(next_prefs).most_common(3):
-                    suggestions.append({
-                        'vacation_type': vacation_type,
-                        'target_age': age_group,
-                        'popularity': count,
-                        'category': 'age_preference'
-                    })
+        # 각 연령대 행에서 가장 인기있는 다음 휴가 경험 3개를 찾습니다 (모든 행을 한 번에).
+        for age_group, top_next in collaborative_filter.top_all('next_preferences', 3):
+            for vacation_type, count in top_next:
+                suggestions.append({
+                    'vacation_type': vacation_type,
+                    'target_age': age_group,
+                    'popularity': count,
+                    'category': 'age_preference'
+                })
         
         # 현재 휴가 유형별 다음 선호도
-        for current_vacation, patterns in self.preference_patterns.items():
-            if isinstance(patterns, dict) and 'next_from_current' in patterns:
-                next_from_current = patterns.get('next_from_current', {})
-                for next_vacation, count in Counter(next_from_current).most_common(2):
-                    suggestions.append({
-                        'vacation_type': next_vacation,
-                        'current_vacation': current_vacation,
-                        'popularity': count,
-                        'category': 'transition_pattern'
-                    })
+        for current_vacation, top_next in collaborative_filter.top_all('next_from_current', 2):
+            for next_vacation, count in top_next:
+                suggestions.append({
+                    'vacation_type': next_vacation,
+                    'current_vacation': current_vacation,
+                    'popularity': count,
+                    'category': 'transition_pattern'
+                })
         
         return suggestions
     
@@ -547,40 +4185,423 @@ class VacationRecommendationService:
         # 모델을 저장할 폴더가 없으면 새로 만듭니다.
         os.makedirs(self.model_dir, exist_ok=True)
         
-        # joblib.dump(): 파이썬 객체를 '.pkl' 파일로 저장하는 함수입니다.
-        # 이렇게 저장하면 나중에 `joblib.load()`로 빠르게 불러올 수 있습니다.
-        joblib.dump(self.features_encoded, os.path.join(self.model_dir, 'features_encoded.pkl'))
-        joblib.dump(self.original_df, os.path.join(self.model_dir, 'original_data.pkl'))
+        # 원본 응답, 프로필 테이블, 검색용 행렬, 사전 집계된 점수표를
+        # pickle 없는 모델 번들(JSON 매니페스트 + numpy 배열) 하나로 저장합니다.
+        # (원본 응답이 값 번호로만 있으면 DataFrame을 만들지 않고 그대로 저장합니다.)
+        # 예전 형식에서 불러와 집계표가 없으면 이번에 만들어 새 형식으로 저장합니다.
+        self._ensure_patterns()
+        self._flush_pending_rows()
+        self._refresh_similarity_backend()
+        # 미리 계산된 추천 조회표와 사용자 세그먼트도 번들과 같은 버전 폴더에 함께 저장해서
+        # 번들, 조회표, 세그먼트가 한 번에(CURRENT를 바꿀 때) 새 버전으로 바뀌도록 합니다.
+        # (조회표/세그먼트가 없으면 새 버전 폴더에도 없으므로 예전 파일을 따로 지울 필요가 없습니다.)
+        extra_files = {}
+        if self.materialized is not None:
+            extra_files[MaterializedRecommendations.FILE_NAME] = self.materialized.save
+        if self.user_clustering_model is not None:
+            extra_files[UserSegmentModel.FILE_NAME] = self.user_clustering_model.save
+        version_dir = ModelBundle.from_service(self).save(os.path.join(self.model_dir, ModelBundle.DIR_NAME),
+                                                          extra_files=extra_files)
+        if self.materialized is not None and self.materialize_report is not None:
+            self.materialize_report['file_bytes'] = os.path.getsize(
+                os.path.join(version_dir, MaterializedRecommendations.FILE_NAME))
+        
+        # 버전 폴더를 쓰기 전 형식으로 모델 폴더에 바로 저장했던 조회표/세그먼트 파일은 이제 읽지 않으므로 지웁니다.
+        for file_name in (MaterializedRecommendations.FILE_NAME, UserSegmentModel.FILE_NAME):
+            if os.path.exists(os.path.join(self.model_dir, file_name)):
+                os.remove(os.path.join(self.model_dir, file_name))
         
-        # 모델 변수가 None이 아닐 경우(존재하는 경우)에만 저장합니다.
+        # joblib.dump(): 파이썬 객체를 '.pkl' 파일로 저장하는 함수입니다.
+        # 추가 머신러닝 모델은 변수가 None이 아닐 경우(존재하는 경우)에만 저장합니다.
         if self.satisfaction_predictor:
             joblib.dump(self.satisfaction_predictor, os.path.join(self.model_dir, 'satisfaction_model.pkl'))
         
-        if self.user_clustering_model:
-            joblib.dump(self.user_clustering_model, os.path.join(self.model_dir, 'clustering_model.pkl'))
-        
         if self.vacation_classifier:
             joblib.dump(self.vacation_classifier, os.path.join(self.model_dir, 'vacation_classifier.pkl'))
         
-        if self.collaborative_filter:
-            joblib.dump(self.collaborative_filter, os.path.join(self.model_dir, 'collaborative_filter.pkl'))
-        
         if self.label_encoders:
             joblib.dump(self.label_encoders, os.path.join(self.model_dir, 'label_encoders.pkl'))
         
-        # json.dump(): 파이썬 딕셔너리를 '.json' 파일로 저장하는 함수입니다.
-        # ensure_ascii=False: 한글이 깨지지 않도록 설정합니다.
-        # indent=2: 들여쓰기를 2칸으로 하여 사람이 읽기 쉽게 만듭니다.
-        with open(os.path.join(self.model_dir, 'learned_vacation_patterns.json'), 'w', encoding='utf-8') as f:
-            json.dump(dict(self.vacation_patterns), f, ensure_ascii=False, indent=2)
+        print("💾 모델 저장 완료 (6개 특징 버전)")
+
+
+class AsyncRecommendationService:
+    """
+    ⚡ asyncio용 추천 서비스 (Django async view, FastAPI 등 비동기 서버용)
+    
+    VacationRecommendationService를 감싸서 이벤트 루프를 막지 않고 추천을 만듭니다.
+    - 계산은 크기가 정해진 스레드 풀(max_workers개)에서 실행합니다.
+    - 같은 6개 특징 응답 조합의 요청이 이미 계산 중이면 다시 계산하지 않고 그 결과를 함께 기다립니다.
+    - batch_window초 동안 모인 서로 다른 요청들은 `get_recommendations_batch`로 한 번에 계산합니다
+      (한 묶음에 최대 max_batch_size개). 스레드가 모두 바쁘면 그동안 요청을 더 모아서 보냅니다.
+    
+    사용법:
+        async_service = AsyncRecommendationService(vacation_service)
+        result = await async_service.get_recommendations(user_data)
+    """
+    
+    def __init__(self, service, max_workers=4, max_batch_size=256, batch_window=0.002):
+        self.service = service
+        self.max_workers = max_workers
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                               thread_name_prefix='recommend')
+        # (모델 버전, 6개 특징 응답) -> 계산 중인 결과를 받을 Future
+        self._in_flight = {}
+        # 아직 스레드 풀로 보내지 않은 (키, 설문 응답) 목록
+        self._queue = []
+        self._flush_handle = None
+        self._tasks = set()
+        self._running = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        # 모델 업데이트 중에는 새 묶음을 보내지 않습니다.
+        self._updating = 0
+        self._update_lock = asyncio.Lock()
+        self._stats = {'requests': 0, 'coalesced': 0, 'batches': 0, 'batched_requests': 0}
+    
+    async def get_recommendations(self, user_survey_data):
+        """
+        🎯 비동기 추천 생성 (`VacationRecommendationService.get_recommendations`와 같은 결과)
+        
+        Args (매개변수):
+            user_survey_data (dict): `get_recommendations`에 넘기는 것과 같은 설문 응답
+            
+        Returns (반환 값):
+            dict: 추천 결과 (요청마다 따로 복사한 딕셔너리이므로 고쳐 써도 다른 요청과 캐시에 영향이 없습니다.)
+        """
+        loop = asyncio.get_running_loop()
+        self._stats['requests'] += 1
+        try:
+            key = (self.service.model_version, canonical_feature_key(user_survey_data))
+            future = self._in_flight.get(key)
+        except Exception:
+            # 키로 쓸 수 없는 값(목록 등)이 있는 응답은 묶지 않고 `get_recommendations`로 계산합니다 (실패 결과 반환).
+            return await loop.run_in_executor(self._executor, self.service.get_recommendations, user_survey_data)
+        if future is not None:
+            self._stats['coalesced'] += 1
+        else:
+            future = loop.create_future()
+            self._in_flight[key] = future
+            self._queue.append((key, user_survey_data))
+            if len(self._queue) >= self.max_batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        # 한 요청이 취소되어도 같은 결과를 기다리는 다른 요청에는 영향이 없도록 shield로 감쌉니다.
+        # 같은 결과 객체를 함께 기다린 요청들과 캐시가 서로의 수정에 영향을 받지 않도록 복사해서 돌려줍니다.
+        return copy.deepcopy(await asyncio.shield(future))
+    
+    async def update_model_with_new_data(self, new_survey_data, save=True):
+        """
+        🔄 비동기 모델 업데이트
+        
+        계산 중인 묶음이 모두 끝난 뒤 스레드 풀에서 업데이트를 실행하고,
+        업데이트가 끝날 때까지 새로 들어온 요청은 모아 두었다가 새 모델로 계산합니다.
+        """
+        self._updating += 1
+        try:
+            async with self._update_lock:
+                await self._idle.wait()
+                return await asyncio.get_running_loop().run_in_executor(
+                    self._executor, lambda: self.service.update_model_with_new_data(new_survey_data, save=save)
+                )
+        finally:
+            self._updating -= 1
+            self._flush()
+    
+    def get_stats(self):
+        """
+        📊 요청 병합/묶음 처리 통계
+        
+        Returns (반환 값):
+            dict: 전체 요청 수, 병합된 요청 수, 묶음 수, 묶음당 평균 요청 수
+        """
+        stats = dict(self._stats)
+        stats['avg_batch_size'] = round(stats['batched_requests'] / stats['batches'], 1) if stats['batches'] else 0
+        return stats
+    
+    def close(self):
+        """🧹 스레드 풀 종료 (서버 종료 시 호출)"""
+        self._executor.shutdown(wait=True)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def _flush(self):
+        """모인 요청을 묶음으로 스레드 풀에 보냄 (빈 스레드가 없으면 앞 묶음이 끝날 때 보냄)"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        while self._queue and self._running < self.max_workers and not self._updating:
+            batch = self._queue[:self.max_batch_size]
+            del self._queue[:self.max_batch_size]
+            self._running += 1
+            self._idle.clear()
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _run_batch(self, batch):
+        """묶음 하나를 get_recommendations_batch로 계산해서 기다리던 요청들에 결과 전달"""
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self._executor, self.service.get_recommendations_batch, [user_data for _, user_data in batch]
+            )
+            self._stats['batches'] += 1
+            self._stats['batched_requests'] += len(batch)
+            for (key, _), result in zip(batch, results):
+                self._in_flight.pop(key).set_result(result)
+        except Exception as e:
+            # 묶음이 통째로 실패하면 결과를 받지 못한 요청만 하나씩 다시 계산해서,
+            # 한 요청의 문제가 같은 묶음의 다른 요청까지 실패시키지 않도록 합니다.
+            print(f"❌ 묶음 추천 실패, 하나씩 다시 계산합니다: {e}")
+            for key, user_data in batch:
+                future = self._in_flight.pop(key, None)
+                if future is None or future.done():
+                    continue
+                try:
+                    future.set_result(await loop.run_in_executor(
+                        self._executor, self.service.get_recommendations, user_data
+                    ))
+                except Exception as item_error:
+                    future.set_exception(item_error)
+        finally:
+            self._running -= 1
+            if not self._running:
+                self._idle.set()
+            self._flush()
+
+
+class SurveySubmissionQueue:
+    """
+    📮 설문 제출 쓰기 지연(write-behind) 큐
+    
+    설문이 제출될 때마다 요청 안에서 `update_model_with_new_data(save=True)`로 모델 전체를 저장하지 않고,
+    - `submit()`은 제출 내용을 로컬 로그 파일(JSON Lines)에 한 줄 추가하고 디스크에 기록(fsync)한 뒤 바로 반환합니다.
+      (학습 데이터 크기와 상관없이 빠르게 끝납니다.)
+    - 백그라운드 스레드 하나가 batch_size개가 모이거나 flush_interval초가 지나면 모아서 모델에 반영하고,
+      checkpoint_interval초마다 모델을 저장(체크포인트)한 뒤 반영된 줄을 로그에서 지웁니다.
+    
+    모델 반영과 저장은 서비스의 쓰기 잠금 안에서 하므로 제출이 몰리거나 다른 곳에서 재학습해도 모델과 파일이 깨지지 않습니다.
+    체크포인트는 번들, 추천 조회표, 세그먼트를 새 버전 폴더 하나에 저장하고 한 번에 바꿔 넣으며(ModelBundle.save),
+    그 매니페스트에 반영된 마지막 접수 번호가 함께 저장됩니다. 로그는 그 다음에 줄이므로
+    서버가 중간에 꺼져도 다시 시작(`start()`)하면 로그에 남은 미반영 제출만 한 번씩 다시 반영합니다.
+    모델에 반영하지 못한 제출은 버리지 않고 실패 로그(pending_surveys.failed.jsonl)에 옮겨 둡니다.
+    
+    사용법:
+        survey_queue = SurveySubmissionQueue(vacation_service).start()
+        survey_queue.submit(survey_data)   # 설문 저장 view에서 호출
+        survey_queue.stop()                # 서버 종료 시 (남은 제출 반영 + 체크포인트)
+    """
+    
+    LOG_FILE_NAME = 'pending_surveys.jsonl'
+    # 모델에 반영하지 못한 제출을 옮겨 두는 실패 로그(dead-letter) 파일 이름
+    FAILED_LOG_FILE_NAME = 'pending_surveys.failed.jsonl'
+    
+    def __init__(self, service, log_path=None, batch_size=100, flush_interval=1.0, checkpoint_interval=60.0,
+                 fsync=True, failed_log_path=None):
+        self.service = service
+        self.log_path = log_path or os.path.join(service.model_dir, self.LOG_FILE_NAME)
+        self.failed_log_path = failed_log_path or os.path.join(os.path.dirname(self.log_path) or '.',
+                                                               self.FAILED_LOG_FILE_NAME)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.checkpoint_interval = checkpoint_interval
+        self.fsync = fsync
+        # 제출(로그 쓰기)과 백그라운드 반영 사이의 대기열을 보호하는 조건 변수입니다.
+        self._condition = threading.Condition()
+        self._queue = []
+        # 마지막 체크포인트 이후 반영한 제출이 있는지 여부
+        self._dirty = False
+        self._log_file = None
+        self._thread = None
+        self._stopping = False
+        self._next_seq = 1
+        self._last_checkpoint = time.monotonic()
+        self._stats = {'submitted': 0, 'applied': 0, 'failed': 0, 'batches': 0, 'checkpoints': 0, 'replayed': 0}
+    
+    def start(self):
+        """
+        ▶️ 로그에 남은 미반영 제출을 대기열에 다시 넣고 백그라운드 반영 스레드를 시작합니다.
+        
+        Returns (반환 값):
+            SurveySubmissionQueue: 자기 자신 (`SurveySubmissionQueue(service).start()`처럼 사용)
+        """
+        applied_seq = self.service.applied_submission_seq
+        last_seq = applied_seq
+        for seq, survey_data in self._read_log():
+            last_seq = max(last_seq, seq)
+            if seq > applied_seq:
+                self._queue.append((seq, survey_data))
+        self._stats['replayed'] = len(self._queue)
+        if self._queue:
+            print(f"📮 반영되지 않은 제출 {len(self._queue)}건을 로그에서 다시 불러왔습니다.")
+        self._next_seq = last_seq + 1
+        
+        os.makedirs(os.path.dirname(self.log_path) or '.', exist_ok=True)
+        self._log_file = open(self.log_path, 'a', encoding='utf-8')
+        self._stopping = False
+        self._last_checkpoint = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name='survey-write-behind', daemon=True)
+        self._thread.start()
+        return self
+    
+    def submit(self, survey_data):
+        """
+        📝 설문 제출 접수 (로그에 기록한 뒤 바로 반환, 모델 반영은 백그라운드에서)
         
-        with open(os.path.join(self.model_dir, 'preference_patterns.json'), 'w', encoding='utf-8') as f:
-            json.dump(dict(self.preference_patterns), f, ensure_ascii=False, indent=2)
+        Args (매개변수):
+            survey_data (dict): `update_model_with_new_data`에 넘기는 것과 같은 설문 응답
             
-        with open(os.path.join(self.model_dir, 'cost_patterns.json'), 'w', encoding='utf-8') as f:
-            json.dump(dict(self.cost_patterns), f, ensure_ascii=False, indent=2)
+        Returns (반환 값):
+            int: 접수 번호 (로그와 체크포인트에서 사용하는 순서 번호)
+        """
+        with self._condition:
+            if self._log_file is None:
+                raise RuntimeError('SurveySubmissionQueue.start()를 먼저 호출하세요.')
+            seq = self._next_seq
+            self._next_seq += 1
+            self._log_file.write(json.dumps({'seq': seq, 'data': survey_data}, ensure_ascii=False, default=str) + '\n')
+            self._log_file.flush()
+            if self.fsync:
+                os.fsync(self._log_file.fileno())
+            self._queue.append((seq, survey_data))
+            self._stats['submitted'] += 1
+            if len(self._queue) >= self.batch_size:
+                self._condition.notify()
+        return seq
+    
+    def stop(self, checkpoint=True):
+        """
+        ⏹️ 백그라운드 스레드를 멈춤 (남은 제출을 모두 반영하고, checkpoint=True면 모델 저장)
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._apply_pending()
+        if checkpoint and self._dirty:
+            self.checkpoint()
+        with self._condition:
+            if self._log_file is not None:
+                self._log_file.close()
+                self._log_file = None
+    
+    def checkpoint(self):
+        """
+        💾 지금까지 반영한 제출을 포함해 모델을 저장하고, 반영된 줄을 로그에서 지웁니다.
         
-        print("💾 모델 저장 완료 (6개 특징 버전)")
+        모델은 새 버전 폴더 하나에 통째로 저장된 뒤에만 바뀌므로(ModelBundle.save),
+        로그를 줄이기 전에 꺼져도 남은 로그와 저장된 모델의 접수 번호가 항상 맞습니다.
+        """
+        # 모델 반영, 체크포인트(모델 저장)와 서비스의 다른 쓰기 작업(재학습 등)이 동시에 실행되지 않도록
+        # 서비스의 쓰기 잠금을 잡습니다.
+        with self.service._write_lock:
+            self.service._save_trained_model()
+            applied_seq = self.service.applied_submission_seq
+            self._dirty = False
+        with self._condition:
+            # 저장하는 동안 새로 접수된 줄은 남겨 두고 임시 파일로 바꿔 씁니다.
+            remaining = [(seq, survey_data) for seq, survey_data in self._read_log() if seq > applied_seq]
+            tmp_path = self.log_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for seq, survey_data in remaining:
+                    f.write(json.dumps({'seq': seq, 'data': survey_data}, ensure_ascii=False, default=str) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            if self._log_file is not None:
+                self._log_file.close()
+            os.replace(tmp_path, self.log_path)
+            if self._log_file is not None:
+                self._log_file = open(self.log_path, 'a', encoding='utf-8')
+            self._last_checkpoint = time.monotonic()
+            self._stats['checkpoints'] += 1
+    
+    def get_stats(self):
+        """
+        📊 접수/반영/체크포인트 통계
+        
+        Returns (반환 값):
+            dict: 접수 수, 반영 수, 실패 수, 반영 묶음 수, 체크포인트 수, 재시작 시 다시 불러온 수, 대기 중인 수
+        """
+        with self._condition:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._queue)
+        return stats
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+    
+    def _read_log(self):
+        """로그 파일의 (접수 번호, 설문 응답) 목록 (마지막 줄이 쓰다 만 줄이면 무시)"""
+        if not os.path.exists(self.log_path):
+            return []
+        entries = []
+        with open(self.log_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                entries.append((entry['seq'], entry['data']))
+        return entries
+    
+    def _write_failed(self, seq, survey_data):
+        """모델에 반영하지 못한 제출을 실패 로그 파일에 한 줄 추가합니다."""
+        entry = {'seq': seq, 'data': survey_data, 'failed_at': datetime.now().isoformat(timespec='seconds')}
+        with open(self.failed_log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+    
+    def _run(self):
+        """백그라운드 반영 루프: 크기/시간 조건마다 반영하고 주기적으로 체크포인트"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._stopping or len(self._queue) >= self.batch_size,
+                                         timeout=self.flush_interval)
+                if self._stopping:
+                    return
+            try:
+                self._apply_pending()
+                if self._dirty and time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+                    self.checkpoint()
+            except Exception as e:
+                print(f"❌ 설문 반영/체크포인트 실패: {e}")
+    
+    def _apply_pending(self):
+        """대기열의 제출을 순서대로 모델에 반영 (저장은 체크포인트에서 한 번에)"""
+        with self._condition:
+            batch, self._queue = self._queue, []
+        if not batch:
+            return
+        failed = 0
+        # 묶음 전체를 반영하고 접수 번호를 올리는 동안 체크포인트나 다른 쓰기 작업이 끼어들지 않습니다.
+        with self.service._write_lock:
+            for seq, survey_data in batch:
+                if not self.service.update_model_with_new_data(survey_data, save=False):
+                    failed += 1
+                    # 반영에 실패한 제출은 실패 로그에 옮겨 두고(로그를 줄이기 전에 디스크에 기록),
+                    # 같은 제출이 뒤의 제출을 계속 막지 않도록 다음 제출로 넘어갑니다.
+                    self._write_failed(seq, survey_data)
+                self.service.applied_submission_seq = seq
+            self._dirty = True
+        with self._condition:
+            self._stats['applied'] += len(batch) - failed
+            self._stats['failed'] += failed
+            self._stats['batches'] += 1
 
 
 # =============================================================================
@@ -601,8 +4622,24 @@ class VacationRecommendationService:
    
    # `train_model` 함수를 호출하여 CSV 파일 경로를 지정하고 초기 학습을 시작합니다.
    vacation_service.train_model('path/to/survey_data.csv')
+   # (선택) 모든 답 조합의 추천 결과를 미리 계산해 두면 요청마다 계산하지 않고 바로 꺼내 씁니다.
+   # vacation_service.train_model('path/to/survey_data.csv', materialize=True)
+   # (선택) 사용자 세그먼트를 만들어 두면 get_segment_recommendations()로 빠른 근사 추천을 쓸 수 있습니다.
+   # vacation_service.train_model('path/to/survey_data.csv', segments=True)
+   # CSV가 아주 커서 메모리에 한 번에 올리기 어렵다면 나누어 읽으면서 학습할 수 있습니다.
+   # vacation_service.train_model('path/to/survey_data.csv', chunksize=100000)
    # 또는, 이미 학습된 모델이 있다면 아래 함수를 호출하여 파일을 불러옵니다.
    vacation_service.load_pretrained_model()
+   # Gunicorn 워커를 여러 개 띄운다면 메모리 맵으로 불러와 워커들이 모델 데이터를 공유하게 할 수 있습니다.
+   # vacation_service.load_pretrained_model(mmap=True)
+   
+   # 새 설문 제출을 받을 쓰기 지연 큐를 서버 시작 시 한 번 만들고 시작합니다.
+   # (로그에 남은 미반영 제출이 있으면 이때 다시 반영합니다.)
+   import atexit
+   from .vacation_recommender import SurveySubmissionQueue
+   survey_queue = SurveySubmissionQueue(vacation_service).start()
+   # 서버가 종료될 때 남은 제출을 모두 반영하고 모델을 저장(체크포인트)합니다.
+   atexit.register(survey_queue.stop)
 
 2. Django views.py에서 추천 생성 (6개 특징 사용):
 
@@ -644,6 +4681,12 @@ class VacationRecommendationService:
            
            # AI 추천을 생성하는 핵심 함수를 호출하고 결과를 받습니다.
            result = vacation_service.get_recommendations(user_data)
+           # 유사 사용자를 특정 조건의 응답자 중에서만 찾고 싶다면 filters를 넘깁니다 (예: 해외 휴가 응답자만).
+           # 자주 쓰는 조건은 서버 시작 시 vacation_service.add_search_filter({...})로 미리 색인해 두세요.
+           # result = vacation_service.get_recommendations(user_data, filters={'휴가_장소_국내_해외': '해외'})
+           # train_model(..., segments=True)로 세그먼트를 만들어 두었다면, 정확도를 조금 양보하고
+           # 응답자 수와 상관없이 일정한 비용으로 답하는 세그먼트 추천을 쓸 수 있습니다 (bench_recommendations.evaluate_segments로 차이 확인).
+           # result = vacation_service.get_segment_recommendations(user_data)
            
            # 결과의 성공 여부에 따라 다른 화면을 보여줍니다.
            if result['success']:
@@ -658,9 +4701,20 @@ class VacationRecommendationService:
                # 추천에 실패하면 'error.html' 템플릿에 오류 메시지를 전달합니다.
                return render(request, 'error.html', {'error': result['error']})
 
+   # 비동기 view(async def)를 사용한다면 AsyncRecommendationService로 감싸서 사용합니다.
+   # 같은 답 조합의 동시 요청은 한 번만 계산하고, 동시에 들어온 서로 다른 요청은 묶어서 한 번에 계산합니다.
+   #
+   #   async_service = AsyncRecommendationService(vacation_service, max_workers=4)
+   #
+   #   async def get_vacation_recommendation(request):
+   #       ...
+   #       result = await async_service.get_recommendations(user_data)
+
 3. Django models.py 연동 (선택사항, 6개 특징 포함):
 
-   # 새로운 설문 데이터가 저장될 때마다 모델을 업데이트하는 예시입니다.
+   # 새로운 설문 데이터가 저장될 때마다 모델에 반영하는 예시입니다.
+   from .vacation_recommender import survey_queue  # 1번에서 시작한 쓰기 지연 큐
+   
    def save_survey_response(request):
        # 사용자가 제출한 설문 데이터를 Django 모델에 저장합니다.
        survey = SurveyResponse.objects.create(
@@ -692,8 +4746,10 @@ class VacationRecommendationService:
            '만족도': survey.satisfaction,
            '다음_휴가_경험': survey.next_vacation_experience,  # 새로 추가!
        }
-       # `update_model_with_new_data` 함수를 호출하여 모델을 업데이트합니다.
-       vacation_service.update_model_with_new_data(survey_data)
+       # 요청 안에서 모델을 업데이트하고 저장하지 않고, 쓰기 지연 큐에 접수만 하고 바로 응답합니다.
+       # (update_model_with_new_data를 요청마다 직접 부르면 제출 때마다 모델 전체를 저장합니다.)
+       # 모아서 모델에 반영하고 주기적으로 저장하는 일은 큐의 백그라운드 스레드가 맡습니다.
+       survey_queue.submit(survey_data)
 
 4. CSV 파일 구조 요구사항 (6개 특징 버전):
 
@@ -713,7 +4769,7 @@ class VacationRecommendationService:
 
 5. 필요한 패키지 설치:
    # 이 모듈을 실행하기 위해 필요한 라이브러리들을 설치하는 명령어입니다.
-   pip install pandas scikit-learn numpy joblib
+   pip install pandas numpy joblib
 
 ⚠️ 주요 업데이트 사항:
 - 기존 5개 특징에서 6개 특징으로 확장 ('다음_휴가_경험' 추가)
@@ -724,4 +4780,4 @@ class VacationRecommendationService:
 - 서버 메모리에 모델을 로드하므로 서버를 재시작하면 모델을 다시 로드해야 합니다.
 - 데이터가 매우 많을 경우(대용량)에는 Redis나 데이터베이스 캐싱(Caching) 같은
   성능 최적화 기술을 추가로 고려하는 것이 좋습니다.
-"""
\ No newline at end of file
+"""
@@ -0,0 +1,1539 @@
+# bench_recommendations.py
+# 📏 vacation_recommender(여름휴가 추천 모듈)의 벤치마크 모음
+# 추천 서비스 코드는 import만 하고, 가상 설문 데이터 생성과 속도/정확도 측정 코드는 이 파일에 둡니다.
+#
+# 실행 예시:
+#   python bench_recommendations.py            -> 모든 벤치마크 실행
+#   python bench_recommendations.py encoding   -> 지정한 벤치마크만 실행
+
+# 필요한 라이브러리(기능 묶음)들을 불러옵니다.
+import json
+import os
+import sys
+import time
+import threading
+import contextlib
+import io
+import asyncio
+import concurrent.futures
+from collections import defaultdict, Counter
+
+# 추천 서비스 모듈을 불러오는 방법과 가상 설문 데이터 생성기는 회귀 테스트와 함께 쓰므로
+# tests/survey_data.py에 있습니다. (다른 위치의 서비스 파일은 VACATION_RECOMMENDER_PATH 환경 변수로 지정)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests'))
+from survey_data import SURVEY_CHOICES, load_service_module, make_synthetic_survey  # noqa: E402
+
+_service_module = load_service_module()
+# pd, joblib은 서비스 모듈의 지연 import 대리 객체를 그대로 씁니다 (cold_start 벤치마크가 import 비용을 잽니다).
+np = _service_module.np
+pd = _service_module.pd
+joblib = _service_module.joblib
+AsyncRecommendationService = _service_module.AsyncRecommendationService
+CosineSimilarityBackend = _service_module.CosineSimilarityBackend
+FeatureEncoder = _service_module.FeatureEncoder
+IVFSimilarityBackend = _service_module.IVFSimilarityBackend
+ModelBundle = _service_module.ModelBundle
+SurveySubmissionQueue = _service_module.SurveySubmissionQueue
+SurveyVocabulary = _service_module.SurveyVocabulary
+VacationRecommendationService = _service_module.VacationRecommendationService
+SATISFACTION_SCORES = _service_module.SATISFACTION_SCORES
+SATISFIED_LEVELS = _service_module.SATISFIED_LEVELS
+SELECTED_FEATURES = _service_module.SELECTED_FEATURES
+canonical_feature_key = _service_module.canonical_feature_key
+make_similarity_backend = _service_module.make_similarity_backend
+_filter_mask = _service_module._filter_mask
+
+
+def _groups_in_first_seen_order(*key_arrays):
+    """
+    여러 키 배열을 묶어 그룹을 나누고, 그룹이 처음 등장한 순서대로
+    (키 값 튜플, 그 그룹에 속한 위치 배열 - 오름차순)을 차례로 돌려줍니다.
+
+    `for` 문으로 딕셔너리에 하나씩 넣었을 때의 키 순서와 같은 순서를 만들기 위한 도구입니다.
+    """
+    n_items = len(key_arrays[0])
+    if n_items == 0:
+        return
+    # 각 키를 정수 코드로 바꾼 뒤 하나의 그룹 번호로 합칩니다. (결측값 NaN도 하나의 값으로 취급)
+    combined = np.zeros(n_items, dtype=np.int64)
+    for keys in key_arrays:
+        codes, uniques = pd.factorize(keys, use_na_sentinel=False)
+        combined, _ = pd.factorize(combined * len(uniques) + codes)
+    
+    n_groups = int(combined.max()) + 1
+    counts = np.bincount(combined, minlength=n_groups)
+    positions_by_group = np.argsort(combined, kind='stable')
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    # pd.factorize는 처음 등장한 순서대로 번호를 매기므로, 그룹 번호 순서가 곧 첫 등장 순서입니다.
+    for group in range(n_groups):
+        positions = positions_by_group[starts[group]:starts[group] + counts[group]]
+        first = positions[0]
+        yield tuple(keys[first] for keys in key_arrays), positions
+
+
+def _build_benchmark_service(n_rows, seed=42, **service_kwargs):
+    """가상 데이터로 학습된 서비스 객체를 만듭니다 (출력 메시지는 숨김)."""
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'survey_data.csv')
+        make_synthetic_survey(n_rows, seed).to_csv(csv_path, index=False)
+        service = VacationRecommendationService(model_dir=os.path.join(tmp_dir, 'ml_models'), **service_kwargs)
+        with contextlib.redirect_stdout(io.StringIO()):
+            if not service.train_model(csv_path):
+                raise RuntimeError('벤치마크용 모델 학습에 실패했습니다.')
+    return service
+
+
+def _time_per_call(func, items, repeat=3):
+    """items의 각 항목으로 func를 호출했을 때 1회 평균 시간(밀리초) 중 가장 빠른 값을 반환합니다."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, (time.perf_counter() - start) / len(items))
+    return best * 1000
+
+
+def benchmark_query_encoding(n_rows=20000, n_queries=500, seed=42):
+    """
+    ⏱️ 사용자 벡터 인코딩 속도 비교 (pandas 방식 vs 고정 인코더)
+
+    예전 `_find_similar_users`가 요청마다 하던
+    DataFrame 생성 + get_dummies + reindex 2번과,
+    FeatureEncoder.encode()의 요청 1건당 처리 시간을 비교합니다.
+    두 방식의 결과 벡터가 같은지도 함께 확인합니다.
+
+    Returns (반환 값):
+        dict: 요청 1건당 처리 시간(ms)과 속도 향상 배수
+    """
+    service = _build_benchmark_service(n_rows, seed)
+    queries = make_synthetic_survey(n_queries, seed + 1).to_dict('records')
+    full_columns = pd.get_dummies(service.original_df).columns
+
+    def legacy_encode(user_data):
+        user_encoded = pd.get_dummies(pd.DataFrame([user_data])).reindex(
+            columns=full_columns, fill_value=0
+        )
+        cols_to_keep = [col for col in full_columns if col in service.features_encoded.columns]
+        return user_encoded[cols_to_keep].reindex(
+            columns=service.features_encoded.columns, fill_value=0
+        )
+
+    for user_data in queries[:50]:
+        expected = legacy_encode(user_data).to_numpy(dtype=np.float32)
+        if not np.array_equal(expected, service.feature_encoder.encode(user_data)):
+            raise AssertionError(f'인코딩 결과가 다릅니다: {user_data}')
+
+    legacy_ms = _time_per_call(legacy_encode, queries)
+    encoder_ms = _time_per_call(service.feature_encoder.encode, queries)
+
+    result = {
+        'n_rows': n_rows,
+        'legacy_ms': round(legacy_ms, 4),
+        'encoder_ms': round(encoder_ms, 4),
+        'speedup': round(legacy_ms / encoder_ms, 1),
+    }
+    print(f"⏱️ 사용자 벡터 인코딩 ({n_rows}행 학습 데이터, 요청 1건당)")
+    print(f"   pandas 방식: {result['legacy_ms']} ms")
+    print(f"   고정 인코더: {result['encoder_ms']} ms  ({result['speedup']}배 빠름)")
+    return result
+
+
+def benchmark_preprocess_memory(n_rows=20000, n_location_variants=1000, n_queries=200, seed=42):
+    """
+    ⏱️ 학습 데이터 전처리 메모리 비교 (전체 컬럼 원-핫 인코딩 vs 선택된 특징만 인코딩)
+
+    예전 `_load_training_data`는 사용자 벡터의 열 목록을 맞추려고 original_df의 모든 컬럼을
+    원-핫 인코딩한 full_encoded_df를 만들어 두었습니다. 주관식에 가까운 휴가_장소 값이
+    n_location_variants가지인 가상 CSV로 두 방식의 전처리 중 최대 메모리(tracemalloc)와
+    남아 있는 인코딩 표 크기를 비교하고, 두 방식의 사용자 벡터가 같은지도 확인합니다.
+
+    Returns (반환 값):
+        dict: 방식별 최대 메모리(MB), 인코딩 표 크기(MB)와 열 개수
+    """
+    import tempfile
+    import tracemalloc
+
+    rng = np.random.default_rng(seed)
+    survey = make_synthetic_survey(n_rows, seed)
+    survey['휴가_장소'] = [f"{location} {variant}" for location, variant in
+                         zip(survey['휴가_장소'], rng.integers(0, n_location_variants, n_rows))]
+    queries = make_synthetic_survey(n_queries, seed + 1).to_dict('records')
+
+    def measure(load):
+        tracemalloc.start()
+        try:
+            kept = load()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return kept, peak / 1024 / 1024
+
+    def frame_mb(frame):
+        return frame.memory_usage(deep=True).sum() / 1024 / 1024
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'survey.csv')
+        survey.to_csv(csv_path, index=False)
+        del survey
+
+        def legacy_load():
+            # 예전 방식: 전체 컬럼 원-핫 인코딩(full_encoded_df) + 선택된 특징 원-핫 인코딩
+            original_df = pd.read_csv(csv_path).fillna('기타')
+            full_encoded_df = pd.get_dummies(original_df)
+            available_features = [feat for feat in SELECTED_FEATURES if feat in original_df.columns]
+            return original_df, full_encoded_df, pd.get_dummies(original_df[available_features])
+
+        (original_df, full_encoded_df, features_encoded), legacy_peak = measure(legacy_load)
+        full_columns = full_encoded_df.columns
+        full_encoded_mb, n_full_columns = frame_mb(full_encoded_df), len(full_columns)
+        del original_df, full_encoded_df
+
+        service = VacationRecommendationService(model_dir=tmp_dir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, current_peak = measure(lambda: service._load_training_data(csv_path))
+
+    # 예전 _find_similar_users의 사용자 벡터 (전체 열 기준 reindex 후 선택된 특징 열만 남김)
+    for user_data in queries:
+        user_encoded = pd.get_dummies(pd.DataFrame([user_data])).reindex(columns=full_columns, fill_value=0)
+        cols_to_keep = [col for col in full_columns if col in features_encoded.columns]
+        expected = user_encoded[cols_to_keep].reindex(columns=features_encoded.columns, fill_value=0)
+        if not np.array_equal(expected.to_numpy(dtype=np.float32), service.feature_encoder.encode(user_data)):
+            raise AssertionError(f'인코딩 결과가 다릅니다: {user_data}')
+
+    result = {
+        'n_rows': n_rows,
+        'legacy_peak_mb': round(legacy_peak, 1),
+        'current_peak_mb': round(current_peak, 1),
+        'full_encoded_mb': round(full_encoded_mb, 1),
+        'full_columns': n_full_columns,
+        'features_encoded_mb': round(frame_mb(service.features_encoded), 1),
+        'feature_columns': service.feature_encoder.width,
+    }
+    print(f"⏱️ 학습 데이터 전처리 메모리 ({n_rows:,}행, 휴가_장소 {n_location_variants:,}가지)")
+    print(f"   전체 컬럼 인코딩: 최대 {result['legacy_peak_mb']} MB, "
+          f"full_encoded_df {result['full_encoded_mb']} MB ({result['full_columns']:,}열)")
+    print(f"   선택된 특징만 인코딩: 최대 {result['current_peak_mb']} MB, "
+          f"features_encoded {result['features_encoded_mb']} MB ({result['feature_columns']}열)")
+    print(f"   사용자 벡터 일치: {n_queries}건 모두 같음")
+    return result
+
+def benchmark_similarity_search(sizes=(10000, 100000, 1000000), n_queries=50, top_k=5,
+                                backends=('cosine', 'inverted_index'), seed=42):
+    """
+    ⏱️ 유사 사용자 검색 속도 비교 (sklearn cosine_similarity + argsort vs 검색 엔진들)
+
+    응답자 수를 늘려가며 요청 1건당 검색 시간을 측정합니다.
+    예전 방식은 요청마다 전체 데이터를 다시 정규화하고 전체를 정렬했지만,
+    CosineSimilarityBackend는 미리 정규화한 행렬과 곱셈 한 번, argpartition만 사용하고,
+    InvertedIndexBackend는 사용자가 고른 답의 역색인만 모아 일치 개수를 셉니다.
+    모든 엔진의 상위 k명이 CosineSimilarityBackend와 같은지도 함께 확인합니다.
+
+    Returns (반환 값):
+        list[dict]: 응답자 수별 요청 1건당 처리 시간(ms)
+    """
+    # sklearn은 비교용으로만 필요하므로 여기서만 불러옵니다.
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    results = []
+    for n_rows in sizes:
+        features = pd.get_dummies(make_synthetic_survey(n_rows, seed)[SELECTED_FEATURES])
+        encoder = FeatureEncoder.from_encoded_frame(features, SELECTED_FEATURES)
+        queries = [encoder.encode(user_data) for user_data in
+                   make_synthetic_survey(n_queries, seed + 1).to_dict('records')]
+
+        def legacy_search(query):
+            similarity_scores = cosine_similarity(query, features)
+            return similarity_scores[0].argsort()[::-1][:top_k]
+
+        row = {'n_rows': n_rows, 'legacy_ms': round(_time_per_call(legacy_search, queries, repeat=1), 3)}
+        reference = None
+        for name in backends:
+            backend = make_similarity_backend(name)
+            start = time.perf_counter()
+            backend.fit(features)
+            row[f'{name}_fit_ms'] = round((time.perf_counter() - start) * 1000, 1)
+            row[f'{name}_ms'] = round(_time_per_call(lambda query: backend.search(query, top_k), queries), 3)
+
+            found = [backend.search(query, top_k)[0].tolist() for query in queries]
+            if reference is None:
+                reference = found
+            elif found != reference:
+                raise AssertionError(f'{name} 엔진의 상위 {top_k}명이 {backends[0]} 엔진과 다릅니다.')
+        results.append(row)
+
+    print(f"⏱️ 유사 사용자 검색 (요청 1건당, 상위 {top_k}명)")
+    for row in results:
+        engines = ', '.join(f"{name} {row[f'{name}_ms']} ms (준비 {row[f'{name}_fit_ms']} ms 1회)"
+                            for name in backends)
+        print(f"   {row['n_rows']:>9,}명: 예전 {row['legacy_ms']} ms -> {engines}")
+    return results
+
+
+def evaluate_recall(backend, exact_backend, queries, top_k=5):
+    """
+    🎯 근사 검색 엔진의 recall@k 평가 (정확한 코사인 검색 대비)
+
+    같은 행렬로 fit한 두 엔진에 같은 질의를 보내고, 근사 엔진의 상위 top_k개가 정답과 얼마나 겹치는지 셉니다.
+    범주형 응답은 유사도가 같은 행이 많아서, 정답과 번호는 달라도 유사도가 정답의 k번째 이상인 행은
+    똑같이 좋은 결과이므로 따로(score_recall) 셉니다.
+
+    Args (매개변수):
+        backend: fit된 근사 검색 엔진 (예: IVFSimilarityBackend - n_probe를 바꿔 가며 같은 객체로 평가 가능)
+        exact_backend: 같은 행렬로 fit된 CosineSimilarityBackend
+        queries (list): 인코딩된 질의 벡터 목록
+
+    Returns (반환 값):
+        dict: recall (정답 번호와 겹치는 비율), score_recall (유사도가 정답 k번째 이상인 비율),
+            요청 1건당 시간 approx_ms / exact_ms
+    """
+    n_hits = n_score_hits = n_expected = 0
+    for query in queries:
+        expected, expected_scores = exact_backend.search(query, top_k)
+        found, found_scores = backend.search(query, top_k)
+        n_expected += len(expected)
+        n_hits += len(set(expected.tolist()) & set(found.tolist()))
+        if len(expected):
+            n_score_hits += int(np.sum(np.asarray(found_scores) >= expected_scores[-1]))
+    return {
+        'recall': round(n_hits / max(1, n_expected), 4),
+        'score_recall': round(n_score_hits / max(1, n_expected), 4),
+        'approx_ms': round(_time_per_call(lambda query: backend.search(query, top_k), queries), 3),
+        'exact_ms': round(_time_per_call(lambda query: exact_backend.search(query, top_k), queries), 3),
+    }
+
+
+def benchmark_ann_search(sizes=(100000, 1000000), n_probes=(1, 2, 4, 8, 16), n_queries=200, top_k=5,
+                         seed=42):
+    """
+    ⏱️ 근사 최근접 이웃(IVF) 검색의 recall@k와 속도 (정확한 코사인 검색 대비)
+
+    응답자 한 명당 한 행인 원-핫 행렬(프로필로 묶지 않은 최악의 경우)에 두 엔진을 fit하고,
+    n_probe를 바꿔 가며 `evaluate_recall()`로 recall@k와 요청 1건당 시간을 잽니다.
+    마지막으로 IVF 엔진으로 학습한 서비스를 모델 번들로 저장했다가 불러와,
+    군집 중심을 다시 학습하지 않고 같은 유사 사용자를 돌려주는지 확인합니다.
+
+    Returns (반환 값):
+        list[dict]: 행 수, n_probe별 recall/score_recall/시간(ms), 색인 준비 시간(ms)
+    """
+    import tempfile
+
+    results = []
+    for n_rows in sizes:
+        features = pd.get_dummies(make_synthetic_survey(n_rows, seed)[SELECTED_FEATURES])
+        encoder = FeatureEncoder.from_encoded_frame(features, SELECTED_FEATURES)
+        queries = [encoder.encode(user_data) for user_data in
+                   make_synthetic_survey(n_queries, seed + 1).to_dict('records')]
+        exact_backend = CosineSimilarityBackend().fit(features)
+        start = time.perf_counter()
+        backend = IVFSimilarityBackend().fit(features)
+        build_ms = (time.perf_counter() - start) * 1000
+        for n_probe in n_probes:
+            backend.n_probe = n_probe
+            row = {'n_rows': n_rows, 'n_lists': len(backend.centroids), 'n_probe': n_probe,
+                   'build_ms': round(build_ms, 1)}
+            row.update(evaluate_recall(backend, exact_backend, queries, top_k))
+            results.append(row)
+
+    # 모델 번들 저장/불러오기: 저장한 군집 중심과 배정을 그대로 쓰는지 확인합니다.
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'survey_data.csv')
+        make_synthetic_survey(20000, seed).to_csv(csv_path, index=False)
+        trained = VacationRecommendationService(model_dir=tmp_dir, similarity_backend='ivf')
+        loaded = VacationRecommendationService(model_dir=tmp_dir, similarity_backend='ivf')
+        with contextlib.redirect_stdout(io.StringIO()):
+            trained.train_model(csv_path)
+            loaded.load_pretrained_model()
+            user_data_list = make_synthetic_survey(50, seed + 1).to_dict('records')
+            same_users = all(trained._find_similar_users(user_data) == loaded._find_similar_users(user_data)
+                             for user_data in user_data_list)
+        same_index = np.array_equal(trained.similarity_backend.centroids, loaded.similarity_backend.centroids)
+        if not (same_users and same_index):
+            raise AssertionError('모델 번들에서 불러온 IVF 색인이 저장할 때와 다릅니다.')
+
+    print(f"⏱️ 근사 최근접 이웃(IVF) 검색 (요청 1건당, 상위 {top_k}명, 정확한 코사인 검색 대비)")
+    for row in results:
+        print(f"   {row['n_rows']:>9,}명, 군집 {row['n_lists']}개 중 {row['n_probe']:>2}개 확인: "
+              f"recall@{top_k} {row['recall']:.3f} (같은 유사도 포함 {row['score_recall']:.3f}), "
+              f"{row['exact_ms']} ms -> {row['approx_ms']} ms (색인 준비 {row['build_ms']} ms 1회)")
+    print("   모델 번들 저장/불러오기: 군집 중심 재학습 없이 같은 유사 사용자 확인 완료")
+    return results
+
+
+def evaluate_segments(service, user_data_list):
+    """
+    🧩 세그먼트 라우터(get_segment_recommendations)의 품질 평가 (정확한 유사도 경로 대비)
+
+    같은 사용자들로 두 경로의 결과를 만들어 비교합니다.
+    정확한 경로는 결과 캐시와 추천 조회표를 거치지 않고 유사 사용자 검색과 점수표 순위를 직접 계산합니다.
+
+    Returns (반환 값):
+        dict: recommendation_overlap (상위 5개 추천 중 겹치는 (휴가 유형, 국내/해외) 비율),
+            top1_agreement (1순위 추천이 같은 비율),
+            cost_agreement (사용자의 (휴가 유형, 국내/해외) 비용 정보가 같은 비율),
+            similarity_ratio (유사 사용자 카드의 평균 유사도, 정확한 경로 대비),
+            요청 1건당 시간 routed_ms / exact_ms
+    """
+    snapshot = service._current_snapshot()
+
+    def exact(user_data):
+        similar_users = service._find_similar_users(user_data, snapshot=snapshot)
+        recommendations = service._generate_recommendations(user_data, similar_users, snapshot)
+        return service._format_for_django(recommendations, similar_users, snapshot)
+
+    def item_keys(result):
+        return [(item['vacation_type'], item['location_type']) for item in result['recommendations']]
+
+    def mean_similarity(result):
+        similarities = [int(user['similarity'].rstrip('%')) for user in result['similar_users']]
+        return sum(similarities) / max(1, len(similarities))
+
+    n_overlap = n_items = n_top1 = n_cost = n_cost_checked = 0
+    similarity_sum = exact_similarity_sum = 0.0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for user_data in user_data_list:
+            routed_result = service.get_segment_recommendations(user_data)
+            exact_result = exact(user_data)
+            routed_items, exact_items = item_keys(routed_result), item_keys(exact_result)
+            n_overlap += len(set(routed_items) & set(exact_items))
+            n_items += len(exact_items)
+            n_top1 += bool(exact_items) and routed_items[:1] == exact_items[:1]
+            vacation_type = user_data.get('가장_최근_여름_휴가')
+            location_type = user_data.get('휴가_장소_국내_해외')
+            expected_cost = exact_result['cost_info'].get(vacation_type, {}).get(location_type)
+            if expected_cost is not None:
+                n_cost_checked += 1
+                n_cost += routed_result['cost_info'].get(vacation_type, {}).get(location_type) == expected_cost
+            similarity_sum += mean_similarity(routed_result)
+            exact_similarity_sum += mean_similarity(exact_result)
+        routed_ms = _time_per_call(service.get_segment_recommendations, user_data_list)
+        exact_ms = _time_per_call(exact, user_data_list)
+    n_queries = max(1, len(user_data_list))
+    return {
+        'n_segments': snapshot.segments.n_segments,
+        'recommendation_overlap': round(n_overlap / max(1, n_items), 4),
+        'top1_agreement': round(n_top1 / n_queries, 4),
+        'cost_agreement': round(n_cost / max(1, n_cost_checked), 4),
+        'similarity_ratio': round(similarity_sum / max(1.0, exact_similarity_sum), 4),
+        'routed_ms': round(routed_ms, 3),
+        'exact_ms': round(exact_ms, 3),
+    }
+
+
+def benchmark_segment_routing(n_rows=100000, segment_counts=(16, 64, 256), n_queries=300, seed=42):
+    """
+    ⏱️ 세그먼트 라우터의 품질과 속도 (정확한 유사도 경로 대비)
+
+    가상 데이터로 학습한 서비스에 세그먼트 수를 바꿔 가며 `build_user_segments()`를 실행하고,
+    `evaluate_segments()`로 추천/비용 정보가 정확한 경로와 얼마나 같은지와 요청 1건당 시간을 잽니다.
+
+    Returns (반환 값):
+        list[dict]: 세그먼트 수별 품질 지표, 시간(ms), 만드는 데 걸린 시간(초)
+    """
+    service = _build_benchmark_service(n_rows, seed)
+    user_data_list = make_synthetic_survey(n_queries, seed + 1).to_dict('records')
+    results = []
+    for n_segments in segment_counts:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            service.build_user_segments(n_segments)
+        row = {'n_rows': n_rows, 'build_seconds': round(time.perf_counter() - start, 2)}
+        row.update(evaluate_segments(service, user_data_list))
+        results.append(row)
+
+    print(f"⏱️ 세그먼트 라우터 ({n_rows:,}명, 요청 {n_queries}건, 정확한 유사도 경로 대비)")
+    for row in results:
+        print(f"   세그먼트 {row['n_segments']:>3}개: 추천 상위 5개 일치 {row['recommendation_overlap']:.1%}, "
+              f"1순위 일치 {row['top1_agreement']:.1%}, 비용 정보 일치 {row['cost_agreement']:.1%}, "
+              f"유사 사용자 유사도 {row['similarity_ratio']:.1%}, "
+              f"{row['exact_ms']} ms -> {row['routed_ms']} ms (만드는 데 {row['build_seconds']}초)")
+    return results
+
+
+def benchmark_filtered_search(n_rows=100000, n_queries=300, top_k=5, seed=42):
+    """
+    ⏱️ 조건부 유사 사용자 검색 (상위 k명을 뽑은 뒤 거르기 vs 조건부 색인)
+
+    예전 방식처럼 전체 응답자에서 상위 top_k명을 뽑은 뒤 조건(만족도, 국내/해외)으로 걸러 내면
+    top_k명보다 적게 남는 요청이 얼마나 되는지 세고, 조건부 색인(FilteredIndex) 검색과 시간을 비교합니다.
+    조건부 색인의 결과가 전체 응답자의 점수를 조건으로 거른 뒤 정렬한 정답과 같은지도 확인합니다.
+
+    Returns (반환 값):
+        list[dict]: 검색 조건별 요청 1건당 시간(ms), top_k명을 못 채운 요청 비율
+    """
+    service = _build_benchmark_service(n_rows, seed, cache_size=0)
+    snapshot = service._current_snapshot()
+    queries = [snapshot.feature_encoder.encode(user_data) for user_data in
+               make_synthetic_survey(n_queries, seed + 1).to_dict('records')]
+    row_profile = snapshot.profile_table.row_profiles()
+    all_rows = np.arange(snapshot.n_respondents)
+
+    results = []
+    for name, filters in [('만족도', None), ('만족도 + 해외', {'휴가_장소_국내_해외': '해외'})]:
+        filters = service._resolve_filters(filters)
+        row_mask = _filter_mask(service.original_df, service._pending_rows, service._coded_respondents,
+                                snapshot.n_respondents, filters)
+
+        def legacy_search(query):
+            top_indices, _ = snapshot.profile_table.top_respondents(snapshot.similarity_backend, query, top_k)
+            return [row_id for row_id in top_indices if row_mask[row_id]]
+
+        start = time.perf_counter()
+        index = snapshot.search_index(filters)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        def filtered_search(query):
+            return index.profile_table.top_respondents(index.similarity_backend, query, top_k)[0]
+
+        n_short = sum(len(legacy_search(query)) < top_k for query in queries)
+        for query in queries:
+            # 정답: 전체 응답자의 점수를 조건으로 거른 뒤 (유사도 높은 순, 번호가 작은 순) 정렬
+            row_scores = snapshot.similarity_backend.score_many(query)[0][row_profile]
+            rows = all_rows[row_mask]
+            expected = rows[np.lexsort((rows, -row_scores[rows]))][:top_k].tolist()
+            if filtered_search(query) != expected:
+                raise AssertionError(f'조건부 색인의 상위 {top_k}명이 정답과 다릅니다 ({name}).')
+        results.append({
+            'filter': name,
+            'n_candidates': int(row_mask.sum()),
+            'short_rate': round(n_short / n_queries, 3),
+            'legacy_ms': round(_time_per_call(legacy_search, queries), 3),
+            'filtered_ms': round(_time_per_call(filtered_search, queries), 3),
+            'build_ms': round(build_ms, 1),
+        })
+
+    print(f"⏱️ 조건부 유사 사용자 검색 ({n_rows:,}명, 요청 1건당, 상위 {top_k}명)")
+    for row in results:
+        print(f"   {row['filter']} (후보 {row['n_candidates']:,}명): "
+              f"거르기 {row['legacy_ms']} ms ({top_k}명 미만 {row['short_rate']:.1%}) -> "
+              f"조건부 색인 {row['filtered_ms']} ms (항상 {top_k}명, 색인 준비 {row['build_ms']} ms 1회)")
+    return results
+
+
+def benchmark_model_update(sizes=(10000, 100000), n_updates=200, seed=42):
+    """
+    ⏱️ 새 응답 1건 반영 시간 (전체 재학습 vs 증분 학습)
+
+    예전 update_model_with_new_data처럼 pd.concat + _learn_patterns 전체 재실행을 하는 경우와,
+    증분 학습(save=False)으로 새 응답 하나만 더하는 경우의 1건당 시간을 비교합니다.
+
+    Returns (반환 값):
+        list[dict]: 응답자 수별 1건당 처리 시간(ms)
+    """
+
+    results = []
+    for n_rows in sizes:
+        service = _build_benchmark_service(n_rows, seed)
+        new_rows = make_synthetic_survey(n_updates, seed + 1).to_dict('records')
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            service._learn_patterns()
+            retrain_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            for row in new_rows:
+                service.update_model_with_new_data(row, save=False)
+            incremental_ms = (time.perf_counter() - start) / n_updates * 1000
+        results.append({
+            'n_rows': n_rows,
+            'retrain_ms': round(retrain_ms, 2),
+            'incremental_ms': round(incremental_ms, 4),
+        })
+
+    print("⏱️ 새 응답 1건 반영 시간")
+    for row in results:
+        print(f"   {row['n_rows']:>9,}명: 전체 재학습 {row['retrain_ms']} ms -> 증분 학습 {row['incremental_ms']} ms")
+    return results
+
+
+def benchmark_write_behind(sizes=(10000, 100000), n_submissions=500, n_sync=20, seed=42):
+    """
+    ⏱️ 설문 제출 1건 응답 시간 (요청 안에서 반영 + 저장 vs 쓰기 지연 큐)
+
+    update_model_with_new_data(save=True)를 제출마다 호출하는 경우(앞쪽 n_sync건만 측정)와
+    SurveySubmissionQueue.submit()(로그 기록 + fsync)의 1건당 시간을 비교하고,
+    큐를 멈출 때(남은 제출 반영 + 체크포인트) 걸리는 시간도 측정합니다.
+    두 방식으로 모든 제출을 반영한 모델과, 체크포인트를 다시 불러온 모델의 추천 결과가 같은지 확인합니다.
+
+    Returns (반환 값):
+        list[dict]: 응답자 수별 1건당 처리 시간(ms)과 큐 정리 시간(ms)
+    """
+    import tempfile
+
+    results = []
+    submissions = make_synthetic_survey(n_submissions, seed + 1).to_dict('records')
+    queries = make_synthetic_survey(50, seed + 2).to_dict('records')
+    for n_rows in sizes:
+        sync_service = _build_benchmark_service(n_rows, seed, cache_size=0)
+        queued_service = _build_benchmark_service(n_rows, seed, cache_size=0)
+        with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+            sync_service.model_dir = os.path.join(tmp_dir, 'sync')
+            queued_service.model_dir = os.path.join(tmp_dir, 'queued')
+            start = time.perf_counter()
+            for row in submissions[:n_sync]:
+                sync_service.update_model_with_new_data(row, save=True)
+            sync_ms = (time.perf_counter() - start) / n_sync * 1000
+            for row in submissions[n_sync:]:
+                sync_service.update_model_with_new_data(row, save=False)
+
+            survey_queue = SurveySubmissionQueue(queued_service, checkpoint_interval=3600).start()
+            latencies = []
+            for row in submissions:
+                start = time.perf_counter()
+                survey_queue.submit(row)
+                latencies.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            survey_queue.stop()
+            drain_ms = (time.perf_counter() - start) * 1000
+
+            reloaded = VacationRecommendationService(model_dir=queued_service.model_dir, cache_size=0)
+            reloaded.load_pretrained_model()
+            expected = [sync_service.get_recommendations(user_data) for user_data in queries]
+            for service in (queued_service, reloaded):
+                if [service.get_recommendations(user_data) for user_data in queries] != expected:
+                    raise AssertionError('쓰기 지연 큐로 반영한 모델의 추천 결과가 다릅니다.')
+            if reloaded.applied_submission_seq != n_submissions:
+                raise AssertionError('체크포인트에 반영된 접수 번호가 저장되지 않았습니다.')
+
+        latencies = np.array(latencies) * 1000
+        results.append({
+            'n_rows': n_rows,
+            'sync_ms': round(sync_ms, 2),
+            'submit_ms': round(float(latencies.mean()), 4),
+            'submit_p99_ms': round(float(np.percentile(latencies, 99)), 4),
+            'drain_ms': round(drain_ms, 1),
+            'stats': survey_queue.get_stats(),
+        })
+
+    print(f"⏱️ 설문 제출 1건 응답 시간 (제출 {n_submissions}건, 결과 및 체크포인트 동일 확인 완료)")
+    for row in results:
+        print(f"   {row['n_rows']:>9,}명: 반영 + 저장 {row['sync_ms']} ms -> 큐 접수 {row['submit_ms']} ms "
+              f"(p99 {row['submit_p99_ms']} ms), 큐 정리(반영 + 체크포인트) {row['drain_ms']} ms")
+    return results
+
+
+def benchmark_concurrent_updates(n_rows=20000, n_readers=4, n_updates=500, idle_seconds=1.0, seed=42):
+    """
+    ⏱️ 모델 업데이트/재학습 중 동시 추천 요청 (읽기 전용 스냅샷)
+
+    n_readers개 스레드가 get_recommendations를 계속 호출하는 동안
+    (1) 아무 변경 없이, (2) 새 응답 n_updates건을 증분 학습하면서, (3) train_model로 전체 재학습하면서
+    구간별 초당 요청 수와 지연 시간(p50/p99/최대)을 측정합니다.
+    실패한 요청이 없는지, 업데이트 전에 잡아 둔 스냅샷의 추천 결과가 업데이트 뒤에도 그대로인지 확인합니다.
+
+    Returns (반환 값):
+        dict: 구간별 요청 수, 초당 요청 수, 지연 시간(ms), 실패 수
+    """
+    import tempfile
+
+    service = _build_benchmark_service(n_rows, seed, cache_size=0)
+    queries = make_synthetic_survey(200, seed + 1).to_dict('records')
+    new_rows = make_synthetic_survey(n_updates, seed + 2).to_dict('records')
+
+    def recommend_with(snapshot, user_data):
+        similar_users = service._find_similar_users(user_data, snapshot=snapshot)
+        recommendations = service._generate_recommendations(user_data, similar_users, snapshot)
+        return service._format_for_django(recommendations, similar_users, snapshot)
+
+    phase = ['idle']
+    latencies = {'idle': [], 'update': [], 'retrain': []}
+    failures = []
+    stop = threading.Event()
+
+    def reader(position):
+        while not stop.is_set():
+            user_data = queries[position % len(queries)]
+            position += 1
+            current = phase[0]
+            start = time.perf_counter()
+            try:
+                ok = service.get_recommendations(user_data)['success']
+            except Exception as e:
+                ok = False
+                failures.append(repr(e))
+            latencies[current].append(time.perf_counter() - start)
+            if not ok and not failures:
+                failures.append(current)
+
+    durations = {}
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        service.model_dir = os.path.join(tmp_dir, 'ml_models')
+        old_snapshot = service._current_snapshot()
+        before = [recommend_with(old_snapshot, user_data) for user_data in queries[:50]]
+        csv_path = os.path.join(tmp_dir, 'survey_data.csv')
+        make_synthetic_survey(n_rows, seed + 3).to_csv(csv_path, index=False)
+
+        threads = [threading.Thread(target=reader, args=(i * 37,)) for i in range(n_readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(idle_seconds)
+        durations['idle'] = idle_seconds
+
+        phase[0] = 'update'
+        start = time.perf_counter()
+        for row in new_rows:
+            service.update_model_with_new_data(row, save=False)
+        durations['update'] = time.perf_counter() - start
+
+        phase[0] = 'retrain'
+        start = time.perf_counter()
+        service.train_model(csv_path)
+        durations['retrain'] = time.perf_counter() - start
+        stop.set()
+        for thread in threads:
+            thread.join()
+        after = [recommend_with(old_snapshot, user_data) for user_data in queries[:50]]
+
+    if failures:
+        raise AssertionError(f'업데이트 중 실패한 추천 요청이 있습니다: {failures[:3]}')
+    if before != after:
+        raise AssertionError('업데이트 전에 잡아 둔 스냅샷의 추천 결과가 바뀌었습니다.')
+
+    result = {'n_rows': n_rows, 'n_readers': n_readers, 'n_updates': n_updates, 'failures': 0}
+    for name, values in latencies.items():
+        values = np.array(values) * 1000
+        result[name] = {
+            'requests': len(values),
+            'seconds': round(durations[name], 2),
+            'requests_per_second': round(len(values) / durations[name]),
+            'p50_ms': round(float(np.percentile(values, 50)), 2) if len(values) else None,
+            'p99_ms': round(float(np.percentile(values, 99)), 2) if len(values) else None,
+            'max_ms': round(float(values.max()), 2) if len(values) else None,
+        }
+    print(f"⏱️ 업데이트 중 동시 추천 ({n_rows:,}명 학습 데이터, 읽는 스레드 {n_readers}개, "
+          f"실패 0건, 이전 스냅샷 결과 변화 없음 확인 완료)")
+    for name, label in (('idle', '변경 없음'), ('update', f'증분 학습 {n_updates}건'), ('retrain', '전체 재학습')):
+        row = result[name]
+        print(f"   {label} ({row['seconds']}초): 요청 {row['requests']:,}건, 초당 {row['requests_per_second']:,}건, "
+              f"p50 {row['p50_ms']} ms, p99 {row['p99_ms']} ms, 최대 {row['max_ms']} ms")
+    return result
+
+
+def _legacy_patterns(satisfied_data):
+    """
+    값 사전(SurveyVocabulary)을 쓰기 전처럼 문자열 키로 만든 (vacation_patterns, cost_patterns)
+
+    만족도 높은 응답들의 경험 목록과 'age_20대' 같은 접두어 키의 비용 목록을 예전
+    `_learn_patterns_vectorized`와 같은 키 순서로 만듭니다 (벤치마크의 비교 기준용).
+    """
+    n_rows = len(satisfied_data)
+
+    def column(name, default):
+        if name in satisfied_data.columns:
+            return satisfied_data[name].to_numpy(dtype=object)
+        return np.full(n_rows, default, dtype=object)
+
+    def prefixed(prefix, values):
+        return np.array([f"{prefix}_{value}" for value in values], dtype=object)
+
+    vacation_type = column('가장_최근_여름_휴가', '기타')
+    location_type = column('휴가_장소_국내_해외', '기타')
+    next_experience = column('다음_휴가_경험', '기타')
+    cost = column('총_비용', '기타')
+    records = [
+        {'location': location, 'satisfaction': satisfaction, 'cost': cost_value,
+         'duration': duration, 'next_experience': next_value}
+        for location, satisfaction, cost_value, duration, next_value in zip(
+            column('휴가_장소', '기타').tolist(), column('만족도', '보통').tolist(), cost.tolist(),
+            column('휴가_기간', '기타').tolist(), next_experience.tolist()
+        )
+    ]
+    vacation_patterns = defaultdict(lambda: defaultdict(list))
+    for (vacation, location), positions in _groups_in_first_seen_order(vacation_type, location_type):
+        vacation_patterns[vacation][location] = [records[position] for position in positions]
+
+    outer_keys = np.column_stack([
+        vacation_type,
+        prefixed('age', column('연령대', '기타')),
+        prefixed('gender', column('성별', '기타')),
+        prefixed('companion', column('함께한_사람', '기타')),
+        prefixed('next', next_experience),
+    ]).ravel()
+    inner_keys = np.column_stack([location_type, vacation_type, vacation_type, location_type, location_type]).ravel()
+    costs = np.repeat(cost, 5)
+    cost_patterns = defaultdict(lambda: defaultdict(list))
+    for (outer, inner), positions in _groups_in_first_seen_order(outer_keys, inner_keys):
+        cost_patterns[outer][inner] = costs[positions].tolist()
+    return vacation_patterns, cost_patterns
+
+
+def _legacy_rank(vacation_patterns, user_next_pref):
+    """예전 `_generate_recommendations`처럼 요청마다 경험 목록을 모두 훑어 추천 목록을 만듭니다 (비교 기준용)."""
+    recommendations = []
+    for vacation_type, location_data in vacation_patterns.items():
+        for location_type, experiences in location_data.items():
+            if len(experiences) >= 2:
+                avg_satisfaction = np.mean([SATISFACTION_SCORES.get(exp['satisfaction'], 3) for exp in experiences])
+                next_experience_score = sum(1 for exp in experiences
+                                            if exp.get('next_experience') == user_next_pref) / len(experiences)
+                total_score = (avg_satisfaction * 0.7) + (next_experience_score * 5 * 0.3)
+                if avg_satisfaction >= 3.0:
+                    top_location = Counter(exp['location'] for exp in experiences).most_common(1)[0]
+                    recommendations.append({
+                        'vacation_type': vacation_type,
+                        'location_type': location_type,
+                        'recommended_location': top_location[0],
+                        'avg_satisfaction': round(avg_satisfaction, 2),
+                        'next_experience_match': round(next_experience_score, 2),
+                        'total_score': round(total_score, 2),
+                        'experience_count': len(experiences),
+                        'confidence': min(len(experiences) / 10 * total_score / 5, 1.0)
+                    })
+    recommendations.sort(key=lambda x: (x['total_score'], x['experience_count']), reverse=True)
+    return recommendations
+
+
+def _legacy_cost_info(cost_patterns):
+    """예전 `_get_cost_recommendations`처럼 비용 목록마다 Counter로 최빈 비용을 찾습니다 (비교 기준용)."""
+    return {key: {inner_key: Counter(costs).most_common(1)[0][0] for inner_key, costs in location_data.items()}
+            for key, location_data in cost_patterns.items()}
+
+
+def benchmark_learn_patterns(sizes=(10000, 100000, 1000000), seed=42):
+    """
+    ⏱️ 패턴 학습 속도 비교 (iterrows 행 단위 vs 그룹 단위 vectorized)
+
+    같은 가상 데이터로 `_learn_patterns(vectorized=False)`와 `_learn_patterns(vectorized=True)`를
+    실행해 학습 시간을 비교하고, 두 결과(키 순서 포함)가 완전히 같은지 확인합니다.
+
+    Returns (반환 값):
+        list[dict]: 응답자 수별 학습 시간(초)과 속도 향상 배수
+    """
+
+    def learned(service):
+        return json.dumps([service.scoring_table.bucket_stats(), service.collaborative_filter.to_preference_patterns(),
+                           service.cost_table.cost_counts()], ensure_ascii=False, default=str)
+
+    service = VacationRecommendationService()
+    results = []
+    for n_rows in sizes:
+        service.original_df = make_synthetic_survey(n_rows, seed)
+        service._pending_rows = []
+        service.vocabulary = SurveyVocabulary()
+        timings = {}
+        outputs = {}
+        for vectorized in (False, True):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                service._learn_patterns(vectorized=vectorized)
+                timings[vectorized] = time.perf_counter() - start
+            outputs[vectorized] = learned(service)
+        if outputs[False] != outputs[True]:
+            raise AssertionError(f'{n_rows}행: vectorized 학습 결과가 행 단위 학습과 다릅니다.')
+        results.append({
+            'n_rows': n_rows,
+            'rowwise_s': round(timings[False], 3),
+            'vectorized_s': round(timings[True], 3),
+            'speedup': round(timings[False] / timings[True], 1),
+        })
+
+    print("⏱️ 패턴 학습 시간 (결과 동일 확인 완료)")
+    for row in results:
+        print(f"   {row['n_rows']:>9,}명: iterrows {row['rowwise_s']} s -> vectorized {row['vectorized_s']} s "
+              f"({row['speedup']}배)")
+    return results
+
+
+def benchmark_generate_recommendations(sizes=(10000, 100000), n_queries=100, seed=42):
+    """
+    ⏱️ 추천 목록 생성 속도 비교 (경험 목록 전체 재계산 vs 사전 집계표)
+
+    예전 `_generate_recommendations`처럼 요청마다 경험 목록(vacation_patterns)을 모두 훑는 방식과
+    ScoringTable.rank()의 요청 1건당 시간을 비교하고, 결과가 같은지 확인합니다.
+
+    Returns (반환 값):
+        list[dict]: 응답자 수별 요청 1건당 처리 시간(ms)
+    """
+    results = []
+    for n_rows in sizes:
+        service = _build_benchmark_service(n_rows, seed)
+        next_prefs = make_synthetic_survey(n_queries, seed + 1)['다음_휴가_경험'].tolist()
+
+        satisfied_data = service.original_df[service.original_df['만족도'].isin(SATISFIED_LEVELS)]
+        vacation_patterns, _ = _legacy_patterns(satisfied_data)
+
+        def legacy_rank(user_next_pref):
+            return _legacy_rank(vacation_patterns, user_next_pref)
+
+        # 값 사전에 있는 모든 '다음_휴가_경험' 값(+ 값이 없는 경우)으로 결과가 같은지 확인합니다.
+        for user_next_pref in list(service.vocabulary.values['다음_휴가_경험']) + [None]:
+            if legacy_rank(user_next_pref) != service.scoring_table.rank(user_next_pref):
+                raise AssertionError(f'추천 결과가 다릅니다: {user_next_pref}')
+
+        legacy_ms = _time_per_call(legacy_rank, next_prefs, repeat=1)
+        table_ms = _time_per_call(service.scoring_table.rank, next_prefs)
+        results.append({
+            'n_rows': n_rows,
+            'legacy_ms': round(legacy_ms, 3),
+            'table_ms': round(table_ms, 4),
+            'speedup': round(legacy_ms / table_ms, 1),
+        })
+
+    print("⏱️ 추천 목록 생성 (요청 1건당, 결과 동일 확인 완료)")
+    for row in results:
+        print(f"   {row['n_rows']:>9,}명: 경험 목록 재계산 {row['legacy_ms']} ms -> 사전 집계표 {row['table_ms']} ms "
+              f"({row['speedup']}배)")
+    return results
+
+
+def benchmark_next_vacation_suggestions(sizes=(10000, 100000, 1000000), n_updates=2000, seed=42):
+    """
+    ⏱️ 다음 휴가 제안 속도 비교 (preference_patterns Counter 딕셔너리 vs CollaborativeFilter 행렬)
+
+    예전처럼 키마다 Counter를 만들어 most_common을 구하는 방식과 행렬의 행을 읽는 방식으로
+    다음 휴가 제안 전체를 만드는 시간, 증분 학습에서 응답 한 개를 더하는 시간을 비교하고 결과가 같은지 확인합니다.
+
+    Returns (반환 값):
+        list[dict]: 응답자 수별 제안 생성 시간(ms)과 응답 1개 반영 시간(µs)
+    """
+    results = []
+    for n_rows in sizes:
+        service = _build_benchmark_service(n_rows, seed)
+        collaborative_filter = service.collaborative_filter
+        preference_patterns = defaultdict(lambda: defaultdict(Counter))
+        for key, patterns in collaborative_filter.to_preference_patterns().items():
+            for pattern_name, counts in patterns.items():
+                preference_patterns[key][pattern_name] = Counter(counts)
+
+        def legacy_suggestions():
+            suggestions = []
+            for age_group, patterns in preference_patterns.items():
+                if 'next_preferences' in patterns:
+                    for vacation_type, count in Counter(patterns['next_preferences']).most_common(3):
+                        suggestions.append({'vacation_type': vacation_type, 'target_age': age_group,
+                                            'popularity': count, 'category': 'age_preference'})
+            for current_vacation, patterns in preference_patterns.items():
+                if 'next_from_current' in patterns:
+                    for next_vacation, count in Counter(patterns['next_from_current']).most_common(2):
+                        suggestions.append({'vacation_type': next_vacation, 'current_vacation': current_vacation,
+                                            'popularity': count, 'category': 'transition_pattern'})
+            return suggestions
+
+        if legacy_suggestions() != service._get_next_vacation_suggestions():
+            raise AssertionError('다음 휴가 제안이 다릅니다.')
+
+        updates = make_synthetic_survey(n_updates, seed + 1).to_dict('records')
+        vocabulary = service.vocabulary
+
+        def legacy_add(update):
+            next_experience = update['다음_휴가_경험']
+            preference_patterns[update['연령대']]['next_preferences'][next_experience] += 1
+            preference_patterns[update['가장_최근_여름_휴가']]['next_from_current'][next_experience] += 1
+
+        def matrix_add(update):
+            # 증분 학습(`_learn_from_row`)처럼 응답 값을 값 번호로 바꾼 뒤 더합니다.
+            collaborative_filter.add(vocabulary.code_record(update))
+
+        results.append({
+            'n_rows': n_rows,
+            'legacy_ms': round(_time_per_call(lambda _: legacy_suggestions(), range(50)), 4),
+            'matrix_ms': round(_time_per_call(lambda _: service._get_next_vacation_suggestions(), range(50)), 4),
+            'legacy_add_us': round(_time_per_call(legacy_add, updates) * 1000, 2),
+            'matrix_add_us': round(_time_per_call(matrix_add, updates) * 1000, 2),
+        })
+        if legacy_suggestions() != service._get_next_vacation_suggestions():
+            raise AssertionError('증분 반영 후 다음 휴가 제안이 다릅니다.')
+
+    print("⏱️ 다음 휴가 제안 (Counter 딕셔너리 -> 전이 행렬, 결과 동일 확인 완료)")
+    for row in results:
+        print(f"   {row['n_rows']:>9,}명: 제안 전체 {row['legacy_ms']} ms -> {row['matrix_ms']} ms, "
+              f"응답 1개 반영 {row['legacy_add_us']} µs -> {row['matrix_add_us']} µs")
+    return results
+
+
+def benchmark_recommendation_cache(n_rows=100000, n_requests=2000, n_distinct=200, cache_size=1024, seed=42):
+    """
+    ⏱️ 추천 결과 캐시 효과 측정 (캐시 없음 vs LRU 캐시)
+
+    n_distinct가지 답 조합만 반복해서 들어오는 요청(실제 서비스처럼 인기 조합이 반복되는 상황)을
+    캐시 없이 처리할 때와 캐시를 사용할 때의 요청 1건당 시간을 비교하고, 결과가 같은지 확인합니다.
+
+    Returns (반환 값):
+        dict: 요청 1건당 처리 시간(ms), 속도 향상 배수, 캐시 통계
+    """
+
+    uncached = _build_benchmark_service(n_rows, seed, cache_size=0)
+    cached = _build_benchmark_service(n_rows, seed, cache_size=cache_size)
+    distinct = make_synthetic_survey(n_distinct, seed + 1).to_dict('records')
+    rng = np.random.default_rng(seed + 2)
+    requests = [distinct[i] for i in rng.integers(0, n_distinct, size=n_requests)]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for user_data in distinct[:20]:
+            if uncached.get_recommendations(user_data) != cached.get_recommendations(user_data):
+                raise AssertionError(f'추천 결과가 다릅니다: {user_data}')
+        uncached_ms = _time_per_call(uncached.get_recommendations, requests, repeat=1)
+        cached_ms = _time_per_call(cached.get_recommendations, requests, repeat=1)
+
+    result = {
+        'n_rows': n_rows,
+        'uncached_ms': round(uncached_ms, 4),
+        'cached_ms': round(cached_ms, 4),
+        'speedup': round(uncached_ms / cached_ms, 1),
+        'cache': cached.get_cache_stats(),
+    }
+    print(f"⏱️ 추천 결과 캐시 ({n_rows:,}명 학습 데이터, {n_distinct}가지 조합 {n_requests}건 요청, 결과 동일 확인 완료)")
+    print(f"   캐시 없음: {result['uncached_ms']} ms -> 캐시 사용: {result['cached_ms']} ms ({result['speedup']}배)")
+    print(f"   캐시 통계: {result['cache']}")
+    return result
+
+
+def benchmark_batch_recommendations(n_rows=100000, n_single=2000, seed=42):
+    """
+    ⏱️ 일괄 추천 처리량 비교 (get_recommendations 반복 호출 vs get_recommendations_batch)
+
+    이메일 캠페인처럼 학습 데이터의 응답자 n_rows명 전체에게 추천을 다시 계산할 때
+    초당 처리 사용자 수를 비교합니다 (결과 캐시는 끄고 측정).
+    반복 호출은 앞쪽 n_single명만 측정하고, 그 결과가 일괄 추천 결과와 같은지도 확인합니다.
+
+    Returns (반환 값):
+        dict: 방식별 초당 처리 사용자 수와 속도 향상 배수
+    """
+    service = _build_benchmark_service(n_rows, seed, cache_size=0)
+    users = make_synthetic_survey(n_rows, seed).to_dict('records')
+    n_users = len(users)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        single_results = [service.get_recommendations(user_data) for user_data in users[:n_single]]
+        single_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch_results = service.get_recommendations_batch(users)
+        batch_seconds = time.perf_counter() - start
+
+    if single_results != batch_results[:n_single]:
+        raise AssertionError('일괄 추천 결과가 개별 추천 결과와 다릅니다.')
+
+    result = {
+        'n_rows': n_rows,
+        'n_users': n_users,
+        'n_distinct': len({canonical_feature_key(user_data) for user_data in users}),
+        'single_users_per_second': round(n_single / single_seconds),
+        'batch_users_per_second': round(n_users / batch_seconds),
+    }
+    result['speedup'] = round(result['batch_users_per_second'] / result['single_users_per_second'], 1)
+    print(f"⏱️ 일괄 추천 ({n_rows:,}명 학습 데이터, 사용자 {n_users:,}명 / 서로 다른 응답 조합 "
+          f"{result['n_distinct']:,}개, 결과 동일 확인 완료)")
+    print(f"   get_recommendations 반복: 초당 {result['single_users_per_second']:,}명")
+    print(f"   get_recommendations_batch: 초당 {result['batch_users_per_second']:,}명 ({result['speedup']}배)")
+    return result
+
+async def run_load_test(handler, requests, concurrency=64):
+    """
+    📈 비동기 부하 테스트
+
+    concurrency명의 가상 사용자가 requests를 하나씩 나눠 가져가며, 응답을 받으면 바로 다음 요청을 보냅니다.
+
+    Args (매개변수):
+        handler: 설문 응답 하나를 받아 추천 결과를 돌려주는 async 함수
+        requests (list): 보낼 설문 응답 목록
+        concurrency (int): 동시에 요청하는 가상 사용자 수
+
+    Returns (반환 값):
+        dict: 초당 요청 수, 지연 시간 p50/p99(ms), 요청 순서대로의 결과 목록
+    """
+    results = [None] * len(requests)
+    latencies = np.zeros(len(requests))
+    positions = iter(range(len(requests)))
+
+    async def client():
+        for position in positions:
+            start = time.perf_counter()
+            results[position] = await handler(requests[position])
+            latencies[position] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        'requests': len(requests),
+        'concurrency': concurrency,
+        'requests_per_second': round(len(requests) / elapsed),
+        'p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 2),
+        'p99_ms': round(float(np.percentile(latencies, 99)) * 1000, 2),
+        'results': results,
+    }
+
+
+def benchmark_async_service(n_rows=100000, n_requests=5000, n_distinct=1000, concurrency=64, max_workers=4,
+                            seed=42):
+    """
+    ⏱️ 비동기 서비스 부하 테스트 (요청마다 스레드에서 계산 vs 요청 병합 + 묶음 계산)
+
+    concurrency명이 동시에 요청하는 상황에서, 동기 view처럼 요청마다 스레드 하나가 get_recommendations를
+    실행하는 방식과 AsyncRecommendationService의 초당 요청 수와 p50/p99 지연 시간을 비교합니다.
+    두 방식 모두 max_workers개 스레드를 사용하고, 결과 캐시는 끈 채로 측정하며 결과가 같은지 확인합니다.
+
+    Returns (반환 값):
+        dict: 방식별 초당 요청 수, p50/p99 지연 시간(ms), 병합/묶음 통계
+    """
+    service = _build_benchmark_service(n_rows, seed, cache_size=0)
+    distinct = make_synthetic_survey(n_distinct, seed + 1).to_dict('records')
+    rng = np.random.default_rng(seed + 2)
+    requests = [distinct[i] for i in rng.integers(0, n_distinct, size=n_requests)]
+
+    async def run_threaded():
+        loop = asyncio.get_running_loop()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return await run_load_test(
+                lambda user_data: loop.run_in_executor(executor, service.get_recommendations, user_data),
+                requests, concurrency
+            )
+
+    async def run_async_service():
+        async with AsyncRecommendationService(service, max_workers=max_workers) as async_service:
+            report = await run_load_test(async_service.get_recommendations, requests, concurrency)
+            report['stats'] = async_service.get_stats()
+            return report
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        threaded = asyncio.run(run_threaded())
+        coalesced = asyncio.run(run_async_service())
+
+    if threaded.pop('results') != coalesced.pop('results'):
+        raise AssertionError('비동기 서비스 결과가 get_recommendations 결과와 다릅니다.')
+
+    result = {'n_rows': n_rows, 'threaded': threaded, 'async': coalesced}
+    result['speedup'] = round(coalesced['requests_per_second'] / threaded['requests_per_second'], 1)
+    print(f"⏱️ 비동기 부하 테스트 ({n_rows:,}명 학습 데이터, {n_distinct}가지 조합 {n_requests:,}건, "
+          f"동시 사용자 {concurrency}명, 스레드 {max_workers}개, 결과 동일 확인 완료)")
+    for label, row in (('요청마다 스레드', threaded), ('병합 + 묶음 계산', coalesced)):
+        print(f"   {label}: 초당 {row['requests_per_second']:,}건, p50 {row['p50_ms']} ms, p99 {row['p99_ms']} ms")
+    print(f"   속도 향상: {result['speedup']}배 / 통계: {coalesced['stats']}")
+    return result
+
+
+def _directory_size(path):
+    """폴더 안 모든 파일 크기의 합(바이트)"""
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+def benchmark_categorical_vocabulary(sizes=(100000, 1000000), seed=42):
+    """
+    ⏱️ 문자열 키 패턴 학습 vs 값 번호(SurveyVocabulary) 집계표 학습 비교
+
+    예전처럼 만족도 높은 응답들을 문자열 키의 경험 목록/비용 목록(vacation_patterns, cost_patterns)으로 모으고
+    Counter로 cost_info를 세는 방식과, 값 번호 배열로 점수표/전이 행렬/비용 빈도표를 세는
+    `_learn_patterns` + cost_info 방식의 시간과 메모리 최대 사용량(tracemalloc)을 비교합니다.
+    추천 목록(rank)과 cost_info가 같은지도 확인합니다.
+
+    Returns (반환 값):
+        list[dict]: 응답자 수별 학습 시간(초)과 메모리 최대 사용량(MB)
+    """
+    import tracemalloc
+
+    def legacy_learn(df):
+        vacation_patterns, cost_patterns = _legacy_patterns(df[df['만족도'].isin(SATISFIED_LEVELS)])
+        return vacation_patterns, _legacy_cost_info(cost_patterns)
+
+    def coded_learn(df):
+        service = VacationRecommendationService()
+        service.original_df = df
+        service._pending_rows = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            service._learn_patterns(vectorized=True)
+        return service, service._get_cost_recommendations()
+
+    results = []
+    for n_rows in sizes:
+        df = make_synthetic_survey(n_rows, seed)
+        row = {'n_rows': n_rows}
+        outputs = {}
+        for label, learn in (('strings', legacy_learn), ('codes', coded_learn)):
+            start = time.perf_counter()
+            outputs[label] = learn(df)
+            row[f'{label}_s'] = round(time.perf_counter() - start, 3)
+            # 시간은 tracemalloc 없이 재고, 메모리는 한 번 더 학습하면서 잽니다.
+            tracemalloc.start()
+            learn(df)
+            row[f'{label}_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+            tracemalloc.stop()
+
+        (vacation_patterns, legacy_cost_info), (service, cost_info) = outputs['strings'], outputs['codes']
+        if legacy_cost_info != cost_info:
+            raise AssertionError(f'{n_rows}행: cost_info가 다릅니다.')
+        for user_next_pref in SURVEY_CHOICES['다음_휴가_경험'] + [None]:
+            if _legacy_rank(vacation_patterns, user_next_pref) != service.scoring_table.rank(user_next_pref):
+                raise AssertionError(f'{n_rows}행: 추천 결과가 다릅니다: {user_next_pref}')
+        row['speedup'] = round(row['strings_s'] / row['codes_s'], 1)
+        results.append(row)
+
+    print("⏱️ 패턴 학습 + cost_info (문자열 키 -> 값 번호, 결과 동일 확인 완료)")
+    for row in results:
+        print(f"   {row['n_rows']:>9,}명: {row['strings_s']} s -> {row['codes_s']} s ({row['speedup']}배), "
+              f"메모리 최대 {row['strings_peak_mb']} MB -> {row['codes_peak_mb']} MB")
+    return results
+
+
+def benchmark_model_loading(sizes=(10000, 100000, 1000000), n_queries=20, seed=42):
+    """
+    ⏱️ 모델 파일 크기와 시작(load_pretrained_model) 시간 비교 (예전 pkl + JSON 형식 vs 모델 번들)
+
+    같은 학습 결과를 예전 형식(features_encoded.pkl, original_data.pkl, indent=2 패턴 JSON)과
+    모델 번들로 각각 저장한 뒤, 불러오는 시간과 메모리 최대 사용량(tracemalloc), 폴더 크기를 비교합니다.
+    두 방식으로 불러온 서비스의 추천 결과가 같은지도 확인합니다.
+
+    Returns (반환 값):
+        list[dict]: 응답자 수별 불러오기 시간(초), 메모리(MB), 파일 크기(MB)
+    """
+    import tempfile
+    import tracemalloc
+
+    results = []
+    for n_rows in sizes:
+        service = _build_benchmark_service(n_rows, seed)
+        queries = make_synthetic_survey(n_queries, seed + 1).to_dict('records')
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            legacy_dir = os.path.join(tmp_dir, 'legacy')
+            bundle_dir = os.path.join(tmp_dir, 'bundle')
+            os.makedirs(legacy_dir)
+            joblib.dump(service.features_encoded, os.path.join(legacy_dir, 'features_encoded.pkl'))
+            joblib.dump(service.original_df, os.path.join(legacy_dir, 'original_data.pkl'))
+            service.feature_encoder.save(os.path.join(legacy_dir, 'feature_encoder.json'))
+            vacation_patterns, cost_patterns = _legacy_patterns(
+                service.original_df[service.original_df['만족도'].isin(SATISFIED_LEVELS)])
+            for file_name, patterns in (('learned_vacation_patterns.json', vacation_patterns),
+                                        ('preference_patterns.json',
+                                         service.collaborative_filter.to_preference_patterns()),
+                                        ('cost_patterns.json', cost_patterns)):
+                with open(os.path.join(legacy_dir, file_name), 'w', encoding='utf-8') as f:
+                    json.dump(dict(patterns), f, ensure_ascii=False, indent=2)
+            service.model_dir = bundle_dir
+            with contextlib.redirect_stdout(io.StringIO()):
+                service._save_trained_model()
+
+            row = {'n_rows': n_rows}
+            loaded = {}
+            for label, model_dir in (('legacy', legacy_dir), ('bundle', bundle_dir)):
+                loaded[label] = VacationRecommendationService(model_dir=model_dir, cache_size=0)
+                tracemalloc.start()
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    if not loaded[label].load_pretrained_model():
+                        raise RuntimeError(f'{label} 모델을 불러오지 못했습니다.')
+                row[f'{label}_seconds'] = round(time.perf_counter() - start, 3)
+                row[f'{label}_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+                tracemalloc.stop()
+                row[f'{label}_disk_mb'] = round(_directory_size(model_dir) / 2 ** 20, 2)
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                for user_data in queries:
+                    if loaded['legacy'].get_recommendations(user_data) != loaded['bundle'].get_recommendations(user_data):
+                        raise AssertionError(f'추천 결과가 다릅니다: {user_data}')
+        results.append(row)
+
+    print("⏱️ 모델 불러오기 (예전 pkl + JSON 형식 -> 모델 번들, 추천 결과 동일 확인 완료)")
+    for row in results:
+        print(f"   {row['n_rows']:>9,}명: 시간 {row['legacy_seconds']}초 -> {row['bundle_seconds']}초, "
+              f"메모리 최대 {row['legacy_peak_mb']} MB -> {row['bundle_peak_mb']} MB, "
+              f"파일 {row['legacy_disk_mb']} MB -> {row['bundle_disk_mb']} MB")
+    return results
+
+
+def _process_memory_mb():
+    """
+    현재 프로세스의 메모리 사용량(MB)
+
+    Linux에서는 /proc/self/smaps_rollup으로 RSS, PSS(공유 메모리를 프로세스 수로 나눈 값),
+    Private(이 프로세스만 쓰는 메모리)를 읽고, 그 밖의 운영체제에서는 최대 RSS만 반환합니다.
+    """
+    fields = {'Rss': 'rss_mb', 'Pss': 'pss_mb', 'Private_Clean': 'private_mb', 'Private_Dirty': 'private_mb'}
+    try:
+        usage = {}
+        with open('/proc/self/smaps_rollup', 'r') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                if name in fields:
+                    key = fields[name]
+                    usage[key] = usage.get(key, 0) + int(value.split()[0]) / 1024
+        return {key: round(value, 1) for key, value in usage.items()}
+    except OSError:
+        import resource
+        return {'rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+
+
+def _shared_loading_worker(model_dir, mmap, n_queries=20, seed=42):
+    """benchmark_shared_loading의 워커 프로세스: 모델을 불러와 요청을 처리한 뒤 메모리 사용량을 출력합니다."""
+    import sys
+
+    before = _process_memory_mb()
+    service = VacationRecommendationService(model_dir=model_dir, cache_size=0)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if not service.load_pretrained_model(mmap=mmap):
+            raise RuntimeError('모델을 불러오지 못했습니다.')
+        load_seconds = time.perf_counter() - start
+        for user_data in make_synthetic_survey(n_queries, seed + 1).to_dict('records'):
+            service.get_recommendations(user_data)
+    print('READY', flush=True)
+    # 모든 워커가 동시에 떠 있는 상태에서 측정해야 공유 메모리가 PSS에 나누어 반영됩니다.
+    sys.stdin.readline()
+    print('RESULT ' + json.dumps({'before': before, 'after': _process_memory_mb(),
+                                  'load_seconds': round(load_seconds, 3)}), flush=True)
+    sys.stdin.readline()
+
+
+def benchmark_shared_loading(n_rows=1000000, n_workers=4, seed=42):
+    """
+    ⏱️ 워커 프로세스별 메모리 비교 (일반 불러오기 vs 메모리 맵 공유 불러오기)
+
+    Gunicorn처럼 워커 n_workers개를 동시에 띄워 같은 모델 폴더를 불러온 뒤
+    워커 1개당 RSS, PSS(공유 메모리를 나눈 실제 부담), Private 메모리를 비교합니다.
+    (워커는 이 파일을 새로 import하는 별도 파이썬 프로세스로 실행합니다.)
+
+    Returns (반환 값):
+        dict: 방식별 워커 평균 메모리(MB)와 불러오기 시간(초)
+    """
+    import subprocess
+    import sys
+    import tempfile
+
+    worker_code = (
+        "import importlib.util, sys\n"
+        "spec = importlib.util.spec_from_file_location('bench_recommendations_worker', sys.argv[1])\n"
+        "module = importlib.util.module_from_spec(spec)\n"
+        "spec.loader.exec_module(module)\n"
+        "module._shared_loading_worker(sys.argv[2], sys.argv[3] == 'mmap')\n"
+    )
+    service = _build_benchmark_service(n_rows, seed)
+    results = {'n_rows': n_rows, 'n_workers': n_workers}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        service.model_dir = tmp_dir
+        with contextlib.redirect_stdout(io.StringIO()):
+            service._save_trained_model()
+        del service
+
+        for mode in ('eager', 'mmap'):
+            workers = [subprocess.Popen([sys.executable, '-c', worker_code, os.path.abspath(__file__), tmp_dir, mode],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+                       for _ in range(n_workers)]
+            try:
+                for worker in workers:
+                    for line in worker.stdout:
+                        if line.startswith('READY'):
+                            break
+                    else:
+                        raise RuntimeError('워커 프로세스가 준비되지 못했습니다.')
+                reports = []
+                for worker in workers:
+                    worker.stdin.write('\n')
+                    worker.stdin.flush()
+                    for line in worker.stdout:
+                        if line.startswith('RESULT '):
+                            reports.append(json.loads(line[len('RESULT '):]))
+                            break
+            finally:
+                for worker in workers:
+                    worker.stdin.close()
+                    worker.wait()
+
+            summary = {'load_seconds': round(float(np.mean([report['load_seconds'] for report in reports])), 3)}
+            for key in reports[0]['after']:
+                summary[key] = round(float(np.mean([report['after'][key] for report in reports])), 1)
+                summary[f'{key}_model'] = round(float(np.mean(
+                    [report['after'][key] - report['before'].get(key, 0) for report in reports])), 1)
+            results[mode] = summary
+
+    print(f"⏱️ 워커 {n_workers}개 동시 실행 시 워커 1개당 메모리 ({n_rows:,}명 모델)")
+    for mode, label in (('eager', '일반 불러오기'), ('mmap', '메모리 맵 공유')):
+        row = results[mode]
+        memory = ', '.join(f"{key.replace('_mb', '').upper()} {row[key]} MB (모델 +{row[key + '_model']} MB)"
+                           for key in ('rss_mb', 'pss_mb', 'private_mb') if key in row)
+        print(f"   {label}: {memory}, 불러오기 {row['load_seconds']}초")
+    return results
+
+
+def _cold_start_worker(model_dir, start, imported):
+    """benchmark_cold_start의 워커 프로세스: 모델을 불러와 첫 추천을 만들 때까지의 시간을 출력합니다."""
+    import sys
+
+    user_data = {field: choices[0] for field, choices in SURVEY_CHOICES.items()}
+    with contextlib.redirect_stdout(io.StringIO()):
+        service = VacationRecommendationService(model_dir=model_dir)
+        if not service.load_pretrained_model(mmap=True):
+            raise RuntimeError('모델을 불러오지 못했습니다.')
+        loaded = time.perf_counter()
+        result = service.get_recommendations(user_data)
+    first = time.perf_counter()
+    print('RESULT ' + json.dumps({
+        'import_seconds': imported - start,
+        'load_seconds': loaded - imported,
+        'first_ms': (first - loaded) * 1000,
+        'total_seconds': first - start,
+        'success': result['success'],
+        'heavy_modules': sorted(name for name in ('pandas', 'joblib', 'sklearn') if name in sys.modules),
+    }), flush=True)
+
+
+def benchmark_cold_start(n_rows=100000, repeat=3, seed=42):
+    """
+    ⏱️ 워커 시작 시간 측정 (모듈 import 시간, 첫 추천까지 걸린 시간)
+
+    새 파이썬 프로세스에서 이 파일을 import하고 저장된 모델 번들을 불러와 첫 추천을 만들 때까지의 시간을
+    두 가지 경우로 잽니다.
+    - eager: 예전처럼 import할 때 pandas와 joblib을 함께 불러오는 경우
+    - lazy: numpy와 표준 라이브러리만으로 추천하는 경우 (현재 방식)
+    추천 중에 pandas/joblib/sklearn이 불러와졌는지도 함께 보여줍니다.
+
+    Returns (반환 값):
+        dict: 방식별 평균 시간(초/ms)과 불러와진 무거운 라이브러리 목록
+    """
+    import subprocess
+    import sys
+    import tempfile
+
+    worker_code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "if sys.argv[3] == 'eager':\n"
+        "    import pandas, joblib\n"
+        "import importlib.util\n"
+        "spec = importlib.util.spec_from_file_location('bench_recommendations_worker', sys.argv[1])\n"
+        "module = importlib.util.module_from_spec(spec)\n"
+        "spec.loader.exec_module(module)\n"
+        "module._cold_start_worker(sys.argv[2], start, time.perf_counter())\n"
+    )
+    service = _build_benchmark_service(n_rows, seed)
+    results = {'n_rows': n_rows}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        service.model_dir = tmp_dir
+        with contextlib.redirect_stdout(io.StringIO()):
+            service._save_trained_model()
+        del service
+
+        for mode in ('eager', 'lazy'):
+            reports = []
+            for _ in range(repeat):
+                output = subprocess.run([sys.executable, '-c', worker_code, os.path.abspath(__file__), tmp_dir, mode],
+                                        capture_output=True, text=True, check=True).stdout
+                line = next(line for line in output.splitlines() if line.startswith('RESULT '))
+                reports.append(json.loads(line[len('RESULT '):]))
+            if not all(report['success'] for report in reports):
+                raise AssertionError('추천 생성에 실패했습니다.')
+            summary = {key: round(float(np.mean([report[key] for report in reports])), 3)
+                       for key in ('import_seconds', 'load_seconds', 'first_ms', 'total_seconds')}
+            summary['heavy_modules'] = reports[-1]['heavy_modules']
+            results[mode] = summary
+
+    print(f"⏱️ 워커 시작 시간 ({n_rows:,}명 모델, {repeat}회 평균)")
+    for mode, label in (('eager', 'pandas/joblib 함께 import'), ('lazy', 'numpy + 표준 라이브러리')):
+        row = results[mode]
+        print(f"   {label}: import {row['import_seconds']}초, 모델 불러오기 {row['load_seconds']}초, "
+              f"첫 추천 {row['first_ms']} ms, 합계 {row['total_seconds']}초 "
+              f"(불러온 무거운 라이브러리: {', '.join(row['heavy_modules']) or '없음'})")
+    return results
+
+
+def _streaming_training_worker(csv_path, model_dir, chunksize):
+    """benchmark_streaming_training의 워커 프로세스: CSV로 학습한 뒤 최대 메모리 사용량과 시간을 출력합니다."""
+    import resource
+
+    # pandas를 미리 불러와서 라이브러리 자체의 메모리는 학습 전 기준값에 포함시킵니다.
+    pd.DataFrame
+    before_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    service = VacationRecommendationService(model_dir=model_dir)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        success = service.train_model(csv_path, chunksize=chunksize)
+    seconds = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print('RESULT ' + json.dumps({'success': success, 'seconds': round(seconds, 2),
+                                  'peak_mb': round(peak_mb, 1), 'train_mb': round(peak_mb - before_mb, 1)}),
+          flush=True)
+
+
+def benchmark_streaming_training(n_rows=1000000, chunksize=100000, seed=42):
+    """
+    ⏱️ CSV 학습 최대 메모리 비교 (한 번에 읽기 vs 나누어 읽기)
+
+    n_rows행짜리 가상 설문 CSV를 만들어 새 파이썬 프로세스에서 각각 학습한 뒤
+    학습 중 늘어난 최대 메모리(최대 RSS)와 학습 시간을 비교합니다.
+    두 방식으로 저장된 모델 번들의 배열/점수표/cost_info가 같은지도 확인합니다.
+
+    Returns (반환 값):
+        dict: 방식별 최대 메모리(MB), 학습 시간(초), 결과 일치 여부
+    """
+    import subprocess
+    import sys
+    import tempfile
+
+    worker_code = (
+        "import importlib.util, sys\n"
+        "spec = importlib.util.spec_from_file_location('bench_recommendations_worker', sys.argv[1])\n"
+        "module = importlib.util.module_from_spec(spec)\n"
+        "spec.loader.exec_module(module)\n"
+        "module._streaming_training_worker(sys.argv[2], sys.argv[3], int(sys.argv[4]) or None)\n"
+    )
+    results = {'n_rows': n_rows, 'chunksize': chunksize}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'survey.csv')
+        make_synthetic_survey(n_rows, seed).to_csv(csv_path, index=False)
+        results['csv_mb'] = round(os.path.getsize(csv_path) / 1024 / 1024, 1)
+
+        bundles = {}
+        for mode, mode_chunksize in (('full', 0), ('chunked', chunksize)):
+            model_dir = os.path.join(tmp_dir, mode)
+            output = subprocess.run([sys.executable, '-c', worker_code, os.path.abspath(__file__),
+                                     csv_path, model_dir, str(mode_chunksize)],
+                                    capture_output=True, text=True, check=True).stdout
+            line = next(line for line in output.splitlines() if line.startswith('RESULT '))
+            results[mode] = json.loads(line[len('RESULT '):])
+            if not results[mode]['success']:
+                raise AssertionError('모델 학습에 실패했습니다.')
+            bundles[mode] = ModelBundle.load(os.path.join(model_dir, ModelBundle.DIR_NAME))
+
+        full, chunked = bundles['full'], bundles['chunked']
+        results['identical'] = (
+            all(np.array_equal(full.arrays[name], chunked.arrays[name]) for name in full.arrays)
+            and all(np.array_equal(full.pattern_arrays[name], chunked.pattern_arrays[name])
+                    for name in full.pattern_arrays)
+            and all(full.manifest[key] == chunked.manifest[key]
+                    for key in ('columns', 'vocabulary', 'feature_encoder', 'static_payload'))
+        )
+
+    print(f"⏱️ CSV 학습 최대 메모리 ({n_rows:,}행, CSV {results['csv_mb']} MB)")
+    for mode, label in (('full', '한 번에 읽기'), ('chunked', f'{chunksize:,}행씩 나누어 읽기')):
+        row = results[mode]
+        print(f"   {label}: 학습 중 최대 메모리 +{row['train_mb']} MB (최대 RSS {row['peak_mb']} MB), "
+              f"{row['seconds']}초")
+    print(f"   결과 일치: {results['identical']}")
+    return results
+
+BENCHMARKS = {
+    'encoding': benchmark_query_encoding,
+    'preprocess': benchmark_preprocess_memory,
+    'similarity': benchmark_similarity_search,
+    'filtered': benchmark_filtered_search,
+    'ann': benchmark_ann_search,
+    'segments': benchmark_segment_routing,
+    'update': benchmark_model_update,
+    'writebehind': benchmark_write_behind,
+    'snapshot': benchmark_concurrent_updates,
+    'learn': benchmark_learn_patterns,
+    'vocabulary': benchmark_categorical_vocabulary,
+    'scoring': benchmark_generate_recommendations,
+    'transitions': benchmark_next_vacation_suggestions,
+    'cache': benchmark_recommendation_cache,
+    'batch': benchmark_batch_recommendations,
+    'async': benchmark_async_service,
+    'loading': benchmark_model_loading,
+    'shared': benchmark_shared_loading,
+    'coldstart': benchmark_cold_start,
+    'streaming': benchmark_streaming_training,
+}
+
+
+if __name__ == "__main__":
+    # 벤치마크 실행 예시:
+    #   python bench_recommendations.py            -> 모든 벤치마크 실행
+    #   python bench_recommendations.py encoding   -> 지정한 벤치마크만 실행
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        if name not in BENCHMARKS:
+            print(f"❌ 알 수 없는 벤치마크: {name} (사용 가능: {', '.join(BENCHMARKS)})")
+            continue
+        BENCHMARKS[name]()
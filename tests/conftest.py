@@ -0,0 +1,61 @@
+# tests/conftest.py
+# 🧪 추천 서비스 회귀 테스트에서 함께 쓰는 준비물(fixture)
+# 서비스 모듈과 가상 설문 데이터는 벤치마크와 함께 쓰는 survey_data.py로 불러오고 만듭니다.
+
+import contextlib
+import io
+
+import pytest
+
+from survey_data import load_service_module, make_synthetic_survey
+
+recommender = load_service_module()
+
+# 테스트용 학습 데이터 크기입니다. 같은 답 조합이 여러 번 나오도록 선택지 조합 수보다 작게 잡습니다.
+N_ROWS = 600
+
+
+def quiet():
+    """서비스가 출력하는 진행 메시지를 숨깁니다."""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def make_queries(n, seed):
+    """가상 설문 응답 n개를 추천 요청 형식(dict 목록)으로 만듭니다."""
+    return make_synthetic_survey(n, seed).to_dict('records')
+
+
+def train_service(csv_path, model_dir, **train_kwargs):
+    """csv_path로 학습한 서비스를 model_dir에 저장하고 반환합니다."""
+    service = recommender.VacationRecommendationService(model_dir=model_dir, cache_size=0)
+    with quiet():
+        assert service.train_model(csv_path, **train_kwargs)
+    return service
+
+
+def load_service(model_dir, **load_kwargs):
+    """model_dir에 저장된 모델 번들을 불러온 서비스를 반환합니다."""
+    service = recommender.VacationRecommendationService(model_dir=model_dir, cache_size=0)
+    with quiet():
+        assert service.load_pretrained_model(**load_kwargs)
+    return service
+
+
+@pytest.fixture
+def survey_csv(tmp_path):
+    """가상 설문 CSV 파일 경로"""
+    csv_path = str(tmp_path / 'survey_data.csv')
+    make_synthetic_survey(N_ROWS, seed=42).to_csv(csv_path, index=False)
+    return csv_path
+
+
+@pytest.fixture
+def queries():
+    """학습 데이터에 없는 답 조합도 섞인 추천 요청 목록"""
+    return make_queries(40, seed=7)
+
+
+@pytest.fixture
+def trained(survey_csv, tmp_path):
+    """survey_csv로 학습하고 tmp_path/ml_models에 저장한 서비스"""
+    return train_service(survey_csv, str(tmp_path / 'ml_models'))
@@ -0,0 +1,85 @@
+# tests/survey_data.py
+# 🧪 회귀 테스트와 벤치마크(bench_recommendations.py)가 함께 쓰는 도구
+# - 추천 서비스 모듈('Api 최종 수정본.py')을 vacation_recommender라는 이름으로 불러오기
+# - 설문지 선택지로 만든 가상(synthetic) 설문 데이터
+
+import importlib
+import importlib.util
+import os
+import sys
+
+import numpy as np
+
+# 추천 서비스 모듈의 이름과 경로입니다.
+# Django 프로젝트에서는 vacation_recommender.py로 import할 수 있으므로 그쪽을 먼저 사용하고,
+# 이 저장소에서 바로 실행할 때는 저장소 폴더의 'Api 최종 수정본.py'를 vacation_recommender라는 이름으로 불러옵니다.
+# 다른 위치의 파일을 쓰고 싶으면 VACATION_RECOMMENDER_PATH 환경 변수로 경로를 지정합니다.
+SERVICE_MODULE_NAME = 'vacation_recommender'
+SERVICE_MODULE_PATH = os.environ.get(
+    'VACATION_RECOMMENDER_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Api 최종 수정본.py'))
+
+
+def load_service_module():
+    """추천 서비스 모듈을 불러옵니다 (import할 수 없으면 SERVICE_MODULE_PATH 파일에서 불러옴)."""
+    if SERVICE_MODULE_NAME in sys.modules:
+        return sys.modules[SERVICE_MODULE_NAME]
+    if 'VACATION_RECOMMENDER_PATH' not in os.environ:
+        try:
+            return importlib.import_module(SERVICE_MODULE_NAME)
+        except ImportError:
+            pass
+    spec = importlib.util.spec_from_file_location(SERVICE_MODULE_NAME, SERVICE_MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    # 모듈 안의 클래스가 자기 모듈을 찾을 수 있도록(pickle, dataclass 등) 실행 전에 등록합니다.
+    sys.modules[SERVICE_MODULE_NAME] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[SERVICE_MODULE_NAME]
+        raise
+    return module
+
+
+# 설문지(survey.html)의 선택지 목록입니다.
+# 테스트/벤치마크용 가상(synthetic) 데이터를 만들 때 사용합니다.
+SURVEY_CHOICES = {
+    '연령대': ['10대', '20대', '30대', '40대', '50대', '60대 이상'],
+    '성별': ['남성', '여성'],
+    '가장_최근_여름_휴가': ['해수욕, 물놀이', '등산, 캠핑', '문화생활', '도시 관광',
+                      '휴양·힐링', '맛집 투어', '친척·지인 방문', '기타'],
+    '휴가_장소_국내_해외': ['국내', '해외'],
+    '휴가_장소': ['서울', '부산', '강원', '경북', '전남', '제주',
+              '동아시아', '동남아시아', '서유럽', '북미', '오세아니아'],
+    '주요_교통수단': ['자동차', '버스', '기차', '항공편', '배', '도보'],
+    '휴가_기간': ['1일', '2~3일', '4~6일', '7~15일', '15일 이상'],
+    '함께한_사람': ['혼자', '가족', '친구', '연인', '직장 동료', '동호회', '기타'],
+    '총_비용': ['10만 원 이하', '10만~30만 원', '30만~50만 원',
+             '50만~100만 원', '100만~200만 원', '200만 원 이상'],
+    '만족도': ['매우 만족', '만족', '보통', '불만족', '매우 불만족'],
+    '다음_휴가_경험': ['바다/섬에서 물놀이', '산·계곡에서 활동', '문화 체험', '도시 관광',
+                  '휴양·힐링', '맛집 탐방', '친척·지인 방문', '기타'],
+}
+
+
+def make_synthetic_survey(n_rows, seed=42):
+    """
+    📊 테스트/벤치마크용 가상 설문 데이터 생성
+
+    SURVEY_CHOICES의 선택지 중에서 무작위로 골라 n_rows개의 응답을 만듭니다.
+
+    Args (매개변수):
+        n_rows (int): 만들 응답 개수
+        seed (int): 같은 데이터를 다시 만들 수 있도록 고정하는 난수 시드
+
+    Returns (반환 값):
+        pd.DataFrame: CSV 파일과 같은 컬럼 구조의 데이터프레임
+    """
+    # pandas는 여기서 처음 import합니다 (cold_start 벤치마크 워커가 이 모듈을 불러와도 pandas가 따라오지 않도록).
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        column: np.asarray(choices, dtype=object)[rng.integers(0, len(choices), size=n_rows)]
+        for column, choices in SURVEY_CHOICES.items()
+    })
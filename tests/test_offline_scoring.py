@@ -0,0 +1,103 @@
+# tests/test_offline_scoring.py
+# 🧪 일괄 채점기(머신러닝Api 코드.py) 회귀 테스트
+# 같은 설문을 CSV로 넣든 JSONL로 넣든 같은 결과 파일이 나와야 합니다.
+
+import importlib.util
+import io
+import json
+import os
+import pickle
+import sys
+
+import pandas as pd
+import pytest
+
+from conftest import make_synthetic_survey, quiet
+
+SCORING_MODULE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '머신러닝Api 코드.py')
+
+
+@pytest.fixture(scope='module')
+def scoring():
+    """일괄 채점기 모듈 (summer_vacation_recommender)"""
+    spec = importlib.util.spec_from_file_location('summer_vacation_recommender', SCORING_MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    # 후보 조건 같은 모듈 안의 객체를 pickle할 수 있도록 모듈 이름으로 등록합니다.
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_csv_and_jsonl_inputs_score_identically(scoring, tmp_path):
+    """CSV의 식별 컬럼 값은 JSONL과 같은 타입으로 읽혀, 두 입력의 채점 결과가 바이트 단위로 같아야 합니다."""
+    train_csv = str(tmp_path / 'survey_data.csv')
+    make_synthetic_survey(300, seed=42).to_csv(train_csv, index=False)
+    surveys = make_synthetic_survey(6, seed=7).to_dict('records')
+    for survey, user_id in zip(surveys, [101, 'A-7', '007', 2.5, -3, 'true']):
+        survey['user_id'] = user_id
+
+    jsonl_path = str(tmp_path / 'surveys.jsonl')
+    with open(jsonl_path, 'w', encoding='utf-8') as f:
+        for survey in surveys:
+            f.write(json.dumps(survey, ensure_ascii=False) + '\n')
+    csv_path = str(tmp_path / 'surveys.csv')
+    pd.DataFrame(surveys).to_csv(csv_path, index=False)
+
+    assert [survey['user_id'] for survey in scoring.iter_surveys(csv_path, id_column='user_id')] == \
+        [survey['user_id'] for survey in surveys]
+
+    with quiet():
+        recommender = scoring.SummerVacationRecommender()
+        recommender.load_and_preprocess_data(train_csv)
+        outputs = []
+        for input_path in (jsonl_path, csv_path):
+            output = io.StringIO()
+            report = scoring.score_file(recommender, input_path, output, id_column='user_id')
+            assert report['rows'] == len(surveys)
+            outputs.append(output.getvalue())
+    assert outputs[0] == outputs[1]
+
+
+def test_unpicklable_filters_and_small_inputs_score_in_process(scoring, tmp_path, monkeypatch):
+    """fork를 못 쓰는 환경에서 람다 후보 조건이 있거나 입력이 한 묶음뿐이면 워커 없이 같은 결과를 써야 합니다."""
+    train_csv = str(tmp_path / 'survey_data.csv')
+    make_synthetic_survey(300, seed=42).to_csv(train_csv, index=False)
+    jsonl_path = str(tmp_path / 'surveys.jsonl')
+    with open(jsonl_path, 'w', encoding='utf-8') as f:
+        for survey in make_synthetic_survey(12, seed=7).to_dict('records'):
+            f.write(json.dumps(survey, ensure_ascii=False) + '\n')
+
+    with quiet():
+        recommender = scoring.SummerVacationRecommender()
+        recommender.load_and_preprocess_data(train_csv)
+    overseas = recommender.original_df['휴가_장소_국내_해외'] == '해외'
+    recommender.add_candidate_filter('overseas_spec', {'휴가_장소_국내_해외': '해외'})
+    spec = pickle.loads(pickle.dumps(recommender.candidate_filters['overseas_spec']))
+    assert spec(recommender.original_df).tolist() == overseas.tolist()
+
+    expected = io.StringIO()
+    scoring.score_file(recommender, jsonl_path, expected, workers=1, batch_size=5)
+    output = io.StringIO()
+    assert scoring.score_file(recommender, jsonl_path, output, workers=4, batch_size=20)['workers'] == 1
+    assert output.getvalue() == expected.getvalue()
+
+    recommender.add_candidate_filter('overseas', lambda df: df['휴가_장소_국내_해외'] == '해외')
+    monkeypatch.setattr(scoring.multiprocessing, 'get_all_start_methods', lambda: ['spawn'])
+    output = io.StringIO()
+    assert scoring.score_file(recommender, jsonl_path, output, workers=4, batch_size=5)['workers'] == 1
+    assert output.getvalue() == expected.getvalue()
+
+
+def test_find_similar_users_excludes_low_satisfaction_by_default(scoring, tmp_path):
+    """find_similar_users는 get_recommendations처럼 기본으로 만족도 낮은 고객을 빼고 top_k명을 채워야 합니다."""
+    train_csv = str(tmp_path / 'survey_data.csv')
+    make_synthetic_survey(300, seed=42).to_csv(train_csv, index=False)
+    with quiet():
+        recommender = scoring.SummerVacationRecommender()
+        recommender.load_and_preprocess_data(train_csv)
+        for survey in make_synthetic_survey(10, seed=7).to_dict('records'):
+            similar_users = recommender.find_similar_users(survey)
+            assert similar_users == recommender.find_similar_users(survey, exclude_low_satisfaction=True)
+            assert len(similar_users) == 5
+            assert all(user['user_data']['만족도'] not in scoring.LOW_SATISFACTION_LEVELS for user in similar_users)
+            assert len(recommender.get_recommendations(similar_users)) == 5
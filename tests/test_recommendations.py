@@ -0,0 +1,493 @@
+# tests/test_recommendations.py
+# 🧪 추천 서비스 회귀 테스트
+# 같은 모델이라면 어떤 경로(증분 학습, 일괄 추천, 저장 후 불러오기, 캐시 등)로 계산해도
+# 처음부터 한 번에 학습한 서비스와 같은 추천을 돌려주는지 확인합니다.
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import (N_ROWS, load_service, make_queries, make_synthetic_survey, quiet, recommender,
+                      train_service)
+
+
+def test_incremental_update_matches_full_retrain(tmp_path, queries):
+    """새 응답을 하나씩 증분 반영한 모델과 전체 데이터로 다시 학습한 모델의 추천이 같아야 합니다."""
+    survey = make_synthetic_survey(N_ROWS + 30, seed=42)
+    base_csv = str(tmp_path / 'base.csv')
+    full_csv = str(tmp_path / 'full.csv')
+    survey.iloc[:N_ROWS].to_csv(base_csv, index=False)
+    survey.to_csv(full_csv, index=False)
+
+    incremental = train_service(base_csv, str(tmp_path / 'incremental'))
+    with quiet():
+        for new_survey_data in survey.iloc[N_ROWS:].to_dict('records'):
+            assert incremental.update_model_with_new_data(new_survey_data, save=False, verify=True)
+    retrained = train_service(full_csv, str(tmp_path / 'retrained'))
+
+    with quiet():
+        assert [incremental.get_recommendations(q) for q in queries] == \
+            [retrained.get_recommendations(q) for q in queries]
+    assert incremental.get_static_payload_json() == retrained.get_static_payload_json()
+
+
+def test_save_load_round_trip(trained, tmp_path, queries):
+    """저장한 모델 번들을 불러온 서비스는 저장한 서비스와 같은 추천을 돌려줘야 합니다."""
+    loaded = load_service(trained.model_dir)
+
+    with quiet():
+        assert [loaded.get_recommendations(q) for q in queries] == [trained.get_recommendations(q) for q in queries]
+    assert loaded.get_static_payload_json() == trained.get_static_payload_json()
+
+
+def test_failed_save_keeps_previous_bundle(trained, monkeypatch, queries):
+    """저장하다 실패해도 이전 모델 번들은 그대로 남고, 만들다 만 임시 폴더는 지워져야 합니다."""
+    bundle_dir = os.path.join(trained.model_dir, recommender.ModelBundle.DIR_NAME)
+    current_dir = recommender.ModelBundle.current_dir(bundle_dir)
+    with quiet():
+        expected = [trained.get_recommendations(q) for q in queries]
+        for new_survey_data in make_queries(5, seed=3):
+            assert trained.update_model_with_new_data(new_survey_data, save=False)
+
+    def fail(*args, **kwargs):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(recommender.np, 'savez', fail)
+    with quiet(), pytest.raises(OSError):
+        trained._save_trained_model()
+    monkeypatch.undo()
+
+    assert recommender.ModelBundle.current_dir(bundle_dir) == current_dir
+    assert not [name for name in os.listdir(bundle_dir) if name.startswith(recommender.ModelBundle.TMP_PREFIX)]
+    loaded = load_service(trained.model_dir)
+    with quiet():
+        assert [loaded.get_recommendations(q) for q in queries] == expected
+
+
+def _modified_times(directory):
+    """폴더 안 파일별 마지막 수정 시각(ns)"""
+    return {name: os.stat(os.path.join(directory, name)).st_mtime_ns for name in os.listdir(directory)}
+
+
+def test_save_does_not_touch_mmapped_version(trained, queries):
+    """mmap으로 불러온 서비스가 쓰는 버전 폴더는 새로 저장해도 바뀌지 않아야 합니다."""
+    bundle_dir = os.path.join(trained.model_dir, recommender.ModelBundle.DIR_NAME)
+    reader = load_service(trained.model_dir, mmap=True)
+    reader_dir = recommender.ModelBundle.current_dir(bundle_dir)
+    reader_files = _modified_times(reader_dir)
+    with quiet():
+        expected = [trained.get_recommendations(q) for q in queries]
+        assert [reader.get_recommendations(q) for q in queries] == expected
+
+        for new_survey_data in make_queries(2, seed=5):
+            assert trained.update_model_with_new_data(dict(new_survey_data, 만족도='매우 만족'), save=True)
+
+    assert recommender.ModelBundle.current_dir(bundle_dir) != reader_dir
+    assert _modified_times(reader_dir) == reader_files
+    with quiet():
+        assert [reader.get_recommendations(q) for q in queries] == expected
+        reloaded = load_service(trained.model_dir, mmap=True)
+        assert [reloaded.get_recommendations(q) for q in queries] == \
+            [trained.get_recommendations(q) for q in queries]
+
+
+def test_batch_matches_rowwise(trained, queries):
+    """일괄 추천은 사용자마다 get_recommendations를 호출한 결과와 같아야 합니다 (중복 응답, 블록 경계 포함)."""
+    surveys = queries + queries[:10] + [dict(queries[0], 휴가_기간=None)]
+    with quiet():
+        expected = [trained.get_recommendations(q) for q in surveys]
+        assert trained.get_recommendations_batch(surveys) == expected
+        assert trained.get_recommendations_batch(surveys, block_size=7) == expected
+
+
+def test_exact_batch_scores_match_search(trained, queries):
+    """블록 행렬곱(score_many)의 점수와 상위 k명 선택은 질의 하나씩 계산한 search/top_respondents와 같아야 합니다."""
+    backend, profile_table = trained.similarity_backend, trained.profile_table
+    query_matrix = trained.feature_encoder.encode_many(queries)
+    scores = backend.score_many(query_matrix)
+    for query_vector, row_scores in zip(query_matrix, scores):
+        indices, expected_scores = backend.search(query_vector, top_k=len(row_scores))
+        assert row_scores[indices].tolist() == expected_scores.tolist()
+
+    match_counts = backend.match_counts_many(query_matrix)
+    assert match_counts is not None
+    assert profile_table.top_respondents_many(*match_counts) == \
+        [profile_table.top_respondents_from_scores(row_scores) for row_scores in scores]
+
+
+def test_batch_throughput_at_scale(tmp_path):
+    """응답자 2만 명 모델에 사용자 2만 명을 일괄 추천할 때 초당 1만 명 이상을 처리해야 합니다 (단일 코어 측정 약 2만 명)."""
+    csv_path = str(tmp_path / 'survey_large.csv')
+    make_synthetic_survey(20000, seed=42).to_csv(csv_path, index=False)
+    service = train_service(csv_path, str(tmp_path / 'large'))
+    users = make_queries(20000, seed=43)
+    with quiet():
+        service.get_recommendations_batch(users[:100])
+        start = time.perf_counter()
+        results = service.get_recommendations_batch(users)
+        elapsed = time.perf_counter() - start
+        assert results[:200] == [service.get_recommendations(user_data) for user_data in users[:200]]
+    assert len(users) / elapsed >= 10000
+
+
+def test_materialized_matches_rowwise(trained, survey_csv, tmp_path, queries):
+    """미리 계산한 '모든 답 조합' 조회표의 결과는 실시간 계산 결과와 같아야 합니다 (저장 후 불러와도)."""
+    materialized = train_service(survey_csv, str(tmp_path / 'materialized'), materialize=True)
+    assert materialized.materialized is not None
+    loaded = load_service(materialized.model_dir)
+    assert loaded.materialized is not None
+    with quiet():
+        expected = [trained.get_recommendations(q) for q in queries]
+        assert [materialized.get_recommendations(q) for q in queries] == expected
+        assert [loaded.get_recommendations(q) for q in queries] == expected
+
+
+def test_cached_matches_uncached(survey_csv, tmp_path, queries):
+    """캐시에서 꺼낸 결과는 캐시 없이 계산한 결과와 같아야 하고, 모델이 바뀌면 새 모델로 다시 계산해야 합니다."""
+    uncached = train_service(survey_csv, str(tmp_path / 'uncached'))
+    cached = recommender.VacationRecommendationService(model_dir=str(tmp_path / 'cached'), cache_size=64)
+    with quiet():
+        assert cached.train_model(survey_csv)
+        expected = [uncached.get_recommendations(q) for q in queries]
+        assert [cached.get_recommendations(q) for q in queries] == expected
+        assert [cached.get_recommendations(q) for q in queries] == expected
+        assert cached.result_cache.stats()['hits'] >= len(queries)
+
+        for new_survey_data in make_queries(3, seed=11):
+            new_survey_data = dict(new_survey_data, 만족도='매우 만족')
+            assert uncached.update_model_with_new_data(new_survey_data, save=False)
+            assert cached.update_model_with_new_data(new_survey_data, save=False)
+        assert [cached.get_recommendations(q) for q in queries] == [uncached.get_recommendations(q) for q in queries]
+
+
+def test_bad_input_returns_error_result(trained, queries):
+    """응답 값이 키로 쓸 수 없는 값(목록)이면 예외 대신 success=False 결과를 돌려주고, 다른 요청은 영향을 받지 않아야 합니다."""
+    bad = dict(queries[0], 휴가_장소_국내_해외=['국내', '해외'])
+    with quiet():
+        result = trained.get_recommendations(bad)
+        assert result['success'] is False and result['error']
+        assert trained.get_recommendations(None)['success'] is False
+
+        batch = trained.get_recommendations_batch([queries[1], bad, None, queries[2]])
+        assert [r['success'] for r in batch] == [True, False, False, True]
+        assert batch[0] == trained.get_recommendations(queries[1])
+        assert batch[3] == trained.get_recommendations(queries[2])
+
+        async def serve():
+            service = recommender.AsyncRecommendationService(trained)
+            try:
+                return await asyncio.gather(*(service.get_recommendations(q) for q in (queries[1], bad, queries[2])))
+            finally:
+                service.close()
+
+        assert [r['success'] for r in asyncio.run(serve())] == [True, False, True]
+        assert trained.update_model_with_new_data(bad, save=False) is False
+        assert trained.get_recommendations(queries[1]) == batch[0]
+
+
+def test_submission_queue_moves_failed_submissions_to_dead_letter(trained):
+    """반영에 실패한 제출은 실패 로그로 옮기고, 나머지 제출은 체크포인트에 반영한 뒤 로그에서 지워야 합니다."""
+    good = [dict(q, 만족도='만족') for q in make_queries(2, seed=13)]
+    bad = {'성별': ['남성', '여성']}
+    survey_queue = recommender.SurveySubmissionQueue(trained, flush_interval=0.05)
+    with quiet():
+        survey_queue.start()
+        seqs = [survey_queue.submit(survey_data) for survey_data in (good[0], bad, good[1])]
+        survey_queue.stop()
+
+    stats = survey_queue.get_stats()
+    assert (stats['applied'], stats['failed'], stats['pending']) == (2, 1, 0)
+    with open(survey_queue.failed_log_path, encoding='utf-8') as f:
+        failed = [json.loads(line) for line in f]
+    assert [(entry['seq'], entry['data']) for entry in failed] == [(seqs[1], bad)]
+    assert os.path.getsize(survey_queue.log_path) == 0
+
+    loaded = load_service(trained.model_dir)
+    assert loaded.applied_submission_seq == seqs[-1]
+    with quiet():
+        assert [loaded.get_recommendations(q) for q in good] == [trained.get_recommendations(q) for q in good]
+
+
+def test_writer_lock_serializes_model_updates(trained, queries):
+    """쓰기 잠금을 다른 스레드가 쥐고 있으면 모델을 바꾸는 메서드는 기다렸다가 실행되어야 합니다 (설문 큐도 같은 잠금)."""
+    new_survey_data = dict(queries[0], 만족도='만족')
+    model_version = trained.model_version
+    writers = [threading.Thread(target=trained.update_model_with_new_data, args=(new_survey_data, False)),
+               threading.Thread(target=trained.add_search_filter, args=({'휴가_장소_국내_해외': '해외'},))]
+    survey_queue = recommender.SurveySubmissionQueue(trained, flush_interval=0.01)
+    with quiet():
+        survey_queue.start()
+        with trained._write_lock:
+            for writer in writers:
+                writer.start()
+            survey_queue.submit(new_survey_data)
+            time.sleep(0.2)
+            assert trained.model_version == model_version
+            assert survey_queue.get_stats()['applied'] == 0
+            assert trained.get_recommendations(queries[1])['success']
+        for writer in writers:
+            writer.join()
+        survey_queue.stop(checkpoint=False)
+    assert survey_queue.get_stats()['applied'] == 1
+    assert trained._n_respondents() == N_ROWS + 2
+
+
+def test_inverted_index_matches_cosine(trained, survey_csv, tmp_path, queries):
+    """역색인 엔진은 코사인 엔진과 같은 유사 사용자와 추천을 돌려줘야 합니다."""
+    service = recommender.VacationRecommendationService(model_dir=str(tmp_path / 'inverted'),
+                                                        similarity_backend='inverted_index', cache_size=0)
+    with quiet():
+        assert service.train_model(survey_csv)
+        assert [service.get_recommendations(q) for q in queries] == [trained.get_recommendations(q) for q in queries]
+
+    matrix = trained.profile_table.matrix
+    backend = recommender.InvertedIndexBackend().fit(matrix)
+    cosine = recommender.CosineSimilarityBackend().fit(matrix)
+    for query_vector in trained.feature_encoder.encode_many(queries):
+        indices, scores = backend.search(query_vector, top_k=10)
+        expected_indices, expected_scores = cosine.search(query_vector, top_k=10)
+        assert indices.tolist() == expected_indices.tolist()
+        assert np.allclose(scores, expected_scores)
+    assert sum(len(postings) for postings in backend.postings) == np.count_nonzero(matrix)
+
+
+class _FullFrameEncoder(recommender.FeatureEncoder):
+    """예전 _find_similar_users처럼 전체 컬럼 원-핫 인코딩(full_encoded_df) 열 목록에 맞춰 reindex하는 인코더"""
+
+    def __init__(self, encoder, full_columns):
+        super().__init__(encoder.columns, encoder.fields)
+        self.full_columns = full_columns
+
+    def encode(self, user_data):
+        user_encoded = pd.get_dummies(pd.DataFrame([user_data])).reindex(columns=self.full_columns, fill_value=0)
+        cols_to_keep = [col for col in self.full_columns if col in self.columns]
+        return user_encoded[cols_to_keep].reindex(columns=self.columns, fill_value=0).to_numpy(dtype=np.float32)
+
+    def encode_many(self, records):
+        return np.vstack([self.encode(user_data) for user_data in records]).reshape(len(records), self.width)
+
+
+def test_frozen_encoder_matches_full_encoded_frame(tmp_path):
+    """휴가_장소 값이 아주 많은 CSV에서도 고정 인코더의 추천은 예전 full_encoded_df + reindex 방식과 같고, 최대 메모리는 줄어야 합니다."""
+    rng = np.random.default_rng(0)
+    survey = make_synthetic_survey(3000, seed=42)
+    survey['휴가_장소'] = [f'{location} {variant}' for location, variant in
+                         zip(survey['휴가_장소'], rng.integers(0, 1000, len(survey)))]
+    csv_path = str(tmp_path / 'survey_data.csv')
+    survey.to_csv(csv_path, index=False)
+    queries = survey.sample(20, random_state=1).to_dict('records') + make_queries(20, seed=7)
+
+    def peak_mb(load):
+        tracemalloc.start()
+        try:
+            kept = load()
+            return kept, tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        finally:
+            tracemalloc.stop()
+
+    def legacy_load():
+        original_df = pd.read_csv(csv_path).fillna('기타')
+        return pd.get_dummies(original_df).columns, pd.get_dummies(original_df[recommender.SELECTED_FEATURES])
+
+    (full_columns, _), legacy_peak = peak_mb(legacy_load)
+    service = recommender.VacationRecommendationService(model_dir=str(tmp_path / 'ml_models'), cache_size=0)
+    with quiet():
+        _, current_peak = peak_mb(lambda: service._load_training_data(csv_path))
+        assert service.train_model(csv_path)
+        expected = [service.get_recommendations(q) for q in queries]
+        service.feature_encoder = _FullFrameEncoder(service.feature_encoder, full_columns)
+        service._publish_snapshot()
+        assert [service.get_recommendations(q) for q in queries] == expected
+        assert service.get_recommendations_batch(queries) == expected
+    assert current_peak * 2 < legacy_peak
+
+
+def test_vectorized_learn_patterns_matches_rowwise(survey_csv, tmp_path, queries):
+    """그룹 단위(vectorized) 패턴 학습은 행마다 _learn_from_row를 적용한 학습과 키 순서까지 같은 표를 만들어야 합니다."""
+    rowwise = train_service(survey_csv, str(tmp_path / 'rowwise'), vectorized=False)
+    vectorized = train_service(survey_csv, str(tmp_path / 'vectorized'), vectorized=True)
+
+    def learned(service):
+        return json.dumps([service.scoring_table.bucket_stats(), service.collaborative_filter.to_preference_patterns(),
+                           service.cost_table.cost_counts()], ensure_ascii=False, default=str)
+
+    assert learned(vectorized) == learned(rowwise)
+    with quiet():
+        assert [vectorized.get_recommendations(q) for q in queries] == [rowwise.get_recommendations(q) for q in queries]
+    assert vectorized.get_static_payload_json() == rowwise.get_static_payload_json()
+
+
+def test_cold_start_serves_from_mmapped_bundle_without_pandas(trained, queries):
+    """새 프로세스에서 모델 번들을 mmap으로 불러와 추천할 때는 pandas/joblib을 import하지 않고 같은 추천을 돌려줘야 합니다."""
+    worker_code = (
+        "import json, sys\n"
+        "sys.path.insert(0, sys.argv[1])\n"
+        "from survey_data import load_service_module\n"
+        "service = load_service_module().VacationRecommendationService(model_dir=sys.argv[2], cache_size=0)\n"
+        "queries = json.loads(sys.stdin.read())\n"
+        "assert service.load_pretrained_model(mmap=True)\n"
+        "results = [service.get_recommendations(q) for q in queries]\n"
+        "heavy_modules = sorted(name for name in ('pandas', 'joblib', 'sklearn') if name in sys.modules)\n"
+        "print('RESULT ' + json.dumps([results, heavy_modules], ensure_ascii=False, default=str))\n"
+    )
+    output = subprocess.run([sys.executable, '-c', worker_code, os.path.dirname(os.path.abspath(__file__)),
+                             trained.model_dir], input=json.dumps(queries, ensure_ascii=False),
+                            capture_output=True, text=True, encoding='utf-8', check=True).stdout
+    results, heavy_modules = json.loads(next(line for line in output.splitlines()
+                                             if line.startswith('RESULT '))[len('RESULT '):])
+    assert heavy_modules == []
+    with quiet():
+        expected = [trained.get_recommendations(q) for q in queries]
+    assert results == json.loads(json.dumps(expected, ensure_ascii=False, default=str))
+
+
+def test_chunked_csv_training_matches_full_read(trained, survey_csv, tmp_path, queries):
+    """CSV를 나누어 읽으면서 학습한 모델은 한 번에 읽어 학습한 모델과 같은 번들과 추천을 만들어야 합니다."""
+    chunked = train_service(survey_csv, str(tmp_path / 'chunked'), chunksize=97)
+    with quiet():
+        assert [chunked.get_recommendations(q) for q in queries] == [trained.get_recommendations(q) for q in queries]
+    assert chunked.get_static_payload_json() == trained.get_static_payload_json()
+
+    full, streamed = [recommender.ModelBundle.load(os.path.join(service.model_dir, recommender.ModelBundle.DIR_NAME))
+                      for service in (trained, chunked)]
+    assert full.arrays.keys() == streamed.arrays.keys()
+    assert all(np.array_equal(full.arrays[name], streamed.arrays[name]) for name in full.arrays)
+    assert all(np.array_equal(full.pattern_arrays[name], streamed.pattern_arrays[name])
+               for name in full.pattern_arrays)
+    for key in ('columns', 'vocabulary', 'feature_encoder', 'static_payload'):
+        assert streamed.manifest[key] == full.manifest[key]
+
+
+def test_ivf_recall_at_n_probe(trained, survey_csv, tmp_path, queries):
+    """IVF 근사 검색은 n_probe를 늘릴수록 정확한 코사인 검색에 가까워지고, 모든 군집을 보면 결과가 같아야 합니다."""
+    survey = make_synthetic_survey(5000, seed=42)
+    csv_path = str(tmp_path / 'survey_5000.csv')
+    survey.to_csv(csv_path, index=False)
+    matrix = train_service(csv_path, str(tmp_path / 'large')).profile_table.matrix
+    exact = recommender.CosineSimilarityBackend().fit(matrix)
+    query_matrix = trained.feature_encoder.encode_many(make_queries(200, seed=7))
+
+    recalls = []
+    for n_probe in (1, 4, 16):
+        ivf = recommender.IVFSimilarityBackend(n_lists=16, n_probe=n_probe).fit(matrix)
+        n_hits = n_score_hits = 0
+        for query_vector in query_matrix:
+            expected, expected_scores = exact.search(query_vector, top_k=5)
+            found, found_scores = ivf.search(query_vector, top_k=5)
+            n_hits += len(set(expected.tolist()) & set(found.tolist()))
+            n_score_hits += int(np.sum(found_scores >= expected_scores[-1]))
+            if n_probe == 16:
+                assert found.tolist() == expected.tolist() and found_scores.tolist() == expected_scores.tolist()
+        recalls.append((n_hits / (5 * len(query_matrix)), n_score_hits / (5 * len(query_matrix))))
+    # 가상 데이터 기준 n_probe=4 (군집의 1/4): recall 약 0.93, score_recall 약 0.995
+    assert all(low <= high for lower, higher in zip(recalls, recalls[1:]) for low, high in zip(lower, higher))
+    recall, score_recall = recalls[1]
+    assert recall >= 0.85 and score_recall >= 0.95
+
+    service = recommender.VacationRecommendationService(
+        model_dir=str(tmp_path / 'ivf'), similarity_backend=recommender.IVFSimilarityBackend(n_probe=10 ** 6),
+        cache_size=0)
+    with quiet():
+        assert service.train_model(survey_csv)
+        assert [service.get_recommendations(q) for q in queries] == [trained.get_recommendations(q) for q in queries]
+
+
+def test_segment_routing_matches_exact_path(survey_csv, tmp_path, queries):
+    """세그먼트가 하나면 세그먼트 추천은 정확한 경로와 같고, 저장 후 불러와도 같은 세그먼트로 보내야 합니다."""
+    service = train_service(survey_csv, str(tmp_path / 'segments'), segments=True)
+    with quiet():
+        routed = [service.get_segment_recommendations(q) for q in queries]
+    assert all(result['success'] for result in routed)
+    snapshot = service._current_snapshot()
+    for user_data, result in zip(queries, routed):
+        scores = snapshot.segments.centroids @ snapshot.feature_encoder.encode(user_data).ravel()
+        assert scores[result['segment']] == scores.max()
+
+    loaded = load_service(service.model_dir)
+    with quiet():
+        assert [loaded.get_segment_recommendations(q) for q in queries] == routed
+        service.build_user_segments(n_segments=1)
+        for user_data in queries:
+            result, expected = service.get_segment_recommendations(user_data), service.get_recommendations(user_data)
+            assert result['segment'] == 0
+            assert {key: value for key, value in result.items() if key not in ('similar_users', 'segment')} == \
+                {key: value for key, value in expected.items() if key != 'similar_users'}
+
+
+def _counter_suggestions(survey):
+    """만족도 높은 응답을 Counter로 직접 세어 만든 (연령대, 현재 휴가 유형)별 다음 휴가 경험 빈도"""
+    satisfied = survey[survey['만족도'].isin(recommender.SATISFIED_LEVELS)]
+    counters = {'next_preferences': {}, 'next_from_current': {}}
+    for record in satisfied.to_dict('records'):
+        for kind, column in recommender.CollaborativeFilter.ROW_COLUMNS.items():
+            counters[kind].setdefault(record[column], Counter())[record['다음_휴가_경험']] += 1
+    return counters
+
+
+def test_collaborative_filter_matches_counters(trained, survey_csv, queries):
+    """다음 휴가 전이 행렬의 상위 값과 확률은 응답을 Counter로 직접 센 결과(most_common)와 같아야 합니다 (증분 반영 후에도)."""
+    survey = pd.read_csv(survey_csv)
+    new_rows = [dict(q, 만족도='만족') for q in queries[:10]]
+    with quiet():
+        for new_survey_data in new_rows:
+            assert trained.update_model_with_new_data(new_survey_data, save=False)
+    survey = pd.concat([survey, pd.DataFrame(new_rows)], ignore_index=True)
+
+    collaborative_filter = trained.collaborative_filter
+    next_values = trained.vocabulary.values['다음_휴가_경험']
+    for kind, counters in _counter_suggestions(survey).items():
+        assert [key for key, _ in collaborative_filter.top_all(kind, 3)] == list(counters)
+        assert collaborative_filter.top_all(kind, 3) == [(key, counter.most_common(3))
+                                                         for key, counter in counters.items()]
+        scores = collaborative_filter.score(kind, list(counters) + ['처음 보는 값'])
+        for key, row_scores in zip(counters, scores):
+            counter = counters[key]
+            assert row_scores[:len(next_values)].tolist() == \
+                [counter[value] / sum(counter.values()) for value in next_values]
+        assert not scores[-1].any()
+        for key, counter in counters.items():
+            assert collaborative_filter.top(kind, key, 2) == counter.most_common(2)
+
+
+def test_vocabulary_codes_round_trip(survey_csv, tmp_path, queries):
+    """값 번호는 처음 등장한 순서대로 매겨지고, 번들의 codes 배열은 학습한 응답(빈 칸은 '기타')으로 그대로 복원되어야 합니다."""
+    survey = pd.read_csv(survey_csv)
+    survey.loc[[3, 50], '휴가_장소'] = None
+    survey.loc[[7], '총_비용'] = None
+    csv_path = str(tmp_path / 'survey_with_blanks.csv')
+    survey.to_csv(csv_path, index=False)
+    survey = pd.read_csv(csv_path).fillna('기타')
+    service = train_service(csv_path, str(tmp_path / 'vocabulary'))
+
+    vocabulary = service.vocabulary
+    for column in recommender.PATTERN_COLUMNS:
+        assert vocabulary.values[column] == list(pd.unique(survey[column]))
+    # 빈 값(NaN)은 객체가 달라도 같은 번호 하나로 모입니다.
+    blanks = recommender.SurveyVocabulary()
+    assert blanks.code('휴가_장소', float('nan')) == blanks.code('휴가_장소', np.float64('nan')) == \
+        blanks.get('휴가_장소', np.nan) == 0
+
+    loaded = load_service(service.model_dir, mmap=True)
+    assert loaded.vocabulary.to_dict().keys() == vocabulary.to_dict().keys()
+    for column, values in vocabulary.values.items():
+        assert [loaded.vocabulary.get(column, value) for value in values] == list(range(len(values)))
+    pd.testing.assert_frame_equal(loaded._coded_respondents.to_frame(), survey)
+    with quiet():
+        assert [loaded.get_recommendations(q) for q in queries] == [service.get_recommendations(q) for q in queries]
+
+        # 새 값은 목록 끝에만 추가되므로 이미 매긴 번호는 바뀌지 않습니다.
+        codes_before = {column: list(values) for column, values in loaded.vocabulary.values.items()}
+        assert loaded.update_model_with_new_data(dict(queries[0], 휴가_장소='처음 보는 장소', 만족도='만족'), save=False)
+    for column, values in codes_before.items():
+        assert loaded.vocabulary.values[column][:len(values)] == values
+    assert loaded.vocabulary.values['휴가_장소'][-1] == '처음 보는 장소'
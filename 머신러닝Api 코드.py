@@ -3,18 +3,168 @@
 
 import pandas as pd
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 import joblib
 import pickle
 import os
+import sys
+import io
+import json
+import time
+import argparse
+import contextlib
+import itertools
+import multiprocessing
+from collections import deque
 from datetime import datetime
 
-class SummerVacationRecommender:
+
+# 만족도가 낮아 유사 고객(추천 근거)에서 빼는 응답 값 (머신러닝 결과 방식)
+LOW_SATISFACTION_LEVELS = ['불만족', '매우 불만족']
+
+
+def select_top_k(scores, top_k):
+    """
+    🏆 점수 상위 top_k개 위치를 높은 순서로 반환 (argpartition 사용)
+    점수가 같으면 앞쪽(번호가 작은) 고객이 먼저 옵니다.
+    """
+    n_rows = scores.shape[0]
+    k = min(top_k, n_rows)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n_rows:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        # 경계 점수가 같은 고객은 번호가 작은 순서로 다시 채움
+        kth_score = scores[candidates].min()
+        above = np.flatnonzero(scores > kth_score)
+        tied = np.flatnonzero(scores == kth_score)[:k - len(above)]
+        candidates = np.concatenate([above, tied])
+    else:
+        candidates = np.arange(n_rows)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order]
+
+
+class CosineSimilarityBackend:
+    """
+    🧮 코사인 유사도 검색 엔진 (기본 엔진)
+    - 특징 행렬을 미리 L2 정규화한 float32 연속 행렬로 보관 (데이터가 바뀔 때만 fit)
+    - 검색은 행렬-벡터 곱 한 번 + argpartition 상위 k개 선택
+    - 후보 조건별로 조건에 맞는 고객만 담은 행렬(partition)을 미리 만들어 두고 그 안에서만 검색 가능
+    - fit(features) / search(query_vector, top_k)를 가진 객체라면 다른 엔진으로 교체 가능
+    """
+    
+    name = 'cosine'
+    
     def __init__(self):
-        self.full_encoded_df = None
+        self.matrix = None
+        # 후보 조건 이름 -> (고객 번호 배열, 그 고객들만 담은 정규화 행렬)
+        self.partitions = {}
+    
+    def fit(self, features):
+        matrix = np.array(features, dtype=np.float32, order='C')
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+        self.matrix = matrix
+        # 행렬이 바뀌면 이전 후보 조건 행렬은 맞지 않으므로 버림
+        self.partitions = {}
+        return self
+    
+    def add_partition(self, name, row_mask):
+        """
+        🔎 row_mask가 True인 고객만 담은 검색 행렬을 미리 만들어 둠 (fit 이후 호출)
+        - search(..., partition=name)은 이 행렬만 계산하므로 조건에 맞지 않는 고객은 점수를 계산하지 않고,
+          조건에 맞는 고객이 top_k명 이상이면 항상 top_k명을 돌려줌
+        """
+        rows = np.flatnonzero(np.asarray(row_mask, dtype=bool))
+        self.partitions[name] = (rows, np.ascontiguousarray(self.matrix[rows]))
+    
+    def search(self, query_vector, top_k=5, partition=None):
+        matrix, rows = self.matrix, None
+        if partition is not None:
+            rows, matrix = self.partitions[partition]
+        query = np.asarray(query_vector, dtype=np.float32).ravel()
+        query_norm = np.linalg.norm(query)
+        if query_norm > 0:
+            query = query / query_norm
+        scores = matrix @ query
+        # float32 오차로 같은 점수가 갈리지 않도록 소수점 6자리로 맞춤
+        np.round(scores, 6, out=scores)
+        top_indices = select_top_k(scores, top_k)
+        if rows is None:
+            return top_indices, scores[top_indices]
+        # 조건 행렬의 위치를 전체 고객 번호로 되돌림 (번호 오름차순이라 동점 순서도 그대로)
+        return rows[top_indices], scores[top_indices]
+
+
+
+class FeatureEncoder:
+    """
+    🔤 고정(Frozen) 범주형 인코더
+    - 학습할 때 만든 원-핫 인코딩 열 목록으로 '특징 -> 값 -> 열 번호' 사전을 한 번만 만들어 둠
+    - 새 고객 벡터는 DataFrame/get_dummies/reindex 없이 사전 조회만으로 만듦
+    - 학습 데이터에 없던 값은 예전 reindex 방식과 마찬가지로 0으로 남음
+    """
+    
+    def __init__(self, columns, fields):
+        self.columns = list(columns)
+        self.fields = list(fields)
+        self.field_index = {field: {} for field in self.fields}
+        for col_idx, col in enumerate(self.columns):
+            # 앞부분이 겹치는 특징 이름이 있을 수 있으므로 가장 길게 일치하는 특징을 찾음
+            matches = [field for field in self.fields if col.startswith(field + '_')]
+            if not matches:
+                continue
+            field = max(matches, key=len)
+            self.field_index[field][col[len(field) + 1:]] = col_idx
+    
+    def encode(self, user_data):
+        vector = np.zeros((1, len(self.columns)), dtype=np.float32)
+        for field, value_index in self.field_index.items():
+            col_idx = value_index.get(user_data.get(field))
+            if col_idx is not None:
+                vector[0, col_idx] = 1.0
+        return vector
+
+
+def _satisfied_rows(df):
+    """만족도가 낮지 않은(LOW_SATISFACTION_LEVELS가 아닌) 고객 표시 (기본 후보 조건)"""
+    if '만족도' not in df.columns:
+        return np.ones(len(df), dtype=bool)
+    return ~df['만족도'].isin(LOW_SATISFACTION_LEVELS).to_numpy(dtype=bool)
+
+class ColumnValueFilter:
+    """
+    🔎 컬럼별 허용 값으로 정한 유사 고객 후보 조건 (예: {'휴가_장소_국내_해외': ['해외']})
+    - 람다와 달리 pickle할 수 있어서, fork를 못 쓰는 환경의 일괄 채점 워커에도 모델과 함께 전달됨
+    """
+    
+    def __init__(self, allowed_values):
+        self.allowed_values = {column: [values] if isinstance(values, str) else list(values)
+                               for column, values in allowed_values.items()}
+    
+    def __call__(self, df):
+        """모든 컬럼의 값이 허용 값 중 하나인 고객 표시"""
+        mask = np.ones(len(df), dtype=bool)
+        for column, values in self.allowed_values.items():
+            mask &= df[column].isin(values).to_numpy(dtype=bool)
+        return mask
+
+class SummerVacationRecommender:
+    def __init__(self, similarity_backend=None):
         self.features_encoded = None
         self.original_df = None
         self.feature_columns = None
+        # 🔤 새 고객 벡터를 만드는 고정 인코더 (선택된 특징의 값 사전만 가짐)
+        self.feature_encoder = None
+        
+        # 🧮 유사 고객 검색 엔진 (기본: 코사인 유사도)
+        self.similarity_backend = similarity_backend or CosineSimilarityBackend()
+        
+        # 🔎 유사 고객 후보 조건 {이름: original_df -> 고객별 True/False 배열}
+        # 검색 엔진이 조건마다 조건에 맞는 고객만 담은 행렬을 미리 만들어 두고 그 안에서만 top_k명을 찾음
+        # ('satisfied': exclude_low_satisfaction=True일 때 쓰는 기본 조건)
+        self.candidate_filters = {'satisfied': _satisfied_rows}
         
         # 📋 머신러닝 결과에서 사용된 핵심 특징 5가지
         self.selected_features = [
@@ -75,12 +225,8 @@ class SummerVacationRecommender:
                 # 결측값을 '기타'로 처리
                 self.original_df[col] = self.original_df[col].fillna('기타')
         
-        # 🔄 전체 데이터 원-핫 인코딩 (기준 템플릿)
-        print("🔄 전체 데이터 원-핫 인코딩 중...")
-        self.full_encoded_df = pd.get_dummies(self.original_df)
-        print(f"✅ 인코딩 완료: {len(self.full_encoded_df.columns)}개 특성")
-        
         # 🎯 선택된 특징만으로 인코딩
+        # (휴가_장소, 총_비용처럼 값 종류가 많은 컬럼까지 전체 원-핫 인코딩하지 않음)
         print(f"🎯 핵심 특징 선택: {self.selected_features}")
         
         # 실제 존재하는 특징만 필터링
@@ -97,63 +243,59 @@ class SummerVacationRecommender:
         features_df = self.original_df[self.selected_features]
         self.features_encoded = pd.get_dummies(features_df)
         self.feature_columns = self.features_encoded.columns.tolist()
+        self.feature_encoder = FeatureEncoder(self.feature_columns, self.selected_features)
+        
+        # 🧮 유사도 검색용 행렬 생성 (데이터가 바뀔 때만 다시 만듦)
+        self.similarity_backend.fit(self.features_encoded)
+        self._build_candidate_partitions()
         
         print(f"✅ 특징 인코딩 완료: {len(self.features_encoded.columns)}개 특성")
         print(f"📊 인코딩된 특징 예시: {self.feature_columns[:5]}")
         
         return self.original_df
     
-    def find_similar_users(self, new_user_data, top_k=5):
+    def find_similar_users(self, new_user_data, top_k=5, exclude_low_satisfaction=True, candidate_filter=None):
         """
         🎯 2단계: 새로운 사용자와 유사한 고객 찾기 (코사인 유사도)
+        - exclude_low_satisfaction=True(기본값, get_recommendations와 같음): 만족도가 낮은 고객을 검색 단계에서 빼고
+          top_k명을 채움 (False면 전체 고객에서 찾음)
+        - candidate_filter: add_candidate_filter로 등록한 후보 조건 이름 (지정하면 이 조건으로 검색)
         """
         print("🔍 유사한 고객 검색 중...")
         
         if self.features_encoded is None:
             raise ValueError("❌ 데이터가 로드되지 않았습니다. load_and_preprocess_data()를 먼저 실행하세요.")
         
-        # 새로운 사용자 데이터를 데이터프레임으로 변환
-        new_user_df = pd.DataFrame([new_user_data])
         print(f"👤 새로운 사용자 데이터:")
         for key, value in new_user_data.items():
             print(f"   {key}: {value}")
         
-        # 전체 컬럼 기준으로 원-핫 인코딩
-        new_user_encoded = pd.get_dummies(new_user_df).reindex(
-            columns=self.full_encoded_df.columns, fill_value=0
-        )
-        
-        # 선택된 특징만 추출
-        cols_to_keep = [col for col in self.full_encoded_df.columns 
-                       if col in self.features_encoded.columns]
-        
-        new_user_features = new_user_encoded[cols_to_keep]
-        
-        # 특성 벡터 차원 맞추기
-        new_user_features = new_user_features.reindex(
-            columns=self.features_encoded.columns, fill_value=0
-        )
+        # 고정 인코더로 선택된 특징만 원-핫 인코딩 (학습 때와 같은 열 순서)
+        new_user_features = self.feature_encoder.encode(new_user_data)
         
         print(f"🔄 사용자 데이터 인코딩 완료: {new_user_features.shape}")
         
         # 🎯 코사인 유사도 계산
         print("🧮 코사인 유사도 계산 중...")
-        similarity_scores = cosine_similarity(new_user_features, self.features_encoded)
-        
-        # 유사도 점수로 정렬 (높은 순)
-        top_indices = similarity_scores[0].argsort()[::-1][:top_k]
+        # 유사도 점수가 높은 상위 top_k명만 선택 (전체 정렬 없음)
+        # 후보 조건이 있으면 조건에 맞는 고객만 담은 행렬에서 찾음 (상위 top_k명을 뽑은 뒤 거르지 않음)
+        partition = candidate_filter or ('satisfied' if exclude_low_satisfaction else None)
+        if partition is None:
+            top_indices, top_scores = self.similarity_backend.search(new_user_features, top_k)
+        else:
+            top_indices, top_scores = self.similarity_backend.search(new_user_features, top_k,
+                                                                     partition=partition)
         
         print(f"✅ 상위 {top_k}명 유사 고객 발견!")
         
         # 결과 정리
         similar_users = []
-        for i, index in enumerate(top_indices):
-            similarity_score = similarity_scores[0][index]
+        for i, (index, similarity_score) in enumerate(zip(top_indices, top_scores)):
             user_info = self.original_df.iloc[index].to_dict()
             
             similar_users.append({
                 'rank': i + 1,
-                'similarity_score': round(similarity_score, 2),
+                'similarity_score': round(float(similarity_score), 2),
                 'user_data': user_info
             })
         
@@ -162,6 +304,8 @@ class SummerVacationRecommender:
     def get_recommendations(self, similar_users, exclude_low_satisfaction=True):
         """
         🎁 3단계: 추천 생성 (만족도 낮은 정보 제외)
+        - find_similar_users(기본값 exclude_low_satisfaction=True)로 찾은 고객은 이미 만족도가 낮은 고객이 없으므로
+          여기서 빠지는 고객 없이 top_k명의 추천이 모두 만들어짐
         """
         print("🎁 추천 결과 생성 중...")
         
@@ -213,9 +357,9 @@ class SummerVacationRecommender:
         joblib.dump(self.features_encoded, features_path)
         print(f"✅ 특징 데이터 저장: {features_path}")
         
-        # 2. 전체 인코딩 템플릿 저장
+        # 2. 인코딩 템플릿 저장 (새 고객 벡터에 쓰이는 선택된 특징의 열 목록)
         template_path = os.path.join(model_dir, 'encoding_template.pkl')
-        joblib.dump(self.full_encoded_df.columns.tolist(), template_path)
+        joblib.dump(self.feature_columns, template_path)
         print(f"✅ 인코딩 템플릿 저장: {template_path}")
         
         # 3. 원본 데이터 저장
@@ -257,6 +401,59 @@ class SummerVacationRecommender:
             file_size = os.path.getsize(file_path) / 1024  # KB
             print(f"   📄 {file} ({file_size:.1f} KB)")
     
+    def score_surveys(self, surveys, top_k=5, exclude_low_satisfaction=True):
+        """
+        📦 여러 고객의 추천을 출력 없이 한 번에 생성 (오프라인 일괄 채점용)
+        - 고객마다 find_similar_users + get_recommendations를 실행한 결과를 입력 순서대로 반환
+        """
+        results = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for survey in surveys:
+                similar_users = self.find_similar_users(survey, top_k=top_k,
+                                                        exclude_low_satisfaction=exclude_low_satisfaction)
+                results.append(self.get_recommendations(similar_users, exclude_low_satisfaction))
+        return results
+    
+    def load_model(self, model_dir='./ml_models/'):
+        """
+        📂 save_model로 저장한 모델 불러오기 (CSV 전처리 없이 바로 추천 가능)
+        """
+        print(f"📂 모델 불러오는 중... 경로: {model_dir}")
+        
+        self.features_encoded = joblib.load(os.path.join(model_dir, 'features_encoded.pkl'))
+        self.original_df = joblib.load(os.path.join(model_dir, 'original_data.pkl'))
+        self.selected_features = joblib.load(os.path.join(model_dir, 'selected_features.pkl'))
+        self.vacation_results = joblib.load(os.path.join(model_dir, 'vacation_results.pkl'))
+        
+        self.feature_columns = self.features_encoded.columns.tolist()
+        self.feature_encoder = FeatureEncoder(self.feature_columns, self.selected_features)
+        self.similarity_backend.fit(self.features_encoded)
+        self._build_candidate_partitions()
+        
+        print(f"✅ 모델 로드 완료: 고객 {len(self.original_df)}명, {len(self.feature_columns)}개 특성")
+        return self
+    
+    def add_candidate_filter(self, name, predicate):
+        """
+        🔎 유사 고객 후보 조건 추가 (예: 해외 여행 고객만)
+        - predicate: {컬럼: 허용 값 목록} 사전 (권장, ColumnValueFilter로 저장되어 pickle 가능)
+          예: recommender.add_candidate_filter('overseas', {'휴가_장소_국내_해외': ['해외']})
+          또는 predicate(original_df) -> 고객별 True/False 배열을 돌려주는 함수
+          (람다 같은 함수는 pickle할 수 없어서, fork를 못 쓰는 환경의 score_file은 워커 없이 채점함)
+        - 검색 엔진이 조건에 맞는 고객만 담은 행렬을 미리 만들어 두고,
+          find_similar_users(..., candidate_filter=name)이 그 안에서만 top_k명을 찾음
+        """
+        if isinstance(predicate, dict):
+            predicate = ColumnValueFilter(predicate)
+        self.candidate_filters[name] = predicate
+        if self.features_encoded is not None:
+            self.similarity_backend.add_partition(name, predicate(self.original_df))
+    
+    def _build_candidate_partitions(self):
+        """후보 조건마다 조건에 맞는 고객만 담은 검색 행렬 생성 (검색 행렬을 fit한 직후)"""
+        for name, predicate in self.candidate_filters.items():
+            self.similarity_backend.add_partition(name, predicate(self.original_df))
+    
     def print_recommendations(self, recommendations):
         """
         📋 추천 결과를 머신러닝 결과 형식으로 출력
@@ -281,10 +478,177 @@ class SummerVacationRecommender:
             print(f"  - 다음_희망_휴가: {rec['next_preference']}")
 
 # =============================================================================
-# 🚀 실행 코드 (데이터 분석가가 실행할 부분)
+# 📦 오프라인 일괄 채점 (여러 CPU 코어 사용)
 # =============================================================================
 
-if __name__ == "__main__":
+# 워커 프로세스가 함께 읽는 추천 모델 (읽기 전용)
+# fork로 워커를 만들면 부모 프로세스가 불러 둔 모델을 복사 없이 그대로 물려받습니다.
+_WORKER_RECOMMENDER = None
+
+
+def _init_scoring_worker(recommender=None):
+    """워커 시작 시 한 번 실행 (fork를 못 쓰는 환경에서만 모델을 한 번 전달받음)"""
+    global _WORKER_RECOMMENDER
+    if recommender is not None:
+        _WORKER_RECOMMENDER = recommender
+
+
+def _score_batch(task):
+    """설문 묶음 하나를 채점해서 JSONL 줄 목록으로 반환 (워커에서 실행)"""
+    rows, top_k, exclude_low_satisfaction, id_column = task
+    results = _WORKER_RECOMMENDER.score_surveys(
+        [survey for _, survey in rows], top_k=top_k, exclude_low_satisfaction=exclude_low_satisfaction
+    )
+    lines = []
+    for (row_number, survey), recommendations in zip(rows, results):
+        record = {'row': row_number}
+        if id_column:
+            record['id'] = survey.get(id_column)
+        record['recommendations'] = recommendations
+        lines.append(json.dumps(record, ensure_ascii=False, default=str))
+    return lines
+
+
+def _csv_id_value(value):
+    """CSV에서 문자열로 읽은 식별자를 JSONL 입력과 같은 타입으로 (JSON 숫자로 쓸 수 있는 값은 숫자로) 바꾸기"""
+    try:
+        number = json.loads(value)
+    except ValueError:
+        return value
+    if isinstance(number, (int, float)) and not isinstance(number, bool) and json.dumps(number) == value:
+        return number
+    return value
+
+
+def iter_surveys(path, chunksize=10000, id_column=None):
+    """
+    📄 CSV 또는 JSONL 설문 파일을 한 명씩 읽기 (파일 전체를 메모리에 올리지 않음)
+    - .jsonl / .json: 한 줄에 설문 응답 하나(JSON 객체)
+    - 그 밖의 확장자: CSV (빈 칸은 응답하지 않은 것으로 처리)
+    - id_column: CSV의 식별 컬럼 값은 JSONL과 같은 타입으로 읽음 (예: 123은 문자열 '123'이 아니라 정수 123)
+    """
+    if path.endswith(('.jsonl', '.json')):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        for chunk in pd.read_csv(path, dtype=str, chunksize=chunksize):
+            for record in chunk.to_dict('records'):
+                survey = {key: value for key, value in record.items() if isinstance(value, str)}
+                if id_column in survey:
+                    survey[id_column] = _csv_id_value(survey[id_column])
+                yield survey
+
+
+def score_file(recommender, input_path, output, workers=1, batch_size=500, top_k=5,
+               exclude_low_satisfaction=True, id_column=None):
+    """
+    🚀 설문 파일 전체를 여러 프로세스로 나누어 채점하고 결과를 JSONL로 내보내기
+    - 결과는 입력 순서대로 쓰므로 워커 수와 상관없이 항상 같은 파일이 만들어짐
+    - 동시에 처리 중인 묶음 수를 제한해서 큰 파일도 메모리를 일정하게 사용
+    - 입력이 한 묶음(batch_size행) 안에 들어가거나, fork를 못 쓰는 환경에서 모델을 pickle할 수 없으면
+      (예: 람다 후보 조건) 워커를 만들지 않고 현재 프로세스에서 채점
+    
+    Returns:
+        dict: 처리한 행 수, 걸린 시간(초), 초당 처리 행 수, 실제로 사용한 워커 수
+    """
+    global _WORKER_RECOMMENDER
+    start = time.perf_counter()
+    rows = enumerate(iter_surveys(input_path, id_column=id_column))
+    tasks = iter(lambda: list(itertools.islice(rows, batch_size)), [])
+    n_rows = 0
+    
+    if workers > 1:
+        # 묶음이 하나뿐이면 워커를 띄우는 비용만 들므로 현재 프로세스에서 채점합니다.
+        first_batches = list(itertools.islice(tasks, 2))
+        tasks = itertools.chain(first_batches, tasks)
+        if len(first_batches) < 2:
+            workers = 1
+    use_fork = 'fork' in multiprocessing.get_all_start_methods()
+    if workers > 1 and not use_fork:
+        # 워커에 모델을 pickle로 넘겨야 하므로, 풀을 만들기 전에 넘길 수 있는지 먼저 확인합니다.
+        try:
+            pickle.dumps(recommender)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            print(f"⚠️ 모델을 워커에 전달할 수 없어 현재 프로세스에서 채점합니다: {e}", file=sys.stderr)
+            workers = 1
+    
+    def write(lines):
+        nonlocal n_rows
+        for line in lines:
+            output.write(line + '\n')
+        n_rows += len(lines)
+    
+    if workers <= 1:
+        _WORKER_RECOMMENDER = recommender
+        for batch in tasks:
+            write(_score_batch((batch, top_k, exclude_low_satisfaction, id_column)))
+    else:
+        if use_fork:
+            # 모델을 전역 변수에 두고 fork하면 워커마다 pickle로 다시 불러올 필요가 없습니다.
+            _WORKER_RECOMMENDER = recommender
+            context, initargs = multiprocessing.get_context('fork'), ()
+        else:
+            context, initargs = multiprocessing.get_context(), (recommender,)
+        with context.Pool(workers, initializer=_init_scoring_worker, initargs=initargs) as pool:
+            pending = deque()
+            for batch in tasks:
+                pending.append(pool.apply_async(_score_batch, ((batch, top_k, exclude_low_satisfaction, id_column),)))
+                if len(pending) >= workers * 2:
+                    write(pending.popleft().get())
+            while pending:
+                write(pending.popleft().get())
+    
+    seconds = time.perf_counter() - start
+    return {'rows': n_rows, 'seconds': round(seconds, 2),
+            'rows_per_second': round(n_rows / seconds) if seconds > 0 else 0, 'workers': workers}
+
+
+def main(argv=None):
+    """
+    💻 명령줄 일괄 채점기
+    
+    사용 예:
+        python "머신러닝Api 코드.py" surveys.csv --model-dir ./ml_models/ -o results.jsonl --workers 8
+        python "머신러닝Api 코드.py" surveys.jsonl --train-csv survey_data.csv --id-column user_id
+    """
+    parser = argparse.ArgumentParser(description='여름 휴가 추천 일괄 채점 (CSV/JSONL 입력 -> JSONL 출력)')
+    parser.add_argument('input', help='채점할 설문 파일 (.csv 또는 .jsonl)')
+    parser.add_argument('-o', '--output', default='-', help='결과 JSONL 파일 (기본값: 표준 출력)')
+    model_source = parser.add_mutually_exclusive_group()
+    model_source.add_argument('--model-dir', default='./ml_models/', help='save_model로 저장한 모델 폴더')
+    model_source.add_argument('--train-csv', help='모델 폴더 대신 이 학습용 CSV로 바로 모델을 만듦')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='워커 프로세스 수')
+    parser.add_argument('--batch-size', type=int, default=500, help='워커에 한 번에 넘기는 설문 수')
+    parser.add_argument('--top-k', type=int, default=5, help='고객마다 찾을 유사 고객 수')
+    parser.add_argument('--include-low-satisfaction', action='store_true', help='만족도 낮은 유사 고객도 포함')
+    parser.add_argument('--id-column', help='결과에 함께 적을 고객 식별 컬럼 (예: user_id)')
+    args = parser.parse_args(argv)
+    
+    # 진행 메시지는 표준 오류로 보내서 표준 출력의 JSONL 결과와 섞이지 않게 합니다.
+    with contextlib.redirect_stdout(sys.stderr):
+        recommender = SummerVacationRecommender()
+        if args.train_csv:
+            recommender.load_and_preprocess_data(args.train_csv)
+        else:
+            recommender.load_model(args.model_dir)
+    
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        report = score_file(recommender, args.input, output, workers=args.workers, batch_size=args.batch_size,
+                            top_k=args.top_k, exclude_low_satisfaction=not args.include_low_satisfaction,
+                            id_column=args.id_column)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"✅ {report['rows']:,}행 채점 완료: {report['seconds']}초, 초당 {report['rows_per_second']:,}행 "
+          f"(워커 {report['workers']}개)", file=sys.stderr)
+    return 0
+
+
+def run_demo():
+    """🎯 예시 고객 한 명의 추천 결과 출력 (데이터 분석가용)"""
     print("🎯 여름 휴가 추천 시스템 - 머신러닝 결과 기반!")
     print("=" * 60)
     
@@ -314,8 +678,8 @@ if __name__ == "__main__":
             '다음_휴가_경험': '도시 관광 (쇼핑, 카페, 시내 구경)'
         }
         
-        # 5️⃣ 유사한 고객 찾기 (상위 5명)
-        similar_users = recommender.find_similar_users(new_user_data, top_k=5)
+        # 5️⃣ 유사한 고객 찾기 (만족도 낮은 고객을 뺀 상위 5명)
+        similar_users = recommender.find_similar_users(new_user_data, top_k=5, exclude_low_satisfaction=True)
         
         # 6️⃣ 추천 생성 (만족도 낮은 고객 제외)
         recommendations = recommender.get_recommendations(
@@ -342,4 +706,15 @@ if __name__ == "__main__":
         print(f"❌ 예상치 못한 오류: {e}")
         print("💡 오류를 개발팀과 공유해주세요!")
         import traceback
-        traceback.print_exc()
\ No newline at end of file
+        traceback.print_exc()
+
+# =============================================================================
+# 🚀 실행 코드 (데이터 분석가가 실행할 부분)
+# =============================================================================
+
+if __name__ == "__main__":
+    # 인자 없이 실행하면 예시 고객 한 명의 추천을 보여주고,
+    # 설문 파일을 넘기면 여러 프로세스로 일괄 채점합니다. (python "머신러닝Api 코드.py" --help)
+    if len(sys.argv) > 1:
+        sys.exit(main())
+    run_demo()